@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def _ordered_remove(ids: List[str], nbr: array, pos: Dict[str, int], edge_id: str):
+    """
+    内部辅助函数：删除一条边记录，并保持其余边的相对顺序。
+    边 ID 列表即节点对外暴露的 in_edge / out_edge，调用方可能依赖其插入顺序，
+    因此这里不使用与末尾交换的方式，而是整体前移后续记录，代价为 O(度数)。
+    """
+    i = pos.pop(edge_id)
+    del ids[i]
+    del nbr[i]
+    for j in range(i, len(ids)):
+        pos[ids[j]] = j
+
+
+class AdjacencyIndex:
+    """
+    知识图谱的内部邻接存储。
+
+    - 将节点 ID 映射为稠密整数下标，删除节点后下标会被回收复用
+    - 每个节点维护紧凑的出/入边结构：边 ID 列表、平行的邻居下标数组、边 ID 到位置的映射，
+      添加一条边为 O(1)，删除一条边为 O(度数)，删除后其余边保持原有顺序
+    - 维护 (起始下标, 结束下标) -> 边 ID 的节点对索引，用于快速重建路径上的边
+
+    边 ID 列表与 `Knowledge_Node.in_edge` / `out_edge` 是同一个列表对象，
+    因此节点对外暴露的 pydantic 字段始终与索引保持一致。
+    """
+
+    __slots__ = (
+        "_index", "_ids", "_free",
+        "_out_ids", "_out_nbr", "_out_pos",
+        "_in_ids", "_in_nbr", "_in_pos",
+        "_pairs", "_edge_ends",
+    )
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}  # 节点 ID -> 稠密下标
+        self._ids: List[Optional[str]] = []  # 稠密下标 -> 节点 ID（空槽为 None）
+        self._free: List[int] = []  # 可复用的空槽下标
+
+        self._out_ids: List[Optional[List[str]]] = []
+        self._out_nbr: List[Optional[array]] = []
+        self._out_pos: List[Optional[Dict[str, int]]] = []
+        self._in_ids: List[Optional[List[str]]] = []
+        self._in_nbr: List[Optional[array]] = []
+        self._in_pos: List[Optional[Dict[str, int]]] = []
+
+        self._pairs: Dict[Tuple[int, int], Dict[str, None]] = {}  # (u, v) -> 边 ID（保持插入顺序）
+        self._edge_ends: Dict[str, Tuple[int, int]] = {}  # 边 ID -> (u, v)
+
+    # 节点
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._index
+
+    @property
+    def capacity(self) -> int:
+        """稠密下标空间的大小（包括空槽），可用于分配按下标访问的数组。"""
+        return len(self._ids)
+
+    def add_node(self, node_id: str, in_edge: List[str], out_edge: List[str]) -> int:
+        """
+        注册一个节点，返回其稠密下标。
+
+        Args:
+            node_id (str): 节点 ID。
+            in_edge (List[str]): 节点的入边列表对象，索引会直接维护该列表。
+            out_edge (List[str]): 节点的出边列表对象，索引会直接维护该列表。
+
+        传入的两个列表会先被清空：节点的边只能通过 `add_edge` 注册。
+        """
+        if node_id in self._index:
+            raise ValueError(f"节点 ID {node_id} 已存在")
+        in_edge.clear()
+        out_edge.clear()
+
+        if self._free:
+            idx = self._free.pop()
+            self._ids[idx] = node_id
+            self._out_ids[idx], self._out_nbr[idx], self._out_pos[idx] = out_edge, array("l"), {}
+            self._in_ids[idx], self._in_nbr[idx], self._in_pos[idx] = in_edge, array("l"), {}
+        else:
+            idx = len(self._ids)
+            self._ids.append(node_id)
+            self._out_ids.append(out_edge)
+            self._out_nbr.append(array("l"))
+            self._out_pos.append({})
+            self._in_ids.append(in_edge)
+            self._in_nbr.append(array("l"))
+            self._in_pos.append({})
+        self._index[node_id] = idx
+        return idx
+
+    def remove_node(self, node_id: str) -> List[str]:
+        """
+        注销一个节点，并从其邻居处摘除所有关联的边。
+        只需更新邻居一侧的结构，总代价与被摘除的边在邻居处的位置之后的记录数成正比。
+
+        Returns:
+            List[str]: 被一并移除的边 ID 列表（已去重）。
+        """
+        idx = self._index.pop(node_id)
+        removed: List[str] = []
+
+        for edge_id, v in zip(self._out_ids[idx], self._out_nbr[idx]):
+            removed.append(edge_id)
+            if v != idx:  # 自环同时位于本节点的入边中，随本节点一起丢弃
+                _ordered_remove(self._in_ids[v], self._in_nbr[v], self._in_pos[v], edge_id)
+            self._drop_pair(edge_id)
+        for edge_id, u in zip(self._in_ids[idx], self._in_nbr[idx]):
+            if u == idx:
+                continue
+            removed.append(edge_id)
+            _ordered_remove(self._out_ids[u], self._out_nbr[u], self._out_pos[u], edge_id)
+            self._drop_pair(edge_id)
+
+        # 清空节点对象上的边列表，并释放槽位
+        self._out_ids[idx].clear()
+        self._in_ids[idx].clear()
+        self._ids[idx] = None
+        self._out_ids[idx] = self._out_nbr[idx] = self._out_pos[idx] = None
+        self._in_ids[idx] = self._in_nbr[idx] = self._in_pos[idx] = None
+        self._free.append(idx)
+        return removed
+
+    def index_of(self, node_id: str) -> int:
+        """获取节点的稠密下标，节点不存在时抛出 KeyError。"""
+        return self._index[node_id]
+
+    def id_of(self, idx: int) -> str:
+        """根据稠密下标获取节点 ID。"""
+        node_id = self._ids[idx]
+        if node_id is None:
+            raise KeyError(idx)
+        return node_id
+
+    def node_ids(self) -> Iterable[str]:
+        """迭代所有已注册的节点 ID。"""
+        return self._index.keys()
+
+    def node_indices(self) -> Iterable[int]:
+        """迭代所有已注册节点的稠密下标。"""
+        return self._index.values()
+
+    # 边
+
+    def add_edge(self, edge_id: str, start_node_id: str, end_node_id: str):
+        """注册一条边，两端节点必须已注册。"""
+        u = self._index[start_node_id]
+        v = self._index[end_node_id]
+
+        out_ids = self._out_ids[u]
+        self._out_pos[u][edge_id] = len(out_ids)
+        out_ids.append(edge_id)
+        self._out_nbr[u].append(v)
+
+        in_ids = self._in_ids[v]
+        self._in_pos[v][edge_id] = len(in_ids)
+        in_ids.append(edge_id)
+        self._in_nbr[v].append(u)
+
+        self._pairs.setdefault((u, v), {})[edge_id] = None
+        self._edge_ends[edge_id] = (u, v)
+
+    def remove_edge(self, edge_id: str):
+        """注销一条边，两端节点的其余边保持原有顺序。"""
+        u, v = self._edge_ends[edge_id]
+        _ordered_remove(self._out_ids[u], self._out_nbr[u], self._out_pos[u], edge_id)
+        _ordered_remove(self._in_ids[v], self._in_nbr[v], self._in_pos[v], edge_id)
+        self._drop_pair(edge_id)
+
+    def _drop_pair(self, edge_id: str):
+        """内部辅助方法：从节点对索引中移除一条边。"""
+        pair = self._edge_ends.pop(edge_id)
+        bucket = self._pairs[pair]
+        del bucket[edge_id]
+        if not bucket:
+            del self._pairs[pair]
+
+    def edges_between(self, start_node_id: str, end_node_id: str) -> List[str]:
+        """获取从起始节点直接指向结束节点的所有边 ID。"""
+        u = self._index.get(start_node_id)
+        v = self._index.get(end_node_id)
+        if u is None or v is None:
+            return []
+        return list(self._pairs.get((u, v), ()))
+
+    def edges_between_index(self, u: int, v: int) -> List[str]:
+        """与 `edges_between` 相同，但以稠密下标为参数。"""
+        return list(self._pairs.get((u, v), ()))
+
+    # 按下标访问（供遍历算法使用，不产生新的列表）
+
+    def out_edge_ids(self, idx: int) -> List[str]:
+        """获取节点出边 ID 列表（只读使用，不要修改）。"""
+        return self._out_ids[idx]
+
+    def in_edge_ids(self, idx: int) -> List[str]:
+        """获取节点入边 ID 列表（只读使用，不要修改）。"""
+        return self._in_ids[idx]
+
+    def out_neighbours(self, idx: int) -> array:
+        """获取节点出边指向的邻居下标数组，可能包含重复（平行边）。"""
+        return self._out_nbr[idx]
+
+    def in_neighbours(self, idx: int) -> array:
+        """获取指向该节点的邻居下标数组，可能包含重复（平行边）。"""
+        return self._in_nbr[idx]
+
+    def out_degree(self, idx: int) -> int:
+        """获取节点出度。"""
+        return len(self._out_nbr[idx])
+
+    def in_degree(self, idx: int) -> int:
+        """获取节点入度。"""
+        return len(self._in_nbr[idx])
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field, ValidationError
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+import argparse
+import json
+import random
+import time
+import uuid
+
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Node, Knowledge_Edge
+from src.graph_manager.knowledge_core.similarity_index import DEFAULT_THRESHOLD
+
+if TYPE_CHECKING:
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+# 批量数据中自动生成的 ID 与已有 ID 冲突时，最多重新生成的次数
+_MAX_ID_RETRIES = 8
+
+# 近似重复节点的处理方式：不检查、只标记、合并到已有节点
+DEDUP_MODES = ("off", "flag", "merge")
+
+
+class BatchItemError(BaseModel):
+    """
+    批量数据中一个条目的错误。
+    """
+    kind: str # 'node'、'edge' 或 'payload'（整体格式错误）
+    index: Optional[int] = Field(default=None) # 条目在 nodes/edges 列表中的位置
+    id: Optional[str] = Field(default=None) # 条目的 ID（能够确定时）
+    message: str
+
+
+class DuplicateMatch(BaseModel):
+    """
+    批量数据中与图谱已有节点近似重复的节点。
+    """
+    index: int # 节点在 nodes 列表中的位置
+    id: str
+    title: str
+    match_id: str # 相似的已有节点
+    match_title: str
+    score: float # 相似度
+    merged: bool = Field(default=False) # 是否已合并到已有节点（未创建新节点）
+
+
+class BatchError(ValueError):
+    """
+    批量添加的数据未通过校验。整个批次都没有写入图谱，`errors` 给出每个出错条目的位置与原因。
+    """
+
+    def __init__(self, errors: List[BatchItemError]):
+        self.errors = errors
+        super().__init__(f"批量数据校验失败，共 {len(errors)} 处错误，未写入任何内容")
+
+
+def _validation_message(error: ValidationError) -> str:
+    """内部辅助函数：将 pydantic 的校验错误压缩为一行。"""
+    return "; ".join(f"{'.'.join(str(loc) for loc in item['loc']) or '条目'}: {item['msg']}" for item in error.errors())
+
+
+def _fresh_id(taken: Set[str]) -> str:
+    """内部辅助函数：生成一个不在 taken 中的 ID，生成方式与节点/边的默认 ID 相同。"""
+    for _ in range(_MAX_ID_RETRIES):
+        new_id = str(uuid.uuid4())[:8]
+        if new_id not in taken:
+            return new_id
+    return str(uuid.uuid4())
+
+
+def check_batch(graph: Knowledge_Graph, nodes: List[Knowledge_Node], edges: List[Knowledge_Edge]) -> List[BatchItemError]:
+    """
+    校验一批节点和边能否整体加入图谱，一次遍历收集所有错误。
+
+    - 节点 ID 不能与图谱中或批次内的其他节点重复，边 ID 同理
+    - 边的起止节点必须已在图谱中，或是同一批次中的节点
+
+    Args:
+        graph (Knowledge_Graph): 目标图谱。
+        nodes (List[Knowledge_Node]): 待添加的节点。
+        edges (List[Knowledge_Edge]): 待添加的边。
+
+    Returns:
+        List[BatchItemError]: 发现的错误，为空表示可以整体添加。
+    """
+    errors: List[BatchItemError] = []
+    graph_nodes = graph.nodes
+    batch_node_ids: Set[str] = set()
+    for index, node in enumerate(nodes):
+        if node.id in graph_nodes:
+            errors.append(BatchItemError(kind="node", index=index, id=node.id, message=f"节点 ID {node.id} 已存在"))
+        elif node.id in batch_node_ids:
+            errors.append(BatchItemError(kind="node", index=index, id=node.id, message=f"节点 ID {node.id} 在本批次中重复"))
+        batch_node_ids.add(node.id)
+
+    graph_edges = graph.edges
+    batch_edge_ids: Set[str] = set()
+    for index, edge in enumerate(edges):
+        if edge.id in graph_edges:
+            errors.append(BatchItemError(kind="edge", index=index, id=edge.id, message=f"边 ID {edge.id} 已存在"))
+        elif edge.id in batch_edge_ids:
+            errors.append(BatchItemError(kind="edge", index=index, id=edge.id, message=f"边 ID {edge.id} 在本批次中重复"))
+        batch_edge_ids.add(edge.id)
+        for node_id, label in ((edge.start_node_id, "起始"), (edge.end_node_id, "结束")):
+            if node_id not in graph_nodes and node_id not in batch_node_ids:
+                errors.append(BatchItemError(kind="edge", index=index, id=edge.id, message=f"{label}节点 ID {node_id} 不存在"))
+    return errors
+
+
+def _resolve_duplicates(graph: Knowledge_Graph, parsed: Dict[str, list], threshold: float, merge: bool) -> List[DuplicateMatch]:
+    """
+    内部辅助函数：为批次中的每个新节点查找图谱中最相似的已有节点。
+    merge 为 True 时从批次中移除这些节点，并将引用它们的边改为连接已有节点。
+    """
+    duplicates: List[DuplicateMatch] = []
+    redirect: Dict[str, str] = {}
+    kept = []
+    for index, node in parsed["node"]:
+        matches = [] if node.id in graph.nodes else graph.find_similar_nodes(node.title, node.tags, threshold, limit=1)
+        if matches:
+            match, score = matches[0]
+            duplicates.append(DuplicateMatch(
+                index=index, id=node.id, title=node.title,
+                match_id=match.id, match_title=match.title, score=round(score, 3), merged=merge,
+            ))
+            if merge:
+                redirect[node.id] = match.id
+                continue
+        kept.append((index, node))
+    parsed["node"] = kept
+    if redirect:
+        for _, edge in parsed["edge"]:
+            edge.start_node_id = redirect.get(edge.start_node_id, edge.start_node_id)
+            edge.end_node_id = redirect.get(edge.end_node_id, edge.end_node_id)
+    return duplicates
+
+
+def prepare_batch(graph: Knowledge_Graph, data: Any, dedup: str = "off", threshold: float = DEFAULT_THRESHOLD) -> Tuple[List[Knowledge_Node], List[Knowledge_Edge], List[BatchItemError], List[DuplicateMatch]]:
+    """
+    将 batch_add_from_json 格式的数据（含 "nodes" 和/或 "edges" 列表的对象）解析为节点与边，并完成全部校验。
+
+    未提供 ID 的条目使用自动生成的 ID；自动生成的 ID 若恰好与已有 ID 冲突会重新生成，不会导致整批失败。
+    dedup 不为 'off' 时，为每个新节点查找标题近似重复的已有节点；'merge' 模式下这些节点不再创建，
+    引用它们的边改为连接已有节点（新节点的描述与标签不会写入）。批次内部的近似重复不做检查。
+
+    Args:
+        graph (Knowledge_Graph): 目标图谱。
+        data (Any): 已解析的 JSON 数据。
+        dedup (str): 近似重复节点的处理方式，'off'、'flag' 或 'merge'。默认为 'off'。
+        threshold (float): 判定为近似重复的最低相似度。默认为 DEFAULT_THRESHOLD。
+
+    Returns:
+        Tuple[List[Knowledge_Node], List[Knowledge_Edge], List[BatchItemError], List[DuplicateMatch]]: 节点、边、所有错误与近似重复的节点。
+    """
+    if dedup not in DEDUP_MODES:
+        raise ValueError(f"不支持的去重方式: {dedup}，可选值为 {', '.join(DEDUP_MODES)}")
+    if not isinstance(data, dict):
+        return [], [], [BatchItemError(kind="payload", message="顶层必须是包含 nodes 和/或 edges 的对象")], []
+
+    errors: List[BatchItemError] = []
+    parsed: Dict[str, list] = {"node": [], "edge": []}
+    for kind, key, model in (("node", "nodes", Knowledge_Node), ("edge", "edges", Knowledge_Edge)):
+        items = data.get(key, [])
+        if not isinstance(items, list):
+            errors.append(BatchItemError(kind="payload", message=f"{key} 必须是列表"))
+            continue
+        taken = graph.nodes if kind == "node" else graph.edges
+        explicit_ids = {item["id"] for item in items if isinstance(item, dict) and isinstance(item.get("id"), str)}
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append(BatchItemError(kind=kind, index=index, message="条目必须是对象"))
+                continue
+            try:
+                obj = model(**item)
+            except (ValidationError, TypeError) as e:
+                message = _validation_message(e) if isinstance(e, ValidationError) else str(e)
+                errors.append(BatchItemError(kind=kind, index=index, id=item.get("id"), message=message))
+                continue
+            if "id" not in item and (obj.id in taken or obj.id in explicit_ids):
+                obj.id = _fresh_id(explicit_ids | set(taken))
+            if "id" not in item:
+                explicit_ids.add(obj.id)
+            parsed[kind].append((index, obj))
+
+    duplicates = _resolve_duplicates(graph, parsed, threshold, dedup == "merge") if dedup != "off" else []
+    nodes = [node for _, node in parsed["node"]]
+    edges = [edge for _, edge in parsed["edge"]]
+    for error in check_batch(graph, nodes, edges):
+        # check_batch 中的位置是解析成功的条目的位置，换算回原始列表中的位置
+        error.index = parsed[error.kind][error.index][0]
+        errors.append(error)
+    return nodes, edges, errors, duplicates
+
+
+class BatchSummary(BaseModel):
+    """
+    一次批量添加的结果摘要。
+    """
+    added_nodes: int = Field(default=0)
+    added_edges: int = Field(default=0)
+    errors: List[BatchItemError] = Field(default_factory=list)
+    duplicates: List[DuplicateMatch] = Field(default_factory=list)
+    elapsed: float = Field(default=0.0) # 校验与写入的总耗时（秒）
+
+    @property
+    def success(self) -> bool:
+        return not self.errors
+
+
+def ingest(graph: Knowledge_Graph, data: Any, dedup: str = "off", threshold: float = DEFAULT_THRESHOLD) -> BatchSummary:
+    """
+    原子地批量添加节点和边：先完整校验整个批次，全部通过后一次性写入并更新索引；任何错误都会使整个批次不被写入。
+
+    Args:
+        graph (Knowledge_Graph): 目标图谱。
+        data (Any): 已解析的 JSON 数据，格式同 batch_add_from_json。
+        dedup (str): 近似重复节点的处理方式，'off'、'flag' 或 'merge'，见 prepare_batch。默认为 'off'。
+        threshold (float): 判定为近似重复的最低相似度。默认为 DEFAULT_THRESHOLD。
+
+    Returns:
+        BatchSummary: 添加结果。errors 非空时图谱保持不变。
+    """
+    started = time.perf_counter()
+    nodes, edges, errors, duplicates = prepare_batch(graph, data, dedup, threshold)
+    if errors:
+        return BatchSummary(errors=errors, duplicates=duplicates, elapsed=time.perf_counter() - started)
+    graph.add_batch(nodes, edges, validate=False)
+    return BatchSummary(added_nodes=len(nodes), added_edges=len(edges), duplicates=duplicates, elapsed=time.perf_counter() - started)
+
+
+# 吞吐量基准
+
+def _synthetic_payload(node_count: int, edges_per_node: float, existing: Iterable[str], seed: int) -> Dict[str, List[Dict[str, Any]]]:
+    """内部辅助函数：生成一批随机节点与边，边的端点既有批次内的节点，也有图谱中已有的节点。"""
+    rng = random.Random(seed)
+    prefix = f"b{seed}-"
+    node_ids = [f"{prefix}n{i}" for i in range(node_count)]
+    endpoints = node_ids + list(existing)
+    nodes = [
+        {"id": node_id, "title": f"概念 {node_id}", "description": f"批量导入的节点 {node_id}", "tags": rng.sample(["数学", "物理", "AI", "错题", "定义", "定理"], 2)}
+        for node_id in node_ids
+    ]
+    edges = [
+        {"id": f"{prefix}e{i}", "start_node_id": rng.choice(endpoints), "end_node_id": rng.choice(endpoints), "title": rng.choice(["前置知识", "应用于", "属于"])}
+        for i in range(int(node_count * edges_per_node))
+    ]
+    return {"nodes": nodes, "edges": edges}
+
+
+def _legacy_add(graph: Knowledge_Graph, data: Dict[str, List[Dict[str, Any]]]):
+    """内部辅助函数：逐条添加节点和边，即批量导入接口出现之前的做法，作为基准对照。"""
+    for node_data in data["nodes"]:
+        graph.add_node(Knowledge_Node(**node_data))
+    for edge_data in data["edges"]:
+        graph.add_edge(Knowledge_Edge(**edge_data))
+
+
+def run_benchmark(batch_size: int = 5000, batches: int = 3, edges_per_node: float = 2.0, listener: bool = True) -> List[Dict[str, Any]]:
+    """
+    测量批量导入的吞吐量，并与逐条添加对照。每一轮向同一个图谱依次导入 batches 个批次。
+
+    Args:
+        batch_size (int): 每个批次的节点数。
+        batches (int): 批次数。
+        edges_per_node (float): 每个节点平均对应的边数。
+        listener (bool): 是否挂载一个空的修改监听器，模拟挂载了修改日志的图谱。
+
+    Returns:
+        List[Dict[str, Any]]: 每种方式一条结果，包含总条目数、耗时与每秒条目数。
+    """
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+    payloads = []
+    existing: List[str] = []
+    for seed in range(batches):
+        payload = _synthetic_payload(batch_size, edges_per_node, existing[:1000], seed)
+        payloads.append(json.dumps(payload, ensure_ascii=False))
+        existing += [node["id"] for node in payload["nodes"]]
+
+    results = []
+    for method in ("legacy", "bulk"):
+        graph = Knowledge_Graph(name="benchmark")
+        if listener:
+            graph.add_listener(lambda op, payload: None)
+        items = 0
+        started = time.perf_counter()
+        for payload in payloads:
+            data = json.loads(payload)
+            if method == "legacy":
+                _legacy_add(graph, data)
+            else:
+                summary = ingest(graph, data)
+                if not summary.success:
+                    raise BatchError(summary.errors)
+            items += len(data["nodes"]) + len(data["edges"])
+        elapsed = time.perf_counter() - started
+        results.append({"method": method, "items": items, "seconds": elapsed, "items_per_second": items / elapsed})
+    return results
+
+
+def _main(argv: Optional[List[str]] = None):
+    """命令行入口：运行批量导入吞吐量基准。"""
+    parser = argparse.ArgumentParser(description="知识图谱批量导入吞吐量基准")
+    parser.add_argument("--batch-size", type=int, default=5000, help="每个批次的节点数")
+    parser.add_argument("--batches", type=int, default=3, help="批次数")
+    parser.add_argument("--edges-per-node", type=float, default=2.0, help="每个节点平均对应的边数")
+    parser.add_argument("--no-listener", action="store_true", help="不挂载修改监听器")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.batch_size, args.batches, args.edges_per_node, not args.no_listener)
+    for result in results:
+        print(f"{result['method']:>6}: {result['items']} 条, {result['seconds']:.3f} 秒, {result['items_per_second']:.0f} 条/秒")
+    print(f"加速比: {results[0]['seconds'] / results[1]['seconds']:.2f}x")
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from collections import deque
+import random
+import threading
+import networkx as nx
+
+from src.graph_manager.knowledge_core.parallel_centrality import parallel_betweenness_centrality, parallel_closeness_centrality
+
+# 节点数不超过该值时默认精确计算，超过后自动切换为采样近似
+DEFAULT_EXACT_LIMIT = 1000
+# 采样近似时最多使用的源节点数量
+DEFAULT_MAX_SAMPLES = 256
+# 采样使用的固定随机种子，保证同一版本图谱的排名可复现
+DEFAULT_SEED = 42
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """获取所有图谱共享的后台计算线程池，首次使用时创建。"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kg-centrality")
+        return _executor
+
+
+class CentralityResult(NamedTuple):
+    """
+    一次中心性计算的结果。
+
+    Attributes:
+        version (int): 计算时图谱的版本号，尚无结果时为 -1。
+        scores (Dict[str, float]): 节点 ID 到得分的映射。
+        ranking (List[Tuple[str, float]]): 按得分从高到低排序的 (节点 ID, 得分) 列表。
+        approximate (bool): 是否为采样近似结果。
+        computing (bool): 为 True 表示后台模式下尚无任何可用结果，计算已在后台进行，此时 scores 与 ranking 为空。
+    """
+    version: int
+    scores: Dict[str, float]
+    ranking: List[Tuple[str, float]]
+    approximate: bool
+    computing: bool = False
+
+
+def _canonical_order(G: nx.DiGraph) -> nx.DiGraph:
+    """
+    内部辅助函数：返回节点与边按 ID 排序的副本。
+    采样近似按节点顺序选取源节点，统一顺序后，无论投影以何种顺序构建，同一版本的采样结果都相同。
+    """
+    H = nx.DiGraph()
+    H.add_nodes_from(sorted(G, key=str))
+    H.add_edges_from(sorted(G.edges, key=lambda edge: (str(edge[0]), str(edge[1]))))
+    return H
+
+
+def sampled_closeness_centrality(G: nx.DiGraph, k: int, seed: int = DEFAULT_SEED) -> Dict[str, float]:
+    """
+    基于采样的接近中心性近似（Eppstein-Wang 估计）。
+
+    与 networkx 一致，有向图使用入方向距离，并按可达节点比例进行 Wang-Faust 修正。
+    从 k 个随机源节点出发做 BFS，每个节点 u 累计能到达它的采样源数量 c_u 与距离之和 d_u，
+    估计值为 (c_u / d_u) * (c_u / k')，其中 k' 为不含 u 自身的有效样本数。
+
+    Args:
+        G (nx.DiGraph): 要计算的图。
+        k (int): 采样的源节点数量。
+        seed (int): 随机种子。
+    """
+    nodes = list(G)
+    sources = random.Random(seed).sample(nodes, min(k, len(nodes)))
+    reach_count: Dict[str, int] = dict.fromkeys(nodes, 0)
+    dist_sum: Dict[str, int] = dict.fromkeys(nodes, 0)
+    succ = G._succ
+
+    for source in sources:
+        dist = {source: 0}
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            d = dist[u] + 1
+            for v in succ[u]:
+                if v not in dist:
+                    dist[v] = d
+                    reach_count[v] += 1
+                    dist_sum[v] += d
+                    queue.append(v)
+
+    # 节点自身被采样时不计入，有效样本数相应减一
+    sampled = set(sources)
+    sample_size = len(sources)
+    result = {}
+    for node in nodes:
+        if not dist_sum[node]:
+            result[node] = 0.0
+            continue
+        effective = sample_size - 1 if node in sampled else sample_size
+        result[node] = (reach_count[node] / dist_sum[node]) * (reach_count[node] / effective)
+    return result
+
+
+class CentralityEngine:
+    """
+    知识图谱的中心性计算子系统。
+
+    - 结果按图谱版本缓存，图谱未修改时直接复用
+    - 根据图谱规模自动选择精确计算或带固定种子的采样近似
+    - 后台模式下从不在调用线程中计算：已有旧结果时返回最近一次成功的结果，否则返回 computing 标记，
+      新版本在后台线程中计算；计算失败的任务会被丢弃，下次调用时重新提交
+    - 指定 workers 时使用多进程实现，结果与单进程计算一致，可直接复用同一份缓存
+
+    后台线程只读取与图谱修改无关的数据：调用方提供 detach 时，由它在调用线程中以较小代价捕获当前状态，
+    投影在后台线程中构建；否则在调用线程中复制 networkx 投影。
+    """
+
+    def __init__(self, exact_limit: int = DEFAULT_EXACT_LIMIT, max_samples: int = DEFAULT_MAX_SAMPLES, seed: int = DEFAULT_SEED):
+        self.exact_limit = exact_limit
+        self.max_samples = max_samples
+        self.seed = seed
+        self._results: Dict[Tuple[str, bool], CentralityResult] = {}
+        self._pending: Dict[Tuple[str, bool], Tuple[int, Future]] = {}
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        # 缓存与后台任务不随图谱复制，副本从空缓存开始
+        return CentralityEngine(self.exact_limit, self.max_samples, self.seed)
+
+    def should_approximate(self, node_count: int) -> bool:
+        """根据节点数量判断是否应使用采样近似。"""
+        return node_count > self.exact_limit
+
+    def _compute(self, metric: str, G: nx.DiGraph, approximate: bool, workers: Optional[int] = None) -> Dict[str, float]:
+        """内部辅助方法：在给定快照上计算中心性，workers 大于 1 时使用多进程实现。"""
+        parallel = workers is not None and workers > 1 and len(G) > 0
+        if approximate:
+            G = _canonical_order(G)
+        if metric == "betweenness":
+            k = min(self.max_samples, len(G)) if approximate else None
+            seed = self.seed if approximate else None
+            if parallel:
+                return parallel_betweenness_centrality(G, workers, k=k, seed=seed)
+            return nx.betweenness_centrality(G, k=k, normalized=True, seed=seed)
+        if metric == "closeness":
+            if approximate:
+                return sampled_closeness_centrality(G, self.max_samples, self.seed)
+            if parallel:
+                return parallel_closeness_centrality(G, workers)
+            return nx.closeness_centrality(G)
+        raise ValueError(f"不支持的中心性指标: {metric}")
+
+    def _run(self, key: Tuple[str, bool], version: int, build: Callable[[], nx.DiGraph], workers: Optional[int] = None) -> CentralityResult:
+        """
+        内部辅助方法：构建投影、计算并登记结果，只保留版本最新的结果。
+        无论成功与否都会移除该版本的后台任务记录，失败的任务不会被之后的调用继续等待。
+        """
+        metric, approximate = key
+        try:
+            scores = self._compute(metric, build(), approximate, workers)
+        except BaseException:
+            self._drop_pending(key, version)
+            raise
+        ranking = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        result = CentralityResult(version, scores, ranking, approximate)
+        with self._lock:
+            current = self._results.get(key)
+            if current is None or current.version < version:
+                self._results[key] = result
+        self._drop_pending(key, version)
+        return result
+
+    def _drop_pending(self, key: Tuple[str, bool], version: int):
+        """内部辅助方法：移除指定版本的后台任务记录。"""
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None and pending[0] == version:
+                del self._pending[key]
+
+    def get(self, metric: str, version: int, projection: Callable[[], nx.DiGraph], approximate: Optional[bool] = None, background: bool = False, workers: Optional[int] = None, detach: Optional[Callable[[], Callable[[], nx.DiGraph]]] = None) -> CentralityResult:
+        """
+        获取指定版本图谱的中心性结果。
+
+        Args:
+            metric (str): 'betweenness' 或 'closeness'。
+            version (int): 当前图谱版本号。
+            projection (Callable[[], nx.DiGraph]): 返回当前图谱 networkx 投影的函数，仅在需要时调用。
+            approximate (Optional[bool]): 是否采样近似，None 表示根据图谱规模自动选择。
+            background (bool): 为 True 时不在调用线程中计算：若已有旧结果则立即返回旧结果，
+                否则返回 computing 标记，新版本在后台计算。
+            workers (Optional[int]): 计算使用的进程数，None 或 1 表示在当前进程中计算。
+            detach (Optional[Callable[[], Callable[[], nx.DiGraph]]]): 后台模式下使用。在调用线程中捕获当前状态，
+                返回一个可在后台线程中构建投影的函数；None 表示在调用线程中复制 projection() 的结果。
+
+        Returns:
+            CentralityResult: 计算结果，后台模式下其 version 可能小于当前版本，或为 computing 标记。
+        """
+        G = None
+        if approximate is None:
+            G = projection()
+            approximate = self.should_approximate(len(G))
+        key = (metric, approximate)
+
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and cached.version == version:
+                return cached
+            pending = self._pending.get(key)
+            # 规模越过阈值导致计算方式切换时，也可以先用另一种方式的旧结果顶上
+            stale = cached if cached is not None else self._results.get((metric, not approximate))
+
+        if background:
+            if pending is None or pending[0] != version:
+                if detach is not None:
+                    build = detach()
+                else:
+                    snapshot = (G if G is not None else projection()).copy()
+                    build = lambda: snapshot
+                with self._lock:
+                    future = _get_executor().submit(self._run, key, version, build, workers)
+                    self._pending[key] = (version, future)
+            if stale is not None:
+                return stale
+            return CentralityResult(-1, {}, [], approximate, computing=True)
+
+        if pending is not None and pending[0] == version:
+            return pending[1].result()
+        return self._run(key, version, lambda: G if G is not None else projection(), workers)
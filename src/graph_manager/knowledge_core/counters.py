@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from typing import Dict, Generic, Hashable, Iterator, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+class RankedCounter(Generic[K]):
+    """
+    支持 O(1) 增减计数、O(k) 获取前 k 名的计数器。
+
+    计数相同的键放在同一个桶中，非空桶按计数值串成双向链表（类似 LFU 缓存的结构）。
+    由于计数每次只变化 1，新桶总是插在相邻位置，不需要排序。
+
+    Args:
+        floor (int): 计数下限，取 0 或 1。通过 `add_key` 加入的新键计数为 floor，
+            对不存在的键调用 `increment` 时视其原计数为 0；计数降到 floor 以下时键被移除。
+            度数统计使用 0（度数为 0 的节点也参与排名），标签统计使用 1（出现次数为 0 的标签不再保留）。
+    """
+
+    __slots__ = ("_floor", "_counts", "_buckets", "_higher", "_lower", "_min", "_max")
+
+    def __init__(self, floor: int = 0):
+        if floor not in (0, 1):
+            raise ValueError("floor 只能为 0 或 1")
+        self._floor = floor
+        self._counts: Dict[K, int] = {}
+        self._buckets: Dict[int, Dict[K, None]] = {}  # 计数 -> 键（保持插入顺序）
+        self._higher: Dict[int, Optional[int]] = {}  # 计数 -> 更大的相邻非空计数
+        self._lower: Dict[int, Optional[int]] = {}  # 计数 -> 更小的相邻非空计数
+        self._min: Optional[int] = None
+        self._max: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._counts
+
+    def __getitem__(self, key: K) -> int:
+        return self._counts[key]
+
+    def get(self, key: K, default: int = 0) -> int:
+        """获取键的计数，不存在时返回 default。"""
+        return self._counts.get(key, default)
+
+    # 桶链表维护
+
+    def _link(self, count: int, lower: Optional[int], higher: Optional[int]):
+        """内部辅助方法：在 lower 与 higher 之间插入一个新的空桶。"""
+        self._buckets[count] = {}
+        self._lower[count] = lower
+        self._higher[count] = higher
+        if lower is not None:
+            self._higher[lower] = count
+        else:
+            self._min = count
+        if higher is not None:
+            self._lower[higher] = count
+        else:
+            self._max = count
+
+    def _unlink_if_empty(self, count: int):
+        """内部辅助方法：桶为空时将其从链表中摘除。"""
+        if self._buckets[count]:
+            return
+        lower = self._lower.pop(count)
+        higher = self._higher.pop(count)
+        del self._buckets[count]
+        if lower is not None:
+            self._higher[lower] = higher
+        else:
+            self._min = higher
+        if higher is not None:
+            self._lower[higher] = lower
+        else:
+            self._max = lower
+
+    def _insert(self, key: K, count: int):
+        """
+        内部辅助方法：以 floor 或 1 的计数插入新键。
+        除 floor 桶外，已有计数都不小于 1，因此新桶只可能位于链表底部。
+        """
+        if count not in self._buckets:
+            if count > self._floor and self._floor in self._buckets:
+                self._link(count, self._floor, self._higher[self._floor])
+            else:
+                self._link(count, None, self._min)
+        self._buckets[count][key] = None
+        self._counts[key] = count
+
+    # 公共接口
+
+    def add_key(self, key: K):
+        """以下限计数加入一个新键，键已存在时不做任何操作。"""
+        if key not in self._counts:
+            self._insert(key, self._floor)
+
+    def discard(self, key: K):
+        """移除一个键（无论计数多少），键不存在时静默忽略。"""
+        count = self._counts.pop(key, None)
+        if count is None:
+            return
+        del self._buckets[count][key]
+        self._unlink_if_empty(count)
+
+    def increment(self, key: K):
+        """将键的计数加 1，键不存在时以计数 1 加入。"""
+        count = self._counts.get(key)
+        if count is None:
+            self._insert(key, 1)
+            return
+        new_count = count + 1
+        if new_count not in self._buckets:
+            self._link(new_count, count, self._higher[count])
+        del self._buckets[count][key]
+        self._buckets[new_count][key] = None
+        self._counts[key] = new_count
+        self._unlink_if_empty(count)
+
+    def decrement(self, key: K):
+        """将键的计数减 1，低于下限时移除该键。"""
+        count = self._counts[key]
+        new_count = count - 1
+        if new_count < self._floor:
+            self.discard(key)
+            return
+        if new_count not in self._buckets:
+            self._link(new_count, self._lower[count], count)
+        del self._buckets[count][key]
+        self._buckets[new_count][key] = None
+        self._counts[key] = new_count
+        self._unlink_if_empty(count)
+
+    def iter_ranked(self) -> Iterator[Tuple[K, int]]:
+        """按计数从高到低迭代 (键, 计数)，计数相同的按进入该计数的先后顺序。"""
+        count = self._max
+        while count is not None:
+            for key in self._buckets[count]:
+                yield key, count
+            count = self._lower[count]
+
+    def most_common(self, top_k: int) -> List[Tuple[K, int]]:
+        """获取计数最高的前 top_k 个 (键, 计数)，代价为 O(top_k)。"""
+        result: List[Tuple[K, int]] = []
+        if top_k <= 0:
+            return result
+        for item in self.iter_ranked():
+            result.append(item)
+            if len(result) >= top_k:
+                break
+        return result
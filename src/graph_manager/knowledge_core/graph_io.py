@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import gzip
+import json
+import os
+
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Node, Knowledge_Edge
+
+if TYPE_CHECKING:
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+# 紧凑格式的标识与版本，写在文件第一行的头记录中
+FORMAT_NAME = "kg-ndjson"
+FORMAT_VERSION = 1
+
+# 紧凑格式的文件后缀，.gz 表示 gzip 压缩
+NDJSON_SUFFIXES = (".ndjson", ".ndjson.gz")
+# SQLite 存储后端的文件后缀，此类图谱通过 sqlite_storage 读写而非整体序列化
+SQLITE_SUFFIXES = (".sqlite", ".db")
+# 图谱目录中可识别的所有图谱文件后缀
+GRAPH_FILE_SUFFIXES = (".json",) + NDJSON_SUFFIXES + SQLITE_SUFFIXES
+
+# 记录中字段的排列顺序，同时写入头记录，便于日后扩展字段
+NODE_FIELDS = ("id", "title", "description", "tags")
+EDGE_FIELDS = ("id", "title", "start_node_id", "end_node_id", "description")
+
+
+def is_ndjson_path(filepath: str | Path) -> bool:
+    """判断文件路径是否使用紧凑的 NDJSON 格式。"""
+    return str(filepath).endswith(NDJSON_SUFFIXES)
+
+
+def strip_graph_suffix(filepath: str | Path) -> str:
+    """去掉图谱文件的后缀，返回文件主名（如 'math.ndjson.gz' -> 'math'）。"""
+    name = Path(filepath).name
+    for suffix in sorted(GRAPH_FILE_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return Path(filepath).stem
+
+
+def _open_text(filepath: str | Path, mode: str, compress: Optional[bool] = None) -> IO[str]:
+    """内部辅助函数：以文本模式打开文件，compress 为 None 时根据 .gz 后缀自动决定是否使用 gzip。"""
+    if compress is None:
+        compress = str(filepath).endswith(".gz")
+    if compress:
+        return gzip.open(filepath, mode + "t", encoding="utf-8", compresslevel=6)
+    return open(filepath, mode, encoding="utf-8", newline="\n")
+
+
+def _dumps(record: Any) -> str:
+    """内部辅助函数：将一条记录序列化为单行 JSON。"""
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+def iter_records(graph: Knowledge_Graph) -> Iterator[str]:
+    """
+    逐行生成图谱的 NDJSON 记录：首行为头记录，随后为所有节点，最后为所有边。
+    节点记录不包含 in_edge/out_edge，加载时由边重建。
+    """
+    yield _dumps({
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "name": graph.name,
+        "node_count": len(graph.nodes),
+        "edge_count": len(graph.edges),
+        "node_fields": NODE_FIELDS,
+        "edge_fields": EDGE_FIELDS,
+    })
+    for node in graph.nodes.values():
+        yield _dumps(["n", node.id, node.title, node.description, node.tags])
+    for edge in graph.edges.values():
+        yield _dumps(["e", edge.id, edge.title, edge.start_node_id, edge.end_node_id, edge.description])
+
+
+def atomic_write_lines(filepath: str | Path, lines: Iterable[str]):
+    """
+    将若干行文本写入文件（后缀为 .gz 时压缩），并在落盘后原子地替换目标文件。
+
+    先写入同目录下的临时文件并 fsync，完成后再替换，写入中途失败不会破坏原有文件。
+
+    Args:
+        filepath (str | Path): 目标文件路径。
+        lines (Iterable[str]): 要写入的文本行，不含换行符。
+    """
+    filepath = Path(filepath)
+    tmp_path = filepath.with_name(filepath.name + ".tmp")
+    try:
+        with _open_text(tmp_path, "w", compress=str(filepath).endswith(".gz")) as f:
+            for line in lines:
+                f.write(line)
+                f.write("\n")
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def snapshot_lines(graph: Knowledge_Graph, filepath: str | Path) -> List[str]:
+    """
+    按目标文件的格式将图谱序列化为文本行，供稍后（例如在后台线程中）调用 atomic_write_lines 写入。
+    序列化在调用线程中完成，之后对图谱的修改不会影响返回的内容。
+    """
+    if is_ndjson_path(filepath):
+        return list(iter_records(graph))
+    return [graph.model_dump_json(indent=4)]
+
+
+def write_ndjson(graph: Knowledge_Graph, filepath: str | Path):
+    """
+    以流式方式将图谱写入 NDJSON 文件（后缀为 .gz 时压缩），完成后原子地替换目标文件。
+
+    Args:
+        graph (Knowledge_Graph): 要保存的图谱。
+        filepath (str | Path): 目标文件路径。
+    """
+    atomic_write_lines(filepath, iter_records(graph))
+
+
+def _read_header(f: IO[str], filepath: str | Path) -> Dict[str, Any]:
+    """内部辅助函数：读取并校验头记录。"""
+    header = json.loads(f.readline() or "null")
+    if not isinstance(header, dict) or header.get("format") != FORMAT_NAME:
+        raise ValueError(f"文件 {filepath} 不是有效的图谱 NDJSON 文件")
+    if header.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(f"文件 {filepath} 的格式版本 {header.get('version')} 高于当前支持的版本 {FORMAT_VERSION}")
+    return header
+
+
+def read_header(filepath: str | Path) -> Dict[str, Any]:
+    """只读取 NDJSON 文件的头记录（图谱名称、节点数、边数），不解析其余内容。"""
+    with _open_text(filepath, "r") as f:
+        return _read_header(f, filepath)
+
+
+# 图谱的紧凑表示：(名称, 节点行, 边行)，行内字段依次为 NODE_FIELDS / EDGE_FIELDS
+GraphRecords = Tuple[str, List[Tuple], List[Tuple]]
+
+
+def _read_ndjson_records(filepath: str | Path) -> GraphRecords:
+    """内部辅助函数：逐行读取 NDJSON 文件中的节点行与边行。"""
+    node_rows: List[Tuple] = []
+    edge_rows: List[Tuple] = []
+    with _open_text(filepath, "r") as f:
+        header = _read_header(f, filepath)
+        node_fields: List[str] = header.get("node_fields", NODE_FIELDS)
+        edge_fields: List[str] = header.get("edge_fields", EDGE_FIELDS)
+        # 头记录中的字段顺序与当前版本一致时直接截取，否则按字段名重新排列
+        node_order = None if tuple(node_fields) == NODE_FIELDS else [node_fields.index(field) for field in NODE_FIELDS]
+        edge_order = None if tuple(edge_fields) == EDGE_FIELDS else [edge_fields.index(field) for field in EDGE_FIELDS]
+
+        for line_no, line in enumerate(f, start=2):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            kind = record[0]
+            if kind == "n":
+                values = record[1:]
+                node_rows.append(tuple(values) if node_order is None else tuple(values[i] for i in node_order))
+            elif kind == "e":
+                values = record[1:]
+                edge_rows.append(tuple(values) if edge_order is None else tuple(values[i] for i in edge_order))
+            else:
+                raise ValueError(f"文件 {filepath} 第 {line_no} 行的记录类型 {kind!r} 无效")
+    return header.get("name", "Knowledge Graph"), node_rows, edge_rows
+
+
+def _read_json_records(filepath: str | Path) -> GraphRecords:
+    """内部辅助函数：读取旧 JSON 格式文件中的节点行与边行，忽略冗余的 in_edge/out_edge。"""
+    with open(filepath, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    node_rows = [
+        (node.get("id"), node.get("title", "Node"), node.get("description"), node.get("tags", []))
+        for node in data.get("nodes", {}).values()
+    ]
+    edge_rows = [
+        (edge.get("id"), edge.get("title", "Edge"), edge.get("start_node_id"), edge.get("end_node_id"), edge.get("description"))
+        for edge in data.get("edges", {}).values()
+    ]
+    return data.get("name", "Knowledge Graph"), node_rows, edge_rows
+
+
+def read_graph_records(filepath: str | Path) -> GraphRecords:
+    """
+    读取任意格式的图谱文件，返回紧凑的 (名称, 节点行, 边行) 表示，不构造任何 pydantic 对象。
+    结果只包含字符串、列表与元组，适合在进程间传递。
+
+    Args:
+        filepath (str | Path): 图谱文件路径。
+
+    Returns:
+        GraphRecords: 图谱名称、节点行与边行。
+    """
+    from src.graph_manager.knowledge_core.storage import is_storage_path, open_storage
+
+    if is_storage_path(filepath):
+        with open_storage(filepath, readonly=True) as storage:
+            node_rows = [(node.id, node.title, node.description, node.tags) for node in storage.iter_nodes()]
+            edge_rows = [(edge.id, edge.title, edge.start_node_id, edge.end_node_id, edge.description) for edge in storage.iter_edges()]
+            return storage.name, node_rows, edge_rows
+    if is_ndjson_path(filepath):
+        return _read_ndjson_records(filepath)
+    return _read_json_records(filepath)
+
+
+def graph_from_records(records: GraphRecords, graph_cls: type) -> Knowledge_Graph:
+    """
+    由紧凑表示一次性构造图谱：先构造全部节点和边并校验 ID 与引用，再一次性建立图谱索引。
+
+    Args:
+        records (GraphRecords): read_graph_records 的返回值。
+        graph_cls (type): 要构造的图谱类（Knowledge_Graph 或其子类）。
+
+    Returns:
+        Knowledge_Graph: 构造得到的图谱。
+    """
+    name, node_rows, edge_rows = records
+    nodes: Dict[str, Knowledge_Node] = {}
+    edges: Dict[str, Knowledge_Edge] = {}
+    for row in node_rows:
+        node = Knowledge_Node(**dict(zip(NODE_FIELDS, row)))
+        if node.id in nodes:
+            raise ValueError(f"节点 ID {node.id} 已存在")
+        nodes[node.id] = node
+    for row in edge_rows:
+        edge = Knowledge_Edge(**dict(zip(EDGE_FIELDS, row)))
+        if edge.id in edges:
+            raise ValueError(f"边 ID {edge.id} 已存在")
+        if edge.start_node_id not in nodes:
+            raise ValueError(f"加载边 {edge.id} 时，起始节点 {edge.start_node_id} 不存在")
+        if edge.end_node_id not in nodes:
+            raise ValueError(f"加载边 {edge.id} 时，结束节点 {edge.end_node_id} 不存在")
+        edges[edge.id] = edge
+
+    # 构造时由 model_post_init 一次性重建全部索引
+    return graph_cls(name=name, nodes=nodes, edges=edges)
+
+
+def read_ndjson(filepath: str | Path, graph_cls: type) -> Knowledge_Graph:
+    """
+    以流式方式从 NDJSON 文件加载图谱，逐行解析记录，不在内存中保留完整的 JSON 树。
+    所有记录读取完毕后一次性建立图谱索引。
+
+    Args:
+        filepath (str | Path): 文件路径。
+        graph_cls (type): 要构造的图谱类（Knowledge_Graph 或其子类）。
+
+    Returns:
+        Knowledge_Graph: 加载得到的图谱。
+    """
+    return graph_from_records(_read_ndjson_records(filepath), graph_cls)
+
+
+def convert_json_to_ndjson(src: str | Path, dst: Optional[str | Path] = None, compress: bool = True) -> Path:
+    """
+    将旧的 JSON 图谱文件转换为紧凑的 NDJSON 格式。
+
+    Args:
+        src (str | Path): 原 JSON 文件路径。
+        dst (Optional[str | Path]): 目标文件路径，默认与原文件同目录同名，后缀为 .ndjson(.gz)。
+        compress (bool): 未指定 dst 时是否使用 gzip 压缩。默认为 True。
+
+    Returns:
+        Path: 写入的目标文件路径。
+    """
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+    src = Path(src)
+    if dst is None:
+        dst = src.with_name(strip_graph_suffix(src) + (".ndjson.gz" if compress else ".ndjson"))
+    dst = Path(dst)
+    if not is_ndjson_path(dst):
+        raise ValueError(f"目标文件 {dst} 的后缀必须为 {' 或 '.join(NDJSON_SUFFIXES)}")
+    graph = Knowledge_Graph.load_from_file(str(src))
+    write_ndjson(graph, dst)
+    return dst
+
+
+def _main(argv: Optional[List[str]] = None):
+    """命令行入口：批量转换 JSON 图谱文件。"""
+    parser = argparse.ArgumentParser(description="将 JSON 格式的知识图谱文件转换为紧凑的 NDJSON 格式")
+    parser.add_argument("files", nargs="+", help="要转换的 JSON 图谱文件")
+    parser.add_argument("--no-compress", action="store_true", help="输出未压缩的 .ndjson 文件")
+    parser.add_argument("--remove-source", action="store_true", help="转换成功后删除原 JSON 文件")
+    args = parser.parse_args(argv)
+
+    for file in args.files:
+        dst = convert_json_to_ndjson(file, compress=not args.no_compress)
+        print(f"{file} -> {dst}")
+        if args.remove_source:
+            Path(file).unlink()
+
+
+if __name__ == "__main__":
+    _main()
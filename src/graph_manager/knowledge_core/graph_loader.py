@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Sequence, Tuple, Union
+import os
+
+from src.graph_manager.knowledge_core.graph_io import graph_from_records, read_graph_records
+
+if TYPE_CHECKING:
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+
+def default_workers(task_count: int) -> int:
+    """默认的工作进程数：不超过任务数与 CPU 核心数。"""
+    return max(1, min(task_count, os.cpu_count() or 1))
+
+
+def _call(func: Callable[[Path], Any], path: Path) -> Tuple[bool, Any]:
+    """内部辅助函数：在工作进程中执行任务，异常作为结果返回，避免单个文件出错中断整批任务。"""
+    try:
+        return True, func(path)
+    except Exception as e:
+        return False, e
+
+
+def _call_star(args: Tuple[Callable[[Path], Any], Path]) -> Tuple[bool, Any]:
+    """内部辅助函数：供 ProcessPoolExecutor.map 调用的单参数版本。"""
+    return _call(*args)
+
+
+def map_files(func: Callable[[Path], Any], paths: Sequence[str | Path], workers: Optional[int] = None) -> Dict[Path, Union[Any, Exception]]:
+    """
+    对一批文件并行执行 func，返回每个文件的结果或异常。
+
+    func 必须是模块级函数且返回值可被 pickle；只有一个文件或 workers <= 1 时直接在当前进程中执行，没有进程间开销。
+
+    Args:
+        func (Callable[[Path], Any]): 对单个文件执行的函数。
+        paths (Sequence[str | Path]): 文件路径。
+        workers (Optional[int]): 工作进程数，默认见 default_workers。
+
+    Returns:
+        Dict[Path, Union[Any, Exception]]: 文件路径 -> 结果（失败时为异常对象），顺序与输入一致。
+    """
+    paths = [Path(path) for path in paths]
+    if workers is None:
+        workers = default_workers(len(paths))
+    if workers <= 1 or len(paths) <= 1:
+        outcomes = [_call(func, path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            outcomes = list(pool.map(_call_star, [(func, path) for path in paths]))
+    return {path: result for path, (_, result) in zip(paths, outcomes)}
+
+
+def load_graph_files(paths: Sequence[str | Path], workers: Optional[int] = None, graph_cls: Optional[type] = None) -> Dict[Path, Union[Knowledge_Graph, Exception]]:
+    """
+    并行加载多个图谱文件。
+
+    工作进程只负责读取与解析文件，并以紧凑的 (名称, 节点行, 边行) 元组形式返回，
+    主进程再一次性构造 pydantic 对象并建立索引；这样进程间只传递字符串与元组，避免序列化整个对象图。
+
+    Args:
+        paths (Sequence[str | Path]): 图谱文件路径。
+        workers (Optional[int]): 工作进程数，默认见 default_workers。
+        graph_cls (Optional[type]): 要构造的图谱类，默认为 Knowledge_Graph。
+
+    Returns:
+        Dict[Path, Union[Knowledge_Graph, Exception]]: 文件路径 -> 加载得到的图谱（失败时为异常对象）。
+    """
+    if graph_cls is None:
+        from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+        graph_cls = Knowledge_Graph
+
+    graphs: Dict[Path, Union[Knowledge_Graph, Exception]] = {}
+    for path, records in map_files(read_graph_records, paths, workers).items():
+        if isinstance(records, Exception):
+            graphs[path] = records
+            continue
+        try:
+            graphs[path] = graph_from_records(records, graph_cls)
+        except Exception as e:
+            graphs[path] = e
+    return graphs
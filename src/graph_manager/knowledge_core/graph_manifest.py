@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+import json
+import logging
+
+from pydantic import BaseModel, Field
+
+from src.graph_manager.knowledge_core.graph_io import GRAPH_FILE_SUFFIXES, atomic_write_lines, is_ndjson_path, read_header
+from src.graph_manager.knowledge_core.graph_loader import map_files
+from src.graph_manager.knowledge_core.mutation_log import log_paths_for, replay
+from src.graph_manager.knowledge_core.storage import is_storage_path, open_storage
+
+if TYPE_CHECKING:
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+logger = logging.getLogger(__name__)
+
+# 清单文件名，后缀不属于图谱文件后缀，扫描图谱目录时不会被当作图谱加载
+MANIFEST_FILENAME = "graphs.manifest"
+MANIFEST_VERSION = 1
+
+
+def file_signature(filepath: str | Path) -> Tuple[int, ...]:
+    """
+    图谱文件及其修改日志的 (大小, 修改时间) 签名，任一文件变化都会使签名改变。
+    不存在的文件记为 (0, 0)。
+    """
+    signature: List[int] = []
+    for path in (Path(filepath),) + log_paths_for(filepath):
+        try:
+            stat = path.stat()
+            signature += [stat.st_size, stat.st_mtime_ns]
+        except FileNotFoundError:
+            signature += [0, 0]
+    return tuple(signature)
+
+
+def _has_pending_log(filepath: Path) -> bool:
+    """内部辅助函数：图谱是否有尚未压缩进快照的修改日志。"""
+    return any(path.exists() and path.stat().st_size > 0 for path in log_paths_for(filepath))
+
+
+def describe_graph_file(filepath: str | Path) -> Tuple[str, int, int]:
+    """
+    以尽量低的代价读取图谱文件的 (名称, 节点数, 边数)。
+
+    - 存储后端文件（如 .sqlite）：直接查询
+    - 没有待重放日志的 NDJSON 文件：只读取头记录
+    - 没有待重放日志的 JSON 文件：只解析 JSON，不构造 pydantic 对象
+    - 有待重放日志时：完整加载并重放日志，保证计数准确
+
+    Args:
+        filepath (str | Path): 图谱文件路径。
+
+    Returns:
+        Tuple[str, int, int]: 图谱名称、节点数与边数。
+    """
+    filepath = Path(filepath)
+    if is_storage_path(filepath):
+        with open_storage(filepath, readonly=True) as storage:
+            return storage.name, storage.node_count(), storage.edge_count()
+    if _has_pending_log(filepath):
+        from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+        graph = Knowledge_Graph.load_from_file(str(filepath))
+        for log_path in log_paths_for(filepath):
+            replay(graph, log_path)
+        return graph.name, len(graph.nodes), len(graph.edges)
+    if is_ndjson_path(filepath):
+        header = read_header(filepath)
+        return header.get("name", "Knowledge Graph"), header.get("node_count", 0), header.get("edge_count", 0)
+    with open(filepath, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("name", "Knowledge Graph"), len(data.get("nodes", {})), len(data.get("edges", {}))
+
+
+class GraphManifestEntry(BaseModel):
+    """
+    清单中一个图谱文件的摘要。
+    """
+    file: str # 图谱文件名（相对于图谱目录）
+    name: str # 图谱名称
+    node_count: int = Field(default=0)
+    edge_count: int = Field(default=0)
+    size: int = Field(default=0) # 图谱文件大小（字节）
+    mtime: float = Field(default=0.0) # 图谱文件修改时间（秒）
+    signature: List[int] = Field(default_factory=list) # 生成摘要时的 file_signature，用于判断摘要是否过期
+
+
+class GraphManifest:
+    """
+    图谱目录的轻量清单：记录每个图谱文件的名称、节点数、边数、文件大小与修改时间。
+
+    - 清单保存在图谱目录下的 `graphs.manifest` 中，启动时只需读取清单并 stat 各个文件
+    - 文件（或其修改日志）的大小、修改时间与清单一致时直接复用摘要，否则以最低代价重新读取
+    - 已加载的图谱修改后，调用 `update` 用内存中的实际计数刷新摘要
+    """
+
+    def __init__(self, graph_dir: str | Path):
+        self.graph_dir = Path(graph_dir)
+        self.entries: Dict[str, GraphManifestEntry] = {} # 文件名 -> 摘要
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[GraphManifestEntry]:
+        return iter(self.entries.values())
+
+    @property
+    def path(self) -> Path:
+        """清单文件路径。"""
+        return self.graph_dir / MANIFEST_FILENAME
+
+    @classmethod
+    def load(cls, graph_dir: str | Path) -> GraphManifest:
+        """
+        读取图谱目录中的清单。清单不存在或已损坏时返回空清单，随后由 `refresh` 重建。
+        """
+        manifest = cls(graph_dir)
+        try:
+            with open(manifest.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                for item in data.get("graphs", []):
+                    entry = GraphManifestEntry(**item)
+                    manifest.entries[entry.file] = entry
+        except (OSError, ValueError):
+            manifest.entries.clear()
+        return manifest
+
+    def save(self, force: bool = False):
+        """清单有变化（或 force 为 True）时原子地写回清单文件。"""
+        if not (self._dirty or force):
+            return
+        data = {"version": MANIFEST_VERSION, "graphs": [entry.model_dump() for entry in self.entries.values()]}
+        atomic_write_lines(self.path, [json.dumps(data, ensure_ascii=False, indent=4)])
+        self._dirty = False
+
+    def scan(self) -> List[Path]:
+        """列出图谱目录中所有可识别的图谱文件。"""
+        return [file for suffix in GRAPH_FILE_SUFFIXES for file in sorted(self.graph_dir.glob(f"*{suffix}"))]
+
+    def refresh(self, workers: Optional[int] = None) -> List[str]:
+        """
+        扫描图谱目录，使清单与磁盘上的文件保持一致：复用未变化文件的摘要，重新读取新增或变化的文件，移除已删除的文件。
+        需要重新读取的文件较多时在进程池中并行读取。
+
+        Args:
+            workers (Optional[int]): 并行读取的进程数，默认见 graph_loader.default_workers。
+
+        Returns:
+            List[str]: 无法读取的图谱文件路径。
+        """
+        signatures = {graph_file: list(file_signature(graph_file)) for graph_file in self.scan()}
+        # 存储后端文件的修改可能只落在其自身的日志中，且查询计数的代价很低，因此总是重新读取
+        stale = [
+            graph_file for graph_file, signature in signatures.items()
+            if graph_file.name not in self.entries or self.entries[graph_file.name].signature != signature or is_storage_path(graph_file)
+        ]
+        described = map_files(describe_graph_file, stale, workers)
+
+        err_load_list = []
+        entries: Dict[str, GraphManifestEntry] = {}
+        for graph_file, signature in signatures.items():
+            entry = self.entries.get(graph_file.name)
+            if graph_file in described:
+                result = described[graph_file]
+                if isinstance(result, Exception):
+                    logger.warning("Error loading graph from %s: %s", graph_file, result)
+                    err_load_list.append(str(graph_file))
+                    continue
+                fresh = self._entry(graph_file, signature, *result)
+                if fresh != entry:
+                    entry = fresh
+                    self._dirty = True
+            entries[graph_file.name] = entry
+        if entries.keys() != self.entries.keys():
+            self._dirty = True
+        self.entries = entries
+        return err_load_list
+
+    @staticmethod
+    def _entry(graph_file: Path, signature: List[int], name: str, node_count: int, edge_count: int) -> GraphManifestEntry:
+        """内部辅助方法：由文件签名与图谱计数生成摘要。"""
+        return GraphManifestEntry(
+            file=graph_file.name, name=name, node_count=node_count, edge_count=edge_count,
+            size=signature[0], mtime=signature[1] / 1e9, signature=signature,
+        )
+
+    def update(self, filepath: str | Path, graph: Knowledge_Graph) -> GraphManifestEntry:
+        """
+        用内存中的图谱刷新（或新增）一个文件的摘要，计数取自图谱本身，签名取自当前磁盘状态。
+
+        Args:
+            filepath (str | Path): 图谱文件路径。
+            graph (Knowledge_Graph): 与该文件内容（含修改日志）一致的内存图谱。
+
+        Returns:
+            GraphManifestEntry: 更新后的摘要。
+        """
+        filepath = Path(filepath)
+        entry = self._entry(filepath, list(file_signature(filepath)), graph.name, len(graph.nodes), len(graph.edges))
+        if self.entries.get(entry.file) != entry:
+            self.entries[entry.file] = entry
+            self._dirty = True
+        return entry
+
+    def file_path(self, entry: GraphManifestEntry) -> Path:
+        """摘要对应的图谱文件完整路径。"""
+        return self.graph_dir / entry.file
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, model_validator
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional, Set, Tuple
+
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Node, Knowledge_Edge
+
+if TYPE_CHECKING:
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+# 单个查询的规模上限，防止模式过大导致搜索空间爆炸
+MAX_QUERY_VARIABLES = 8
+MAX_QUERY_HOPS = 6
+MAX_QUERY_LIMIT = 200
+DEFAULT_QUERY_LIMIT = 20
+
+
+class NodePattern(BaseModel):
+    """
+    节点变量的过滤条件，所有给出的条件需同时满足；不给任何条件表示任意节点。
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    id: Optional[str] = Field(default=None) # 节点 ID
+    ids: Optional[List[str]] = Field(default=None) # 节点 ID 之一
+    title: Optional[str] = Field(default=None) # 标题完全相同（不区分大小写）
+    keyword: Optional[str] = Field(default=None) # 标题、描述或标签包含该关键词（不区分大小写）
+    tags: Optional[List[str]] = Field(default=None) # 标签（不区分大小写）
+    tag_mode: Literal["AND", "OR"] = Field(default="AND") # tags 需全部包含还是包含任一即可
+
+
+class EdgePattern(BaseModel):
+    """
+    两个节点变量之间的连接条件：从 from 出发，经过 min_hops 到 max_hops 条边到达 to。
+    给出 title 时，路径上的每条边都必须是该类型（按 normalize_relation 规范化后相同）。
+    """
+    model_config = ConfigDict(extra="forbid", populate_by_name=True)
+
+    start: str = Field(alias="from") # 起点变量
+    end: str = Field(alias="to") # 终点变量
+    title: Optional[str] = Field(default=None) # 边的类型（标题）
+    min_hops: int = Field(default=1, ge=1, le=MAX_QUERY_HOPS)
+    max_hops: int = Field(default=1, ge=1, le=MAX_QUERY_HOPS)
+    directed: bool = Field(default=True) # 为 False 时忽略边的方向
+
+    @model_validator(mode="after")
+    def _check_hops(self) -> EdgePattern:
+        if self.min_hops > self.max_hops:
+            raise ValueError(f"min_hops ({self.min_hops}) 不能大于 max_hops ({self.max_hops})")
+        return self
+
+    def describe(self) -> str:
+        """模式的简短文字形式，如 'p -[前置知识*1..3]-> x'。"""
+        label = self.title or ""
+        if self.min_hops != 1 or self.max_hops != 1:
+            label += f"*{self.min_hops}..{self.max_hops}"
+        arrow = f"-[{label}]-" if label else "-"
+        return f"{self.start} {arrow}{'>' if self.directed else ''} {self.end}"
+
+
+class GraphQuery(BaseModel):
+    """
+    图模式查询：为每个节点变量找到满足过滤条件、且彼此之间满足所有连接条件的节点组合。
+
+    示例（查找 X 的前置知识中带有“错题”标签的节点）：
+        {"nodes": {"x": {"title": "X"}, "p": {"tags": ["错题"]}},
+         "edges": [{"from": "p", "to": "x", "title": "前置知识", "max_hops": 3}],
+         "return": ["p"], "limit": 20}
+    """
+    model_config = ConfigDict(extra="forbid", populate_by_name=True)
+
+    nodes: Dict[str, NodePattern] # 变量名 -> 过滤条件
+    edges: List[EdgePattern] = Field(default_factory=list)
+    returns: Optional[List[str]] = Field(default=None, alias="return") # 结果中列出的变量，默认为全部
+    limit: int = Field(default=DEFAULT_QUERY_LIMIT, ge=1, le=MAX_QUERY_LIMIT)
+
+    @model_validator(mode="after")
+    def _check_variables(self) -> GraphQuery:
+        if not self.nodes:
+            raise ValueError("nodes 中至少需要一个节点变量")
+        if len(self.nodes) > MAX_QUERY_VARIABLES:
+            raise ValueError(f"节点变量不能超过 {MAX_QUERY_VARIABLES} 个")
+        for edge in self.edges:
+            for var in (edge.start, edge.end):
+                if var not in self.nodes:
+                    raise ValueError(f"边模式 {edge.describe()} 中的变量 {var} 未在 nodes 中定义")
+        for var in self.returns or ():
+            if var not in self.nodes:
+                raise ValueError(f"return 中的变量 {var} 未在 nodes 中定义")
+        return self
+
+    @property
+    def return_variables(self) -> List[str]:
+        """结果中列出的变量。"""
+        return list(self.returns) if self.returns else list(self.nodes)
+
+
+class QueryMatch(BaseModel):
+    """
+    查询的一个结果。
+    """
+    nodes: Dict[str, Knowledge_Node] # 变量名 -> 节点（只包含 return 中的变量）
+    paths: List[List[Knowledge_Edge]] # 与查询的 edges 一一对应，满足该连接条件的一条最短路径上的边（按 from 到 to 的顺序）
+
+
+class QueryResult(BaseModel):
+    """
+    查询结果与执行计划。
+    """
+    matches: List[QueryMatch]
+    plan: List[str] # 执行计划的各个步骤
+    truncated: bool = Field(default=False) # 结果是否因 limit 被截断
+
+
+def parse_query(data: Any) -> GraphQuery:
+    """
+    校验并解析查询。
+
+    Args:
+        data (Any): 查询字典（通常来自 JSON）。
+
+    Returns:
+        GraphQuery: 解析后的查询。
+
+    Raises:
+        ValueError: 查询格式不正确，错误信息中逐条列出出错的位置与原因。
+    """
+    try:
+        return GraphQuery.model_validate(data)
+    except ValidationError as e:
+        details = "; ".join(
+            f"{'.'.join(str(loc) for loc in item['loc']) or '查询'}: {item['msg'].removeprefix('Value error, ')}"
+            for item in e.errors()
+        )
+        raise ValueError(f"查询格式错误: {details}") from None
+
+
+def _candidates(graph: Knowledge_Graph, pattern: NodePattern) -> Optional[List[str]]:
+    """
+    内部辅助函数：通过 ID、关键词索引与标签索引求出满足过滤条件的节点 ID。
+    所有条件都可以由索引直接回答，因此返回的就是精确结果；没有任何条件时返回 None 表示任意节点。
+    """
+    lists: List[List[str]] = []
+    if pattern.id is not None:
+        lists.append([pattern.id] if pattern.id in graph.nodes else [])
+    if pattern.ids is not None:
+        lists.append([node_id for node_id in dict.fromkeys(pattern.ids) if node_id in graph.nodes])
+    if pattern.title is not None:
+        folded = pattern.title.lower()
+        lists.append([node.id for node in graph.search_nodes_by_keyword(pattern.title) if node.title.lower() == folded])
+    if pattern.keyword is not None:
+        lists.append([node.id for node in graph.search_nodes_by_keyword(pattern.keyword)])
+    if pattern.tags:
+        lists.append([node.id for node in graph.search_nodes_by_tag(pattern.tags, pattern.tag_mode)])
+    if not lists:
+        return None
+    # 以最短的列表为基础按其顺序过滤（关键词搜索的结果按相关度排序，与其他条件同样短时优先保留其顺序）
+    lists.sort(key=len)
+    base, others = lists[0], [set(ids) for ids in lists[1:]]
+    return [node_id for node_id in base if all(node_id in other for other in others)]
+
+
+class _Step:
+    """内部辅助类：执行计划中的一步。kind 为 'scan'（枚举候选节点）、'expand'（沿边扩展到新变量）或 'check'（校验两个已绑定变量）。"""
+    __slots__ = ("kind", "var", "edge_index", "source", "reverse")
+
+    def __init__(self, kind: str, var: Optional[str] = None, edge_index: Optional[int] = None, source: Optional[str] = None, reverse: bool = False):
+        self.kind = kind
+        self.var = var # scan/expand 时绑定的变量
+        self.edge_index = edge_index
+        self.source = source # expand/check 时出发的已绑定变量
+        self.reverse = reverse # 是否逆着边的方向（从 to 走向 from）扩展
+
+
+def _plan_query(query: GraphQuery, estimates: Dict[str, int]) -> List[_Step]:
+    """
+    生成执行计划：从候选最少的变量开始，优先执行两端都已绑定的校验，
+    其次沿边扩展到候选最少的相邻变量；与已绑定变量不连通的变量再单独枚举。
+
+    Args:
+        query (GraphQuery): 查询。
+        estimates (Dict[str, int]): 各变量的候选节点数量。
+
+    Returns:
+        List[_Step]: 执行步骤。
+    """
+    order = {var: i for i, var in enumerate(query.nodes)}
+    bound: Set[str] = set()
+    pending = list(range(len(query.edges)))
+    steps: List[_Step] = []
+    while len(bound) < len(query.nodes) or pending:
+        checks = [i for i in pending if query.edges[i].start in bound and query.edges[i].end in bound]
+        if checks:
+            for i in checks:
+                steps.append(_Step("check", edge_index=i, source=query.edges[i].start))
+                pending.remove(i)
+            continue
+        expansions = []
+        for i in pending:
+            edge = query.edges[i]
+            if edge.start in bound:
+                expansions.append((estimates[edge.end], order[edge.end], i, edge.start, edge.end, False))
+            elif edge.end in bound:
+                expansions.append((estimates[edge.start], order[edge.start], i, edge.end, edge.start, True))
+        if expansions:
+            _, _, i, source, target, reverse = min(expansions)
+            steps.append(_Step("expand", var=target, edge_index=i, source=source, reverse=reverse))
+            pending.remove(i)
+            bound.add(target)
+            continue
+        var = min((var for var in query.nodes if var not in bound), key=lambda var: (estimates[var], order[var]))
+        steps.append(_Step("scan", var=var))
+        bound.add(var)
+    return steps
+
+
+def _describe_step(query: GraphQuery, step: _Step, estimates: Dict[str, int]) -> str:
+    """内部辅助函数：执行步骤的文字说明。"""
+    if step.kind == "scan":
+        return f"枚举 {step.var} 的候选节点（{estimates[step.var]} 个）"
+    edge = query.edges[step.edge_index]
+    if step.kind == "check":
+        return f"校验 {edge.describe()}"
+    direction = "逆向" if step.reverse else "沿"
+    return f"从 {step.source} {direction} {edge.describe()} 扩展到 {step.var}（{step.var} 的候选节点 {estimates[step.var]} 个）"
+
+
+def _reach(graph: Knowledge_Graph, start_id: str, edge: EdgePattern, reverse: bool) -> Dict[str, List[str]]:
+    """
+    内部辅助函数：从 start_id 出发，经过 min_hops 到 max_hops 条符合类型的边能到达的节点，以及到达每个节点的一条最短路径（边 ID）。
+    reverse 为 True 时逆着边的方向行走，返回的路径仍按从 from 到 to 的顺序排列。
+    路径可以重复经过节点（min_hops > 1 时需要）；已在合法跳数内到达过的节点不再重复扩展。
+    """
+    nodes = graph.nodes
+    edges = graph.edges
+    relation_index = graph.relation_index
+    title = edge.title
+    outgoing = not reverse or not edge.directed
+    incoming = reverse or not edge.directed
+    frontier: Dict[str, List[str]] = {start_id: []}
+    reached: Dict[str, List[str]] = {}
+    for depth in range(1, edge.max_hops + 1):
+        next_frontier: Dict[str, List[str]] = {}
+        for node_id, path in frontier.items():
+            node = nodes[node_id]
+            # 给出类型时通过关系类型索引只访问该类型的边
+            steps = []
+            if outgoing:
+                edge_ids = node.out_edge if title is None else relation_index.out_edge_ids(node_id, title)
+                steps.extend((edge_id, False) for edge_id in edge_ids)
+            if incoming:
+                edge_ids = node.in_edge if title is None else relation_index.in_edge_ids(node_id, title)
+                steps.extend((edge_id, True) for edge_id in edge_ids)
+            for edge_id, backward in steps:
+                item = edges[edge_id]
+                other = item.start_node_id if backward else item.end_node_id
+                if other in next_frontier or other in reached:
+                    continue
+                next_frontier[other] = path + [edge_id]
+        if depth >= edge.min_hops:
+            reached.update(next_frontier)
+        frontier = next_frontier
+        if not frontier:
+            break
+    if reverse:
+        return {node_id: path[::-1] for node_id, path in reached.items()}
+    return reached
+
+
+def run_query(graph: Knowledge_Graph, query: GraphQuery) -> QueryResult:
+    """
+    在图谱上执行模式查询。
+
+    先用索引求出每个变量的候选节点，按候选数量生成执行计划，再按计划回溯搜索；
+    每个 (边模式, 起点) 的可达节点只计算一次，找到 limit 个不同的结果后立即停止。
+
+    Args:
+        graph (Knowledge_Graph): 要查询的图谱。
+        query (GraphQuery): 查询。
+
+    Returns:
+        QueryResult: 查询结果与执行计划。
+    """
+    candidates = {var: _candidates(graph, pattern) for var, pattern in query.nodes.items()}
+    estimates = {var: len(ids) if ids is not None else len(graph.nodes) for var, ids in candidates.items()}
+    allowed = {var: set(ids) for var, ids in candidates.items() if ids is not None}
+    steps = _plan_query(query, estimates)
+    plan = [_describe_step(query, step, estimates) for step in steps]
+
+    returns = query.return_variables
+    reach_cache: Dict[Tuple[int, str, bool], Dict[str, List[str]]] = {}
+    binding: Dict[str, str] = {}
+    paths: List[List[str]] = [[] for _ in query.edges]
+    seen: Set[Tuple[str, ...]] = set()
+    matches: List[QueryMatch] = []
+
+    def reach(step: _Step) -> Dict[str, List[str]]:
+        key = (step.edge_index, binding[step.source], step.reverse)
+        if key not in reach_cache:
+            reach_cache[key] = _reach(graph, binding[step.source], query.edges[step.edge_index], step.reverse)
+        return reach_cache[key]
+
+    def search(position: int) -> bool:
+        """按计划回溯搜索，已收集到 limit + 1 个结果时返回 True 以停止搜索。"""
+        if position == len(steps):
+            key = tuple(binding[var] for var in returns)
+            if key not in seen:
+                seen.add(key)
+                matches.append(QueryMatch(
+                    nodes={var: graph.nodes[binding[var]] for var in returns},
+                    paths=[[graph.edges[edge_id] for edge_id in path] for path in paths],
+                ))
+            return len(matches) > query.limit
+        step = steps[position]
+        if step.kind == "scan":
+            ids = candidates[step.var]
+            for node_id in (ids if ids is not None else graph.nodes):
+                binding[step.var] = node_id
+                if search(position + 1):
+                    return True
+            binding.pop(step.var, None)
+            return False
+        reached = reach(step)
+        if step.kind == "check":
+            target = query.edges[step.edge_index].end
+            path = reached.get(binding[target])
+            if path is None:
+                return False
+            paths[step.edge_index] = path
+            return search(position + 1)
+        filter_ids = allowed.get(step.var)
+        for node_id, path in reached.items():
+            if filter_ids is not None and node_id not in filter_ids:
+                continue
+            binding[step.var] = node_id
+            paths[step.edge_index] = path
+            if search(position + 1):
+                return True
+        binding.pop(step.var, None)
+        return False
+
+    search(0)
+    truncated = len(matches) > query.limit
+    return QueryResult(matches=matches[:query.limit], plan=plan, truncated=truncated)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+
+class GraphRegistry:
+    """
+    以图谱名称为键的图谱注册表。
+
+    - 记录每个图谱名称对应的文件，按名称查找为 O(1)，同一名称只能对应一个文件
+    - 记录已加载到内存中的图谱，并按最近使用的顺序排列，供按 LRU 卸载
+    - 已加载的图谱一定已注册；注销图谱时同时移除其已加载的对象
+    """
+
+    def __init__(self):
+        self._files: Dict[str, Path] = {} # 图谱名称 -> 图谱文件
+        self._names: Dict[Path, str] = {} # 图谱文件 -> 图谱名称
+        self._loaded: OrderedDict[str, Knowledge_Graph] = OrderedDict() # 图谱名称 -> 已加载的图谱，最近使用的在末尾
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._files
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._files)
+
+    # 名称与文件
+
+    def register(self, name: str, file_path: str | Path):
+        """
+        注册图谱名称与其文件。重复注册同一名称与同一文件不做任何操作。
+
+        Args:
+            name (str): 图谱名称。
+            file_path (str | Path): 图谱文件路径。
+
+        Raises:
+            ValueError: 该名称已对应另一个文件，或该文件已属于另一个图谱。
+        """
+        file_path = Path(file_path)
+        registered = self._files.get(name)
+        if registered is not None:
+            if registered != file_path:
+                raise ValueError(f"图谱 {name} 已存在（{registered}）")
+            return
+        owner = self.name_of(file_path)
+        if owner is not None:
+            raise ValueError(f"图谱文件 {file_path} 已属于图谱 {owner}")
+        self._files[name] = file_path
+        self._names[file_path] = name
+
+    def unregister(self, name: str) -> Optional[Knowledge_Graph]:
+        """注销图谱，返回其已加载的对象（未加载时为 None）。"""
+        file_path = self._files.pop(name, None)
+        if file_path is not None:
+            self._names.pop(file_path, None)
+        return self._loaded.pop(name, None)
+
+    def file_path(self, name: str) -> Optional[Path]:
+        """图谱名称对应的文件，未注册时返回 None。"""
+        return self._files.get(name)
+
+    def name_of(self, file_path: str | Path) -> Optional[str]:
+        """文件对应的图谱名称，未注册时返回 None。"""
+        return self._names.get(Path(file_path))
+
+    def sync(self, entries: Iterable[Tuple[str, Path]]) -> List[Path]:
+        """
+        用目录扫描结果（图谱名称, 文件）重建名称与文件的对应关系。
+
+        多个文件使用同一名称时只保留一个：优先保留该名称此前对应的文件，其余按扫描顺序取第一个。
+        已加载的图谱不会被移除，调用方应检查其名称是否仍然注册。
+
+        Args:
+            entries (Iterable[Tuple[str, Path]]): 图谱名称与文件路径。
+
+        Returns:
+            List[Path]: 因名称重复而未注册的文件。
+        """
+        entries = [(name, Path(file_path)) for name, file_path in entries]
+        kept = {(name, file_path) for name, file_path in entries if self._files.get(name) == file_path}
+        files: Dict[str, Path] = {name: file_path for name, file_path in kept}
+        duplicates = []
+        for name, file_path in entries:
+            if (name, file_path) in kept:
+                continue
+            if name in files:
+                duplicates.append(file_path)
+            else:
+                files[name] = file_path
+        self._files = files
+        self._names = {file_path: name for name, file_path in files.items()}
+        return duplicates
+
+    # 已加载的图谱
+
+    def get(self, name: str) -> Optional[Knowledge_Graph]:
+        """返回已加载的图谱并将其标记为最近使用，未加载时返回 None。"""
+        graph = self._loaded.get(name)
+        if graph is not None:
+            self._loaded.move_to_end(name)
+        return graph
+
+    def is_loaded(self, name: str) -> bool:
+        """图谱是否已加载。"""
+        return name in self._loaded
+
+    def set_loaded(self, name: str, graph: Knowledge_Graph):
+        """
+        记录已加载的图谱并将其标记为最近使用。
+
+        Raises:
+            ValueError: 图谱名称未注册。
+        """
+        if name not in self._files:
+            raise ValueError(f"图谱 {name} 未注册")
+        self._loaded[name] = graph
+        self._loaded.move_to_end(name)
+
+    def unload(self, name: str) -> Optional[Knowledge_Graph]:
+        """移除已加载的图谱（名称仍保持注册），返回被移除的图谱。"""
+        return self._loaded.pop(name, None)
+
+    @property
+    def loaded(self) -> List[Knowledge_Graph]:
+        """已加载的图谱，按最近使用的顺序排列（最久未使用的在前）。"""
+        return list(self._loaded.values())
+
+    @property
+    def loaded_names(self) -> List[str]:
+        """已加载图谱的名称，按最近使用的顺序排列（最久未使用的在前）。"""
+        return list(self._loaded)
+
+    def clear(self):
+        """清空注册表。"""
+        self._files.clear()
+        self._names.clear()
+        self._loaded.clear()
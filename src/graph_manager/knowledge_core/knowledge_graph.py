@@ -1,12 +1,52 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Tuple
-from collections import deque
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import networkx as nx
-import json
 
 from src.graph_manager.knowledge_core.node_edge import Knowledge_Node, Knowledge_Edge
+from src.graph_manager.knowledge_core.adjacency import AdjacencyIndex
+from src.graph_manager.knowledge_core.bulk_ingest import BatchError, check_batch
+from src.graph_manager.knowledge_core.text_index import NGramIndex
+from src.graph_manager.knowledge_core.tag_index import TagIndex
+from src.graph_manager.knowledge_core.relation_index import RelationIndex, normalize_relation
+from src.graph_manager.knowledge_core.reachability import ReachabilityIndex
+from src.graph_manager.knowledge_core.similarity_index import DEFAULT_THRESHOLD, MinHashIndex
+from src.graph_manager.knowledge_core.vector_index import VectorIndex
+from src.graph_manager.knowledge_core.centrality import CentralityEngine, CentralityResult
+from src.graph_manager.knowledge_core.counters import RankedCounter
+from src.graph_manager.knowledge_core.graph_io import atomic_write_lines, graph_from_records, is_ndjson_path, read_graph_records, write_ndjson
+from src.graph_manager.knowledge_core.subgraph_view import DIRECTIONS, SubgraphView
+from src.graph_manager.knowledge_core.graph_query import GraphQuery, QueryResult, parse_query, run_query
+from src.graph_manager.knowledge_core.snapshot import GraphDiff, GraphSnapshot, SnapshotTracker, rollback
+from src.graph_manager.knowledge_core.learning_path import DEFAULT_PREREQUISITE_RELATION, MAX_PLANNERS_PER_GRAPH, LearningPlan, LearningPlanner
+from src.graph_manager.knowledge_core.path_search import PathCache, all_shortest_paths, bidirectional_shortest_path, k_shortest_paths
+from src.graph_manager.knowledge_core.storage import is_storage_path, open_storage
+
+
+def _node_text_fields(node: Knowledge_Node) -> Tuple[str, str, str]:
+    """节点参与关键词搜索的文本字段：标题、描述、标签。"""
+    return (node.title, node.description or "", " ".join(node.tags))
+
+
+def _edge_text_fields(edge: Knowledge_Edge) -> Tuple[str, str]:
+    """边参与关键词搜索的文本字段：标题、描述。"""
+    return (edge.title, edge.description or "")
+
+
+# 修改监听器：接收操作名称（如 'add_node'）与操作参数
+MutationListener = Callable[[str, Dict[str, Any]], None]
+
+
+class _Listeners(list):
+    """修改监听器列表。图谱被复制时，副本不继承原图的监听器（如修改日志）。"""
+
+    def __copy__(self):
+        return _Listeners()
+
+    def __deepcopy__(self, memo):
+        return _Listeners()
+
 
 # 知识图谱定义
 class Knowledge_Graph(BaseModel):
@@ -17,14 +57,135 @@ class Knowledge_Graph(BaseModel):
     nodes: Dict[str, Knowledge_Node] = Field(default={}) # 以 ID 为键存储所有节点
     edges: Dict[str, Knowledge_Edge] = Field(default={}) # 以 ID 为键存储所有边
 
+    # 内部邻接存储，节点的 in_edge/out_edge 列表由其直接维护
+    # 注意：直接修改 nodes/edges 字典会绕过索引，请始终使用 add_*/remove_* 方法
+    _adjacency: AdjacencyIndex = PrivateAttr(default_factory=AdjacencyIndex)
+    # 节点与边的关键词倒排索引
+    _node_text_index: NGramIndex = PrivateAttr(default_factory=NGramIndex)
+    _edge_text_index: NGramIndex = PrivateAttr(default_factory=NGramIndex)
+    # 标签倒排索引与标签频次表
+    _tag_index: TagIndex = PrivateAttr(default_factory=TagIndex)
+    # 关系类型索引（边标题 -> 边 ID，以及按关系类型划分的节点出边/入边）
+    _relation_index: RelationIndex = PrivateAttr(default_factory=RelationIndex)
+    # 可达性与连通分量索引（并查集 + 带标签的缩点 DAG），首次查询时构建，随增删操作原地更新或失效
+    _reachability: ReachabilityIndex = PrivateAttr(default_factory=ReachabilityIndex)
+    # 按度数分桶的入度/出度表，用于 O(k) 获取度数排名
+    _in_degree: RankedCounter = PrivateAttr(default_factory=RankedCounter)
+    _out_degree: RankedCounter = PrivateAttr(default_factory=RankedCounter)
+    # 图谱版本号，任何修改都会使其递增，供各类缓存判断是否失效
+    _version: int = PrivateAttr(default=0)
+    # 延迟构建的节点近似重复索引（MinHash + LSH），构建后随增删改操作原地更新
+    _similarity_index: Optional[MinHashIndex] = PrivateAttr(default=None)
+    # 延迟构建（或从索引文件加载）的节点文本向量索引，构建后随增删改操作原地更新
+    _vector_index: Optional[VectorIndex] = PrivateAttr(default=None)
+    # 延迟构建的 networkx 投影，构建后随增删操作原地更新
+    _nx_graph: Optional[nx.DiGraph] = PrivateAttr(default=None)
+    # 中心性计算子系统，按版本缓存结果并支持后台重算
+    _centrality: CentralityEngine = PrivateAttr(default_factory=CentralityEngine)
+    # 路径查询结果的 LRU 缓存，图谱版本变化后失效
+    _path_cache: PathCache = PrivateAttr(default_factory=PathCache)
+    # 修改监听器，每次增删改节点或边成功后依次调用（例如追加写修改日志）
+    _listeners: List[MutationListener] = PrivateAttr(default_factory=_Listeners)
+
+    @property
+    def version(self) -> int:
+        """图谱版本号，每次增删改节点或边后递增。"""
+        return self._version
+
+    def add_listener(self, listener: MutationListener):
+        """
+        注册修改监听器。每次 add/remove/update 节点或边成功后，监听器会收到 (操作名称, 操作参数)。
+        操作参数足以在另一个图谱上重放该修改。
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: MutationListener):
+        """注销修改监听器，监听器不存在时静默忽略。"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, op: str, payload: Dict[str, Any]):
+        """内部辅助方法：通知所有修改监听器。"""
+        for listener in list(self._listeners):
+            listener(op, payload)
+
+    def model_post_init(self, __context: Any):
+        """
+        通过构造参数传入节点和边时，重新建立内部索引。
+        """
+        if self.nodes or self.edges:
+            self._rebuild_indexes()
+
+    def _rebuild_indexes(self):
+        """
+        内部辅助方法：根据 nodes/edges 字典重建所有内部索引与节点引用。
+        批量加载时先填充字典再调用本方法，比逐个 add_node/add_edge 更快。
+        """
+        # 索引先在局部变量中构建，避免在循环中反复经过 pydantic 的私有属性访问
+        adjacency = AdjacencyIndex()
+        node_text_index = NGramIndex()
+        edge_text_index = NGramIndex()
+        tag_index = TagIndex()
+        relation_index = RelationIndex()
+        in_degree = RankedCounter()
+        out_degree = RankedCounter()
+        nodes = self.nodes
+        for node in nodes.values():
+            adjacency.add_node(node.id, node.in_edge, node.out_edge)
+            node_text_index.add(node.id, _node_text_fields(node))
+            tag_index.add(node.id, node.tags)
+            in_degree.add_key(node.id)
+            out_degree.add_key(node.id)
+        for edge in self.edges.values():
+            if edge.start_node_id not in nodes:
+                raise ValueError(f"起始节点 ID {edge.start_node_id} 不存在")
+            if edge.end_node_id not in nodes:
+                raise ValueError(f"结束节点 ID {edge.end_node_id} 不存在")
+            edge._start_node = nodes[edge.start_node_id]
+            edge._end_node = nodes[edge.end_node_id]
+            adjacency.add_edge(edge.id, edge.start_node_id, edge.end_node_id)
+            edge_text_index.add(edge.id, _edge_text_fields(edge))
+            relation_index.add(edge.id, edge.title, edge.start_node_id, edge.end_node_id)
+            out_degree.increment(edge.start_node_id)
+            in_degree.increment(edge.end_node_id)
+
+        self._adjacency = adjacency
+        self._node_text_index = node_text_index
+        self._edge_text_index = edge_text_index
+        self._tag_index = tag_index
+        self._relation_index = relation_index
+        self._in_degree = in_degree
+        self._out_degree = out_degree
+        self._similarity_index = None
+        self._vector_index = None
+        self._reachability = ReachabilityIndex()
+        self._nx_graph = None
+        self._version += 1
+
     def add_node(self, node: Knowledge_Node):
         """
         向图谱中添加一个节点。
         如果节点ID已存在，则抛出ValueError。
+        节点原有的 in_edge/out_edge 列表会被清空，由图谱在添加边时重新维护。
         """
         if node.id in self.nodes:
             raise ValueError(f"节点 ID {node.id} 已存在")
+        idx = self._adjacency.add_node(node.id, node.in_edge, node.out_edge)
+        self._reachability.add_node(idx)
+        self._node_text_index.add(node.id, _node_text_fields(node))
+        self._tag_index.add(node.id, node.tags)
+        self._in_degree.add_key(node.id)
+        self._out_degree.add_key(node.id)
         self.nodes[node.id] = node
+        if self._similarity_index is not None:
+            self._similarity_index.add(node.id, node.title, node.tags)
+        if self._vector_index is not None:
+            self._vector_index.add(node.id, _node_text_fields(node))
+        if self._nx_graph is not None:
+            self._nx_graph.add_node(node.id)
+        self._version += 1
+        if self._listeners:
+            self._emit("add_node", {"node": node.model_dump(exclude={"in_edge", "out_edge"})})
 
     def add_edge(self, edge: Knowledge_Edge):
         """
@@ -47,25 +208,132 @@ class Knowledge_Graph(BaseModel):
         edge._end_node = end_node_obj
 
         self.edges[edge.id] = edge
-        start_node_obj.out_edge.append(edge.id) # 更新起始节点的出边列表
-        end_node_obj.in_edge.append(edge.id)   # 更新结束节点的入边列表
+        # 同时更新起始节点的出边列表与结束节点的入边列表
+        self._adjacency.add_edge(edge.id, edge.start_node_id, edge.end_node_id)
+        self._edge_text_index.add(edge.id, _edge_text_fields(edge))
+        self._relation_index.add(edge.id, edge.title, edge.start_node_id, edge.end_node_id)
+        self._reachability.add_edge(self._adjacency.index_of(edge.start_node_id), self._adjacency.index_of(edge.end_node_id))
+        self._out_degree.increment(edge.start_node_id)
+        self._in_degree.increment(edge.end_node_id)
+        if self._nx_graph is not None:
+            self._nx_graph.add_edge(edge.start_node_id, edge.end_node_id)
+        self._version += 1
+        if self._listeners:
+            self._emit("add_edge", {"edge": edge.model_dump()})
+
+    def add_batch(self, nodes: List[Knowledge_Node], edges: List[Knowledge_Edge], validate: bool = True):
+        """
+        原子地添加一批节点和边。
+
+        - 先校验整个批次（ID 不重复、边的端点在图谱或本批次中），有任何错误都不做修改，抛出 BatchError
+        - 校验通过后一次性写入，所有索引在同一遍中更新，版本号只递增一次
+        - 修改监听器只收到一条 'add_batch' 事件，修改日志与存储后端可以原子地记录整个批次
+        - 写入或通知监听器的过程中出现异常时，回滚本批次的全部修改后重新抛出
+
+        Args:
+            nodes (List[Knowledge_Node]): 待添加的节点，节点原有的 in_edge/out_edge 列表会被清空。
+            edges (List[Knowledge_Edge]): 待添加的边，端点可以是本批次中的节点。
+            validate (bool): 是否校验批次。调用方已通过 check_batch 校验时可传 False。默认为 True。
+        """
+        if validate:
+            errors = check_batch(self, nodes, edges)
+            if errors:
+                raise BatchError(errors)
+        if not nodes and not edges:
+            return
+
+        all_nodes = self.nodes
+        all_edges = self.edges
+        adjacency = self._adjacency
+        node_text_index = self._node_text_index
+        edge_text_index = self._edge_text_index
+        tag_index = self._tag_index
+        relation_index = self._relation_index
+        reachability = self._reachability
+        in_degree = self._in_degree
+        out_degree = self._out_degree
+        try:
+            for node in nodes:
+                all_nodes[node.id] = node
+                reachability.add_node(adjacency.add_node(node.id, node.in_edge, node.out_edge))
+                node_text_index.add(node.id, _node_text_fields(node))
+                tag_index.add(node.id, node.tags)
+                in_degree.add_key(node.id)
+                out_degree.add_key(node.id)
+            for edge in edges:
+                all_edges[edge.id] = edge
+                edge._start_node = all_nodes[edge.start_node_id]
+                edge._end_node = all_nodes[edge.end_node_id]
+                adjacency.add_edge(edge.id, edge.start_node_id, edge.end_node_id)
+                edge_text_index.add(edge.id, _edge_text_fields(edge))
+                relation_index.add(edge.id, edge.title, edge.start_node_id, edge.end_node_id)
+                reachability.add_edge(adjacency.index_of(edge.start_node_id), adjacency.index_of(edge.end_node_id))
+                out_degree.increment(edge.start_node_id)
+                in_degree.increment(edge.end_node_id)
+            if self._similarity_index is not None:
+                for node in nodes:
+                    self._similarity_index.add(node.id, node.title, node.tags)
+            if self._vector_index is not None:
+                for node in nodes:
+                    self._vector_index.add(node.id, _node_text_fields(node))
+            if self._nx_graph is not None:
+                self._nx_graph.add_nodes_from(node.id for node in nodes)
+                self._nx_graph.add_edges_from((edge.start_node_id, edge.end_node_id) for edge in edges)
+            self._version += 1
+            if self._listeners:
+                self._emit("add_batch", {
+                    "nodes": [node.model_dump(exclude={"in_edge", "out_edge"}) for node in nodes],
+                    "edges": [edge.model_dump() for edge in edges],
+                })
+        except BaseException:
+            self._rollback_batch(nodes, edges)
+            raise
+
+    def _rollback_batch(self, nodes: List[Knowledge_Node], edges: List[Knowledge_Edge]):
+        """
+        内部辅助方法：撤销 add_batch 已写入的部分。
+        从字典中删除本批次的条目后整体重建索引，无论写入在哪一步中断，都能恢复到一致的状态。
+        """
+        for edge in edges:
+            self.edges.pop(edge.id, None)
+        for node in nodes:
+            self.nodes.pop(node.id, None)
+        self._rebuild_indexes()
 
     def remove_node(self, node_id: str):
         """
         从图谱中移除一个节点及其所有关联的边。
+        只需更新邻居一侧的边结构，代价与节点度数成正比。
         """
         if node_id not in self.nodes:
             raise ValueError(f"节点 ID {node_id} 不存在")
-        node = self.nodes[node_id]
-        
-        # 收集所有需要删除的边ID
-        edges_to_remove = set(node.in_edge + node.out_edge)
 
-        # 遍历并删除这些边
-        for edge_id in list(edges_to_remove): # 复制一份，因为迭代时会修改原列表
-            self.remove_edge(edge_id) # 调用 remove_edge 来处理反向链接
+        node = self.nodes[node_id]
+        self._reachability.remove_node(self._adjacency.index_of(node_id), not node.in_edge and not node.out_edge)
+        for edge_id in self._adjacency.remove_node(node_id):
+            edge = self.edges.pop(edge_id)
+            self._edge_text_index.remove(edge_id)
+            self._relation_index.remove(edge_id)
+            # 只需更新邻居一侧的度数，节点自身的计数随后整体移除
+            if edge.start_node_id != node_id:
+                self._out_degree.decrement(edge.start_node_id)
+            if edge.end_node_id != node_id:
+                self._in_degree.decrement(edge.end_node_id)
 
+        self._node_text_index.remove(node_id)
+        self._tag_index.remove(node_id)
+        self._in_degree.discard(node_id)
+        self._out_degree.discard(node_id)
+        if self._similarity_index is not None:
+            self._similarity_index.remove(node_id)
+        if self._vector_index is not None:
+            self._vector_index.remove(node_id)
         del self.nodes[node_id]
+        if self._nx_graph is not None:
+            self._nx_graph.remove_node(node_id) # 同时移除投影中所有关联的边
+        self._version += 1
+        if self._listeners:
+            self._emit("remove_node", {"id": node_id})
 
     def remove_edge(self, edge_id: str):
         """
@@ -73,20 +341,22 @@ class Knowledge_Graph(BaseModel):
         """
         if edge_id not in self.edges:
             raise ValueError(f'边 ID {edge_id} 不存在')
-            
+
         edge = self.edges[edge_id]
-        
-        # 从起始节点的出边列表中移除该边ID
-        start_node = self.nodes.get(edge.start_node_id)
-        if start_node and edge.id in start_node.out_edge:
-            start_node.out_edge.remove(edge.id)
-        
-        # 从结束节点的入边列表中移除该边ID
-        end_node = self.nodes.get(edge.end_node_id)
-        if end_node and edge.id in end_node.in_edge:
-            end_node.in_edge.remove(edge.id)
-            
+        self._adjacency.remove_edge(edge_id)
+        self._edge_text_index.remove(edge_id)
+        self._relation_index.remove(edge_id)
+        self._out_degree.decrement(edge.start_node_id)
+        self._in_degree.decrement(edge.end_node_id)
         del self.edges[edge_id]
+        # 投影中平行边会合并为一条，只有最后一条平行边被删除时才移除；可达关系同理
+        parallel_left = bool(self._adjacency.edges_between(edge.start_node_id, edge.end_node_id))
+        self._reachability.remove_edge(parallel_left)
+        if self._nx_graph is not None and not parallel_left:
+            self._nx_graph.remove_edge(edge.start_node_id, edge.end_node_id)
+        self._version += 1
+        if self._listeners:
+            self._emit("remove_edge", {"id": edge_id})
         
     def update_node(self, node_id: str, title: Optional[str] = None, description: Optional[str] = None, tags: Optional[List[str]] = None):
         """
@@ -104,6 +374,17 @@ class Knowledge_Graph(BaseModel):
             node.description = description
         if tags is not None:
             node.tags = tags
+            self._tag_index.add(node_id, tags)
+
+        self._node_text_index.add(node_id, _node_text_fields(node))
+        if self._similarity_index is not None:
+            self._similarity_index.add(node_id, node.title, node.tags)
+        if self._vector_index is not None:
+            self._vector_index.add(node_id, _node_text_fields(node))
+        self._version += 1
+        if self._listeners:
+            changes = {"title": title, "description": description, "tags": tags}
+            self._emit("update_node", {"id": node_id, **{k: v for k, v in changes.items() if v is not None}})
 
     def update_edge(self, edge_id: str, title: Optional[str] = None, description: Optional[str] = None):
         """
@@ -120,6 +401,144 @@ class Knowledge_Graph(BaseModel):
         if description is not None:
             edge.description = description
 
+        self._edge_text_index.add(edge_id, _edge_text_fields(edge))
+        if title is not None:
+            self._relation_index.add(edge_id, edge.title, edge.start_node_id, edge.end_node_id)
+        self._version += 1
+        if self._listeners:
+            changes = {"title": title, "description": description}
+            self._emit("update_edge", {"id": edge_id, **{k: v for k, v in changes.items() if v is not None}})
+
+    def merge_nodes(self, target_id: str, source_id: str, title: Optional[str] = None, description: Optional[str] = None, tags: Optional[List[str]] = None) -> Knowledge_Node:
+        """
+        将源节点合并到目标节点：源节点的边改为连接目标节点，然后删除源节点，代价与源节点的度数成正比。
+
+        - 源节点与目标节点之间的边合并后会成为自环，直接删除；其余的边保留原有的 ID、标题与描述
+        - 目标节点的标签追加源节点中没有的标签；目标节点没有描述时使用源节点的描述
+        - 修改监听器只收到一条 'merge_nodes' 事件，其中包含合并后目标节点的标题、描述与标签
+
+        Args:
+            target_id (str): 保留的节点ID。
+            source_id (str): 被合并并删除的节点ID。
+            title (Optional[str]): 合并后的标题，默认保留目标节点的标题。
+            description (Optional[str]): 合并后的描述，默认按上述规则确定。
+            tags (Optional[List[str]]): 合并后的标签，默认按上述规则确定。
+
+        Returns:
+            Knowledge_Node: 合并后的目标节点。
+        """
+        if target_id == source_id:
+            raise ValueError("不能将节点合并到其自身")
+        if target_id not in self.nodes:
+            raise ValueError(f"节点 ID {target_id} 不存在")
+        if source_id not in self.nodes:
+            raise ValueError(f"节点 ID {source_id} 不存在")
+
+        target = self.nodes[target_id]
+        source = self.nodes[source_id]
+        adjacency = self._adjacency
+        rewired: List[Knowledge_Edge] = []
+        for edge_id in dict.fromkeys(source.out_edge + source.in_edge):
+            edge = self.edges[edge_id]
+            adjacency.remove_edge(edge_id)
+            self._relation_index.remove(edge_id)
+            self._out_degree.decrement(edge.start_node_id)
+            self._in_degree.decrement(edge.end_node_id)
+            if {edge.start_node_id, edge.end_node_id} == {source_id, target_id}:
+                del self.edges[edge_id]
+                self._edge_text_index.remove(edge_id)
+                continue
+            if edge.start_node_id == source_id:
+                edge.start_node_id = target_id
+                edge._start_node = target
+            if edge.end_node_id == source_id:
+                edge.end_node_id = target_id
+                edge._end_node = target
+            rewired.append(edge)
+        for edge in rewired:
+            adjacency.add_edge(edge.id, edge.start_node_id, edge.end_node_id)
+            self._relation_index.add(edge.id, edge.title, edge.start_node_id, edge.end_node_id)
+            self._out_degree.increment(edge.start_node_id)
+            self._in_degree.increment(edge.end_node_id)
+
+        adjacency.remove_node(source_id)
+        self._reachability.invalidate()
+        self._node_text_index.remove(source_id)
+        self._tag_index.remove(source_id)
+        self._in_degree.discard(source_id)
+        self._out_degree.discard(source_id)
+        del self.nodes[source_id]
+
+        target.title = title if title is not None else target.title
+        if description is not None:
+            target.description = description
+        elif target.description is None:
+            target.description = source.description
+        target.tags = list(tags) if tags is not None else target.tags + [tag for tag in source.tags if tag not in target.tags]
+        self._node_text_index.add(target_id, _node_text_fields(target))
+        self._tag_index.add(target_id, target.tags)
+        if self._similarity_index is not None:
+            self._similarity_index.remove(source_id)
+            self._similarity_index.add(target_id, target.title, target.tags)
+        if self._vector_index is not None:
+            self._vector_index.remove(source_id)
+            self._vector_index.add(target_id, _node_text_fields(target))
+        if self._nx_graph is not None:
+            self._nx_graph.remove_node(source_id)
+            self._nx_graph.add_edges_from((edge.start_node_id, edge.end_node_id) for edge in rewired)
+        self._version += 1
+        if self._listeners:
+            self._emit("merge_nodes", {
+                "target_id": target_id,
+                "source_id": source_id,
+                "title": target.title,
+                "description": target.description,
+                "tags": list(target.tags),
+            })
+        return target
+
+    def snapshot(self) -> GraphSnapshot:
+        """
+        返回图谱当前状态的只读快照，快照不受之后修改的影响，可以在其他线程中无锁读取。
+
+        首次调用时以 O(n) 的代价开始跟踪修改（注册一个修改监听器），之后每次修改只额外复制受影响的记录，
+        获取快照为 O(1)。同一图谱的多个快照共享未修改的部分。
+
+        Returns:
+            GraphSnapshot: 当前版本的快照。
+        """
+        for listener in self._listeners:
+            if isinstance(listener, SnapshotTracker):
+                return listener.snapshot()
+        tracker = SnapshotTracker(self)
+        self.add_listener(tracker)
+        return tracker.snapshot()
+
+    def diff(self, snapshot: GraphSnapshot) -> GraphDiff:
+        """
+        比较快照与图谱的当前状态，列出快照之后的变化，代价与修改量成正比。
+
+        Args:
+            snapshot (GraphSnapshot): 较早的快照。
+
+        Returns:
+            GraphDiff: 从快照到当前状态的差异。
+        """
+        return snapshot.diff(self.snapshot())
+
+    def rollback(self, snapshot: GraphSnapshot) -> GraphDiff:
+        """
+        将图谱恢复到快照中的状态，只撤销快照之后的变化，代价与修改量成正比。
+        恢复通过 add/remove/update 方法完成，修改日志与存储后端会同步记录。
+
+        Args:
+            snapshot (GraphSnapshot): 要恢复到的快照。
+
+        Returns:
+            GraphDiff: 被撤销的变化（从当前状态到快照）。
+        """
+        return rollback(self, snapshot)
+
     class Config:
         """Pydantic 配置，允许模型中包含非BaseModel类型的属性。"""
         arbitrary_types_allowed = True
@@ -146,136 +565,328 @@ class Knowledge_Graph(BaseModel):
         """获取指定节点的所有出边对象。"""
         if node_id not in self.nodes:
             raise ValueError(f"节点 ID {node_id} 不存在")
-        node = self.nodes[node_id]
-        return [self.edges[id] for id in node.out_edge]
+        edge_ids = self._adjacency.out_edge_ids(self._adjacency.index_of(node_id))
+        return [self.edges[id] for id in edge_ids]
 
     def get_in_edge(self, node_id: str) -> List[Knowledge_Edge]:
         """获取指定节点的所有入边对象。"""
         if node_id not in self.nodes:
             raise ValueError(f"节点 ID {node_id} 不存在")
-        node = self.nodes[node_id]
-        return [self.edges[id] for id in node.in_edge]
+        edge_ids = self._adjacency.in_edge_ids(self._adjacency.index_of(node_id))
+        return [self.edges[id] for id in edge_ids]
+
+    def get_edges_between(self, start_node_id: str, end_node_id: str) -> List[Knowledge_Edge]:
+        """获取从起始节点直接指向结束节点的所有边对象。"""
+        return [self.edges[id] for id in self._adjacency.edges_between(start_node_id, end_node_id)]
 
     def get_neighbours(self, node_id: str) -> List[Knowledge_Node]:
         """获取指定节点的所有邻居节点（包括入边和出边连接的节点）。"""
         if node_id not in self.nodes:
             raise ValueError(f"节点 ID {node_id} 不存在")
-        node = self.nodes[node_id]
-        node_ids = set()
-        for edge_id in node.in_edge:
-            edge = self.edges[edge_id]
-            node_ids.add(edge.start_node_id) # 入边的起始节点是邻居
-        for edge_id in node.out_edge:
-            edge = self.edges[edge_id]
-            node_ids.add(edge.end_node_id)   # 出边的结束节点是邻居
-
-        node_ids.discard(node.id) # 移除自身
-        return [self.nodes[nid] for nid in node_ids]
+        adjacency = self._adjacency
+        idx = adjacency.index_of(node_id)
+        neighbour_idx = set(adjacency.in_neighbours(idx)) # 入边的起始节点是邻居
+        neighbour_idx.update(adjacency.out_neighbours(idx)) # 出边的结束节点是邻居
+        neighbour_idx.discard(idx) # 移除自身
+        return [self.nodes[adjacency.id_of(i)] for i in neighbour_idx]
 
     def get_out_neighbours(self,node_id:str) -> List[Knowledge_Node]:
         """获取指定节点的所有出方向邻居节点。"""
         if node_id not in self.nodes:
             raise ValueError(f"节点 ID {node_id} 不存在")
-        node = self.nodes[node_id]
-        node_ids = set()
-        for edge_id in node.out_edge:
-            edge = self.edges[edge_id]
-            node_ids.add(edge.end_node_id) # 只添加出边的目标节点
-        return [self.nodes[nid] for nid in node_ids]
+        adjacency = self._adjacency
+        neighbour_idx = set(adjacency.out_neighbours(adjacency.index_of(node_id))) # 只添加出边的目标节点
+        return [self.nodes[adjacency.id_of(i)] for i in neighbour_idx]
     
-    def find_path(self, start_node_id: str, goal_node_id: str) -> List[str]:
+    @property
+    def relation_index(self) -> RelationIndex:
+        """关系类型索引（只读使用），随边的增删改原地更新。"""
+        return self._relation_index
+
+    def get_relation_types(self, top_k: Optional[int] = None) -> List[Tuple[str, int]]:
         """
-        使用广度优先搜索（BFS）查找从起始节点到目标节点的最短路径（按节点数量）。
-        返回节点ID列表，如果不存在路径则返回空列表。
+        列出图谱中的关系类型（规范化后的边标题）及各自的边数量。
+
+        Args:
+            top_k (Optional[int]): 最多返回的类型数量，None 表示全部返回。
+
+        Returns:
+            List[Tuple[str, int]]: (关系类型, 边数量)，按边数量从多到少排列。
+        """
+        relations = self._relation_index.relations()
+        return relations[:top_k] if top_k is not None else relations
+
+    def get_edges_by_relation(self, relation: str, limit: Optional[int] = None) -> List[Knowledge_Edge]:
+        """
+        获取某种关系类型的全部边，关系类型按 normalize_relation 规范化后精确匹配。
+
+        Args:
+            relation (str): 关系类型，即边的标题。
+            limit (Optional[int]): 最多返回的边数量，None 表示不限制。
+
+        Returns:
+            List[Knowledge_Edge]: 按添加顺序排列的边。
+        """
+        edge_ids = self._relation_index.edge_ids(relation)
+        if limit is not None:
+            edge_ids = edge_ids[:limit]
+        return [self.edges[id] for id in edge_ids]
+
+    def _relation_steps(self, node_id: str, relation: str, direction: str) -> List[Tuple[Knowledge_Edge, str]]:
+        """内部辅助方法：节点沿某种关系、按给定方向经过的 (边, 对端节点 ID)。"""
+        relation_index = self._relation_index
+        steps = []
+        if direction in ('out', 'both'):
+            steps.extend((edge, edge.end_node_id) for edge in map(self.edges.__getitem__, relation_index.out_edge_ids(node_id, relation)))
+        if direction in ('in', 'both'):
+            steps.extend((edge, edge.start_node_id) for edge in map(self.edges.__getitem__, relation_index.in_edge_ids(node_id, relation)))
+        return steps
+
+    def get_neighbours_by_relation(self, node_id: str, relation: str, direction: str = 'out') -> List[Tuple[Knowledge_Node, Knowledge_Edge]]:
+        """
+        获取节点通过某种关系直接相连的邻居，只访问该关系类型的边。
+
+        Args:
+            node_id (str): 节点ID。
+            relation (str): 关系类型，即边的标题。
+            direction (str): 'out' 沿出边，'in' 沿入边，'both' 同时沿两个方向。默认为 'out'。
+
+        Returns:
+            List[Tuple[Knowledge_Node, Knowledge_Edge]]: (邻居节点, 经过的边)，同一邻居有多条该类型的边时各占一项。
+        """
+        if node_id not in self.nodes:
+            raise ValueError(f"节点 ID {node_id} 不存在")
+        if direction not in DIRECTIONS:
+            raise ValueError(f"不支持的遍历方向: {direction}，可选值为 {', '.join(DIRECTIONS)}")
+        return [(self.nodes[other_id], edge) for edge, other_id in self._relation_steps(node_id, relation, direction)]
+
+    def get_relation_closure(self, node_id: str, relation: str, direction: str = 'out', max_depth: Optional[int] = None) -> List[Tuple[Knowledge_Node, int]]:
+        """
+        计算节点在某种关系下的传递闭包：反复沿该关系的边扩散可以到达的全部节点（例如一个知识点的全部前置知识）。
+        逐层 BFS，每个节点只访问一次，代价与闭包内该类型的边数成正比。
+
+        Args:
+            node_id (str): 起始节点ID。
+            relation (str): 关系类型，即边的标题。
+            direction (str): 'out' 沿出边，'in' 沿入边，'both' 同时沿两个方向。默认为 'out'。
+            max_depth (Optional[int]): 最大扩散层数，None 表示不限制。
+
+        Returns:
+            List[Tuple[Knowledge_Node, int]]: (节点, 距起始节点的层数)，按层数从小到大排列，不包含起始节点。
+        """
+        if node_id not in self.nodes:
+            raise ValueError(f"节点 ID {node_id} 不存在")
+        if direction not in DIRECTIONS:
+            raise ValueError(f"不支持的遍历方向: {direction}，可选值为 {', '.join(DIRECTIONS)}")
+
+        depths: Dict[str, int] = {node_id: 0}
+        frontier = [node_id]
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for current_id in frontier:
+                for _, other_id in self._relation_steps(current_id, relation, direction):
+                    if other_id not in depths:
+                        depths[other_id] = depth
+                        next_frontier.append(other_id)
+            frontier = next_frontier
+        del depths[node_id]
+        return [(self.nodes[id], hop) for id, hop in depths.items()]
+
+    def plan_learning_path(self, target_ids: List[str], relation: str = DEFAULT_PREREQUISITE_RELATION, known_ids: Optional[List[str]] = None, reverse: bool = False) -> LearningPlan:
+        """
+        规划学习目标节点的顺序：求出目标的全部前置知识（最小前置闭包），按前置关系的拓扑序排列。
+
+        首次对某种关系规划时以 O(该关系的边数) 的代价建立规划器（注册一个修改监听器），
+        之后拓扑序随修改增量维护，每次规划的代价只与闭包大小有关。
+
+        Args:
+            target_ids (List[str]): 目标节点 ID。
+            relation (str): 前置关系类型，即边的标题。默认为 DEFAULT_PREREQUISITE_RELATION。
+            known_ids (Optional[List[str]]): 已经掌握的节点 ID，这些节点及只能经由它们到达的前置知识不会出现在计划中。
+            reverse (bool): 为 False 时边 A -> B 表示 A 是 B 的前置；为 True 时表示 B 是 A 的前置。
+
+        Returns:
+            LearningPlan: 学习计划，前置节点总是排在依赖它的节点之前，循环依赖的节点作为一组给出。
+        """
+        key = normalize_relation(relation)
+        planners = [listener for listener in self._listeners if isinstance(listener, LearningPlanner)]
+        planner = next((item for item in planners if item.relation == key and item.reverse == reverse), None)
+        if planner is None:
+            if len(planners) >= MAX_PLANNERS_PER_GRAPH:
+                self.remove_listener(planners[0])
+            planner = LearningPlanner(self, relation, reverse)
+            self.add_listener(planner)
+        return planner.plan(target_ids, known_ids)
+
+    def is_reachable(self, start_node_id: str, goal_node_id: str, directed: bool = True) -> bool:
+        """
+        判断从起始节点能否到达目标节点。
+        忽略方向时只需比较弱连通分量；沿边的方向时先比较弱连通分量，再比较强连通分量在缩点 DAG 上的标签，
+        大多数情况下都是 O(1)。
+
+        Args:
+            start_node_id (str): 起始节点 ID。
+            goal_node_id (str): 目标节点 ID。
+            directed (bool): 是否沿边的方向判断，为 False 时忽略边的方向。
+
+        Returns:
+            bool: 是否存在从起始节点到目标节点的路径。
         """
         if start_node_id not in self.nodes or goal_node_id not in self.nodes:
             raise ValueError("起始或终止节点不存在")
-        
-        if start_node_id == goal_node_id:
-            return [start_node_id]
-        
-        queue = deque()
-        queue.append(start_node_id)
-        parent = {start_node_id: None} # 存储每个节点的前驱，用于重建路径
-        
-        while queue:
-            current_id = queue.popleft()
-            
-            if current_id == goal_node_id:
-                path = []
-                while current_id is not None:
-                    path.append(current_id)
-                    current_id = parent[current_id]
-                return path[::-1] # 反转路径，使其从起始节点到目标节点
-            
-            # 获取出邻居的ID
-            neighbors = [edge.end_node_id for edge in self.get_out_edge(current_id)]
-            
-            for neighbor_id in neighbors:
-                if neighbor_id not in parent: # 避免重复访问和循环
-                    parent[neighbor_id] = current_id
-                    queue.append(neighbor_id)
-        
-        return [] # 未找到路径
+        adjacency = self._adjacency
+        start, goal = adjacency.index_of(start_node_id), adjacency.index_of(goal_node_id)
+        if directed:
+            return self._reachability.reachable(adjacency, start, goal)
+        return self._reachability.connected(adjacency, start, goal)
+
+    def count_components(self, strong: bool = False) -> int:
+        """
+        统计连通分量的数量。
+
+        Args:
+            strong (bool): 为 True 时统计强连通分量（沿边的方向互相可达），否则统计弱连通分量（忽略方向）。
+
+        Returns:
+            int: 连通分量的数量。
+        """
+        return self._reachability.component_count(self._adjacency, strong)
+
+    def get_components(self, strong: bool = False, top_k: Optional[int] = None) -> List[List[str]]:
+        """
+        列出连通分量。
+
+        Args:
+            strong (bool): 为 True 时列出强连通分量，否则列出弱连通分量。
+            top_k (Optional[int]): 最多返回的分量数量，None 表示全部返回。
+
+        Returns:
+            List[List[str]]: 每个分量的节点 ID 列表，按分量大小从大到小排列。
+        """
+        adjacency = self._adjacency
+        components = self._reachability.components(adjacency, strong)
+        if top_k is not None:
+            components = components[:top_k]
+        return [[adjacency.id_of(idx) for idx in component] for component in components]
+
+    def _path_query(self, kind: str, start_node_id: str, goal_node_id: str, directed: bool, max_depth: Optional[int], param: Optional[int], compute) -> Tuple[Tuple[str, ...], ...]:
+        """
+        内部辅助方法：校验节点并通过按版本失效的 LRU 缓存执行路径查询。
+        未命中缓存时，若已建立的可达性结构能确定不可达则不必搜索，空结果同样写入缓存；可达性结构缺失时不为此重建。
+        compute 接收 (起始下标, 目标下标)，返回下标路径列表。
+        """
+        if start_node_id not in self.nodes or goal_node_id not in self.nodes:
+            raise ValueError("起始或终止节点不存在")
+        if max_depth is not None and max_depth < 0:
+            raise ValueError("max_depth 不能为负数")
+
+        def run() -> Tuple[Tuple[str, ...], ...]:
+            adjacency = self._adjacency
+            start, goal = adjacency.index_of(start_node_id), adjacency.index_of(goal_node_id)
+            if self._reachability.excludes(start, goal, directed):
+                return ()
+            paths = compute(start, goal)
+            return tuple(tuple(adjacency.id_of(i) for i in path) for path in paths)
+
+        key = (kind, start_node_id, goal_node_id, directed, max_depth, param)
+        return self._path_cache.get_or_compute(self._version, key, run)
+
+    def find_path(self, start_node_id: str, goal_node_id: str, directed: bool = True, max_depth: Optional[int] = None) -> List[str]:
+        """
+        使用双向广度优先搜索查找从起始节点到目标节点的最短路径（按节点数量）。
+        结果按图谱版本缓存。
+
+        Args:
+            start_node_id (str): 起始节点 ID。
+            goal_node_id (str): 目标节点 ID。
+            directed (bool): 是否沿边的方向查找，为 False 时忽略边的方向。
+            max_depth (Optional[int]): 路径最多包含的边数，None 表示不限制。
+
+        Returns:
+            List[str]: 路径上的节点 ID 列表，如果不存在路径则返回空列表。
+        """
+        def compute(start: int, goal: int) -> List[List[int]]:
+            path = bidirectional_shortest_path(self._adjacency, start, goal, directed, max_depth)
+            return [path] if path is not None else []
+
+        paths = self._path_query("shortest", start_node_id, goal_node_id, directed, max_depth, None, compute)
+        return list(paths[0]) if paths else []
+
+    def find_all_shortest_paths(self, start_node_id: str, goal_node_id: str, directed: bool = True, max_depth: Optional[int] = None, limit: Optional[int] = None) -> List[List[str]]:
+        """
+        查找从起始节点到目标节点的所有最短路径，结果按图谱版本缓存。
+
+        Args:
+            start_node_id (str): 起始节点 ID。
+            goal_node_id (str): 目标节点 ID。
+            directed (bool): 是否沿边的方向查找。
+            max_depth (Optional[int]): 路径最多包含的边数。
+            limit (Optional[int]): 最多返回的路径数量，None 表示不限制。
+
+        Returns:
+            List[List[str]]: 路径列表，每条路径为节点 ID 列表；不存在路径时返回空列表。
+        """
+        def compute(start: int, goal: int) -> List[List[int]]:
+            return all_shortest_paths(self._adjacency, start, goal, directed, max_depth, limit)
+
+        paths = self._path_query("all_shortest", start_node_id, goal_node_id, directed, max_depth, limit, compute)
+        return [list(path) for path in paths]
+
+    def find_k_shortest_paths(self, start_node_id: str, goal_node_id: str, k: int = 3, directed: bool = True, max_depth: Optional[int] = None) -> List[List[str]]:
+        """
+        按长度从短到长查找最多 k 条无环路径（Yen 算法），结果按图谱版本缓存。
+
+        Args:
+            start_node_id (str): 起始节点 ID。
+            goal_node_id (str): 目标节点 ID。
+            k (int): 最多返回的路径数量。
+            directed (bool): 是否沿边的方向查找。
+            max_depth (Optional[int]): 路径最多包含的边数。
+
+        Returns:
+            List[List[str]]: 路径列表，每条路径为节点 ID 列表；不存在路径时返回空列表。
+        """
+        def compute(start: int, goal: int) -> List[List[int]]:
+            return k_shortest_paths(self._adjacency, start, goal, k, directed, max_depth)
+
+        paths = self._path_query("k_shortest", start_node_id, goal_node_id, directed, max_depth, k, compute)
+        return [list(path) for path in paths]
 
     def save_to_file(self, filepath: str):
         """
-        将当前知识图谱保存到JSON文件。
-        使用 Pydantic 的 model_dump_json 进行序列化。
+        将当前知识图谱保存到文件，格式由文件后缀决定。
+        - .ndjson / .ndjson.gz：紧凑的流式格式，逐条写入节点和边，不包含冗余的 in_edge/out_edge
+        - .sqlite / .db 等存储后端负责的后缀：在一个事务中整体写入存储后端
+        - 其他后缀：使用 Pydantic 的 model_dump_json 保存为 JSON
         """
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(self.model_dump_json(indent=4))
+        if is_storage_path(filepath):
+            with open_storage(filepath) as storage:
+                storage.write_graph(self)
+        elif is_ndjson_path(filepath):
+            write_ndjson(self, filepath)
+        else:
+            # 先写临时文件再原子替换，保存中途失败不会破坏原有文件
+            atomic_write_lines(filepath, [self.model_dump_json(indent=4)])
         print(f"知识图谱已保存到 {filepath}")
 
     @classmethod
     def load_from_file(cls, filepath: str):
         """
-        从 JSON 文件加载知识图谱。
-        重建节点、边以及它们之间的内部引用和连接列表。
+        从文件加载知识图谱，格式由文件后缀决定（.ndjson / .ndjson.gz 为流式格式，.sqlite / .db 等由存储后端读取，其余为 JSON）。
+        先读取全部节点和边，再一次性重建节点、边之间的内部引用、连接列表与各类索引。
+        不需要完整加载时，可通过 storage.open_storage 直接在存储后端上查询。
         """
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # 创建图谱实例并设置名称
-        graph = cls()
-        graph.name = data.get('name', 'Knowledge Graph')
-
-        # 1. 加载所有节点，先清空它们的in_edge和out_edge列表
-        for node_id, node_data in data.get('nodes', {}).items():
-            node = Knowledge_Node(**node_data)
-            # 清空边列表，稍后会重新填充
-            node.in_edge = []
-            node.out_edge = []
-            graph.nodes[node.id] = node
-        
-        # 2. 加载所有边，并重新建立节点引用和节点的in_edge/out_edge列表
-        for edge_id, edge_data in data.get('edges', {}).items():
-            # 创建一个临时的字典，不包含 _start_node 和 _end_node，以便 Pydantic 正确解析
-            temp_edge_data = {k: v for k, v in edge_data.items() if not k.startswith('_')}
-            edge = Knowledge_Edge(**temp_edge_data) # 此时 edge.start_node_id 和 edge.end_node_id 是字符串
-
-            # 重新链接实际的节点对象
-            if edge.start_node_id in graph.nodes:
-                edge._start_node = graph.nodes[edge.start_node_id]
-            else:
-                raise ValueError(f"加载边 {edge.id} 时，起始节点 {edge.start_node_id} 不存在")
-            
-            if edge.end_node_id in graph.nodes:
-                edge._end_node = graph.nodes[edge.end_node_id]
-            else:
-                raise ValueError(f"加载边 {edge.id} 时，结束节点 {edge.end_node_id} 不存在")
-
-            graph.edges[edge.id] = edge
-            
-            # 重新填充节点的 in_edge 和 out_edge 列表
-            graph.nodes[edge.start_node_id].out_edge.append(edge.id)
-            graph.nodes[edge.end_node_id].in_edge.append(edge.id)
-
-        return graph
+        if is_storage_path(filepath):
+            with open_storage(filepath, readonly=True) as storage:
+                return storage.load_graph(cls)
+        return graph_from_records(read_graph_records(filepath), cls)
     
     def get_high_in_degree_nodes(self, top_k: int = 10) -> List[Tuple[Knowledge_Node, int]]:
         """
         获取入度最高的节点排名。
+        入度按度数分桶实时维护，代价为 O(top_k)，与图谱规模无关。入度相同的节点按达到该入度的先后排列。
         
         Args:
             top_k (int): 返回排名前 k 的节点。
@@ -283,15 +894,12 @@ class Knowledge_Graph(BaseModel):
         Returns:
             List[Tuple[Knowledge_Node, int]]: 一个元组列表，每个元组包含节点对象和其入度值。
         """
-        nodes_with_in_degree = [
-            (node, len(node.in_edge)) for node in self.nodes.values()
-        ]
-        nodes_with_in_degree.sort(key=lambda x: x[1], reverse=True)
-        return nodes_with_in_degree[:top_k]
+        return [(self.nodes[node_id], degree) for node_id, degree in self._in_degree.most_common(top_k)]
  
     def get_high_out_degree_nodes(self, top_k: int = 10) -> List[Tuple[Knowledge_Node, int]]:
         """
         获取出度最高的节点排名。
+        出度按度数分桶实时维护，代价为 O(top_k)，与图谱规模无关。出度相同的节点按达到该出度的先后排列。
         
         Args:
             top_k (int): 返回排名前 k 的节点。
@@ -299,123 +907,150 @@ class Knowledge_Graph(BaseModel):
         Returns:
             List[Tuple[Knowledge_Node, int]]: 一个元组列表，每个元组包含节点对象和其出度值。
         """
-        nodes_with_out_degree = [
-            (node, len(node.out_edge)) for node in self.nodes.values()
-        ]
-        nodes_with_out_degree.sort(key=lambda x: x[1], reverse=True)
-        return nodes_with_out_degree[:top_k]
+        return [(self.nodes[node_id], degree) for node_id, degree in self._out_degree.most_common(top_k)]
  
     def _to_networkx(self) -> nx.DiGraph:
         """
-        内部辅助方法：将当前图转换为 networkx.DiGraph 对象。
+        内部辅助方法：获取当前图的 networkx.DiGraph 投影。
+        投影在首次访问时构建，之后随节点和边的增删原地更新，因此调用方不得修改返回的对象。
         """
-        G = nx.DiGraph()
-        for node_id in self.nodes:
-            G.add_node(node_id)
-        for edge in self.edges.values():
-            G.add_edge(edge.start_node_id, edge.end_node_id)
-        return G
+        if self._nx_graph is None:
+            G = nx.DiGraph()
+            G.add_nodes_from(self.nodes)
+            G.add_edges_from((edge.start_node_id, edge.end_node_id) for edge in self.edges.values())
+            self._nx_graph = G
+        return self._nx_graph
+
+    def _detached_projection(self) -> Callable[[], nx.DiGraph]:
+        """
+        内部辅助方法：在调用线程中获取当前状态的只读快照（见 `snapshot`，除首次外为 O(1)），
+        返回一个根据快照构建 networkx 投影的函数，可以在其他线程中调用而不受之后修改的影响。
+        """
+        snapshot = self.snapshot()
+
+        def build() -> nx.DiGraph:
+            G = nx.DiGraph()
+            G.add_nodes_from(snapshot.nodes)
+            G.add_edges_from((edge.start_node_id, edge.end_node_id) for edge in snapshot.edges.values())
+            return G
+        return build
+
+    def _centrality_result(self, metric: str, approximate: Optional[bool], background: bool, workers: Optional[int]) -> CentralityResult:
+        """内部辅助方法：按节点数量选择计算方式，并从中心性子系统获取当前版本的结果。"""
+        if approximate is None:
+            approximate = self._centrality.should_approximate(len(self.nodes))
+        return self._centrality.get(metric, self._version, self._to_networkx, approximate, background, workers, self._detached_projection)
+
+    def get_betweenness_centrality(self, approximate: Optional[bool] = None, background: bool = False, workers: Optional[int] = None) -> Dict[str, float]:
+        """
+        获取所有节点的介数中心性得分，结果按图谱版本缓存。
+
+        Args:
+            approximate (Optional[bool]): 是否使用带固定种子的采样近似，None 表示根据图谱规模自动选择。
+            background (bool): 为 True 时不阻塞：优先返回最近一次的结果（可能略旧），从未计算过时返回空字典，新版本在后台线程中计算。
+            workers (Optional[int]): 计算使用的进程数，大于 1 时将源节点分配到进程池中并行计算。
+
+        Returns:
+            Dict[str, float]: 节点 ID 到介数中心性得分的映射。后台模式下可能包含已删除的节点。
+        """
+        return self._centrality_result("betweenness", approximate, background, workers).scores
+
+    def get_closeness_centrality(self, approximate: Optional[bool] = None, background: bool = False, workers: Optional[int] = None) -> Dict[str, float]:
+        """
+        获取所有节点的接近中心性得分，结果按图谱版本缓存。
+
+        Args:
+            approximate (Optional[bool]): 是否使用带固定种子的采样近似，None 表示根据图谱规模自动选择。
+            background (bool): 为 True 时不阻塞：优先返回最近一次的结果（可能略旧），从未计算过时返回空字典，新版本在后台线程中计算。
+            workers (Optional[int]): 计算使用的进程数，大于 1 时将源节点分配到进程池中并行计算。
+
+        Returns:
+            Dict[str, float]: 节点 ID 到接近中心性得分的映射。后台模式下可能包含已删除的节点。
+        """
+        return self._centrality_result("closeness", approximate, background, workers).scores
+
+    def _rank_nodes(self, ranking: List[Tuple[str, float]], top_k: int) -> List[Tuple[Knowledge_Node, float]]:
+        """内部辅助方法：将 (节点 ID, 得分) 排名转换为节点对象排名，跳过已被删除的节点。"""
+        result = []
+        for node_id, score in ranking:
+            if len(result) >= top_k:
+                break
+            node = self.nodes.get(node_id)
+            if node is not None:
+                result.append((node, score))
+        return result
     
-    def get_high_betweenness_centrality_nodes(self, top_k: int = 10, approximate: bool = False) -> List[Tuple[Knowledge_Node, float]]:
+    def get_high_betweenness_centrality_nodes(self, top_k: int = 10, approximate: Optional[bool] = None, background: bool = False, workers: Optional[int] = None) -> List[Tuple[Knowledge_Node, float]]:
         """
         获取介数中心性最高的节点排名。
-        对于大于几百个节点的图，精确计算可能较慢，可以选择近似计算。
+        对于大于几百个节点的图，精确计算可能较慢，默认根据图谱规模自动选择精确计算或采样近似。
         
         Args:
             top_k (int): 返回排名前 k 的节点。
-            approximate (bool): 如果为True，则使用采样进行近似计算，速度更快。
+            approximate (Optional[bool]): 如果为True，则使用采样进行近似计算，速度更快；None 表示自动选择。
                                 对于<1000节点的图，通常不需要。
+            background (bool): 为 True 时不阻塞：优先返回最近一次的排名，从未计算过时返回空列表，新版本在后台线程中计算。
+            workers (Optional[int]): 计算使用的进程数，大于 1 时将源节点分配到进程池中并行计算，
+                                适合夜间报告等需要在大图上精确计算的场景。
         
         Returns:
             List[Tuple[Knowledge_Node, float]]: 一个元组列表，每个元组包含节点对象和其介数中心性得分。
         """
         if not self.nodes:
             return []
-        G = self._to_networkx()
-        
-        # 对于<1000节点的稀疏图，精确计算很快。但提供近似选项以备不时之需。
-        k_sample = int(len(self.nodes) * 0.2) if approximate else None
-        
-        centrality = nx.betweenness_centrality(G, k=k_sample, normalized=True)
-        
-        sorted_nodes = sorted(centrality.items(), key=lambda item: item[1], reverse=True)
-        
-        result = [
-            (self.nodes[node_id], score) for node_id, score in sorted_nodes[:top_k]
-        ]
-        return result
+        result = self._centrality_result("betweenness", approximate, background, workers)
+        return self._rank_nodes(result.ranking, top_k)
  
-    def get_high_closeness_centrality_nodes(self, top_k: int = 10) -> List[Tuple[Knowledge_Node, float]]:
+    def get_high_closeness_centrality_nodes(self, top_k: int = 10, approximate: Optional[bool] = None, background: bool = False, workers: Optional[int] = None) -> List[Tuple[Knowledge_Node, float]]:
         """
         获取接近中心性最高的节点排名。
         
         Args:
             top_k (int): 返回排名前 k 的节点。
+            approximate (Optional[bool]): 如果为True，则使用采样进行近似计算；None 表示根据图谱规模自动选择。
+            background (bool): 为 True 时不阻塞：优先返回最近一次的排名，从未计算过时返回空列表，新版本在后台线程中计算。
+            workers (Optional[int]): 计算使用的进程数，大于 1 时将源节点分配到进程池中并行计算，
+                                适合夜间报告等需要在大图上精确计算的场景。
         
         Returns:
             List[Tuple[Knowledge_Node, float]]: 一个元组列表，每个元组包含节点对象和其接近中心性得分。
         """
         if not self.nodes:
             return []
-        G = self._to_networkx()
-        centrality = nx.closeness_centrality(G)
-        
-        sorted_nodes = sorted(centrality.items(), key=lambda item: item[1], reverse=True)
-        
-        result = [
-            (self.nodes[node_id], score) for node_id, score in sorted_nodes[:top_k]
-        ]
-        return result
+        result = self._centrality_result("closeness", approximate, background, workers)
+        return self._rank_nodes(result.ranking, top_k)
  
-    def search_nodes_by_keyword(self, keyword: str, case_sensitive: bool = False) -> List[Knowledge_Node]:
+    def search_nodes_by_keyword(self, keyword: str, case_sensitive: bool = False, limit: Optional[int] = None) -> List[Knowledge_Node]:
         """
         根据关键词搜索节点。关键词会匹配节点的 title、description 和 tags。
+        通过 n-gram 倒排索引求交获得候选节点，结果按相关度排序（标题匹配优先）。
         
         Args:
             keyword (str): 要搜索的关键词。
             case_sensitive (bool): 是否区分大小写。默认为False。
+            limit (Optional[int]): 最多返回的节点数量，None 表示不限制。
         
         Returns:
             List[Knowledge_Node]: 匹配的节点对象列表。
         """
-        results = []
-        search_term = keyword if case_sensitive else keyword.lower()
-        
-        for node in self.nodes.values():
-            title = node.title if case_sensitive else node.title.lower()
-            description = ""
-            if node.description:
-                description = node.description if case_sensitive else node.description.lower()
-            
-            tags_content = " ".join(node.tags) if case_sensitive else " ".join(tag.lower() for tag in node.tags)
-
-            if search_term in title or search_term in description or search_term in tags_content:
-                results.append(node)
-        return results
+        node_ids = self._node_text_index.search(keyword, case_sensitive, limit)
+        return [self.nodes[node_id] for node_id in node_ids]
  
-    def search_edges_by_keyword(self, keyword: str, case_sensitive: bool = False) -> List[Knowledge_Edge]:
+    def search_edges_by_keyword(self, keyword: str, case_sensitive: bool = False, limit: Optional[int] = None) -> List[Knowledge_Edge]:
         """
         根据关键词搜索边。关键词会匹配边的 title 和 description。
+        通过 n-gram 倒排索引求交获得候选边，结果按相关度排序（标题匹配优先）。
         
         Args:
             keyword (str): 要搜索的关键词。
             case_sensitive (bool): 是否区分大小写。默认为False。
+            limit (Optional[int]): 最多返回的边数量，None 表示不限制。
         
         Returns:
             List[Knowledge_Edge]: 匹配的边对象列表。
         """
-        results = []
-        search_term = keyword if case_sensitive else keyword.lower()
-        
-        for edge in self.edges.values():
-            title = edge.title if case_sensitive else edge.title.lower()
-            description = ""
-            if edge.description:
-                description = edge.description if case_sensitive else edge.description.lower()
-            
-            if search_term in title or search_term in description:
-                results.append(edge)
-        return results
+        edge_ids = self._edge_text_index.search(keyword, case_sensitive, limit)
+        return [self.edges[edge_id] for edge_id in edge_ids]
 
     def search_nodes_by_tag(self, tags: List[str], mode: str = 'AND', case_sensitive: bool = False) -> List[Knowledge_Node]:
         """
@@ -432,70 +1067,175 @@ class Knowledge_Graph(BaseModel):
         if not tags:
             return []
 
-        results = []
-        search_tags = set(tags) if case_sensitive else set(tag.lower() for tag in tags)
+        node_ids = self._tag_index.query(tags, mode, case_sensitive)
+        return [self.nodes[node_id] for node_id in node_ids]
+ 
+    def _similarity(self) -> MinHashIndex:
+        """内部辅助方法：返回近似重复索引，首次使用时构建。"""
+        if self._similarity_index is None:
+            index = MinHashIndex()
+            for node in self.nodes.values():
+                index.add(node.id, node.title, node.tags)
+            self._similarity_index = index
+        return self._similarity_index
 
-        for node in self.nodes.values():
-            node_tags = set(node.tags) if case_sensitive else set(tag.lower() for tag in node.tags)
+    def find_similar_nodes(self, title: str, tags: Optional[List[str]] = None, threshold: float = DEFAULT_THRESHOLD, limit: Optional[int] = None, exclude_id: Optional[str] = None) -> List[Tuple[Knowledge_Node, float]]:
+        """
+        查找标题（和标签）与给定内容相似的节点，用于在添加前发现近似重复的概念。
+        通过 MinHash + LSH 索引只比较少量候选节点，无需扫描整个图谱；索引在首次调用时构建。
 
-            if mode.upper() == 'AND':
-                if search_tags.issubset(node_tags):
-                    results.append(node)
-            elif mode.upper() == 'OR':
-                if not search_tags.isdisjoint(node_tags):
-                    results.append(node)
-        return results
- 
-    def get_k_hop_neighborhood(self, start_node_id: str, k: int) -> Knowledge_Graph:
+        Args:
+            title (str): 标题，比较前会去掉空白与标点并转为小写。
+            tags (Optional[List[str]]): 标签，两者都有标签时参与相似度计算。
+            threshold (float): 最低相似度（0 到 1）。默认为 DEFAULT_THRESHOLD。
+            limit (Optional[int]): 最多返回的节点数量，None 表示不限制。
+            exclude_id (Optional[str]): 不参与比较的节点ID，通常是查询节点自身。
+
+        Returns:
+            List[Tuple[Knowledge_Node, float]]: (节点, 相似度)，按相似度从高到低排列。
         """
-        从一个起始节点开始，获取至多 k 次向外扩散得到的子图。
+        matches = self._similarity().query(title, tags or (), threshold, limit, exclude_id)
+        return [(self.nodes[node_id], score) for node_id, score in matches]
+
+    def find_duplicate_nodes(self, threshold: float = DEFAULT_THRESHOLD, limit: Optional[int] = None) -> List[Tuple[Knowledge_Node, Knowledge_Node, float]]:
+        """
+        列出图谱中疑似重复的节点对，可作为 merge_nodes 的候选。
+
+        Args:
+            threshold (float): 最低相似度（0 到 1）。默认为 DEFAULT_THRESHOLD。
+            limit (Optional[int]): 最多返回的节点对数量，None 表示不限制。
+
+        Returns:
+            List[Tuple[Knowledge_Node, Knowledge_Node, float]]: (节点, 节点, 相似度)，按相似度从高到低排列。
+        """
+        pairs = self._similarity().duplicate_pairs(threshold, limit)
+        return [(self.nodes[first], self.nodes[second], score) for first, second, score in pairs]
+
+    @property
+    def has_vector_index(self) -> bool:
+        """节点文本向量索引是否已构建或加载。"""
+        return self._vector_index is not None
+
+    def _vectors(self) -> VectorIndex:
+        """内部辅助方法：返回节点文本向量索引，首次使用时构建。"""
+        if self._vector_index is None:
+            index = VectorIndex()
+            for node in self.nodes.values():
+                index.add(node.id, _node_text_fields(node))
+            self._vector_index = index
+        return self._vector_index
+
+    def load_vector_index(self, filepath: str) -> int:
+        """
+        从索引文件加载节点文本向量索引，替换当前的索引。
+        文件中内容未变化的节点直接复用已保存的向量，新增或已修改的节点重新计算，因此文件略旧于图谱时仍可使用。
+
+        Args:
+            filepath (str): 索引文件路径，通常由 vector_index.vector_index_path_for 根据图谱文件路径给出。
+
+        Returns:
+            int: 从文件中复用的节点数量。
+        """
+        docs = ((node.id, _node_text_fields(node)) for node in self.nodes.values())
+        self._vector_index, reused = VectorIndex.load(filepath, docs)
+        return reused
+
+    def save_vector_index(self, filepath: str) -> bool:
+        """
+        将节点文本向量索引保存到索引文件。索引尚未构建时不写入任何内容。
+
+        Args:
+            filepath (str): 索引文件路径。
+
+        Returns:
+            bool: 是否写入了文件。
+        """
+        if self._vector_index is None:
+            return False
+        self._vector_index.save(filepath)
+        return True
+
+    def semantic_search(self, queries: List[str], limit: int = 10, min_score: float = 0.0) -> List[List[Tuple[Knowledge_Node, float]]]:
+        """
+        按文本相近程度批量查找节点，查询用语与节点标题不完全一致时也能找到相关节点。
+        节点的标题、描述和标签以字符 n-gram 的 TF-IDF 向量表示，按余弦相似度排序；索引在首次调用时构建。
+
+        Args:
+            queries (List[str]): 查询文本，可以是概念名称或一句话。
+            limit (int): 每个查询最多返回的节点数量。默认为 10。
+            min_score (float): 最低相似度（0 到 1）。默认为 0，即返回所有有共同 n-gram 的节点。
+
+        Returns:
+            List[List[Tuple[Knowledge_Node, float]]]: 与 queries 一一对应的 (节点, 相似度) 列表，按相似度从高到低排列。
+        """
+        results = self._vectors().search(queries, limit, min_score)
+        return [[(self.nodes[node_id], score) for node_id, score in matches] for matches in results]
+
+    def query(self, query: GraphQuery | Dict[str, Any]) -> QueryResult:
+        """
+        执行图模式查询，在一次调用中完成节点过滤、按类型沿边扩展与多跳路径匹配。
+        查询格式见 graph_query.GraphQuery；执行时从候选节点最少的变量开始，结果中附带执行计划。
+
+        Args:
+            query (GraphQuery | Dict[str, Any]): 查询对象，或可由 GraphQuery 校验的字典。
+
+        Returns:
+            QueryResult: 匹配结果、各连接条件对应的路径与执行计划。
+
+        Raises:
+            ValueError: 查询格式不正确。
+        """
+        if not isinstance(query, GraphQuery):
+            query = parse_query(query)
+        return run_query(self, query)
+
+    def get_k_hop_neighborhood(self, start_node_id: str, k: int, direction: str = 'out') -> SubgraphView:
+        """
+        从一个起始节点开始，获取至多 k 次扩散得到的子图视图。
+        视图只记录节点 ID 与边 ID，不复制任何对象；需要独立图谱时调用其 `materialize()` 方法。
+
+        子图包含所有到达节点，以及从距离小于 k 的节点出发、沿扩散方向经过的边。
         
         Args:
             start_node_id (str): 起始节点的ID。
             k (int): 扩散的跳数（hops）。k=1 表示直接邻居。
+            direction (str): 扩散方向，'out' 沿出边，'in' 沿入边，'both' 同时沿两个方向。
         
         Returns:
-            Knowledge_Graph: 一个包含邻域内所有节点和边的新图对象。
+            SubgraphView: 父图上的只读子图视图。
         """
         if start_node_id not in self.nodes:
             raise ValueError(f"起始节点 ID {start_node_id} 不存在")
- 
-        subgraph = Knowledge_Graph(name=f"{self.name}_subgraph")
-        
-        # 使用BFS进行遍历
-        queue = deque([(start_node_id, 0)]) # (node_id, current_depth)
-        visited_nodes = {start_node_id}
-        
-        # 首先将起始节点添加到子图中
-        subgraph.add_node(self.nodes[start_node_id].model_copy(deep=True))
- 
-        while queue:
-            current_id, depth = queue.popleft()
-            
-            if depth >= k:
-                continue
-            
-            # 遍历当前节点的所有出边
-            for edge_id in self.nodes[current_id].out_edge:
-                edge = self.edges[edge_id]
-                neighbor_id = edge.end_node_id
-                
-                # 如果邻居节点未被访问过，则加入队列和子图
-                if neighbor_id not in visited_nodes:
-                    visited_nodes.add(neighbor_id)
-                    # 复制节点对象，避免修改原图
-                    subgraph.add_node(self.nodes[neighbor_id].model_copy(deep=True))
-                    queue.append((neighbor_id, depth + 1))
-                
-                # 只要边在扩散路径上，且两个节点都在子图中，就将其加入子图
-                if (edge.id not in subgraph.edges and 
-                    edge.start_node_id in subgraph.nodes and 
-                    edge.end_node_id in subgraph.nodes):
-                    # 复制边对象
-                    new_edge = edge.model_copy(deep=True)
-                    subgraph.add_edge(new_edge)
- 
-        return subgraph
+        if direction not in DIRECTIONS:
+            raise ValueError(f"不支持的扩散方向: {direction}，可选值为 {', '.join(DIRECTIONS)}")
+
+        adjacency = self._adjacency
+        sides = []
+        if direction in ('out', 'both'):
+            sides.append((adjacency.out_edge_ids, adjacency.out_neighbours))
+        if direction in ('in', 'both'):
+            sides.append((adjacency.in_edge_ids, adjacency.in_neighbours))
+
+        # 逐层 BFS，hops 同时记录访问状态与跳数
+        start = adjacency.index_of(start_node_id)
+        hops: Dict[int, int] = {start: 0}
+        edge_ids: Dict[str, None] = {}
+        frontier = [start]
+        for depth in range(1, k + 1):
+            next_frontier = []
+            for u in frontier:
+                for edge_ids_of, neighbours_of in sides:
+                    edge_ids.update(dict.fromkeys(edge_ids_of(u)))
+                    for v in neighbours_of(u):
+                        if v not in hops:
+                            hops[v] = depth
+                            next_frontier.append(v)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        node_hops = {adjacency.id_of(idx): hop for idx, hop in hops.items()}
+        return SubgraphView(self, node_hops, edge_ids, start_node_id, k, direction)
 
     def get_top_k_tags(self, top_k: int = 10) -> List[Tuple[str, int]]:
         """
@@ -507,11 +1247,4 @@ class Knowledge_Graph(BaseModel):
         Returns:
             List[Tuple[str, int]]: 一个元组列表，每个元组包含标签和其出现次数。
         """
-        from collections import Counter
-        
-        all_tags = [tag for node in self.nodes.values() for tag in node.tags]
-        if not all_tags:
-            return []
-            
-        tag_counts = Counter(all_tags)
-        return tag_counts.most_common(top_k)
+        return self._tag_index.top_k(top_k)
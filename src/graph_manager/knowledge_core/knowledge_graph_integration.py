@@ -1,18 +1,45 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Callable
 from pathlib import Path
+import itertools
+import logging
 import random
+import time
 import networkx as nx
 import json
-import jinja2
 
 from src.graph_manager.knowledge_core.node_edge import Knowledge_Node, Knowledge_Edge
 from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.bulk_ingest import ingest
+from src.graph_manager.knowledge_core.graph_io import NDJSON_SUFFIXES
+from src.graph_manager.knowledge_core.graph_loader import load_graph_files
+from src.graph_manager.knowledge_core.graph_manifest import GraphManifest, GraphManifestEntry
+from src.graph_manager.knowledge_core.graph_query import parse_query
+from src.graph_manager.knowledge_core.graph_registry import GraphRegistry
+from src.graph_manager.knowledge_core.mutation_log import MutationLog, open_graph_log
+from src.graph_manager.knowledge_core.result_cache import DEFAULT_RESULT_CACHE_SIZE, ResultCache, cached_read
+from src.graph_manager.knowledge_core.similarity_index import DEFAULT_THRESHOLD
+from src.graph_manager.knowledge_core.snapshot import GraphSnapshot
+from src.graph_manager.knowledge_core.storage import GraphStorage, is_storage_path, open_storage
+from src.graph_manager.knowledge_core.vector_index import vector_index_path_for
 from src.graph_manager.knowledge_core.prompt import *
+from src.graph_manager.knowledge_core.prompt_templates import render_prompt
+
+logger = logging.getLogger(__name__)
 
 # 需要进行持久状态留存
 
+# 默认的图谱存储目录
+DEFAULT_GRAPH_DIR = Path(__file__).parent.parent.parent.parent / "data" / "knowledge_graphs"
+# 批量添加失败时最多列出的出错条目数
+MAX_LISTED_BATCH_ERRORS = 20
+# 每个图谱最多保留的快照数，超出时丢弃最早的快照
+MAX_SNAPSHOTS_PER_GRAPH = 10
+# 列出快照之后的变化时，每类变化最多列出的 ID 数
+MAX_LISTED_DIFF_IDS = 20
+
 class KnowledgeGraphIntegration:
     """
     知识图谱集成类
@@ -25,63 +52,199 @@ class KnowledgeGraphIntegration:
     
     def __str__(self):
         if not self.current_graph:
-            return jinja2.Template(PROMPT_STR).render({"selected": False})
+            return render_prompt(PROMPT_STR, {"selected": False})
         else:
             node_rank_title: Callable[[List[Tuple[Knowledge_Node, int]]], List[Tuple[str, int]]] = lambda li: [
                 (node.title, degree) for node, degree in li
             ]
-            return jinja2.Template(PROMPT_STR).render({
+            return render_prompt(PROMPT_STR, {
                 "selected": True,
                 "name": self.current_graph.name,
                 "node_count": len(self.current_graph.nodes),
                 "edge_count": len(self.current_graph.edges),
                 "top_in_degree_nodes": node_rank_title(self.current_graph.get_high_in_degree_nodes(10)),
                 "top_out_degree_nodes": node_rank_title(self.current_graph.get_high_out_degree_nodes(10)),
-                "top_betweenness_centrality_nodes": node_rank_title(self.current_graph.get_high_betweenness_centrality_nodes(10)),
-                "top_closeness_centrality_nodes": node_rank_title(self.current_graph.get_high_closeness_centrality_nodes(10)),
+                "top_betweenness_centrality_nodes": node_rank_title(self.current_graph.get_high_betweenness_centrality_nodes(10, background=True)),
+                "top_closeness_centrality_nodes": node_rank_title(self.current_graph.get_high_closeness_centrality_nodes(10, background=True)),
                 "top_tags": self.current_graph.get_top_k_tags(10),
             })
 
-    def __init__(self, graph_dir: Optional[str | Path] = None):
+    def __init__(self, graph_dir: Optional[str | Path] = None, max_loaded_graphs: Optional[int] = None, result_cache_size: int = DEFAULT_RESULT_CACHE_SIZE):
         """
         初始化 KnowledgeGraphIntegration
+
+        Args:
+            graph_dir (Optional[str | Path]): 图谱存储目录，默认为 DEFAULT_GRAPH_DIR。
+            max_loaded_graphs (Optional[int]): 内存中最多保留的图谱数量，超出时按最近最少使用的顺序卸载非当前图谱；None 表示不限制。
+            result_cache_size (int): 最多缓存的读取结果数量，为 0 时不缓存。默认为 DEFAULT_RESULT_CACHE_SIZE。
         """
-        self.graph_list: List[Knowledge_Graph] = []
-        self.current_graph: Optional[Knowledge_Graph] = None
+        self._current_graph: Optional[Knowledge_Graph] = None
+        self._current_storage: Optional[GraphStorage] = None # 已选为当前图谱、但尚未加载到内存的存储后端图谱（只读打开）
+        self.graph_dir: Path = DEFAULT_GRAPH_DIR
+        self.max_loaded_graphs = max_loaded_graphs
+        self._manifest: Optional[GraphManifest] = None # 图谱目录清单，未加载的图谱只在清单中出现
+        self._registry = GraphRegistry() # 图谱名称 -> 图谱文件与已加载的图谱
+        self._logs: Dict[str, MutationLog] = {} # 图谱名称 -> 修改日志
+        self._storages: Dict[str, GraphStorage] = {} # 图谱名称 -> 直接写入的存储后端（如 SQLite）
+        self._snapshots: Dict[str, OrderedDict[str, GraphSnapshot]] = {} # 图谱名称 -> 快照名称 -> 快照，从早到晚
+        self.result_cache = ResultCache(result_cache_size) # 只读方法的结果缓存，按图谱版本失效，命中统计见 result_cache.stats()
         self.reload_graphs(graph_dir)
 
-    def reload_graphs(self, graph_dir: Optional[str | Path] = None) -> str:
+    @property
+    def current_graph(self) -> Optional[Knowledge_Graph]:
         """
-        重新加载知识图谱
+        当前图谱。
+        当前图谱由存储后端提供且尚未加载时，首次访问会将其完整加载到内存并挂载写入监听器；
+        只读取节点、搜索或遍历的方法先通过 `_storage_reader` 直接查询存储后端，不会触发加载。
         """
-        err_load_list = []
+        if self._current_graph is None and self._current_storage is not None:
+            name = self._current_storage.name
+            self._close_current_storage()
+            self._current_graph = self.get_graph(name)
+            self._evict_graphs()
+        return self._current_graph
+
+    @current_graph.setter
+    def current_graph(self, graph: Optional[Knowledge_Graph]):
+        self._close_current_storage()
+        self._current_graph = graph
+
+    def _storage_reader(self) -> Optional[GraphStorage]:
+        """内部辅助方法：当前图谱由存储后端提供且尚未加载到内存时，返回可直接查询的只读存储后端。"""
+        return self._current_storage
+
+    def _close_current_storage(self):
+        """内部辅助方法：关闭当前图谱尚未加载时使用的只读存储后端。"""
+        if self._current_storage is not None:
+            self._current_storage.close()
+            self._current_storage = None
+
+    def _current_name(self) -> Optional[str]:
+        """内部辅助方法：当前图谱的名称，不会触发加载。"""
+        if self._current_graph is not None:
+            return self._current_graph.name
+        if self._current_storage is not None:
+            return self._current_storage.name
+        return None
+
+    @property
+    def graph_list(self) -> List[Knowledge_Graph]:
+        """当前已加载到内存中的图谱。"""
+        return self._registry.loaded
+
+    def reload_graphs(self, graph_dir: Optional[str | Path] = None, preload: bool = False, workers: Optional[int] = None) -> str:
+        """
+        重新扫描图谱目录。
+
+        只读取清单并检查各文件的大小与修改时间，不会加载未加载的图谱；图谱在被切换为当前图谱时才加载。
+        再次扫描同一目录时为增量刷新：
+        - 大小与修改时间未变化的文件直接复用清单中的摘要，已加载的图谱保持不变
+        - 已加载图谱的文件在本进程之外被修改时，从文件重新加载；文件被删除时将其卸载
+        - 新增或变化的文件较多时，在进程池中并行读取
+        切换到其他目录时，卸载所有已加载的图谱。
 
+        Args:
+            graph_dir (Optional[str | Path]): 图谱目录，默认为当前图谱目录（初始为 DEFAULT_GRAPH_DIR）。
+            preload (bool): 是否同时加载目录中的所有图谱（不超过 max_loaded_graphs）。默认为 False。
+            workers (Optional[int]): 并行读取文件的进程数，默认不超过 CPU 核心数。
+
+        Returns:
+            str: 重新扫描结果的提示信息。
+        """
         if not graph_dir:
-            graph_dir = Path(__file__).parent.parent.parent.parent / "data" / "knowledge_graphs"
+            graph_dir = self.graph_dir
         if isinstance(graph_dir, str):
             graph_dir = Path(graph_dir)
         if not graph_dir.exists():
             graph_dir.mkdir(parents=True, exist_ok=True)
 
-        self.graph_list.clear()
-        graph_files = list(graph_dir.glob("*.json"))
-        for graph_file in graph_files:
-            try:
-                loading_graph = Knowledge_Graph.load_from_file(str(graph_file))
-                self.graph_list.append(loading_graph)
-            except Exception as e:
-                print(f"Error loading graph from {graph_file}: {e}")
-                err_load_list.append(str(graph_file))
-                continue
-
-        return jinja2.Template(PROMPT_RELOAD_GRAPHS).render({
-            "graph_list": self.graph_list,
+        reload_names: List[str] = []
+        current_name = self._current_name()
+        if self._manifest is None or graph_dir.resolve() != self.graph_dir.resolve():
+            self._close_logs()
+            self._registry.clear()
+            self._snapshots.clear()
+            self.current_graph = None
+            self._manifest = GraphManifest.load(graph_dir)
+        else:
+            for name in [name for name in self._registry.loaded_names if self._modified_externally(name)]:
+                # 内存中的内容已过期，不能再用它刷新清单，直接丢弃
+                self._drop_loaded(name)
+                reload_names.append(name)
+        self.graph_dir = graph_dir
+
+        err_load_list = self._manifest.refresh(workers)
+        for file_path in self._registry.sync((entry.name, self._manifest.file_path(entry)) for entry in self._manifest):
+            logger.warning("Error loading graph from %s: 图谱名称 %s 与其他文件重复", file_path, self._manifest.entries[file_path.name].name)
+            err_load_list.append(str(file_path))
+        for name in self._registry.loaded_names:
+            if name not in self._registry:
+                self._drop_loaded(name)
+        if preload:
+            reload_names += [name for name in self._registry if not self._registry.is_loaded(name)]
+            if self.max_loaded_graphs is not None:
+                reload_names = reload_names[:max(self.max_loaded_graphs - len(self._registry.loaded_names), 0)]
+        err_load_list += self._load_graphs(reload_names, workers)
+        if self._current_storage is not None and current_name not in self._registry:
+            self.current_graph = None
+        if self._current_graph is None and self._current_storage is None and self._registry.is_loaded(current_name):
+            self.current_graph = self._registry.get(current_name)
+        self._evict_graphs()
+        self._manifest.save()
+
+        return render_prompt(PROMPT_RELOAD_GRAPHS, {
+            "graph_list": self._graph_entries(),
             "err_load_list": err_load_list
         })
-        
+
+    def _modified_externally(self, name: str) -> bool:
+        """内部辅助方法：已加载图谱的文件是否已被删除，或在本进程之外被修改。"""
+        log = self._logs.get(name)
+        if log is not None:
+            return log.modified_externally()
+        storage = self._storages.get(name)
+        if storage is not None:
+            file_path = self._registry.file_path(name)
+            return file_path is None or not file_path.exists() or storage.modified_externally()
+        return False
+
+    def _graph_entries(self) -> List[GraphManifestEntry]:
+        """内部辅助方法：清单中已注册的图谱摘要，名称与其他文件重复的文件不在其中。"""
+        return [entry for entry in self._manifest if self._registry.name_of(self._manifest.file_path(entry)) is not None]
+
+    def _drop_loaded(self, name: str):
+        """内部辅助方法：丢弃内存中已过期的图谱，不用它刷新清单，也不写回文件。"""
+        if self._registry.unload(name) is self._current_graph:
+            self.current_graph = None
+        self._detach_persistence(name)
+
+    def _load_graphs(self, names: List[str], workers: Optional[int] = None) -> List[str]:
+        """
+        内部辅助方法：并行加载多个已注册的图谱并挂载持久化监听器，未注册的名称会被忽略。
+
+        Returns:
+            List[str]: 加载失败的图谱文件路径。
+        """
+        file_paths = {}
+        for name in names:
+            file_path = self._registry.file_path(name)
+            if file_path is not None:
+                file_paths[file_path] = name
+        err_load_list = []
+        for file_path, graph in load_graph_files(list(file_paths), workers).items():
+            if isinstance(graph, Exception):
+                logger.warning("Error loading graph from %s: %s", file_path, graph)
+                err_load_list.append(str(file_path))
+                continue
+            self._attach_persistence(graph, file_path)
+            self._registry.set_loaded(file_paths[file_path], graph)
+            self._update_manifest(graph)
+        return err_load_list
+
     def add_graph(self, graph_name: str, graph: Optional[Knowledge_Graph] = None) -> str:
         """
-        添加一个新的知识图谱到集成中，并保存到文件
+        添加一个新的知识图谱到集成中，并保存到当前图谱目录。
+        同名图谱或同名文件已存在时添加失败，不会覆盖已有的图谱。
         Args:
             name (str): 图谱的名称
             graph (Knowledge_Graph): 要添加的知识图谱
@@ -93,30 +256,48 @@ class KnowledgeGraphIntegration:
             raise TypeError("graph must be an instance of Knowledge_Graph")
 
         try:
-            self.graph_list.append(graph)
-            file_path = Path(__file__).parent.parent.parent.parent / "data" / "knowledge_graphs" / f"{graph_name}.json"
-            graph.save_to_file(file_path)
+            if graph.name in self._registry:
+                raise ValueError(f"图谱 {graph.name} 已存在")
+            file_path = self._graph_file_path(self.graph_dir, graph_name)
+            if file_path.exists():
+                raise ValueError(f"图谱文件 {file_path} 已存在")
+            self._registry.register(graph.name, file_path)
+            try:
+                graph.save_to_file(file_path)
+                self._attach_persistence(graph, file_path)
+            except Exception:
+                self._registry.unregister(graph.name)
+                raise
+            self._manifest.update(file_path, graph)
+            self._manifest.save()
+            self._registry.set_loaded(graph.name, graph)
             self.current_graph = graph
+            self._evict_graphs()
 
-            return jinja2.Template(PROMPT_ADD_GRAPH).render({
+            return render_prompt(PROMPT_ADD_GRAPH, {
                 "graph": graph
             })
         except Exception as e:
-            print(f"Error adding graph: {e}")
+            logger.exception("Error adding graph")
             return f"添加图谱失败，错误原因: {e}"
         
     def list_current_graph(self) -> str:
         """
-        列出所有存在的知识图谱
+        列出所有存在的知识图谱。
+        由清单提供，不会加载任何图谱；已加载图谱的节点数与边数取自内存中的实际值。
         """
-        if not self.graph_list:
-            return jinja2.Template(PROMPT_LIST_GRAPHS).render({
+        if not len(self._registry):
+            return render_prompt(PROMPT_LIST_GRAPHS, {
                 "graph_list": [],
                 "empty": True
             })
-        
-        return jinja2.Template(PROMPT_LIST_GRAPHS).render({
-            "graph_list": self.graph_list,
+
+        for graph in self._registry.loaded:
+            self._update_manifest(graph)
+        return render_prompt(PROMPT_LIST_GRAPHS, {
+            "graph_list": self._graph_entries(),
+            "loaded": set(self._registry.loaded_names),
+            "current": self._current_name(),
             "empty": False
         })
 
@@ -124,22 +305,99 @@ class KnowledgeGraphIntegration:
         """
         设置当前操作的知识图谱。
 
+        由存储后端提供（如 .sqlite）且尚未加载的图谱不会立即加载：读取节点、关键词搜索、k 跳邻域与最短路径
+        直接查询存储后端，首次需要完整内存图谱（如修改图谱）时才加载。
+
         Args:
             name (str): 要设置为当前图谱的名称。
 
         Returns:
             str: 操作结果的提示信息。
         """
-        for graph in self.graph_list:
-            if graph.name == name:
-                self.current_graph = graph
-                return f"已成功切换到知识图谱: {name}"
-        
-        return jinja2.Template(PROMPT_SET_GRAPH_FAILED).render({
+        file_path = self._registry.file_path(name)
+        if file_path is not None and not self._registry.is_loaded(name) and is_storage_path(file_path):
+            try:
+                storage = open_storage(file_path, readonly=True)
+            except Exception as e:
+                return render_prompt(PROMPT_OPERATION_ERROR, {"error_message": f"加载图谱失败: {e}"})
+            self.current_graph = None
+            self._current_storage = storage
+            return f"已成功切换到知识图谱: {name}"
+
+        try:
+            graph = self.get_graph(name)
+        except Exception as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": f"加载图谱失败: {e}"})
+            return error_prompt
+
+        if graph is not None:
+            self.current_graph = graph
+            self._evict_graphs()
+            return f"已成功切换到知识图谱: {name}"
+
+        return render_prompt(PROMPT_SET_GRAPH_FAILED, {
             "name": name,
-            "graph_list": self.graph_list
+            "graph_list": self._graph_entries()
         })
 
+    def get_graph(self, name: str) -> Optional[Knowledge_Graph]:
+        """
+        按名称获取图谱，图谱尚未加载时从文件加载（并重放其修改日志）。
+
+        Args:
+            name (str): 图谱名称。
+
+        Returns:
+            Optional[Knowledge_Graph]: 图谱对象，没有该名称的图谱时返回 None。
+        """
+        graph = self._registry.get(name)
+        if graph is not None:
+            return graph
+
+        file_path = self._registry.file_path(name)
+        if file_path is None:
+            return None
+        graph = Knowledge_Graph.load_from_file(str(file_path))
+        self._attach_persistence(graph, file_path)
+        self._registry.set_loaded(name, graph)
+        self._update_manifest(graph)
+        self._manifest.save()
+        return graph
+
+    def unload_graph(self, name: str) -> bool:
+        """
+        将图谱从内存中卸载。所有修改都已写入修改日志或存储后端，卸载不会丢失数据。
+
+        Args:
+            name (str): 图谱名称。
+
+        Returns:
+            bool: 图谱此前是否已加载。
+        """
+        graph = self._registry.unload(name)
+        if graph is None:
+            return False
+        self._detach_persistence(name)
+        self._update_manifest(graph)
+        self._manifest.save()
+        if self._current_graph is graph:
+            self.current_graph = None
+        return True
+
+    def _evict_graphs(self):
+        """内部辅助方法：已加载的图谱超过 max_loaded_graphs 时，按最近最少使用的顺序卸载非当前图谱。"""
+        if self.max_loaded_graphs is None:
+            return
+        loaded_names = self._registry.loaded_names
+        excess = len(loaded_names) - self.max_loaded_graphs
+        for name in loaded_names:
+            if excess <= 0:
+                break
+            if self._current_name() == name:
+                continue
+            self.unload_graph(name)
+            excess -= 1
+
     def add_node_to_current_graph(self, title: str, description: Optional[str] = None, id: Optional[str] = None, tags: Optional[List[str]] = None) -> str:
         """
         向当前选中的图谱中添加一个新节点。
@@ -154,7 +412,7 @@ class KnowledgeGraphIntegration:
             str: 一个为LLM格式化的、包含操作结果的字符串。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         try:
             node_data = {"title": title, "description": description}
@@ -164,14 +422,14 @@ class KnowledgeGraphIntegration:
                 node_data["tags"] = tags
             node = Knowledge_Node(**node_data)
             self.current_graph.add_node(node)
-            return jinja2.Template(PROMPT_ADD_NODE).render({
+            return render_prompt(PROMPT_ADD_NODE, {
                 "success": True,
                 "graph_name": self.current_graph.name,
                 "node": node
             })
         except ValueError as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": str(e)})
-            return jinja2.Template(PROMPT_ADD_NODE).render({
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_ADD_NODE, {
                 "success": False,
                 "graph_name": self.current_graph.name,
                 "error_prompt": error_prompt
@@ -192,7 +450,7 @@ class KnowledgeGraphIntegration:
             str: 一个为LLM格式化的、包含操作结果的字符串。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         try:
             edge_data = {
@@ -205,19 +463,20 @@ class KnowledgeGraphIntegration:
                 edge_data["id"] = id
             edge = Knowledge_Edge(**edge_data)
             self.current_graph.add_edge(edge)
-            return jinja2.Template(PROMPT_ADD_EDGE).render({
+            return render_prompt(PROMPT_ADD_EDGE, {
                 "success": True,
                 "graph_name": self.current_graph.name,
                 "edge": edge
             })
         except ValueError as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": str(e)})
-            return jinja2.Template(PROMPT_ADD_EDGE).render({
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_ADD_EDGE, {
                 "success": False,
                 "graph_name": self.current_graph.name,
                 "error_prompt": error_prompt
             })
 
+    @cached_read
     def get_node_info(self, node_id: str) -> str:
         """
         获取当前图谱中指定ID的节点信息。
@@ -228,25 +487,27 @@ class KnowledgeGraphIntegration:
         Returns:
             str: 一个为LLM格式化的、包含查询结果的字符串。
         """
-        if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+        source = self._storage_reader() or self.current_graph
+        if not source:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
-        node = self.current_graph.get_node(node_id)
+        node = source.get_node(node_id)
         if node:
-            return jinja2.Template(PROMPT_GET_NODE).render({
+            return render_prompt(PROMPT_GET_NODE, {
                 "success": True,
-                "graph_name": self.current_graph.name,
+                "graph_name": source.name,
                 "node_id": node_id,
                 "node": node
             })
         else:
-            return jinja2.Template(PROMPT_GET_NODE).render({
+            return render_prompt(PROMPT_GET_NODE, {
                 "success": False,
                 "not_found": True,
-                "graph_name": self.current_graph.name,
+                "graph_name": source.name,
                 "node_id": node_id
             })
 
+    @cached_read
     def get_edge_info(self, edge_id: str) -> str:
         """
         获取当前图谱中指定ID的边信息。
@@ -258,24 +519,25 @@ class KnowledgeGraphIntegration:
             str: 一个为LLM格式化的、包含查询结果的字符串。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         edge = self.current_graph.get_edge(edge_id)
         if edge:
-            return jinja2.Template(PROMPT_GET_EDGE).render({
+            return render_prompt(PROMPT_GET_EDGE, {
                 "success": True,
                 "graph_name": self.current_graph.name,
                 "edge_id": edge_id,
                 "edge": edge
             })
         else:
-            return jinja2.Template(PROMPT_GET_EDGE).render({
+            return render_prompt(PROMPT_GET_EDGE, {
                 "success": False,
                 "not_found": True,
                 "graph_name": self.current_graph.name,
                 "edge_id": edge_id
             })
 
+    @cached_read
     def get_node_in_out_edges(self, node_id: str) -> str:
         """
         获取当前图谱中指定节点的所有入边和出边信息。
@@ -287,11 +549,11 @@ class KnowledgeGraphIntegration:
             str: 一个为LLM格式化的、包含查询结果的字符串。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         node = self.current_graph.get_node(node_id)
         if not node:
-            return jinja2.Template(PROMPT_GET_IN_OUT_EDGES).render({
+            return render_prompt(PROMPT_GET_IN_OUT_EDGES, {
                 "success": False,
                 "not_found": True,
                 "graph_name": self.current_graph.name,
@@ -301,7 +563,7 @@ class KnowledgeGraphIntegration:
         try:
             in_edges = self.current_graph.get_in_edge(node_id)
             out_edges = self.current_graph.get_out_edge(node_id)
-            return jinja2.Template(PROMPT_GET_IN_OUT_EDGES).render({
+            return render_prompt(PROMPT_GET_IN_OUT_EDGES, {
                 "success": True,
                 "graph_name": self.current_graph.name,
                 "node_id": node_id,
@@ -310,8 +572,8 @@ class KnowledgeGraphIntegration:
                 "out_edges": out_edges
             })
         except ValueError as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": str(e)})
-            return jinja2.Template(PROMPT_GET_IN_OUT_EDGES).render({
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_GET_IN_OUT_EDGES, {
                 "success": False,
                 "not_found": False,
                 "graph_name": self.current_graph.name,
@@ -319,6 +581,7 @@ class KnowledgeGraphIntegration:
                 "error_prompt": error_prompt
             })
 
+    @cached_read
     def get_node_neighbours(self, node_id: str) -> str:
         """
         获取当前图谱中指定节点的所有邻居节点信息。
@@ -330,11 +593,11 @@ class KnowledgeGraphIntegration:
             str: 一个为LLM格式化的、包含查询结果的字符串。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         node = self.current_graph.get_node(node_id)
         if not node:
-            return jinja2.Template(PROMPT_GET_NEIGHBOURS).render({
+            return render_prompt(PROMPT_GET_NEIGHBOURS, {
                 "success": False,
                 "not_found": True,
                 "graph_name": self.current_graph.name,
@@ -343,7 +606,7 @@ class KnowledgeGraphIntegration:
 
         try:
             neighbours = self.current_graph.get_neighbours(node_id)
-            return jinja2.Template(PROMPT_GET_NEIGHBOURS).render({
+            return render_prompt(PROMPT_GET_NEIGHBOURS, {
                 "success": True,
                 "graph_name": self.current_graph.name,
                 "node_id": node_id,
@@ -351,8 +614,8 @@ class KnowledgeGraphIntegration:
                 "neighbours": neighbours
             })
         except ValueError as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": str(e)})
-            return jinja2.Template(PROMPT_GET_NEIGHBOURS).render({
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_GET_NEIGHBOURS, {
                 "success": False,
                 "not_found": False,
                 "graph_name": self.current_graph.name,
@@ -360,7 +623,92 @@ class KnowledgeGraphIntegration:
                 "error_prompt": error_prompt
             })
 
-    def search_nodes_by_tag(self, tags: List[str], mode: str = 'AND', case_sensitive: bool = False) -> str:
+    @cached_read
+    def get_k_hop_neighborhood(self, node_id: str, k: int = 1, direction: str = 'both', with_description: bool = False, max_nodes: int = 50) -> str:
+        """
+        获取当前图谱中以指定节点为中心的 k 跳邻域子图信息。
+        子图以只读视图的形式获取，不会复制图谱中的节点和边。
+
+        Args:
+            node_id (str): 中心节点的ID。
+            k (int, optional): 扩散的跳数，k=1 表示直接邻居。默认为 1。
+            direction (str, optional): 扩散方向，'out' 沿出边，'in' 沿入边，'both' 同时沿两个方向。默认为 'both'。
+            with_description (bool, optional): 是否在结果中包含节点的描述。默认为 False。
+            max_nodes (int, optional): 最多显示的节点数量，按跳数从近到远保留。默认为 50。
+
+        Returns:
+            str: 一个为LLM格式化的、包含查询结果的字符串。
+        """
+        storage = self._storage_reader()
+        source = storage or self.current_graph
+        if not source:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        node = source.get_node(node_id)
+        if not node:
+            return render_prompt(PROMPT_GET_K_HOP_NEIGHBORHOOD, {
+                "success": False,
+                "not_found": True,
+                "graph_name": source.name,
+                "node_id": node_id
+            })
+
+        try:
+            # 节点按 BFS 发现顺序排列，截断时自然保留距离最近的节点
+            if storage is not None:
+                # 存储后端先求出邻域范围，只读取需要显示的节点与边
+                hops, edge_ends = storage.k_hop_scope(node_id, k, direction)
+                shown_nodes = [{"hop": hop, "node": storage.get_node(shown_id)} for shown_id, hop in itertools.islice(hops.items(), max_nodes)]
+                shown = {item["node"].id: item["node"] for item in shown_nodes}
+                shown_edges = []
+                for edge_id, (u, v) in edge_ends.items():
+                    if u in shown and v in shown:
+                        # 后端返回的边没有链接节点对象，链接到已读取的两端节点以便显示标题
+                        edge = storage.get_edge(edge_id)
+                        edge._start_node, edge._end_node = shown[edge.start_node_id], shown[edge.end_node_id]
+                        shown_edges.append(edge)
+                total_nodes, total_edges = len(hops), len(edge_ends)
+            else:
+                view = self.current_graph.get_k_hop_neighborhood(node_id, k, direction)
+                shown_nodes = []
+                for shown_id, shown_node in view.nodes.items():
+                    if len(shown_nodes) >= max_nodes:
+                        break
+                    shown_nodes.append({"hop": view.hop_of(shown_id), "node": shown_node})
+                shown_ids = {item["node"].id for item in shown_nodes}
+                shown_edges = [
+                    edge for edge in view.edges.values()
+                    if edge.start_node_id in shown_ids and edge.end_node_id in shown_ids
+                ]
+                total_nodes, total_edges = len(view), len(view.edges)
+            truncated = total_nodes > len(shown_nodes)
+
+            return render_prompt(PROMPT_GET_K_HOP_NEIGHBORHOOD, {
+                "success": True,
+                "graph_name": source.name,
+                "node_id": node_id,
+                "node": node,
+                "k": k,
+                "direction_text": {"out": "出边", "in": "入边", "both": "出边和入边"}[direction],
+                "nodes": shown_nodes,
+                "edges": shown_edges,
+                "total_nodes": total_nodes,
+                "total_edges": total_edges,
+                "truncated": truncated,
+                "with_description": with_description
+            })
+        except ValueError as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_GET_K_HOP_NEIGHBORHOOD, {
+                "success": False,
+                "not_found": False,
+                "graph_name": source.name,
+                "node_id": node_id,
+                "error_prompt": error_prompt
+            })
+
+    @cached_read
+    def search_nodes_by_tag(self, tags: List[str], mode: str = 'AND', case_sensitive: bool = False, compact: bool = False) -> str:
         """
         根据一个或多个标签搜索节点。
 
@@ -368,16 +716,17 @@ class KnowledgeGraphIntegration:
             tags (List[str]): 要搜索的标签列表。
             mode (str): 搜索模式，'AND' 或 'OR'。
             case_sensitive (bool): 是否区分大小写。
+            compact (bool): 是否以紧凑的 TSV 行输出结果。默认为 False。
 
         Returns:
             str: 格式化后的搜索结果。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         try:
             found_nodes = self.current_graph.search_nodes_by_tag(tags, mode, case_sensitive)
-            return jinja2.Template(PROMPT_SEARCH_NODES_BY_TAG).render({
+            return render_prompt(PROMPT_SEARCH_NODES_BY_TAG_COMPACT if compact else PROMPT_SEARCH_NODES_BY_TAG, {
                 "success": True,
                 "graph_name": self.current_graph.name,
                 "tags": tags,
@@ -386,86 +735,508 @@ class KnowledgeGraphIntegration:
                 "nodes": found_nodes
             })
         except Exception as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": str(e)})
-            return jinja2.Template(PROMPT_SEARCH_NODES_BY_TAG).render({
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_SEARCH_NODES_BY_TAG, {
                 "success": False,
                 "graph_name": self.current_graph.name,
                 "error_prompt": error_prompt
             })
 
-    def find_path(self, start_node_id: str, end_node_id: str, with_description: bool = False, with_edge_description: bool = False) -> str:
+    @cached_read
+    def search_nodes_by_keyword(self, keyword: str, case_sensitive: bool = False, limit: int = 20) -> str:
+        """
+        根据关键词搜索节点，关键词会匹配节点的标题、描述和标签。
+
+        Args:
+            keyword (str): 要搜索的关键词。
+            case_sensitive (bool): 是否区分大小写。
+            limit (int): 最多返回的节点数量。
+
+        Returns:
+            str: 格式化后的搜索结果。
+        """
+        source = self._storage_reader() or self.current_graph
+        if not source:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        try:
+            # 多取一个结果，用于判断是否被截断
+            found_nodes = source.search_nodes_by_keyword(keyword, case_sensitive, limit + 1)
+            truncated = len(found_nodes) > limit
+            found_nodes = found_nodes[:limit]
+            return render_prompt(PROMPT_SEARCH_NODES_BY_KEYWORD, {
+                "success": True,
+                "graph_name": source.name,
+                "keyword": keyword,
+                "count": len(found_nodes),
+                "limit": limit,
+                "truncated": truncated,
+                "nodes": found_nodes
+            })
+        except Exception as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_SEARCH_NODES_BY_KEYWORD, {
+                "success": False,
+                "graph_name": source.name,
+                "error_prompt": error_prompt
+            })
+
+    @cached_read
+    def search_edges_by_keyword(self, keyword: str, case_sensitive: bool = False, limit: int = 20) -> str:
         """
-        查找两个节点之间的最短路径，并返回包含路径信息的prompt。
+        根据关键词搜索边，关键词会匹配边的标题和描述。
+
+        Args:
+            keyword (str): 要搜索的关键词。
+            case_sensitive (bool): 是否区分大小写。
+            limit (int): 最多返回的边数量。
+
+        Returns:
+            str: 格式化后的搜索结果。
+        """
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        try:
+            found_edges = self.current_graph.search_edges_by_keyword(keyword, case_sensitive, limit + 1)
+            truncated = len(found_edges) > limit
+            found_edges = found_edges[:limit]
+            return render_prompt(PROMPT_SEARCH_EDGES_BY_KEYWORD, {
+                "success": True,
+                "graph_name": self.current_graph.name,
+                "keyword": keyword,
+                "count": len(found_edges),
+                "limit": limit,
+                "truncated": truncated,
+                "edges": found_edges
+            })
+        except Exception as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_SEARCH_EDGES_BY_KEYWORD, {
+                "success": False,
+                "graph_name": self.current_graph.name,
+                "error_prompt": error_prompt
+            })
+
+    @cached_read
+    def list_relation_types(self, top_k: int = 30) -> str:
+        """
+        列出当前图谱中的关系类型（边的标题）及各自的边数量。
+
+        Args:
+            top_k (int): 最多列出的关系类型数量。默认为 30。
+
+        Returns:
+            str: 格式化后的关系类型统计。
+        """
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        try:
+            relations = self.current_graph.get_relation_types()
+            return render_prompt(PROMPT_LIST_RELATION_TYPES, {
+                "success": True,
+                "graph_name": self.current_graph.name,
+                "total": len(relations),
+                "relations": relations[:top_k],
+                "truncated": len(relations) > top_k
+            })
+        except Exception as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_LIST_RELATION_TYPES, {
+                "success": False,
+                "graph_name": self.current_graph.name,
+                "error_prompt": error_prompt
+            })
+
+    @cached_read
+    def get_neighbours_by_relation(self, node_id: str, relation: str, direction: str = 'out', limit: int = 50) -> str:
+        """
+        获取当前图谱中指定节点通过某种关系直接相连的节点。
+
+        Args:
+            node_id (str): 要查询的节点ID。
+            relation (str): 关系类型，即边的标题。
+            direction (str, optional): 'out' 沿出边，'in' 沿入边，'both' 同时沿两个方向。默认为 'out'。
+            limit (int, optional): 最多显示的邻居数量。默认为 50。
+
+        Returns:
+            str: 一个为LLM格式化的、包含查询结果的字符串。
+        """
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        node = self.current_graph.get_node(node_id)
+        if not node:
+            return render_prompt(PROMPT_GET_NEIGHBOURS_BY_RELATION, {
+                "success": False,
+                "not_found": True,
+                "graph_name": self.current_graph.name,
+                "node_id": node_id
+            })
+
+        try:
+            neighbours = self.current_graph.get_neighbours_by_relation(node_id, relation, direction)
+            return render_prompt(PROMPT_GET_NEIGHBOURS_BY_RELATION, {
+                "success": True,
+                "graph_name": self.current_graph.name,
+                "node_id": node_id,
+                "node": node,
+                "relation": self.current_graph.relation_index.label(relation) or relation,
+                "direction_text": {"out": "出边", "in": "入边", "both": "出边和入边"}[direction],
+                "items": [
+                    {"node": neighbour, "edge": edge, "outgoing": edge.start_node_id == node_id}
+                    for neighbour, edge in neighbours[:limit]
+                ],
+                "total": len(neighbours),
+                "truncated": len(neighbours) > limit
+            })
+        except ValueError as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_GET_NEIGHBOURS_BY_RELATION, {
+                "success": False,
+                "not_found": False,
+                "graph_name": self.current_graph.name,
+                "node_id": node_id,
+                "error_prompt": error_prompt
+            })
+
+    @cached_read
+    def get_relation_closure(self, node_id: str, relation: str, direction: str = 'out', max_depth: Optional[int] = None, limit: int = 50) -> str:
+        """
+        从指定节点出发沿某种关系递归展开，列出可以到达的全部节点（例如一个知识点的全部前置知识）。
+
+        Args:
+            node_id (str): 起始节点的ID。
+            relation (str): 关系类型，即边的标题。
+            direction (str, optional): 'out' 沿出边，'in' 沿入边，'both' 同时沿两个方向。默认为 'out'。
+            max_depth (Optional[int], optional): 最大展开层数，None 表示不限制。
+            limit (int, optional): 最多显示的节点数量，按层数从近到远保留。默认为 50。
+
+        Returns:
+            str: 一个为LLM格式化的、包含查询结果的字符串。
+        """
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        node = self.current_graph.get_node(node_id)
+        if not node:
+            return render_prompt(PROMPT_GET_RELATION_CLOSURE, {
+                "success": False,
+                "not_found": True,
+                "graph_name": self.current_graph.name,
+                "node_id": node_id
+            })
+
+        try:
+            closure = self.current_graph.get_relation_closure(node_id, relation, direction, max_depth)
+            return render_prompt(PROMPT_GET_RELATION_CLOSURE, {
+                "success": True,
+                "graph_name": self.current_graph.name,
+                "node_id": node_id,
+                "node": node,
+                "relation": self.current_graph.relation_index.label(relation) or relation,
+                "direction_text": {"out": "出边", "in": "入边", "both": "出边和入边"}[direction],
+                "max_depth": max_depth,
+                "items": closure[:limit],
+                "total": len(closure),
+                "truncated": len(closure) > limit
+            })
+        except ValueError as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_GET_RELATION_CLOSURE, {
+                "success": False,
+                "not_found": False,
+                "graph_name": self.current_graph.name,
+                "node_id": node_id,
+                "error_prompt": error_prompt
+            })
+
+    @cached_read
+    def plan_learning_path(self, target_ids: List[str], relation: str = "前置知识", known_ids: Optional[List[str]] = None, max_nodes: int = 50) -> str:
+        """
+        规划学习目标节点的顺序：列出目标的全部前置知识，前置节点排在依赖它的节点之前。
+
+        Args:
+            target_ids (List[str]): 目标节点的ID列表。
+            relation (str, optional): 前置关系类型，边 A -> B 表示学习 B 之前需要先学习 A。默认为 "前置知识"。
+            known_ids (Optional[List[str]], optional): 已经掌握的节点ID列表，这些节点及只能经由它们到达的前置知识不会出现在计划中。
+            max_nodes (int, optional): 最多显示的节点数量，按学习顺序保留最先学习的节点。默认为 50。
+
+        Returns:
+            str: 一个为LLM格式化的、包含学习计划的字符串。
+        """
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        try:
+            plan = self.current_graph.plan_learning_path(target_ids, relation, known_ids)
+            return render_prompt(PROMPT_PLAN_LEARNING_PATH, {
+                "success": True,
+                "graph_name": self.current_graph.name,
+                "relation": self.current_graph.relation_index.label(relation) or relation,
+                "relation_exists": relation in self.current_graph.relation_index,
+                "targets": plan.targets,
+                "known_count": len(set(known_ids or ())),
+                "steps": plan.steps[:max_nodes],
+                "cycles": plan.cycles,
+                "total": len(plan.steps),
+                "truncated": len(plan.steps) > max_nodes
+            })
+        except ValueError as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_PLAN_LEARNING_PATH, {
+                "success": False,
+                "graph_name": self.current_graph.name,
+                "error_prompt": error_prompt
+            })
+
+    @cached_read
+    def find_similar_nodes(self, title: Optional[str] = None, node_id: Optional[str] = None, tags: Optional[List[str]] = None, threshold: float = DEFAULT_THRESHOLD, limit: int = 10) -> str:
+        """
+        查找标题与给定标题或已有节点近似重复的节点，用于在添加新概念前检查图谱中是否已有同一概念。
+
+        Args:
+            title (Optional[str]): 要比较的标题。
+            node_id (Optional[str]): 要比较的已有节点ID，提供时使用该节点的标题与标签，且结果中不包含该节点本身。
+            tags (Optional[List[str]]): 要比较的标签，仅在提供 title 时使用。
+            threshold (float): 最低相似度（0 到 1）。
+            limit (int): 最多返回的节点数量。
+
+        Returns:
+            str: 渲染后的prompt字符串。
+        """
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        try:
+            if node_id is not None:
+                node = self.current_graph.get_node(node_id)
+                if node is None:
+                    raise ValueError(f"节点 ID {node_id} 不存在")
+                title, tags = node.title, node.tags
+            elif not title:
+                raise ValueError("必须提供 title 或 node_id")
+            nodes = self.current_graph.find_similar_nodes(title, tags, threshold, limit + 1, exclude_id=node_id)
+            return render_prompt(PROMPT_FIND_SIMILAR_NODES, {
+                "success": True,
+                "graph_name": self.current_graph.name,
+                "title": title,
+                "threshold": threshold,
+                "limit": limit,
+                "truncated": len(nodes) > limit,
+                "nodes": nodes[:limit]
+            })
+        except Exception as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_FIND_SIMILAR_NODES, {"success": False, "error_prompt": error_prompt})
+
+    @cached_read
+    def semantic_search_nodes(self, queries: List[str], limit: int = 5, min_score: float = 0.1) -> str:
+        """
+        按文本相近程度批量查找节点，可一次为多个概念找到对应的节点。
+        首次调用时优先从图谱文件旁的索引文件加载向量索引，没有索引文件时再构建。
+
+        Args:
+            queries (List[str]): 查询文本列表。
+            limit (int): 每个查询最多返回的节点数量。
+            min_score (float): 最低相似度（0 到 1）。
+
+        Returns:
+            str: 渲染后的prompt字符串。
+        """
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        try:
+            queries = [query for query in queries if query.strip()]
+            if not queries:
+                raise ValueError("查询文本不能为空")
+            self._load_vector_index(self.current_graph)
+            results = self.current_graph.semantic_search(queries, limit, min_score)
+            return render_prompt(PROMPT_SEMANTIC_SEARCH_NODES, {
+                "success": True,
+                "graph_name": self.current_graph.name,
+                "limit": limit,
+                "results": list(zip(queries, results))
+            })
+        except Exception as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_SEMANTIC_SEARCH_NODES, {"success": False, "error_prompt": error_prompt})
+
+    @cached_read
+    def find_duplicate_nodes(self, threshold: float = DEFAULT_THRESHOLD, limit: int = 20) -> str:
+        """
+        列出当前图谱中疑似重复的节点对。
+
+        Args:
+            threshold (float): 最低相似度（0 到 1）。
+            limit (int): 最多返回的节点对数量。
+
+        Returns:
+            str: 渲染后的prompt字符串。
+        """
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        try:
+            pairs = self.current_graph.find_duplicate_nodes(threshold, limit + 1)
+            return render_prompt(PROMPT_FIND_DUPLICATE_NODES, {
+                "success": True,
+                "graph_name": self.current_graph.name,
+                "threshold": threshold,
+                "limit": limit,
+                "truncated": len(pairs) > limit,
+                "pairs": pairs[:limit]
+            })
+        except Exception as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_FIND_DUPLICATE_NODES, {"success": False, "error_prompt": error_prompt})
+
+    @cached_read
+    def find_path(self, start_node_id: str, end_node_id: str, with_description: bool = False, with_edge_description: bool = False,
+                  directed: bool = True, k: int = 1, all_shortest: bool = False, max_depth: Optional[int] = None, compact: bool = False,
+                  with_centrality: bool = False) -> str:
+        """
+        查找两个节点之间的路径，并返回包含路径信息的prompt。
 
         Args:
             start_node_id (str): 起始节点的ID。
             end_node_id (str): 结束节点的ID。
             with_description (bool, optional): 是否在结果中包含路径上节点的描述。默认为 False。
             with_edge_description (bool, optional): 是否在结果中包含路径上边的描述。默认为 False。
+            directed (bool, optional): 是否沿边的方向查找，为 False 时忽略边的方向。默认为 True。
+            k (int, optional): 返回的路径数量上限，大于 1 时按长度从短到长返回多条无环路径。默认为 1。
+            all_shortest (bool, optional): 是否返回所有等长的最短路径，最多返回 max(k, 10) 条。默认为 False。
+            max_depth (Optional[int], optional): 路径最多包含的边数，None 表示不限制。
+            compact (bool, optional): 是否以紧凑的 TSV 行输出找到的路径。默认为 False。
+            with_centrality (bool, optional): 是否标注路径节点的介数中心性。需要全图计算（按图谱版本缓存），默认为 False。
 
         Returns:
             str: 渲染后的prompt字符串。
         """
-        if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+        # 存储后端只支持单条最短路径，多条路径与中心性标注需要完整的内存图谱
+        storage = self._storage_reader() if k <= 1 and not all_shortest and not with_centrality else None
+        graph = storage or self.current_graph
+        if not graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         try:
-            path_node_ids = self.current_graph.find_path(start_node_id, end_node_id)
-
-            if not path_node_ids:
-                return jinja2.Template(PROMPT_FIND_PATH).render({
+            if all_shortest:
+                paths = graph.find_all_shortest_paths(start_node_id, end_node_id, directed, max_depth, limit=max(k, 10))
+            elif k > 1:
+                paths = graph.find_k_shortest_paths(start_node_id, end_node_id, k, directed, max_depth)
+            else:
+                path = graph.find_path(start_node_id, end_node_id, directed, max_depth)
+                paths = [path] if path else []
+
+            if not paths:
+                return render_prompt(PROMPT_FIND_PATH, {
                     "success": False,
                     "not_found": True,
-                    "graph_name": self.current_graph.name,
+                    "connected": bool(storage.find_path(start_node_id, end_node_id, directed=False)) if storage is not None
+                                 else graph.is_reachable(start_node_id, end_node_id, directed=False),
+                    "graph_name": graph.name,
                     "start_node_id": start_node_id,
-                    "end_node_id": end_node_id
-                })
-
-            G = self.current_graph._to_networkx()
-            centrality = nx.betweenness_centrality(G, normalized=True)
-
-            path_nodes_info = []
-            for node_id in path_node_ids:
-                node = self.current_graph.get_node(node_id)
-                path_nodes_info.append({
-                    "node": node,
-                    "in_degree": G.in_degree(node_id),
-                    "out_degree": G.out_degree(node_id),
-                    "centrality": centrality.get(node_id, 0.0)
+                    "end_node_id": end_node_id,
+                    "directed": directed,
+                    "max_depth": max_depth
                 })
 
-            path_edges = []
-            for i in range(len(path_node_ids) - 1):
-                u_id = path_node_ids[i]
-                v_id = path_node_ids[i+1]
-                # Find the edge(s) connecting u and v
-                for edge in self.current_graph.get_out_edge(u_id):
-                    if edge.end_node_id == v_id:
-                        path_edges.append(edge)
-                        break # Assuming one edge, for simplicity
-
-            return jinja2.Template(PROMPT_FIND_PATH).render({
+            # 度数直接取自节点的边列表；中心性需要全图计算，只在显式要求时获取
+            centrality = graph.get_betweenness_centrality() if with_centrality else None
+
+            paths_info = []
+            for path_node_ids in paths:
+                path_nodes_info = []
+                for node_id in path_node_ids:
+                    node = graph.get_node(node_id)
+                    path_nodes_info.append({
+                        "node": node,
+                        "in_degree": len(node.in_edge),
+                        "out_degree": len(node.out_edge),
+                        "centrality": centrality.get(node_id, 0.0) if centrality is not None else None
+                    })
+
+                path_edges = []
+                for u_id, v_id in zip(path_node_ids, path_node_ids[1:]):
+                    # 通过节点对索引直接取得连接 u 和 v 的边，存在平行边时取第一条；无向模式下可能需要逆向经过
+                    edges_between = graph.get_edges_between(u_id, v_id)
+                    if edges_between:
+                        path_edges.append({"edge": edges_between[0], "reversed": False})
+                    elif not directed:
+                        edges_between = graph.get_edges_between(v_id, u_id)
+                        if edges_between:
+                            path_edges.append({"edge": edges_between[0], "reversed": True})
+
+                paths_info.append({"nodes": path_nodes_info, "edges": path_edges})
+
+            return render_prompt(PROMPT_FIND_PATH_COMPACT if compact else PROMPT_FIND_PATH, {
                 "success": True,
-                "graph_name": self.current_graph.name,
+                "graph_name": graph.name,
                 "start_node_id": start_node_id,
                 "end_node_id": end_node_id,
-                "path_nodes": path_nodes_info,
-                "path_edges": path_edges,
+                "directed": directed,
+                "paths": paths_info,
                 "with_description": with_description,
                 "with_edge_description": with_edge_description
             })
 
         except ValueError as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": str(e)})
-            return jinja2.Template(PROMPT_FIND_PATH).render({
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_FIND_PATH, {
                 "success": False,
                 "not_found": False,
-                "graph_name": self.current_graph.name,
+                "graph_name": graph.name,
                 "start_node_id": start_node_id,
                 "end_node_id": end_node_id,
                 "error_prompt": error_prompt
             })
 
+    @cached_read
+    def query_graph(self, query: str) -> str:
+        """
+        在当前图谱上执行图模式查询，一次调用即可完成过滤节点、按类型沿边扩展和多跳路径匹配。
+
+        Args:
+            query (str): JSON 格式的查询，格式见 graph_query.GraphQuery。
+
+        JSON示例（查找“梯度下降”的三跳以内前置知识中带有“错题”标签的节点）:
+        ```json
+        {
+            "nodes": {"x": {"title": "梯度下降"}, "p": {"tags": ["错题"]}},
+            "edges": [{"from": "p", "to": "x", "title": "前置知识", "max_hops": 3}],
+            "return": ["p"],
+            "limit": 20
+        }
+        ```
+
+        Returns:
+            str: 渲染后的prompt字符串。
+        """
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        try:
+            spec = parse_query(json.loads(query))
+            result = self.current_graph.query(spec)
+            return render_prompt(PROMPT_QUERY_GRAPH, {
+                "success": True,
+                "graph_name": self.current_graph.name,
+                "variables": spec.return_variables,
+                "edge_patterns": [edge.describe() for edge in spec.edges],
+                "plan": result.plan,
+                "matches": result.matches,
+                "limit": spec.limit,
+                "truncated": result.truncated
+            })
+        except json.JSONDecodeError as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": f"JSON解析失败: {e}"})
+            return render_prompt(PROMPT_QUERY_GRAPH, {"success": False, "error_prompt": error_prompt})
+        except Exception as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_QUERY_GRAPH, {"success": False, "error_prompt": error_prompt})
+
     def delete_items(self, node_ids: Optional[List[str]] = None, edge_ids: Optional[List[str]] = None) -> str:
         """
         通过ID批量删除节点和边。
@@ -478,7 +1249,7 @@ class KnowledgeGraphIntegration:
             str: 渲染后的prompt字符串。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         deleted_nodes_count = 0
         deleted_edges_count = 0
@@ -486,6 +1257,7 @@ class KnowledgeGraphIntegration:
         not_found_edges = []
 
         try:
+            before = self.current_graph.snapshot()
             if node_ids:
                 for node_id in node_ids:
                     try:
@@ -502,23 +1274,53 @@ class KnowledgeGraphIntegration:
                     except ValueError:
                         not_found_edges.append(edge_id)
 
-            return jinja2.Template(PROMPT_DELETE_ITEMS).render({
+            return render_prompt(PROMPT_DELETE_ITEMS, {
                 "success": True,
                 "graph_name": self.current_graph.name,
                 "deleted_nodes_count": deleted_nodes_count,
                 "deleted_edges_count": deleted_edges_count,
                 "not_found_nodes": not_found_nodes,
-                "not_found_edges": not_found_edges
+                "not_found_edges": not_found_edges,
+                "undo_label": self._keep_undo_snapshot(before, "before-delete")
             })
 
         except Exception as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": str(e)})
-            return jinja2.Template(PROMPT_DELETE_ITEMS).render({
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_DELETE_ITEMS, {
                 "success": False,
                 "graph_name": self.current_graph.name,
                 "error_prompt": error_prompt
             })
     
+    def merge_nodes(self, target_id: str, source_id: str) -> str:
+        """
+        将源节点合并到目标节点：源节点的边改为连接目标节点，标签并入目标节点，然后删除源节点。
+
+        Args:
+            target_id (str): 保留的节点ID。
+            source_id (str): 被合并并删除的节点ID。
+
+        Returns:
+            str: 渲染后的prompt字符串。
+        """
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        try:
+            source = self.current_graph.get_node(source_id)
+            source_title = source.title if source is not None else source_id
+            node = self.current_graph.merge_nodes(target_id, source_id)
+            return render_prompt(PROMPT_MERGE_NODES, {
+                "success": True,
+                "graph_name": self.current_graph.name,
+                "source_id": source_id,
+                "source_title": source_title,
+                "node": node
+            })
+        except Exception as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_MERGE_NODES, {"success": False, "error_prompt": error_prompt})
+
     def update_node_in_current_graph(self, node_id: str, title: Optional[str] = None, description: Optional[str] = None, tags: Optional[List[str]] = None) -> str:
         """
         更新当前图谱中指定ID的节点信息。
@@ -533,7 +1335,7 @@ class KnowledgeGraphIntegration:
             str: 渲染后的prompt字符串。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         try:
             # 获取更新前的节点信息
@@ -548,7 +1350,7 @@ class KnowledgeGraphIntegration:
             # 获取更新后的节点信息
             updated_node = self.current_graph.get_node(node_id)
 
-            return jinja2.Template(PROMPT_UPDATE_NODE).render({
+            return render_prompt(PROMPT_UPDATE_NODE, {
                 "success": True,
                 "graph_name": self.current_graph.name,
                 "node_id": node_id,
@@ -557,8 +1359,8 @@ class KnowledgeGraphIntegration:
             })
 
         except ValueError as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": str(e)})
-            return jinja2.Template(PROMPT_UPDATE_NODE).render({
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_UPDATE_NODE, {
                 "success": False,
                 "graph_name": self.current_graph.name,
                 "node_id": node_id,
@@ -578,7 +1380,7 @@ class KnowledgeGraphIntegration:
             str: 渲染后的prompt字符串。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         try:
             # 获取更新前的边信息
@@ -593,7 +1395,7 @@ class KnowledgeGraphIntegration:
             # 获取更新后的边信息
             updated_edge = self.current_graph.get_edge(edge_id)
 
-            return jinja2.Template(PROMPT_UPDATE_EDGE).render({
+            return render_prompt(PROMPT_UPDATE_EDGE, {
                 "success": True,
                 "graph_name": self.current_graph.name,
                 "edge_id": edge_id,
@@ -602,20 +1404,25 @@ class KnowledgeGraphIntegration:
             })
 
         except ValueError as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": str(e)})
-            return jinja2.Template(PROMPT_UPDATE_EDGE).render({
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_UPDATE_EDGE, {
                 "success": False,
                 "graph_name": self.current_graph.name,
                 "edge_id": edge_id,
                 "error_prompt": error_prompt
             })
 
-    def batch_add_from_json(self, json_data: str) -> str:
+    def batch_add_from_json(self, json_data: str, dedup: str = "flag") -> str:
         """
         通过JSON数据批量添加节点和边。
 
+        整个批次先完整校验，全部通过后原子地写入图谱；任何条目出错时都不写入任何内容，并列出所有出错的条目。
+        边的端点可以是同一批次中的节点。
+
         Args:
             json_data (str): 包含节点和边列表的JSON字符串。
+            dedup (str): 与已有节点标题近似重复的新节点如何处理：'off' 不检查，'flag' 照常添加并在结果中列出，
+                'merge' 不创建该节点，引用它的边改为连接已有节点。默认为 'flag'。
 
         JSON格式要求:
         - 顶层是一个对象，包含 "nodes" 和/或 "edges" 键。
@@ -662,49 +1469,30 @@ class KnowledgeGraphIntegration:
             str: 渲染后的prompt字符串。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
-
-        added_nodes_count = 0
-        added_edges_count = 0
-        errors = []
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         try:
             data = json.loads(json_data)
-            
-            # Add nodes first
-            if 'nodes' in data and isinstance(data['nodes'], list):
-                for node_data in data['nodes']:
-                    try:
-                        node = Knowledge_Node(**node_data)
-                        self.current_graph.add_node(node)
-                        added_nodes_count += 1
-                    except (ValueError, TypeError) as e:
-                        errors.append({"item": str(node_data), "message": str(e)})
-
-            # Then add edges
-            if 'edges' in data and isinstance(data['edges'], list):
-                for edge_data in data['edges']:
-                    try:
-                        edge = Knowledge_Edge(**edge_data)
-                        self.current_graph.add_edge(edge)
-                        added_edges_count += 1
-                    except (ValueError, TypeError) as e:
-                        errors.append({"item": str(edge_data), "message": str(e)})
-
-            return jinja2.Template(PROMPT_BATCH_ADD).render({
-                "success": True,
+            before = self.current_graph.snapshot()
+            summary = ingest(self.current_graph, data, dedup)
+            return render_prompt(PROMPT_BATCH_ADD, {
+                "success": summary.success,
+                "rejected": not summary.success,
                 "graph_name": self.current_graph.name,
-                "added_nodes_count": added_nodes_count,
-                "added_edges_count": added_edges_count,
-                "errors": errors
+                "added_nodes_count": summary.added_nodes,
+                "added_edges_count": summary.added_edges,
+                "errors": summary.errors[:MAX_LISTED_BATCH_ERRORS],
+                "error_count": len(summary.errors),
+                "duplicates": summary.duplicates,
+                "undo_label": self._keep_undo_snapshot(before, "before-batch")
             })
 
         except json.JSONDecodeError as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": f"JSON解析失败: {e}"})
-            return jinja2.Template(PROMPT_BATCH_ADD).render({"success": False, "error_prompt": error_prompt})
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": f"JSON解析失败: {e}"})
+            return render_prompt(PROMPT_BATCH_ADD, {"success": False, "error_prompt": error_prompt})
         except Exception as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": str(e)})
-            return jinja2.Template(PROMPT_BATCH_ADD).render({
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_BATCH_ADD, {
                 "success": False,
                 "graph_name": self.current_graph.name if self.current_graph else "Unknown",
                 "error_prompt": error_prompt
@@ -721,7 +1509,7 @@ class KnowledgeGraphIntegration:
             str: 渲染后的prompt字符串。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         try:
             all_nodes = list(self.current_graph.nodes.values())
@@ -730,7 +1518,7 @@ class KnowledgeGraphIntegration:
             
             sampled_nodes = random.sample(all_nodes, count)
 
-            return jinja2.Template(PROMPT_SAMPLE_NODES).render({
+            return render_prompt(PROMPT_SAMPLE_NODES, {
                 "success": True,
                 "graph_name": self.current_graph.name,
                 "count": count,
@@ -738,43 +1526,49 @@ class KnowledgeGraphIntegration:
             })
 
         except Exception as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": str(e)})
-            return jinja2.Template(PROMPT_SAMPLE_NODES).render({
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_SAMPLE_NODES, {
                 "success": False,
                 "graph_name": self.current_graph.name,
                 "error_prompt": error_prompt
             })
 
-    def get_all_node(self) -> str:
+    @cached_read
+    def get_all_node(self, compact: bool = False) -> str:
         """
         获取当前图谱中所有节点的简要信息（ID和标题）。
+
+        Args:
+            compact (bool): 是否以紧凑的 TSV 行输出。默认为 False。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
         
         nodes = self.current_graph.get_all_node()
-        node_briefs = [{"id": node.id, "title": node.title} for node in nodes]
-        
-        return jinja2.Template(PROMPT_ALL_NODES).render({
+
+        return render_prompt(PROMPT_ALL_NODES_COMPACT if compact else PROMPT_ALL_NODES, {
             "graph_name": self.current_graph.name,
             "count": len(nodes),
-            "nodes": node_briefs
+            "nodes": nodes
         })
 
-    def get_all_edge(self) -> str:
+    @cached_read
+    def get_all_edge(self, compact: bool = False) -> str:
         """
         获取当前图谱中所有边的简要信息（ID和标题）。
+
+        Args:
+            compact (bool): 是否以紧凑的 TSV 行输出，紧凑输出同时包含边的起止节点。默认为 False。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
             
         edges = self.current_graph.get_all_edge()
-        edge_briefs = [{"id": edge.id, "title": edge.title} for edge in edges]
-        
-        return jinja2.Template(PROMPT_ALL_EDGES).render({
+
+        return render_prompt(PROMPT_ALL_EDGES_COMPACT if compact else PROMPT_ALL_EDGES, {
             "graph_name": self.current_graph.name,
             "count": len(edges),
-            "edges": edge_briefs
+            "edges": edges
         })
 
     def summarize_graph_content(self, max_nodes: int = 10, max_edges: int = 10) -> str:
@@ -782,7 +1576,7 @@ class KnowledgeGraphIntegration:
         通过随机采样，为LLM提供当前知识图谱的高层次摘要。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         try:
             node_count = len(self.current_graph.nodes)
@@ -790,16 +1584,19 @@ class KnowledgeGraphIntegration:
 
             top_in_degree_nodes = self.current_graph.get_high_in_degree_nodes(max_nodes)
             top_out_degree_nodes = self.current_graph.get_high_out_degree_nodes(max_nodes)
-            top_betweenness_centrality_nodes = self.current_graph.get_high_betweenness_centrality_nodes(max_nodes)
+            top_betweenness_centrality_nodes = self.current_graph.get_high_betweenness_centrality_nodes(max_nodes, background=True)
 
             all_edges = self.current_graph.get_all_edge()
             sampled_edges = random.sample(all_edges, min(len(all_edges), max_edges))
+            largest_components = self.current_graph.get_components(top_k=3)
 
-            return jinja2.Template(PROMPT_SUMMARIZE_GRAPH).render({
+            return render_prompt(PROMPT_SUMMARIZE_GRAPH, {
                 "success": True,
                 "graph_name": self.current_graph.name,
                 "node_count": node_count,
                 "edge_count": edge_count,
+                "component_count": self.current_graph.count_components(),
+                "largest_component_sizes": [len(component) for component in largest_components],
                 "top_in_degree_nodes": top_in_degree_nodes,
                 "top_out_degree_nodes": top_out_degree_nodes,
                 "top_betweenness_centrality_nodes": top_betweenness_centrality_nodes,
@@ -807,35 +1604,288 @@ class KnowledgeGraphIntegration:
                 "top_tags": self.current_graph.get_top_k_tags(max_nodes)
             })
         except Exception as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": str(e)})
-            return jinja2.Template(PROMPT_SUMMARIZE_GRAPH).render({
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_SUMMARIZE_GRAPH, {
                 "success": False,
                 "graph_name": self.current_graph.name,
                 "error_prompt": error_prompt
             })
     
+    @cached_read
+    def list_components(self, strong: bool = False, top_k: int = 10, max_nodes: int = 10) -> str:
+        """
+        列出当前图谱的连通分量，按分量大小从大到小排列。
+
+        Args:
+            strong (bool): 为 True 时列出强连通分量（沿边的方向互相可达），否则列出弱连通分量（忽略方向）。默认为 False。
+            top_k (int): 最多列出的分量数量。默认为 10。
+            max_nodes (int): 每个分量最多列出的节点数量。默认为 10。
+
+        Returns:
+            str: 格式化后的连通分量列表。
+        """
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        graph = self.current_graph
+        try:
+            components = graph.get_components(strong, top_k)
+            return render_prompt(PROMPT_LIST_COMPONENTS, {
+                "success": True,
+                "graph_name": graph.name,
+                "strong": strong,
+                "total": graph.count_components(strong),
+                "components": [
+                    {"size": len(component), "nodes": [graph.nodes[node_id] for node_id in component[:max_nodes]]}
+                    for component in components
+                ],
+                "truncated": graph.count_components(strong) > len(components)
+            })
+        except Exception as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_LIST_COMPONENTS, {
+                "success": False,
+                "graph_name": graph.name,
+                "error_prompt": error_prompt
+            })
+
+    # 快照
+
+    def _graph_snapshots(self, graph: Knowledge_Graph) -> OrderedDict[str, GraphSnapshot]:
+        """内部辅助方法：图谱的快照表，不存在时创建。"""
+        return self._snapshots.setdefault(graph.name, OrderedDict())
+
+    def _store_snapshot(self, graph: Knowledge_Graph, label: str, snapshot: GraphSnapshot):
+        """内部辅助方法：保存快照，同名快照被覆盖，超出 MAX_SNAPSHOTS_PER_GRAPH 时丢弃最早的快照。"""
+        snapshots = self._graph_snapshots(graph)
+        snapshots.pop(label, None)
+        snapshots[label] = snapshot
+        while len(snapshots) > MAX_SNAPSHOTS_PER_GRAPH:
+            snapshots.popitem(last=False)
+
+    def _keep_undo_snapshot(self, before: GraphSnapshot, prefix: str) -> Optional[str]:
+        """
+        内部辅助方法：操作修改了当前图谱时，保存操作前的快照用于撤销。
+
+        Returns:
+            Optional[str]: 快照名称，图谱未被修改时为 None。
+        """
+        if self.current_graph.version == before.version:
+            return None
+        label = f"{prefix}-v{before.version}"
+        self._store_snapshot(self.current_graph, label, before)
+        return label
+
+    def create_snapshot(self, label: Optional[str] = None) -> str:
+        """
+        为当前图谱创建快照。快照与图谱共享未修改的部分，之后可以用于查看变化或恢复图谱。
+
+        Args:
+            label (Optional[str]): 快照名称，默认为 "v<版本号>"。同名快照会被覆盖。
+
+        Returns:
+            str: 渲染后的prompt字符串。
+        """
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        snapshot = self.current_graph.snapshot()
+        label = label or f"v{snapshot.version}"
+        self._store_snapshot(self.current_graph, label, snapshot)
+        return render_prompt(PROMPT_CREATE_SNAPSHOT, {
+            "graph_name": self.current_graph.name,
+            "label": label,
+            "version": snapshot.version,
+            "node_count": len(snapshot.nodes),
+            "edge_count": len(snapshot.edges),
+            "max_snapshots": MAX_SNAPSHOTS_PER_GRAPH,
+        })
+
+    def list_snapshots(self) -> str:
+        """
+        列出当前图谱的所有快照。
+
+        Returns:
+            str: 渲染后的prompt字符串。
+        """
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        return render_prompt(PROMPT_LIST_SNAPSHOTS, {
+            "graph_name": self.current_graph.name,
+            "version": self.current_graph.version,
+            "snapshots": [{
+                "label": label,
+                "version": snapshot.version,
+                "created_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot.created_at)),
+                "node_count": len(snapshot.nodes),
+                "edge_count": len(snapshot.edges),
+            } for label, snapshot in self._graph_snapshots(self.current_graph).items()],
+        })
+
+    def _snapshot_diff(self, label: str, rollback: bool) -> str:
+        """内部辅助方法：列出快照之后的变化，rollback 为 True 时同时将图谱恢复到该快照。"""
+        if not self.current_graph:
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
+
+        snapshots = self._graph_snapshots(self.current_graph)
+        snapshot = snapshots.get(label)
+        if snapshot is None:
+            return render_prompt(PROMPT_SNAPSHOT_NOT_FOUND, {
+                "graph_name": self.current_graph.name,
+                "label": label,
+                "labels": list(snapshots),
+            })
+
+        try:
+            diff = self.current_graph.diff(snapshot)
+            if rollback:
+                self.current_graph.rollback(snapshot)
+            return render_prompt(PROMPT_SNAPSHOT_DIFF, {
+                "success": True,
+                "rolled_back": rollback,
+                "graph_name": self.current_graph.name,
+                "label": label,
+                "diff": diff,
+                "max_ids": MAX_LISTED_DIFF_IDS,
+            })
+        except Exception as e:
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_SNAPSHOT_DIFF, {"success": False, "error_prompt": error_prompt})
+
+    def diff_snapshot(self, label: str) -> str:
+        """
+        列出当前图谱自指定快照以来的变化，代价与变化量成正比。
+
+        Args:
+            label (str): 快照名称。
+
+        Returns:
+            str: 渲染后的prompt字符串。
+        """
+        return self._snapshot_diff(label, rollback=False)
+
+    def rollback_to_snapshot(self, label: str) -> str:
+        """
+        将当前图谱恢复到指定快照，只撤销快照之后的变化，代价与变化量成正比。
+        恢复操作同样写入修改日志，恢复后的状态会被持久化。快照本身保留，可以再次恢复。
+
+        Args:
+            label (str): 快照名称。
+
+        Returns:
+            str: 渲染后的prompt字符串。
+        """
+        return self._snapshot_diff(label, rollback=True)
+
+    @staticmethod
+    def _graph_file_path(graph_dir: Path, graph_name: str) -> Path:
+        """
+        内部辅助方法：确定图谱的保存路径。
+        若目录中已存在该图谱的紧凑格式文件（例如已通过 graph_io 转换），则沿用该文件，否则使用 JSON。
+        """
+        for suffix in NDJSON_SUFFIXES:
+            file_path = graph_dir / f"{graph_name}{suffix}"
+            if file_path.exists():
+                return file_path
+        return graph_dir / f"{graph_name}.json"
+
+    def _attach_persistence(self, graph: Knowledge_Graph, file_path: Path):
+        """
+        内部辅助方法：为已加载（或刚保存）的图谱挂载持久化监听器。
+        - 存储后端负责的文件（如 .sqlite）：每次修改直接写入存储后端
+        - 其余文件：重放上次会话尚未压缩进快照的修改，并挂载新的修改日志
+        """
+        if is_storage_path(file_path):
+            storage = open_storage(file_path)
+            storage.attach(graph)
+            self._storages[graph.name] = storage
+        else:
+            self._logs[graph.name], _ = open_graph_log(graph, file_path)
+
+    def _detach_persistence(self, name: str):
+        """内部辅助方法：关闭图谱的修改日志或存储后端。"""
+        log = self._logs.pop(name, None)
+        if log:
+            log.close()
+        storage = self._storages.pop(name, None)
+        if storage:
+            storage.close()
+
+    def _persistence_path(self, graph: Knowledge_Graph) -> Path:
+        """内部辅助方法：图谱对应的文件路径，由注册表给出；尚未注册时按名称确定新文件的路径。"""
+        file_path = self._registry.file_path(graph.name)
+        if file_path is not None:
+            return file_path
+        return self._graph_file_path(self.graph_dir, graph.name)
+
+    def _load_vector_index(self, graph: Knowledge_Graph):
+        """内部辅助方法：图谱的向量索引尚未构建时，尝试从图谱文件旁的索引文件加载；文件不存在或无法读取时留待首次查询时构建。"""
+        if graph.has_vector_index:
+            return
+        index_path = vector_index_path_for(self._persistence_path(graph))
+        if index_path.exists():
+            try:
+                graph.load_vector_index(str(index_path))
+            except Exception as e:
+                logger.warning("Error loading vector index from %s: %s", index_path, e)
+
+    def _update_manifest(self, graph: Knowledge_Graph):
+        """内部辅助方法：用已加载图谱的实际计数刷新清单（不写回文件）。"""
+        file_path = self._persistence_path(graph)
+        if file_path.exists():
+            self._manifest.update(file_path, graph)
+
+    def _save_graph(self, graph: Knowledge_Graph):
+        """
+        内部辅助方法：将图谱完整保存为快照，并清空其修改日志。
+        快照优先写回图谱加载时的文件，保存后日志中的修改都已包含在快照里。
+        使用存储后端的图谱已逐次写入，保存时整体重写一次以保证与内存一致。
+        已构建的向量索引同时保存到图谱文件旁的索引文件。
+        """
+        storage = self._storages.get(graph.name)
+        if storage:
+            storage.write_graph(graph)
+        else:
+            if not self.graph_dir.exists():
+                self.graph_dir.mkdir(parents=True, exist_ok=True)
+            log = self._logs.get(graph.name)
+            file_path = log.snapshot_path if log else self._persistence_path(graph)
+            if log:
+                log.wait_for_compaction()
+            graph.save_to_file(str(file_path))
+            if log:
+                log.reset()
+        # 向量索引只在已构建时写入，文件略旧也无妨：加载时会重新计算内容已变化的节点
+        graph.save_vector_index(str(vector_index_path_for(self._persistence_path(graph))))
+        self._update_manifest(graph)
+        self._manifest.save()
+
+    def _close_logs(self):
+        """内部辅助方法：落盘并关闭所有修改日志与存储后端。"""
+        for log in self._logs.values():
+            log.close()
+        self._logs.clear()
+        for storage in self._storages.values():
+            storage.close()
+        self._storages.clear()
+
     def save_current_graph(self) -> str:
         """
         保存当前图谱到文件。
         """
         if not self.current_graph:
-            return jinja2.Template(PROMPT_NO_CURRENT_GRAPH).render()
+            return render_prompt(PROMPT_NO_CURRENT_GRAPH)
 
         try:
-            # 使用 reload_graphs 中定义的默认路径
-            graph_dir = Path(__file__).parent.parent.parent.parent / "data" / "knowledge_graphs"
-            if not graph_dir.exists():
-                graph_dir.mkdir(parents=True, exist_ok=True)
-            
-            file_path = graph_dir / f"{self.current_graph.name}.json"
-            self.current_graph.save_to_file(str(file_path))
-            return jinja2.Template(PROMPT_SAVE_GRAPH).render({
+            self._save_graph(self.current_graph)
+            return render_prompt(PROMPT_SAVE_GRAPH, {
                 "success": True,
                 "graph_name": self.current_graph.name
             })
         except Exception as e:
-            error_prompt = jinja2.Template(PROMPT_OPERATION_ERROR).render({"error_message": str(e)})
-            return jinja2.Template(PROMPT_SAVE_GRAPH).render({
+            error_prompt = render_prompt(PROMPT_OPERATION_ERROR, {"error_message": str(e)})
+            return render_prompt(PROMPT_SAVE_GRAPH, {
                 "success": False,
                 "graph_name": self.current_graph.name,
                 "error_prompt": error_prompt
@@ -846,25 +1896,19 @@ class KnowledgeGraphIntegration:
         保存所有已加载的知识图谱到文件。
         """
         if not self.graph_list:
-            return jinja2.Template(PROMPT_NO_GRAPHS_TO_SAVE).render()
+            return render_prompt(PROMPT_NO_GRAPHS_TO_SAVE)
 
         saved_graphs = []
         failed_graphs = []
         
-        # 使用 reload_graphs 中定义的默认路径
-        graph_dir = Path(__file__).parent.parent.parent.parent / "data" / "knowledge_graphs"
-        if not graph_dir.exists():
-            graph_dir.mkdir(parents=True, exist_ok=True)
-
         for graph in self.graph_list:
             try:
-                file_path = graph_dir / f"{graph.name}.json"
-                graph.save_to_file(str(file_path))
+                self._save_graph(graph)
                 saved_graphs.append(graph.name)
             except Exception as e:
                 failed_graphs.append({"name": graph.name, "error": str(e)})
         
-        return jinja2.Template(PROMPT_SAVE_ALL_GRAPHS).render({
+        return render_prompt(PROMPT_SAVE_ALL_GRAPHS, {
             "saved_graphs": saved_graphs,
             "failed_graphs": failed_graphs
         })
\ No newline at end of file
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Node
+from src.graph_manager.knowledge_core.reachability import strongly_connected_components
+from src.graph_manager.knowledge_core.relation_index import normalize_relation
+
+if TYPE_CHECKING:
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+# 默认的前置关系类型：边 A -> B 表示学习 B 之前需要先学习 A
+DEFAULT_PREREQUISITE_RELATION = "前置知识"
+# 一个图谱同时维护的规划器数量上限，超出时注销最早创建的规划器
+MAX_PLANNERS_PER_GRAPH = 4
+
+
+class LearningStep(BaseModel):
+    """
+    学习计划中的一步。
+    """
+    node: Knowledge_Node
+    stage: int # 阶段编号，从 1 开始；同一阶段的节点之间没有先后依赖，可以并行学习
+    prerequisites: List[str] = Field(default_factory=list) # 计划中该节点的直接前置节点 ID
+    cycle: Optional[int] = Field(default=None) # 所在循环依赖组的编号，同组节点互为前置，需要一起学习
+
+
+class LearningPlan(BaseModel):
+    """
+    学习计划：目标节点及其全部（未掌握的）前置知识，按学习顺序排列。
+    """
+    relation: str # 使用的前置关系类型
+    targets: List[str] # 目标节点 ID
+    steps: List[LearningStep] # 按学习顺序排列的步骤，前置节点总是排在依赖它的节点之前
+    cycles: List[List[str]] = Field(default_factory=list) # 计划中的循环依赖组
+
+
+class LearningPlanner:
+    """
+    学习路径规划器：作为 Knowledge_Graph 的修改监听器，在某种前置关系上维护增量更新的拓扑序。
+
+    - 前置关系的边构成的子图先用 Tarjan 算法缩点，循环依赖的节点合并为一个分量，分量之间按拓扑序编号
+    - 添加前置边 u -> v 时，若 u 的分量已排在 v 之前则无需处理；否则按 Pearce-Kelly 算法只在两者位置之间
+      做双向搜索并重排受影响的分量，新边形成环时把环上的分量合并为一个
+    - 删除边与节点只会解除约束，拓扑序保持有效；只有删除分量内部的边或节点（可能使分量分裂）、合并节点，
+      或图谱在未通知监听器的情况下被修改时，才在下次规划时整体重建
+    - 规划时从目标出发沿前置边反向求闭包，再按维护好的拓扑序排序，代价只与闭包大小有关
+    """
+
+    def __init__(self, graph: Knowledge_Graph, relation: str = DEFAULT_PREREQUISITE_RELATION, reverse: bool = False):
+        """
+        Args:
+            graph (Knowledge_Graph): 规划所在的图谱。
+            relation (str): 前置关系类型，即边的标题。
+            reverse (bool): 为 False 时边 A -> B 表示 A 是 B 的前置；为 True 时表示 B 是 A 的前置（如“依赖”关系）。
+        """
+        self._graph = graph
+        self.relation = normalize_relation(relation)
+        self.reverse = reverse
+        self._edges: Dict[str, Tuple[str, str]] = {} # 边 ID -> (前置节点, 后续节点)
+        self._out: Dict[str, Dict[str, str]] = {} # 节点 -> {边 ID: 后续节点}
+        self._in: Dict[str, Dict[str, str]] = {} # 节点 -> {边 ID: 前置节点}
+        self._comp: Dict[str, int] = {} # 节点 -> 分量编号
+        self._members: Dict[int, List[str]] = {} # 分量编号 -> 节点
+        self._position: Dict[int, int] = {} # 分量编号 -> 拓扑序中的位置（越小越先学习）
+        self._succ: Dict[int, Dict[int, int]] = {} # 缩点图：分量编号 -> {后继分量: 边数}
+        self._pred: Dict[int, Dict[int, int]] = {} # 缩点图：分量编号 -> {前驱分量: 边数}
+        self._next_comp = 0
+        self._next_position = 0
+        self._version = -1
+        self._resync()
+
+    # 维护
+
+    def _resync(self):
+        """内部辅助方法：由图谱的当前状态整体重建，代价与该关系的边数成正比。"""
+        graph = self._graph
+        self._edges, self._out, self._in = {}, {}, {}
+        for edge_id in graph.relation_index.edge_ids(self.relation):
+            edge = graph.edges[edge_id]
+            self._link(edge_id, edge.start_node_id, edge.end_node_id)
+
+        def successors(node_id: str) -> Iterable[str]:
+            return self._out.get(node_id, {}).values()
+
+        # Tarjan 按逆拓扑序输出分量，倒序编号即为拓扑序
+        components = strongly_connected_components(list(self._nodes()), successors)
+        self._comp, self._members, self._position = {}, {}, {}
+        for position, members in enumerate(reversed(components)):
+            self._members[position] = members
+            self._position[position] = position
+            for node_id in members:
+                self._comp[node_id] = position
+        self._next_comp = self._next_position = len(components)
+        self._succ, self._pred = {}, {}
+        for before, after in self._edges.values():
+            self._count(self._comp[before], self._comp[after], 1)
+        self._version = graph.version
+
+    def _nodes(self) -> Iterable[str]:
+        """内部辅助方法：前置关系子图中的全部节点。"""
+        return dict.fromkeys(list(self._out) + list(self._in))
+
+    def _link(self, edge_id: str, start_node_id: str, end_node_id: str):
+        """内部辅助方法：按关系方向记录一条前置边。"""
+        before, after = (end_node_id, start_node_id) if self.reverse else (start_node_id, end_node_id)
+        self._edges[edge_id] = (before, after)
+        self._out.setdefault(before, {})[edge_id] = after
+        self._in.setdefault(after, {})[edge_id] = before
+        return before, after
+
+    def _ensure_node(self, node_id: str):
+        """内部辅助方法：为首次出现的节点分配一个排在末尾的分量。"""
+        if node_id not in self._comp:
+            comp = self._next_comp
+            self._next_comp += 1
+            self._comp[node_id] = comp
+            self._members[comp] = [node_id]
+            self._position[comp] = self._next_position
+            self._next_position += 1
+
+    def _count(self, source: int, target: int, delta: int):
+        """内部辅助方法：调整缩点图中 source -> target 的边数，分量内部的边不计入。"""
+        if source == target:
+            return
+        for table, key, other in ((self._succ, source, target), (self._pred, target, source)):
+            counts = table.setdefault(key, {})
+            counts[other] = counts.get(other, 0) + delta
+            if not counts[other]:
+                del counts[other]
+
+    def _absorb(self, keep: int, comp: int):
+        """内部辅助方法：把分量 comp 合并进 keep，并把 comp 在缩点图中的边转移给 keep。"""
+        for node_id in self._members.pop(comp):
+            self._comp[node_id] = keep
+            self._members[keep].append(node_id)
+        del self._position[comp]
+        for after, count in self._succ.pop(comp, {}).items():
+            del self._pred[after][comp]
+            self._count(keep, after, count)
+        for before, count in self._pred.pop(comp, {}).items():
+            del self._succ[before][comp]
+            self._count(before, keep, count)
+
+    def _insert(self, edge_id: str, start_node_id: str, end_node_id: str):
+        """内部辅助方法：加入一条前置边并修正拓扑序（Pearce-Kelly）。"""
+        before, after = self._link(edge_id, start_node_id, end_node_id)
+        self._ensure_node(before)
+        self._ensure_node(after)
+        position = self._position
+        source, target = self._comp[before], self._comp[after]
+        self._count(source, target, 1)
+        if source == target or position[source] < position[target]:
+            return
+        lower, upper = position[target], position[source]
+
+        # 受影响的区域只是两者位置之间的分量：从 target 向后、从 source 向前各搜索一次
+        forward = {target}
+        stack = [target]
+        while stack:
+            for comp in self._succ.get(stack.pop(), ()):
+                if comp not in forward and position[comp] <= upper:
+                    forward.add(comp)
+                    stack.append(comp)
+        backward = {source}
+        stack = [source]
+        while stack:
+            for comp in self._pred.get(stack.pop(), ()):
+                if comp not in backward and position[comp] >= lower:
+                    backward.add(comp)
+                    stack.append(comp)
+
+        slots = sorted(position[comp] for comp in forward | backward)
+        cycle = forward & backward # 新边形成的环经过的分量（source 能从 target 到达时非空）
+        if cycle:
+            keep = max(cycle, key=lambda comp: len(self._members[comp]))
+            for comp in cycle:
+                if comp != keep:
+                    self._absorb(keep, comp)
+        # 新顺序：只到达 source 的分量、环、只从 target 可达的分量，各部分内部保持原有的相对顺序。
+        # 合并环空出的位置留在中间：前一部分占最小的位置，后一部分占最大的位置，
+        # 这样两部分相对于区域外分量的先后关系都与原来一致
+        backward_only = sorted(backward - cycle, key=position.__getitem__)
+        forward_only = sorted(forward - cycle, key=position.__getitem__)
+        for comp, slot in zip(backward_only, slots):
+            position[comp] = slot
+        for comp, slot in zip(forward_only, slots[len(slots) - len(forward_only):]):
+            position[comp] = slot
+        if cycle:
+            position[keep] = slots[len(backward_only)]
+
+    def _unlink(self, edge_id: str):
+        """内部辅助方法：移除一条前置边，边在分量内部时标记为需要重建。"""
+        before, after = self._edges.pop(edge_id)
+        del self._out[before][edge_id]
+        if not self._out[before]:
+            del self._out[before]
+        del self._in[after][edge_id]
+        if not self._in[after]:
+            del self._in[after]
+        source, target = self._comp[before], self._comp[after]
+        if before != after and source == target:
+            self._version = -1
+        self._count(source, target, -1)
+
+    def _matches(self, title: str) -> bool:
+        return normalize_relation(title) == self.relation
+
+    def _on_add_edge(self, data: Dict[str, Any]):
+        if self._matches(data["title"]):
+            self._insert(data["id"], data["start_node_id"], data["end_node_id"])
+
+    def _on_add_batch(self, payload: Dict[str, Any]):
+        for data in payload["edges"]:
+            self._on_add_edge(data)
+
+    def _on_remove_edge(self, payload: Dict[str, Any]):
+        if payload["id"] in self._edges:
+            self._unlink(payload["id"])
+
+    def _on_update_edge(self, payload: Dict[str, Any]):
+        if "title" not in payload:
+            return
+        edge_id = payload["id"]
+        matches = self._matches(payload["title"])
+        if edge_id in self._edges and not matches:
+            self._unlink(edge_id)
+        elif edge_id not in self._edges and matches:
+            edge = self._graph.edges[edge_id]
+            self._insert(edge_id, edge.start_node_id, edge.end_node_id)
+
+    def _on_remove_node(self, payload: Dict[str, Any]):
+        node_id = payload["id"]
+        for edge_id in list(self._out.get(node_id, {})) + list(self._in.get(node_id, {})):
+            if edge_id in self._edges:
+                self._unlink(edge_id)
+        comp = self._comp.pop(node_id, None)
+        if comp is not None:
+            members = self._members[comp]
+            members.remove(node_id)
+            if not members:
+                del self._members[comp]
+                del self._position[comp]
+                self._succ.pop(comp, None)
+                self._pred.pop(comp, None)
+
+    def __call__(self, op: str, payload: Dict[str, Any]):
+        handler = self._HANDLERS.get(op)
+        # 与快照跟踪器相同：版本号不连续或遇到无法增量处理的修改时，在下次规划时整体重建
+        if handler is None or self._version == -1 or self._graph.version != self._version + 1:
+            self._version = -1
+            return
+        try:
+            handler(self, payload)
+        except (KeyError, ValueError):
+            self._version = -1
+            return
+        if self._version != -1: # 处理过程中可能已标记为需要重建
+            self._version = self._graph.version
+
+    _HANDLERS = {
+        "add_node": lambda self, payload: None,
+        "update_node": lambda self, payload: None,
+        "add_edge": lambda self, payload: self._on_add_edge(payload["edge"]),
+        "add_batch": _on_add_batch,
+        "remove_edge": _on_remove_edge,
+        "update_edge": _on_update_edge,
+        "remove_node": _on_remove_node,
+    }
+
+    # 规划
+
+    def _order(self, closure: Dict[str, None]) -> Optional[Tuple[List[str], Dict[int, int], Dict[str, List[str]]]]:
+        """
+        内部辅助方法：按维护好的拓扑序排列闭包并计算各分量的阶段，同时检查拓扑序是否成立。
+
+        Returns:
+            Optional[Tuple[List[str], Dict[int, int], Dict[str, List[str]]]]: (排序后的节点, 分量 -> 阶段, 节点 -> 闭包内的直接前置)；
+            若某个前置节点排在依赖它的节点之后（拓扑序已失效），返回 None。
+        """
+        comp_of, position = self._comp, self._position
+        if any(node_id in comp_of and comp_of[node_id] not in position for node_id in closure):
+            return None
+        # 不在前置关系子图中的节点没有任何约束，排在最前
+        ordered = sorted(closure, key=lambda node_id: position[comp_of[node_id]] if node_id in comp_of else -1)
+
+        # 阶段：闭包内最长前置链的长度，同一循环依赖组的节点处于同一阶段
+        stage_of: Dict[int, int] = {}
+        prerequisites_of: Dict[str, List[str]] = {}
+        for node_id in ordered:
+            prerequisites = [before for before in dict.fromkeys(self._in.get(node_id, {}).values()) if before in closure and before != node_id]
+            prerequisites_of[node_id] = prerequisites
+            comp = comp_of.get(node_id)
+            if comp is None:
+                continue
+            stage = 0
+            for before in prerequisites:
+                before_comp = comp_of.get(before)
+                if before_comp == comp:
+                    continue
+                if before_comp not in stage_of:
+                    return None
+                stage = max(stage, stage_of[before_comp])
+            stage_of[comp] = max(stage_of.get(comp, 0), stage + 1)
+        return ordered, stage_of, prerequisites_of
+
+
+    def plan(self, target_ids: List[str], known_ids: Optional[Iterable[str]] = None) -> LearningPlan:
+        """
+        规划学习目标节点所需的最小前置闭包及其学习顺序。
+
+        Args:
+            target_ids (List[str]): 目标节点 ID。
+            known_ids (Optional[Iterable[str]]): 已经掌握的节点 ID，这些节点及只能经由它们到达的前置知识不会出现在计划中。
+
+        Returns:
+            LearningPlan: 学习计划。
+        """
+        graph = self._graph
+        for node_id in target_ids:
+            if node_id not in graph.nodes:
+                raise ValueError(f"节点 ID {node_id} 不存在")
+        if self._version != graph.version:
+            self._resync()
+
+        # 沿前置边反向求闭包，已掌握的节点不再展开
+        known = set(known_ids or ())
+        closure: Dict[str, None] = {}
+        stack = [node_id for node_id in dict.fromkeys(target_ids) if node_id not in known]
+        closure.update(dict.fromkeys(stack))
+        while stack:
+            for before in self._in.get(stack.pop(), {}).values():
+                if before not in closure and before not in known:
+                    closure[before] = None
+                    stack.append(before)
+
+        result = self._order(closure)
+        if result is None:
+            # 维护的拓扑序与前置边不一致，由图谱的当前状态重建后重试
+            self._resync()
+            result = self._order(closure)
+            if result is None:
+                raise ValueError(f"关系「{self.relation}」的拓扑序与前置边不一致，无法规划学习路径")
+        ordered, stage_of, prerequisites_of = result
+        comp_of = self._comp
+
+        # 闭包中属于同一分量的多个节点构成一个循环依赖组，按出现顺序编号
+        groups: Dict[int, List[str]] = {}
+        for node_id in ordered:
+            if node_id in comp_of:
+                groups.setdefault(comp_of[node_id], []).append(node_id)
+        cycle_of = {comp: number for number, comp in enumerate((comp for comp, members in groups.items() if len(members) > 1), 1)}
+
+        return LearningPlan(
+            relation=self.relation,
+            targets=list(target_ids),
+            steps=[
+                LearningStep(
+                    node=graph.nodes[node_id],
+                    stage=stage_of.get(comp_of.get(node_id), 1),
+                    prerequisites=prerequisites_of[node_id],
+                    cycle=cycle_of.get(comp_of.get(node_id)),
+                )
+                for node_id in ordered
+            ],
+            cycles=[groups[comp] for comp in cycle_of],
+        )
+
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+import json
+import os
+import threading
+
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Node, Knowledge_Edge
+from src.graph_manager.knowledge_core.graph_io import atomic_write_lines, snapshot_lines, strip_graph_suffix
+
+if TYPE_CHECKING:
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+# 日志文件后缀；压缩进行中时，被轮换出去的旧日志使用 .wal.old
+WAL_SUFFIX = ".wal"
+ROTATED_SUFFIX = ".wal.old"
+# 累计多少条未落盘的记录后立即 fsync
+DEFAULT_SYNC_BATCH = 64
+# 未落盘的记录最多等待多少秒后 fsync
+DEFAULT_SYNC_INTERVAL = 1.0
+# 日志累计多少条记录后自动压缩进基础快照
+DEFAULT_COMPACT_THRESHOLD = 1000
+
+
+def wal_path_for(snapshot_path: str | Path) -> Path:
+    """根据图谱快照文件路径得到对应的日志文件路径（如 'math.json' -> 'math.wal'）。"""
+    snapshot_path = Path(snapshot_path)
+    return snapshot_path.with_name(strip_graph_suffix(snapshot_path) + WAL_SUFFIX)
+
+
+def _rotated_path(wal_path: Path) -> Path:
+    """内部辅助函数：压缩时旧日志被轮换到的路径。"""
+    return wal_path.with_name(wal_path.name[:-len(WAL_SUFFIX)] + ROTATED_SUFFIX)
+
+
+def file_stat(path: str | Path) -> Tuple[int, int]:
+    """文件的 (大小, 修改时间纳秒)，文件不存在时为 (0, 0)。"""
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return 0, 0
+    return stat.st_size, stat.st_mtime_ns
+
+
+def log_paths_for(snapshot_path: str | Path) -> Tuple[Path, Path]:
+    """返回图谱快照对应的 (`.wal.old`, `.wal`) 日志路径，即加载时的重放顺序。文件不一定存在。"""
+    wal_path = wal_path_for(snapshot_path)
+    return _rotated_path(wal_path), wal_path
+
+
+# 各操作的重放方式，参数与 Knowledge_Graph 发出的修改事件一一对应
+_REPLAY: Dict[str, Callable[[Knowledge_Graph, Dict[str, Any]], None]] = {
+    "add_node": lambda graph, record: graph.add_node(Knowledge_Node(**record["node"])),
+    "add_edge": lambda graph, record: graph.add_edge(Knowledge_Edge(**record["edge"])),
+    "add_batch": lambda graph, record: graph.add_batch([Knowledge_Node(**node) for node in record["nodes"]], [Knowledge_Edge(**edge) for edge in record["edges"]]),
+    "remove_node": lambda graph, record: graph.remove_node(record["id"]),
+    "remove_edge": lambda graph, record: graph.remove_edge(record["id"]),
+    "update_node": lambda graph, record: graph.update_node(record["id"], record.get("title"), record.get("description"), record.get("tags")),
+    "update_edge": lambda graph, record: graph.update_edge(record["id"], record.get("title"), record.get("description")),
+    "merge_nodes": lambda graph, record: graph.merge_nodes(record["target_id"], record["source_id"], record.get("title"), record.get("description"), record.get("tags")),
+}
+
+
+def replay(graph: Knowledge_Graph, wal_path: str | Path) -> Tuple[int, int]:
+    """
+    将日志中的修改依次重放到图谱上。
+
+    - 崩溃时可能留下写了一半的末行，遇到无法解析的行即停止
+    - 与图谱当前状态冲突的记录（如添加已存在的节点）会被跳过：压缩在替换快照后、删除旧日志前中断时，
+      旧日志会被重放到已包含其效果的快照上，跳过冲突记录后结果与原状态一致
+
+    调用前请勿为图谱挂载日志监听器，否则重放的修改会被再次写入日志。
+
+    Args:
+        graph (Knowledge_Graph): 要重放到的图谱。
+        wal_path (str | Path): 日志文件路径，不存在时不做任何操作。
+
+    Returns:
+        Tuple[int, int]: (成功应用的记录数, 跳过的记录数)。
+    """
+    wal_path = Path(wal_path)
+    if not wal_path.exists():
+        return 0, 0
+    applied = skipped = 0
+    with open(wal_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break # 未写完整的末行
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            try:
+                _REPLAY[record["op"]](graph, record)
+                applied += 1
+            except (ValueError, KeyError):
+                skipped += 1
+    return applied, skipped
+
+
+class MutationLog:
+    """
+    知识图谱的追加写修改日志（WAL）。
+
+    - 作为 Knowledge_Graph 的修改监听器，每次增删改节点或边都追加一行 JSON 记录，写入代价为 O(1)
+    - 记录写入后立即 flush 到操作系统，并按批次（条数或时间间隔）fsync 到磁盘
+    - 记录数超过阈值时自动压缩：在调用线程中序列化图谱并轮换日志，在后台线程中写入基础快照并删除旧日志
+
+    加载时先读取基础快照，再依次重放 `.wal.old`（若压缩中途中断）与 `.wal`。
+    """
+
+    def __init__(
+        self,
+        wal_path: str | Path,
+        snapshot_path: str | Path,
+        sync_batch: int = DEFAULT_SYNC_BATCH,
+        sync_interval: float = DEFAULT_SYNC_INTERVAL,
+        compact_threshold: Optional[int] = DEFAULT_COMPACT_THRESHOLD,
+    ):
+        self.wal_path = Path(wal_path)
+        self.snapshot_path = Path(snapshot_path)
+        self.sync_batch = sync_batch
+        self.sync_interval = sync_interval
+        self.compact_threshold = compact_threshold
+
+        self._lock = threading.RLock()
+        self._graph: Optional[Knowledge_Graph] = None
+        self._timer: Optional[threading.Timer] = None
+        self._compaction: Optional[threading.Thread] = None
+        self._pending = 0 # 已写入但尚未 fsync 的记录数
+        self.snapshot_stat = file_stat(self.snapshot_path) # 快照最近一次由本进程读取或写入时的 (大小, 修改时间)，用于发现外部修改
+        self.records = self._count_records()
+        self._file = open(self.wal_path, "a", encoding="utf-8")
+
+    def _count_records(self) -> int:
+        """
+        内部辅助方法：统计已有日志中的记录数，用于判断何时压缩。
+        若末行因崩溃而未写完整，则将其截掉，避免新记录接在残缺的行后面。
+        """
+        if not self.wal_path.exists():
+            return 0
+        count = 0
+        complete = 0 # 最后一个完整行结束处的字节偏移
+        with open(self.wal_path, "rb+") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                count += 1
+                complete += len(line)
+            f.truncate(complete)
+        return count
+
+    # 监听
+
+    def attach(self, graph: Knowledge_Graph):
+        """将日志挂载到图谱上，之后图谱的所有修改都会写入日志。"""
+        self._graph = graph
+        graph.add_listener(self.append)
+
+    def detach(self):
+        """从图谱上卸载日志。"""
+        if self._graph is not None:
+            self._graph.remove_listener(self.append)
+            self._graph = None
+
+    # 写入与落盘
+
+    def append(self, op: str, payload: Dict[str, Any]):
+        """
+        追加一条修改记录。签名与 Knowledge_Graph 的修改监听器一致。
+
+        Args:
+            op (str): 操作名称，如 'add_node'、'remove_edge'。
+            payload (Dict[str, Any]): 操作参数。
+        """
+        line = json.dumps({"op": op, **payload}, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.records += 1
+            self._pending += 1
+            if self._pending >= self.sync_batch:
+                self._sync_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.sync_interval, self.sync)
+                self._timer.daemon = True
+                self._timer.start()
+            should_compact = self.compact_threshold is not None and self.records >= self.compact_threshold
+
+        if should_compact:
+            self.compact()
+
+    def _sync_locked(self):
+        """内部辅助方法：在持有锁时将未落盘的记录 fsync 到磁盘。"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending and not self._file.closed:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def sync(self):
+        """立即将所有已写入的记录 fsync 到磁盘。"""
+        with self._lock:
+            self._sync_locked()
+
+    def close(self):
+        """落盘并关闭日志文件，同时卸载监听器。等待进行中的压缩完成。"""
+        self.detach()
+        self.wait_for_compaction()
+        with self._lock:
+            self._sync_locked()
+            self._file.close()
+
+    def modified_externally(self) -> bool:
+        """快照文件是否在本进程之外被修改、替换或删除。"""
+        self.wait_for_compaction()
+        return file_stat(self.snapshot_path) != self.snapshot_stat
+
+    # 压缩
+
+    @property
+    def compacting(self) -> bool:
+        """是否有后台压缩正在进行。"""
+        return self._compaction is not None and self._compaction.is_alive()
+
+    def wait_for_compaction(self):
+        """等待进行中的后台压缩完成。"""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+
+    def compact(self, background: bool = True) -> bool:
+        """
+        将当前图谱压缩进基础快照，并清空日志。
+
+        图谱在调用线程中序列化，同时把现有日志轮换为 `.wal.old`，新的修改写入新的空日志；
+        快照写入完成后再删除 `.wal.old`，因此任何时刻崩溃都能通过“快照 + 日志”恢复。
+
+        Args:
+            background (bool): 是否在后台线程中写入快照。默认为 True。
+
+        Returns:
+            bool: 是否发起了压缩。未挂载图谱或已有压缩在进行时返回 False。
+        """
+        with self._lock:
+            if self._graph is None or self.compacting:
+                return False
+            lines = snapshot_lines(self._graph, self.snapshot_path)
+            if _rotated_path(self.wal_path).exists():
+                # 上次压缩未完成，残留的旧日志不能被覆盖：直接同步写入快照后清空两份日志
+                atomic_write_lines(self.snapshot_path, lines)
+                self.snapshot_stat = file_stat(self.snapshot_path)
+                self._truncate_locked()
+                return True
+            rotated = self._rotate_locked()
+
+        def write_snapshot():
+            atomic_write_lines(self.snapshot_path, lines)
+            self.snapshot_stat = file_stat(self.snapshot_path)
+            rotated.unlink(missing_ok=True)
+
+        if background:
+            self._compaction = threading.Thread(target=write_snapshot, name="kg-wal-compaction", daemon=True)
+            self._compaction.start()
+        else:
+            write_snapshot()
+        return True
+
+    def _rotate_locked(self) -> Path:
+        """内部辅助方法：在持有锁时将当前日志轮换为 `.wal.old`，并打开新的空日志。"""
+        self._sync_locked()
+        self._file.close()
+        rotated = _rotated_path(self.wal_path)
+        os.replace(self.wal_path, rotated)
+        self._file = open(self.wal_path, "a", encoding="utf-8")
+        self.records = 0
+        return rotated
+
+    def _truncate_locked(self):
+        """内部辅助方法：在持有锁时清空日志并删除残留的 `.wal.old`。"""
+        self._sync_locked()
+        self._file.seek(0)
+        self._file.truncate()
+        os.fsync(self._file.fileno())
+        self.records = 0
+        _rotated_path(self.wal_path).unlink(missing_ok=True)
+
+    def reset(self):
+        """
+        在图谱已被完整保存到快照后调用：清空日志并删除残留的 `.wal.old`。
+        """
+        self.wait_for_compaction()
+        with self._lock:
+            self.snapshot_stat = file_stat(self.snapshot_path)
+            self._truncate_locked()
+
+
+def open_graph_log(graph: Knowledge_Graph, snapshot_path: str | Path, **kwargs) -> Tuple[MutationLog, int]:
+    """
+    为已从快照加载的图谱重放残留日志，并挂载新的修改日志。
+
+    Args:
+        graph (Knowledge_Graph): 从 snapshot_path 加载得到的图谱。
+        snapshot_path (str | Path): 图谱快照文件路径，日志位于同目录。
+        **kwargs: 传递给 MutationLog 的其余参数。
+
+    Returns:
+        Tuple[MutationLog, int]: 挂载好的日志，以及重放时成功应用的记录数。
+    """
+    rotated, wal_path = log_paths_for(snapshot_path)
+    applied = replay(graph, rotated)[0] + replay(graph, wal_path)[0]
+
+    log = MutationLog(wal_path, snapshot_path, **kwargs)
+    log.attach(graph)
+    if rotated.exists():
+        # 上次压缩未完成：两份日志的效果都已重放到内存中，立即重新生成快照
+        log.compact(background=False)
+    return log, applied
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from itertools import chain
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import heapq
+
+from src.graph_manager.knowledge_core.adjacency import AdjacencyIndex
+
+# 路径结果缓存的默认容量
+DEFAULT_CACHE_SIZE = 256
+
+Neighbours = Callable[[int], Iterable[int]]
+
+
+def _neighbour_functions(adjacency: AdjacencyIndex, directed: bool) -> Tuple[Neighbours, Neighbours]:
+    """
+    内部辅助函数：返回 (正向扩展, 反向扩展) 两个邻居函数。
+    无向模式下两个方向都同时沿出边和入边扩展。
+    """
+    if directed:
+        return adjacency.out_neighbours, adjacency.in_neighbours
+
+    def both(idx: int) -> Iterable[int]:
+        return chain(adjacency.out_neighbours(idx), adjacency.in_neighbours(idx))
+    return both, both
+
+
+def bidirectional_shortest_path(
+    adjacency: AdjacencyIndex,
+    start: int,
+    goal: int,
+    directed: bool = True,
+    max_depth: Optional[int] = None,
+    blocked_nodes: Optional[Set[int]] = None,
+    blocked_pairs: Optional[Set[Tuple[int, int]]] = None,
+) -> Optional[List[int]]:
+    """
+    双向广度优先搜索，返回从 start 到 goal 的一条最短路径（节点下标列表）。
+
+    每轮从规模较小的一侧扩展一整层，两侧相遇时即得到最短路径。
+
+    Args:
+        adjacency (AdjacencyIndex): 图谱的邻接索引。
+        start (int): 起始节点下标。
+        goal (int): 目标节点下标。
+        directed (bool): 是否沿边的方向搜索，为 False 时忽略方向。
+        max_depth (Optional[int]): 路径最多包含的边数，None 表示不限制。
+        blocked_nodes (Optional[Set[int]]): 搜索时跳过的节点。
+        blocked_pairs (Optional[Set[Tuple[int, int]]]): 搜索时跳过的 (u, v) 相邻节点对，按路径方向给出。
+
+    Returns:
+        Optional[List[int]]: 路径上的节点下标，找不到时返回 None。
+    """
+    if start == goal:
+        return [start]
+    blocked_nodes = blocked_nodes or set()
+    blocked_pairs = blocked_pairs or set()
+    forward, backward = _neighbour_functions(adjacency, directed)
+
+    pred: Dict[int, int] = {start: -1} # 正向搜索树：节点 -> 前驱
+    succ: Dict[int, int] = {goal: -1} # 反向搜索树：节点 -> 后继
+    forward_frontier = [start]
+    backward_frontier = [goal]
+    depth = 0 # 两侧已扩展的层数之和
+
+    while forward_frontier and backward_frontier:
+        # 再扩展一层后路径长度为 depth + 1
+        if max_depth is not None and depth >= max_depth:
+            return None
+        depth += 1
+        meet = -1
+        next_frontier = []
+        if len(forward_frontier) <= len(backward_frontier):
+            for u in forward_frontier:
+                for v in forward(u):
+                    if v in pred or v in blocked_nodes or (u, v) in blocked_pairs:
+                        continue
+                    pred[v] = u
+                    if v in succ:
+                        meet = v
+                        break
+                    next_frontier.append(v)
+                if meet >= 0:
+                    break
+            forward_frontier = next_frontier
+        else:
+            for v in backward_frontier:
+                for u in backward(v):
+                    if u in succ or u in blocked_nodes or (u, v) in blocked_pairs:
+                        continue
+                    succ[u] = v
+                    if u in pred:
+                        meet = u
+                        break
+                    next_frontier.append(u)
+                if meet >= 0:
+                    break
+            backward_frontier = next_frontier
+
+        if meet >= 0:
+            path = []
+            node = meet
+            while node != -1:
+                path.append(node)
+                node = pred[node]
+            path.reverse()
+            node = succ[meet]
+            while node != -1:
+                path.append(node)
+                node = succ[node]
+            return path
+    return None
+
+
+def all_shortest_paths(
+    adjacency: AdjacencyIndex,
+    start: int,
+    goal: int,
+    directed: bool = True,
+    max_depth: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[List[int]]:
+    """
+    返回从 start 到 goal 的所有最短路径。
+
+    先做逐层 BFS 并记录每个节点的全部最短路前驱，到达目标所在层后立即停止，
+    再从目标沿前驱回溯枚举路径。
+
+    Args:
+        adjacency (AdjacencyIndex): 图谱的邻接索引。
+        start (int): 起始节点下标。
+        goal (int): 目标节点下标。
+        directed (bool): 是否沿边的方向搜索。
+        max_depth (Optional[int]): 路径最多包含的边数。
+        limit (Optional[int]): 最多返回的路径数量，None 表示不限制。
+
+    Returns:
+        List[List[int]]: 路径列表，找不到时返回空列表。
+    """
+    if start == goal:
+        return [[start]]
+    forward, _ = _neighbour_functions(adjacency, directed)
+
+    dist: Dict[int, int] = {start: 0}
+    preds: Dict[int, List[int]] = {start: []}
+    frontier = [start]
+    depth = 0
+    while frontier and goal not in dist:
+        if max_depth is not None and depth >= max_depth:
+            return []
+        depth += 1
+        next_frontier = []
+        for u in frontier:
+            for v in forward(u):
+                d = dist.get(v)
+                if d is None:
+                    dist[v] = depth
+                    preds[v] = [u]
+                    next_frontier.append(v)
+                elif d == depth and u not in preds[v]: # 平行边只计一次
+                    preds[v].append(u)
+        frontier = next_frontier
+    if goal not in dist:
+        return []
+
+    # 从目标出发沿前驱做深度优先回溯
+    paths: List[List[int]] = []
+    stack = [(goal, [goal])]
+    while stack:
+        node, suffix = stack.pop()
+        if node == start:
+            paths.append(suffix[::-1])
+            if limit is not None and len(paths) >= limit:
+                break
+            continue
+        for p in reversed(preds[node]):
+            stack.append((p, suffix + [p]))
+    return paths
+
+
+def k_shortest_paths(
+    adjacency: AdjacencyIndex,
+    start: int,
+    goal: int,
+    k: int,
+    directed: bool = True,
+    max_depth: Optional[int] = None,
+) -> List[List[int]]:
+    """
+    Yen 算法：按长度从短到长返回最多 k 条无环路径，子问题使用双向 BFS 求解。
+
+    Args:
+        adjacency (AdjacencyIndex): 图谱的邻接索引。
+        start (int): 起始节点下标。
+        goal (int): 目标节点下标。
+        k (int): 最多返回的路径数量。
+        directed (bool): 是否沿边的方向搜索。
+        max_depth (Optional[int]): 路径最多包含的边数。
+
+    Returns:
+        List[List[int]]: 路径列表，找不到时返回空列表。
+    """
+    if k <= 0:
+        return []
+    first = bidirectional_shortest_path(adjacency, start, goal, directed, max_depth)
+    if first is None:
+        return []
+
+    found = [first]
+    seen = {tuple(first)}
+    candidates: List[Tuple[int, Tuple[int, ...]]] = []
+    while len(found) < k:
+        last = found[-1]
+        for i in range(len(last) - 1):
+            spur = last[i]
+            root = last[:i + 1]
+            # 屏蔽与已有路径共享相同前缀时的下一条边，避免重复
+            blocked_pairs: Set[Tuple[int, int]] = set()
+            for path in found:
+                if len(path) > i + 1 and path[:i + 1] == root:
+                    blocked_pairs.add((path[i], path[i + 1]))
+                    if not directed:
+                        blocked_pairs.add((path[i + 1], path[i]))
+            blocked_nodes = set(root[:-1]) # 屏蔽前缀上的节点，保证路径无环
+            spur_depth = None if max_depth is None else max_depth - i
+            spur_path = bidirectional_shortest_path(
+                adjacency, spur, goal, directed, spur_depth, blocked_nodes, blocked_pairs
+            )
+            if spur_path is None:
+                continue
+            candidate = tuple(root[:-1] + spur_path)
+            if candidate not in seen:
+                seen.add(candidate)
+                heapq.heappush(candidates, (len(candidate), candidate))
+        if not candidates:
+            break
+        found.append(list(heapq.heappop(candidates)[1]))
+    return found
+
+
+class PathCache:
+    """
+    路径查询结果的 LRU 缓存，按图谱版本整体失效。
+
+    缓存值应为不可变对象（如元组），取出后由调用方转换为列表返回。
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._version: Optional[int] = None
+        self._entries: OrderedDict[Hashable, object] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __deepcopy__(self, memo):
+        # 缓存不随图谱复制
+        return PathCache(self.maxsize)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, version: int, key: Hashable, compute: Callable[[], object]) -> object:
+        """
+        获取缓存结果，未命中时调用 compute 计算并写入缓存。图谱版本变化时先清空旧结果。
+        """
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+        entries = self._entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            return entries[key]
+        self.misses += 1
+        value = compute()
+        entries[key] = value
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+        return value
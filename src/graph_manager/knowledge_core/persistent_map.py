@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+from typing import Any, Generic, Hashable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# 哈希数组映射字典树（HAMT）：每层取哈希值的 5 位，节点最多 32 个分支
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_BITS = 64
+_HASH_MASK = (1 << _HASH_BITS) - 1
+
+_popcount = getattr(int, "bit_count", None) or (lambda value: bin(value).count("1"))
+
+
+def _hash(key: Hashable) -> int:
+    """内部辅助函数：取键的 64 位无符号哈希值。"""
+    return hash(key) & _HASH_MASK
+
+
+class _Bitmap:
+    """
+    内部节点：bitmap 标记存在的分支，entries 按分支顺序存放叶子 (哈希, 键, 值) 或子节点。
+    节点创建后不再修改，修改操作沿路径复制节点，其余子树与旧版本共享。
+    """
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: tuple):
+        self.bitmap = bitmap
+        self.entries = entries
+
+
+class _Collision:
+    """内部节点：哈希值完全相同的多个键，entries 为 (哈希, 键, 值) 元组。"""
+    __slots__ = ("hash", "entries")
+
+    def __init__(self, hash: int, entries: tuple):
+        self.hash = hash
+        self.entries = entries
+
+
+_EMPTY = _Bitmap(0, ())
+
+
+def _find(node, shift: int, h: int, key) -> Optional[tuple]:
+    """内部辅助函数：查找键所在的叶子，不存在时返回 None。"""
+    while True:
+        if isinstance(node, _Collision):
+            for leaf in node.entries:
+                if leaf[1] == key:
+                    return leaf
+            return None
+        bit = 1 << ((h >> shift) & _MASK)
+        if not node.bitmap & bit:
+            return None
+        entry = node.entries[_popcount(node.bitmap & (bit - 1))]
+        if isinstance(entry, tuple):
+            return entry if entry[0] == h and entry[1] == key else None
+        node = entry
+        shift += _BITS
+
+
+def _merge_leaves(shift: int, first: tuple, second: tuple):
+    """内部辅助函数：为两个落在同一分支的叶子创建子节点。"""
+    if shift >= _HASH_BITS:
+        return _Collision(first[0], (first, second))
+    first_index = (first[0] >> shift) & _MASK
+    second_index = (second[0] >> shift) & _MASK
+    if first_index == second_index:
+        return _Bitmap(1 << first_index, (_merge_leaves(shift + _BITS, first, second),))
+    entries = (first, second) if first_index < second_index else (second, first)
+    return _Bitmap((1 << first_index) | (1 << second_index), entries)
+
+
+def _assoc(node, shift: int, leaf: tuple) -> Tuple[Any, bool]:
+    """内部辅助函数：返回插入或替换叶子后的新节点，以及是否新增了键。"""
+    h, key = leaf[0], leaf[1]
+    if isinstance(node, _Collision):
+        for index, existing in enumerate(node.entries):
+            if existing[1] == key:
+                if existing[2] is leaf[2]:
+                    return node, False
+                return _Collision(h, node.entries[:index] + (leaf,) + node.entries[index + 1:]), False
+        return _Collision(h, node.entries + (leaf,)), True
+
+    bit = 1 << ((h >> shift) & _MASK)
+    index = _popcount(node.bitmap & (bit - 1))
+    entries = node.entries
+    if not node.bitmap & bit:
+        return _Bitmap(node.bitmap | bit, entries[:index] + (leaf,) + entries[index:]), True
+    entry = entries[index]
+    if isinstance(entry, tuple):
+        if entry[0] == h and entry[1] == key:
+            if entry[2] is leaf[2]:
+                return node, False
+            child, added = leaf, False
+        else:
+            child, added = _merge_leaves(shift + _BITS, entry, leaf), True
+    else:
+        child, added = _assoc(entry, shift + _BITS, leaf)
+        if child is entry:
+            return node, False
+    return _Bitmap(node.bitmap, entries[:index] + (child,) + entries[index + 1:]), added
+
+
+def _without(node, shift: int, h: int, key):
+    """
+    内部辅助函数：返回删除键后的新节点。键不存在时返回原节点；节点变空时返回 None；
+    只剩一个叶子的子节点会被该叶子替换，保持树的形状只取决于其中的键。
+    """
+    if isinstance(node, _Collision):
+        entries = tuple(leaf for leaf in node.entries if leaf[1] != key)
+        if len(entries) == len(node.entries):
+            return node
+        return entries[0] if len(entries) == 1 else _Collision(node.hash, entries)
+
+    bit = 1 << ((h >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return node
+    index = _popcount(node.bitmap & (bit - 1))
+    entry = node.entries[index]
+    if isinstance(entry, tuple):
+        if entry[0] != h or entry[1] != key:
+            return node
+        child = None
+    else:
+        child = _without(entry, shift + _BITS, h, key)
+        if child is entry:
+            return node
+    if child is None:
+        bitmap = node.bitmap & ~bit
+        entries = node.entries[:index] + node.entries[index + 1:]
+        if not entries:
+            return None
+        if len(entries) == 1 and isinstance(entries[0], tuple) and shift > 0:
+            return entries[0]
+        return _Bitmap(bitmap, entries)
+    if isinstance(child, tuple) and len(node.entries) == 1 and shift > 0:
+        return child
+    return _Bitmap(node.bitmap, node.entries[:index] + (child,) + node.entries[index + 1:])
+
+
+def _leaves(node) -> Iterator[tuple]:
+    """内部辅助函数：遍历子树中的所有叶子。"""
+    if isinstance(node, tuple):
+        yield node
+        return
+    for entry in node.entries:
+        if isinstance(entry, tuple):
+            yield entry
+        else:
+            yield from _leaves(entry)
+
+
+def _build(leaves: List[tuple], shift: int):
+    """内部辅助函数：自底向上地由一组键互不相同的叶子构建子树。"""
+    if len(leaves) == 1:
+        return leaves[0]
+    if shift >= _HASH_BITS:
+        return _Collision(leaves[0][0], tuple(leaves))
+    buckets: dict = {}
+    for leaf in leaves:
+        buckets.setdefault((leaf[0] >> shift) & _MASK, []).append(leaf)
+    bitmap = 0
+    entries = []
+    for index in sorted(buckets):
+        bitmap |= 1 << index
+        entries.append(_build(buckets[index], shift + _BITS))
+    return _Bitmap(bitmap, tuple(entries))
+
+
+def _diff_leaves(old: Iterable[tuple], new: Iterable[tuple]) -> Iterator[Tuple[Any, Any, Any]]:
+    """内部辅助函数：逐键比较两组叶子。"""
+    new_values = {leaf[1]: leaf[2] for leaf in new}
+    for _, key, value in old:
+        if key in new_values:
+            other = new_values.pop(key)
+            if other is not value and other != value:
+                yield key, value, other
+        else:
+            yield key, value, None
+    for key, value in new_values.items():
+        yield key, None, value
+
+
+def _diff(old, new, shift: int) -> Iterator[Tuple[Any, Any, Any]]:
+    """内部辅助函数：比较两棵子树，跳过两个版本共享的子树。"""
+    if old is new:
+        return
+    if not isinstance(old, _Bitmap) or not isinstance(new, _Bitmap):
+        yield from _diff_leaves(_leaves(old), _leaves(new))
+        return
+    old_index = new_index = 0
+    for position in range(1 << _BITS):
+        bit = 1 << position
+        old_entry = new_entry = None
+        if old.bitmap & bit:
+            old_entry = old.entries[old_index]
+            old_index += 1
+        if new.bitmap & bit:
+            new_entry = new.entries[new_index]
+            new_index += 1
+        if old_entry is new_entry:
+            continue
+        if old_entry is None:
+            yield from _diff_leaves((), _leaves(new_entry))
+        elif new_entry is None:
+            yield from _diff_leaves(_leaves(old_entry), ())
+        else:
+            yield from _diff(old_entry, new_entry, shift + _BITS)
+
+
+class PersistentMap(Generic[K, V]):
+    """
+    不可变的持久化字典（哈希数组映射字典树）。
+
+    - set/delete 不修改原字典，而是返回新字典，代价为 O(log32 n)；新旧版本共享未修改的子树
+    - 旧版本始终保持不变，可以在不加锁的情况下被其他线程读取
+    - diff 跳过两个版本共享的子树，比较同一字典相邻的版本时代价与修改量成正比
+    """
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, items: Optional[Iterable[Tuple[K, V]]] = None):
+        self._root = _EMPTY
+        self._size = 0
+        if items is not None:
+            leaves = {}
+            for key, value in items:
+                leaves[key] = (_hash(key), key, value)
+            if leaves:
+                root = _build(list(leaves.values()), 0)
+                self._root = root if isinstance(root, _Bitmap) else _Bitmap(1 << (root[0] & _MASK), (root,))
+                self._size = len(leaves)
+
+    @classmethod
+    def _make(cls, root, size: int) -> PersistentMap[K, V]:
+        """内部辅助方法：由根节点直接构造字典。"""
+        result = cls.__new__(cls)
+        result._root = root
+        result._size = size
+        return result
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: object) -> bool:
+        return _find(self._root, 0, _hash(key), key) is not None
+
+    def __getitem__(self, key: K) -> V:
+        leaf = _find(self._root, 0, _hash(key), key)
+        if leaf is None:
+            raise KeyError(key)
+        return leaf[2]
+
+    def __iter__(self) -> Iterator[K]:
+        return (leaf[1] for leaf in _leaves(self._root))
+
+    def __repr__(self) -> str:
+        return f"PersistentMap({dict(self.items())!r})"
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """返回键对应的值，不存在时返回 default。"""
+        leaf = _find(self._root, 0, _hash(key), key)
+        return default if leaf is None else leaf[2]
+
+    def keys(self) -> Iterator[K]:
+        return iter(self)
+
+    def values(self) -> Iterator[V]:
+        return (leaf[2] for leaf in _leaves(self._root))
+
+    def items(self) -> Iterator[Tuple[K, V]]:
+        return ((leaf[1], leaf[2]) for leaf in _leaves(self._root))
+
+    def set(self, key: K, value: V) -> PersistentMap[K, V]:
+        """返回将 key 设为 value 后的新字典。值未变化（同一对象）时返回自身。"""
+        root, added = _assoc(self._root, 0, (_hash(key), key, value))
+        if root is self._root:
+            return self
+        return self._make(root, self._size + added)
+
+    def delete(self, key: K) -> PersistentMap[K, V]:
+        """返回删除 key 后的新字典。键不存在时返回自身。"""
+        root = _without(self._root, 0, _hash(key), key)
+        if root is self._root:
+            return self
+        if root is None:
+            return self._make(_EMPTY, 0)
+        if isinstance(root, tuple):
+            root = _Bitmap(1 << (root[0] & _MASK), (root,))
+        return self._make(root, self._size - 1)
+
+    def diff(self, other: PersistentMap[K, V]) -> Iterator[Tuple[K, Optional[V], Optional[V]]]:
+        """
+        比较两个字典，逐个产出 (键, 本字典中的值, other 中的值)。键只在一侧存在时另一侧为 None。
+        值先按对象身份、再按 == 比较，相等的键不会产出。
+
+        Args:
+            other (PersistentMap): 要比较的字典，通常是同一字典的另一个版本。
+
+        Returns:
+            Iterator[Tuple[K, Optional[V], Optional[V]]]: 存在差异的键及其两侧的值。
+        """
+        return _diff(self._root, other._root, 0)
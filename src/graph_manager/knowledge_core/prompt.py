@@ -75,7 +75,7 @@ PROMPT_RELOAD_GRAPHS = """
 """
 """
 Args:
-    graph_list (List[KnowledgeGraph]): 图谱列表
+    graph_list (List[GraphManifestEntry]): 图谱目录清单中的图谱摘要
     err_load_list (List[str]): 错误列表
 """
 
@@ -93,17 +93,20 @@ Args:
 
 PROMPT_LIST_GRAPHS = """
 {% if not empty %}
-当前已加载的知识图谱列表:
+当前可用的知识图谱列表:
 {% for graph in graph_list %}
-- {{ graph.name }}
+- {{ graph.name }}（{{ graph.node_count }} 个节点，{{ graph.edge_count }} 条边）{% if graph.name == current %} [当前图谱]{% elif graph.name in loaded %} [已加载]{% endif %}
+
 {% endfor %}
 {% else %}
-当前没有已加载的知识图谱
+当前没有可用的知识图谱
 {% endif %}
 """
 """
 Args:
-    graph_list (List[KnowledgeGraph]): 当前已加载的图谱列表
+    graph_list (List[GraphManifestEntry]): 图谱目录清单中的图谱摘要
+    loaded (Set[str]): 已加载到内存中的图谱名称
+    current (Optional[str]): 当前图谱名称
     empty (bool): 是否为空列表
 """
 
@@ -117,7 +120,7 @@ PROMPT_SET_GRAPH_FAILED = """
 - `{{ graph.name }}`
 {% endfor %}
 {% else %}
-- 当前没有已加载的图谱。
+- 当前没有可用的图谱。
 {% endif %}
 
 ## 进一步操作提示
@@ -127,7 +130,7 @@ PROMPT_SET_GRAPH_FAILED = """
 """
 Args:
     name (str): 尝试切换的图谱名称。
-    graph_list (List[KnowledgeGraph]): 当前已加载的图谱列表。
+    graph_list (List[GraphManifestEntry]): 图谱目录清单中的图谱摘要。
 """
 
 PROMPT_NO_CURRENT_GRAPH = """
@@ -352,19 +355,75 @@ Args:
     error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
 """
 
+PROMPT_GET_K_HOP_NEIGHBORHOOD = """
+{% if success %}
+## k 跳邻域查询成功
+在图谱 `{{ graph_name }}` 中，以节点 `{{ node_id }}` ({{ node.title }}) 为中心、沿{{ direction_text }}扩散 {{ k }} 跳得到的子图如下：
+
+### 节点 (共 {{ total_nodes }} 个{% if truncated %}，仅显示距离最近的 {{ nodes | length }} 个{% endif %})
+| 跳数 | 节点 ID | 节点标题 | 标签 |{% if with_description %} 描述 |{% endif %}
+|---|---|---|---|{% if with_description %}---|{% endif %}
+{% for item in nodes %}
+| {{ item.hop }} | {{ item.node.id }} | {{ item.node.title }} | {{ item.node.tags | join(', ') if item.node.tags else '无' }} |{% if with_description %} {{ item.node.description or '无' }} |{% endif %}
+{% endfor %}
+
+### 边 (共 {{ total_edges }} 条{% if truncated %}，仅显示两端节点均在上表中的 {{ edges | length }} 条{% endif %})
+{% if edges %}
+| 边 ID | 起始节点 | 关系 | 结束节点 |
+|---|---|---|---|
+{% for edge in edges %}
+| {{ edge.id }} | {{ edge.start_node.title }} ({{ edge.start_node_id }}) | {{ edge.title }} | {{ edge.end_node.title }} ({{ edge.end_node_id }}) |
+{% endfor %}
+{% else %}
+子图中没有边。
+{% endif %}
+
+## 进一步操作提示
+你可以使用 `get_node_info` 查看具体节点的详细信息，或使用 `find_path` 查找节点之间的路径。
+{% elif not_found %}
+## 查询结果
+在图谱 `{{ graph_name }}` 中未找到 ID 为 `{{ node_id }}` 的节点。
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    not_found (bool): 是否因为未找到节点而失败。
+    graph_name (str): 当前图谱的名称。
+    node_id (str): 中心节点的ID。
+    node (Knowledge_Node): 中心节点对象。
+    k (int): 扩散的跳数。
+    direction_text (str): 扩散方向的文字描述。
+    nodes (List[Dict[str, Any]]): 显示的节点列表，每个元素包含 'hop' 和 'node'。
+    edges (List[Knowledge_Edge]): 显示的边列表。
+    total_nodes (int): 子图中的节点总数。
+    total_edges (int): 子图中的边总数。
+    truncated (bool): 节点是否因数量上限被截断。
+    with_description (bool): 是否包含节点描述。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
+
 PROMPT_FIND_PATH = """
 {% if success %}
 ## 路径查找成功
 
-在知识图谱 **{{ graph_name }}** 中，从节点 **{{ start_node_id }}** 到 **{{ end_node_id }}** 的路径如下：
+在知识图谱 **{{ graph_name }}** 中，从节点 **{{ start_node_id }}** 到 **{{ end_node_id }}** 共找到 {{ paths | length }} 条{{ '' if directed else '（忽略方向的）' }}路径：
+{% for path in paths %}
+{% if paths | length > 1 %}
+### 路径 {{ loop.index }}（长度 {{ path.edges | length }}）
+{% endif %}
 
 **路径节点:**
-{% for node_info in path_nodes %}
+{% for node_info in path.nodes %}
 - **ID:** {{ node_info.node.id }}
   - **标题:** {{ node_info.node.title }}
   - **入度:** {{ node_info.in_degree }}
   - **出度:** {{ node_info.out_degree }}
+  {% if node_info.centrality is not none %}
   - **中心度:** {{ "%.4f"|format(node_info.centrality) }}
+  {% endif %}
   - **标签:** {{ node_info.node.tags | join(', ') if node_info.node.tags else '无' }}
   {% if with_description and node_info.node.description %}
   - **描述:** {{ node_info.node.description }}
@@ -372,25 +431,29 @@ PROMPT_FIND_PATH = """
 {% endfor %}
 
 **路径边:**
-{% for edge in path_edges %}
-- **ID:** {{ edge.id }}
-  - **标题:** {{ edge.title }}
-  - **从:** {{ edge.start_node_id }}
-  - **到:** {{ edge.end_node_id }}
-  {% if with_edge_description and edge.description %}
-  - **描述:** {{ edge.description }}
+{% for edge_info in path.edges %}
+- **ID:** {{ edge_info.edge.id }}{{ '（逆向经过）' if edge_info.reversed else '' }}
+  - **标题:** {{ edge_info.edge.title }}
+  - **从:** {{ edge_info.edge.start_node_id }}
+  - **到:** {{ edge_info.edge.end_node_id }}
+  {% if with_edge_description and edge_info.edge.description %}
+  - **描述:** {{ edge_info.edge.description }}
   {% endif %}
 {% endfor %}
+{% endfor %}
 
 ## 进一步操作提示
 你可以使用 `get_node_info` 或 `get_edge_info` 工具来获取更详细的信息。
 {% elif not_found %}
 ## 路径查找结果
 
-在知识图谱 **{{ graph_name }}** 中，无法找到从节点 **{{ start_node_id }}** 到 **{{ end_node_id }}** 的路径。
+在知识图谱 **{{ graph_name }}** 中，无法找到从节点 **{{ start_node_id }}** 到 **{{ end_node_id }}** 的路径{{ '（最大深度 ' ~ max_depth ~ '）' if max_depth is not none else '' }}。
+{% if not connected %}
+两个节点位于不同的连通分量中，即使忽略边的方向、不限制深度，它们之间也不存在任何路径。
+{% endif %}
 
 ## 进一步操作提示
-请检查节点ID是否正确，或者尝试使用 `get_all_node` 工具来查看所有节点。
+请检查节点ID是否正确，或者尝试使用 `get_all_node` 工具来查看所有节点。{{ '也可以将 directed 设为 False，忽略边的方向再次查找。' if directed and connected else '' }}{{ '可以使用 `list_components` 查看各连通分量包含的节点。' if not connected else '' }}
 {% elif error_prompt %}
 {{ error_prompt }}
 {% endif %}
@@ -399,16 +462,88 @@ PROMPT_FIND_PATH = """
 Args:
     success (bool): 操作是否成功。
     not_found (bool): 是否因为未找到路径而失败。
+    connected (bool): 未找到路径时，两个节点在忽略方向时是否连通。
     graph_name (str): 当前图谱的名称。
     start_node_id (str): 起始节点的ID。
     end_node_id (str): 结束节点的ID。
-    path_nodes (List[Dict[str, Any]]): 路径上的节点信息列表，每个元素包含 'node', 'in_degree', 'out_degree', 'centrality'。
-    path_edges (List[Knowledge_Edge]): 路径上的边列表。
+    directed (bool): 是否沿边的方向查找。
+    max_depth (Optional[int]): 路径的最大长度限制。
+    paths (List[Dict[str, Any]]): 路径列表，每个元素包含 'nodes' 和 'edges'。
+        'nodes' 中的每个元素包含 'node', 'in_degree', 'out_degree', 'centrality'（未要求标注中心性时为 None）；
+        'edges' 中的每个元素包含 'edge' 以及表示是否逆着边的方向经过的 'reversed'。
     with_description (bool): 是否包含节点描述。
     with_edge_description (bool): 是否包含边描述。
     error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
 """
 
+PROMPT_FIND_PATH_COMPACT = """在知识图谱 {{ graph_name }} 中，从 {{ start_node_id }} 到 {{ end_node_id }} 共找到 {{ paths | length }} 条{{ '' if directed else '（忽略方向的）' }}路径，每条路径以 TSV 格式给出（N 为节点行，E 为边行）：
+{% for path in paths %}
+# 路径 {{ loop.index }}，长度 {{ path.edges | length }}
+N\tid\ttitle\tin_degree\tout_degree\t{{ 'centrality\t' if path.nodes[0].centrality is not none else '' }}tags{{ '\tdescription' if with_description else '' }}
+{% for node_info in path.nodes %}N\t{{ node_info.node.id }}\t{{ node_info.node.title | tsv }}\t{{ node_info.in_degree }}\t{{ node_info.out_degree }}\t{{ "%.4f"|format(node_info.centrality) ~ '\t' if node_info.centrality is not none else '' }}{{ node_info.node.tags | tsv }}{{ '\t' ~ (node_info.node.description | tsv) if with_description else '' }}
+{% endfor %}E\tid\ttitle\tstart_node_id\tend_node_id\treversed{{ '\tdescription' if with_edge_description else '' }}
+{% for edge_info in path.edges %}E\t{{ edge_info.edge.id }}\t{{ edge_info.edge.title | tsv }}\t{{ edge_info.edge.start_node_id }}\t{{ edge_info.edge.end_node_id }}\t{{ 1 if edge_info.reversed else 0 }}{{ '\t' ~ (edge_info.edge.description | tsv) if with_edge_description else '' }}
+{% endfor %}{% endfor %}"""
+"""
+PROMPT_FIND_PATH 的紧凑版本，仅用于查找成功的情况。
+
+Args:
+    与 PROMPT_FIND_PATH 成功时相同。
+"""
+
+PROMPT_QUERY_GRAPH = """
+{% if success %}
+## 图模式查询结果
+
+在知识图谱 **{{ graph_name }}** 中找到 **{{ matches | length }}** 个匹配{% if truncated %}（已达到上限 {{ limit }}，可能还有更多结果）{% endif %}。
+
+执行计划:
+{% for step in plan %}
+{{ loop.index }}. {{ step }}
+{% endfor %}
+
+{% if matches %}
+| # | {{ variables | join(' | ') }} |
+|---|{% for var in variables %}---|{% endfor %}
+
+{% for match in matches %}
+| {{ loop.index }} | {% for var in variables %}{{ match.nodes[var].title }}（{{ match.nodes[var].id }}） | {% endfor %}
+
+{% endfor %}
+{% if edge_patterns %}
+
+### 匹配路径
+{% for match in matches %}
+{% set outer = loop %}
+{% for path in match.paths %}
+- #{{ outer.index }} {{ edge_patterns[loop.index0] }}: {% for edge in path %}{% if loop.first %}{{ edge.start_node.title }}{% endif %} -[{{ edge.title }}]-> {{ edge.end_node.title }}{% endfor %}
+
+{% endfor %}
+{% endfor %}
+{% endif %}
+
+## 进一步操作提示
+结果中已包含节点 ID，可直接使用 `get_node_info` 查看详情；如需更多结果可调大 limit。
+{% else %}
+没有找到匹配的节点组合。可以放宽过滤条件（如改用 keyword、减少 tags）或增大 max_hops 后重试。
+{% endif %}
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    graph_name (str): 当前图谱的名称。
+    variables (List[str]): 结果中列出的变量。
+    edge_patterns (List[str]): 各连接条件的文字形式，与每个匹配的 paths 一一对应。
+    plan (List[str]): 执行计划的各个步骤。
+    matches (List[QueryMatch]): 匹配结果。
+    limit (int): 结果数量上限。
+    truncated (bool): 结果是否因数量上限被截断。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
+
 PROMPT_DELETE_ITEMS = """
 {% if success %}
 ## 批量删除成功
@@ -431,6 +566,9 @@ PROMPT_DELETE_ITEMS = """
 
 ## 进一步操作提示
 你可以使用 `get_all_node` 或 `get_all_edge` 工具来确认删除结果。
+{% if undo_label %}
+如需撤销本次删除，可使用 `rollback_to_snapshot` 工具恢复到快照 **{{ undo_label }}**。
+{% endif %}
 {% else %}
 {{ error_prompt }}
 {% endif %}
@@ -443,6 +581,38 @@ Args:
     deleted_edges_count (int): 成功删除的边数量。
     not_found_nodes (List[str]): 未找到的节点ID列表。
     not_found_edges (List[str]): 未找到的边ID列表。
+    undo_label (Optional[str]): 删除前自动创建的快照名称，用于撤销本次删除。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
+
+PROMPT_MERGE_NODES = """
+{% if success %}
+## 节点合并成功
+
+在知识图谱 **{{ graph_name }}** 中，节点 **{{ source_title }}**（{{ source_id }}）已合并到节点 **{{ node.title }}**（{{ node.id }}）。
+
+**合并后的节点:**
+- **标题:** {{ node.title }}
+- **描述:** {{ node.description or '无' }}
+- **标签:** {{ node.tags | join(', ') if node.tags else '无' }}
+- **入边数:** {{ node.in_edge | length }}
+- **出边数:** {{ node.out_edge | length }}
+
+原节点的边已改为连接合并后的节点，两者之间的边已删除。
+
+## 进一步操作提示
+你可以使用 `get_node_in_out_edges` 工具检查合并后的边，或使用 `update_node_in_current_graph` 工具调整合并后的描述。
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    graph_name (str): 当前图谱的名称。
+    source_id (str): 被合并的节点ID。
+    source_title (str): 被合并的节点标题。
+    node (Knowledge_Node): 合并后的节点。
     error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
 """
 
@@ -517,17 +687,37 @@ PROMPT_BATCH_ADD = """
 **添加统计:**
 - **节点:** {{ added_nodes_count }} 个
 - **边:** {{ added_edges_count }} 个
+{% if duplicates %}
 
-{% if errors %}
-**添加失败的条目:**
-{% for error in errors %}
-- **条目:** `{{ error.item }}`
-  - **错误:** {{ error.message }}
+**与已有节点近似重复的节点:**
+{% for dup in duplicates %}
+- 节点 #{{ dup.index }}「{{ dup.title }}」（ID: {{ dup.id }}）{{ '已合并到' if dup.merged else '与' }}已有节点「{{ dup.match_title }}」（ID: {{ dup.match_id }}）{{ '' if dup.merged else '相似' }}，相似度 {{ '%.2f' | format(dup.score) }}
 {% endfor %}
 {% endif %}
 
 ## 进一步操作提示
 你可以使用 `get_all_node` 或 `get_all_edge` 工具来确认添加结果。
+{% if duplicates and not duplicates[0].merged %}
+请确认近似重复的节点是否表示同一概念，确认后可使用 `merge_nodes` 工具合并。
+{% endif %}
+{% if undo_label %}
+如需撤销本次添加，可使用 `rollback_to_snapshot` 工具恢复到快照 **{{ undo_label }}**。
+{% endif %}
+{% elif rejected %}
+## 批量添加失败
+
+批量数据中共有 **{{ error_count }}** 处错误，本批次未写入知识图谱 **{{ graph_name }}** 的任何内容。
+
+**出错的条目:**
+{% for error in errors %}
+- {% if error.kind == 'node' %}节点 #{{ error.index }}{% elif error.kind == 'edge' %}边 #{{ error.index }}{% else %}整体格式{% endif %}{{ '（ID: ' ~ error.id ~ '）' if error.id else '' }}: {{ error.message }}
+{% endfor %}
+{% if error_count > errors | length %}
+- ……其余 {{ error_count - errors | length }} 处错误未列出
+{% endif %}
+
+## 进一步操作提示
+请修正以上条目后重新提交整个批次。条目编号为其在 nodes 或 edges 列表中的位置（从 0 开始）。
 {% else %}
 {{ error_prompt }}
 {% endif %}
@@ -535,10 +725,14 @@ PROMPT_BATCH_ADD = """
 """
 Args:
     success (bool): 操作是否成功。
+    rejected (bool): 是否因批量数据校验失败而整体未写入。
     graph_name (str): 当前图谱的名称。
     added_nodes_count (int): 成功添加的节点数量。
     added_edges_count (int): 成功添加的边数量。
-    errors (List[Dict[str, Any]]): 添加失败的条目列表，每个元素包含 'item' 和 'message'。
+    errors (List[BatchItemError]): 出错的条目（可能只是一部分），每个元素包含 'kind'、'index'、'id' 和 'message'。
+    error_count (int): 出错条目的总数。
+    duplicates (List[DuplicateMatch]): 与已有节点近似重复的节点，每个元素包含 'index'、'id'、'title'、'match_id'、'match_title'、'score' 和 'merged'。
+    undo_label (Optional[str]): 添加前自动创建的快照名称，用于撤销本次添加。
     error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
 """
 
@@ -580,6 +774,7 @@ PROMPT_SUMMARIZE_GRAPH = """
 **核心统计:**
 - **节点总数:** {{ node_count }}
 - **边总数:** {{ edge_count }}
+- **连通分量数:** {{ component_count }}{% if component_count > 1 %}（最大的几个分量分别包含 {{ largest_component_sizes | join('、') }} 个节点）{% endif %}
 
 **核心节点 (基于入度):**
 {% if top_in_degree_nodes %}
@@ -627,7 +822,7 @@ PROMPT_SUMMARIZE_GRAPH = """
 
 **随机边示例:**
 {% if sampled_edges %}
-| 边ID | 边标题 | 从 ({{ edge.start_node.title }}) | 到 ({{ edge.end_node.title }}) |
+| 边ID | 边标题 | 从 | 到 |
 |---|---|---|---|
 {% for edge in sampled_edges %}
 | {{ edge.id }} | {{ edge.title }} | {{ edge.start_node_id }} ({{ edge.start_node.title }}) | {{ edge.end_node_id }} ({{ edge.end_node.title }}) |
@@ -648,6 +843,8 @@ Args:
     graph_name (str): 当前图谱的名称。
     node_count (int): 节点总数。
     edge_count (int): 边总数。
+    component_count (int): 弱连通分量数。
+    largest_component_sizes (List[int]): 最大的几个弱连通分量的节点数。
     top_in_degree_nodes (List[Tuple[Knowledge_Node, int]]): 入度最高的节点列表。
     top_out_degree_nodes (List[Tuple[Knowledge_Node, int]]): 出度最高的节点列表。
     top_betweenness_centrality_nodes (List[Tuple[Knowledge_Node, float]]): 介数中心性最高的节点列表。
@@ -656,6 +853,39 @@ Args:
     error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
 """
 
+PROMPT_LIST_COMPONENTS = """
+{% if success %}
+## 连通分量列表
+
+知识图谱 **{{ graph_name }}** 中共有 **{{ total }}** 个{{ '强' if strong else '弱' }}连通分量（{{ '沿边的方向互相可达的节点构成一个分量' if strong else '忽略边的方向后相互连通的节点构成一个分量' }}）{% if truncated %}，以下仅列出最大的 {{ components | length }} 个{% endif %}。
+
+{% for component in components %}
+### 分量 {{ loop.index }}（{{ component.size }} 个节点）
+{% for node in component.nodes %}
+- {{ node.id }}: {{ node.title }}
+{% endfor %}
+{% if component.size > component.nodes | length %}
+- ……其余 {{ component.size - component.nodes | length }} 个节点未列出
+{% endif %}
+{% endfor %}
+
+## 进一步操作提示
+{% if strong %}不同强连通分量之间最多只有单向的路径，包含多个节点的分量内部存在环。{% else %}不同连通分量之间不存在任何路径。孤立的小分量通常意味着缺少关联，可以考虑使用 `add_edge` 将其连接到主体图谱。{% endif %}
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    graph_name (str): 当前图谱的名称。
+    strong (bool): 是否为强连通分量。
+    total (int): 连通分量总数。
+    components (List[Dict[str, Any]]): 显示的分量，每个元素包含 'size' 和 'nodes'（显示的节点列表）。
+    truncated (bool): 分量是否因数量上限被截断。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
+
 PROMPT_SEARCH_NODES_BY_TAG = """
 {% if success %}
 ## 按标签搜索节点成功
@@ -689,6 +919,341 @@ Args:
     error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
 """
 
+PROMPT_SEARCH_NODES_BY_TAG_COMPACT = """在知识图谱 {{ graph_name }} 中，使用标签 {{ tags | join(', ') }} (模式: {{ mode }}) 搜索到 {{ count }} 个节点{{ '：' if nodes else '。' }}
+{% if nodes %}id\ttitle\ttags
+{% for node in nodes %}{{ node.id }}\t{{ node.title | tsv }}\t{{ node.tags | tsv }}
+{% endfor %}{% endif %}"""
+"""
+PROMPT_SEARCH_NODES_BY_TAG 的紧凑版本，仅用于搜索成功的情况。
+
+Args:
+    与 PROMPT_SEARCH_NODES_BY_TAG 成功时相同。
+"""
+
+PROMPT_SEARCH_NODES_BY_KEYWORD = """
+{% if success %}
+## 按关键词搜索节点成功
+
+在知识图谱 **{{ graph_name }}** 中，使用关键词 `{{ keyword }}` 搜索到 **{{ count }}** 个节点{% if truncated %}（仅显示相关度最高的前 {{ limit }} 个）{% endif %}。
+
+{% if nodes %}
+| 节点 ID | 节点标题 | 标签 |
+|---|---|---|
+{% for node in nodes %}
+| {{ node.id }} | {{ node.title }} | {{ node.tags | join(', ') if node.tags else '无' }} |
+{% endfor %}
+{% else %}
+没有找到匹配的节点。
+{% endif %}
+
+## 进一步操作提示
+结果按相关度排序，标题匹配的节点排在前面。你可以使用 `get_node_info` 查看具体节点的详细信息，或换用更短的关键词扩大搜索范围。
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    graph_name (str): 当前图谱的名称。
+    keyword (str): 用于搜索的关键词。
+    count (int): 返回的节点数量。
+    limit (int): 返回数量上限。
+    truncated (bool): 结果是否因数量上限被截断。
+    nodes (List[Knowledge_Node]): 匹配的节点列表。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
+
+PROMPT_FIND_SIMILAR_NODES = """
+{% if success %}
+## 查找相似节点成功
+
+在知识图谱 **{{ graph_name }}** 中，与「{{ title }}」相似度不低于 {{ threshold }} 的节点共 **{{ nodes | length }}** 个{% if truncated %}（仅显示最相似的前 {{ limit }} 个）{% endif %}。
+
+{% if nodes %}
+| 节点 ID | 节点标题 | 标签 | 相似度 |
+|---|---|---|---|
+{% for node, score in nodes %}
+| {{ node.id }} | {{ node.title }} | {{ node.tags | join(', ') if node.tags else '无' }} | {{ '%.2f' | format(score) }} |
+{% endfor %}
+
+## 进一步操作提示
+如果其中有与「{{ title }}」表示同一概念的节点，请直接使用已有节点，或使用 `merge_nodes` 工具将重复的节点合并。
+{% else %}
+没有找到相似的节点，可以放心添加新节点。
+{% endif %}
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    graph_name (str): 当前图谱的名称。
+    title (str): 用于比较的标题。
+    threshold (float): 最低相似度。
+    limit (int): 返回数量上限。
+    truncated (bool): 结果是否因数量上限被截断。
+    nodes (List[Tuple[Knowledge_Node, float]]): 相似的节点与相似度。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
+
+PROMPT_SEMANTIC_SEARCH_NODES = """
+{% if success %}
+## 语义搜索结果
+
+在知识图谱 **{{ graph_name }}** 中按文本相近程度查找节点，每个查询最多显示 {{ limit }} 个结果：
+{% for query, nodes in results %}
+
+### 「{{ query }}」
+{% if nodes %}
+| 节点 ID | 节点标题 | 标签 | 相似度 |
+|---|---|---|---|
+{% for node, score in nodes %}
+| {{ node.id }} | {{ node.title }} | {{ node.tags | join(', ') if node.tags else '无' }} | {{ '%.2f' | format(score) }} |
+{% endfor %}
+{% else %}
+没有找到相关的节点。
+{% endif %}
+{% endfor %}
+
+## 进一步操作提示
+相似度越高，节点与查询越接近；请根据标题确认对应的节点后，直接使用其节点 ID 进行后续查询。
+若某个查询没有合适的结果，可以换用同义词再次搜索，或使用 `search_nodes_by_keyword` 工具按关键词精确查找。
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    graph_name (str): 当前图谱的名称。
+    limit (int): 每个查询的返回数量上限。
+    results (List[Tuple[str, List[Tuple[Knowledge_Node, float]]]]): 各查询文本及其匹配的节点与相似度。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
+
+PROMPT_FIND_DUPLICATE_NODES = """
+{% if success %}
+## 疑似重复节点
+
+在知识图谱 **{{ graph_name }}** 中，找到 **{{ pairs | length }}** 对相似度不低于 {{ threshold }} 的节点{% if truncated %}（仅显示最相似的前 {{ limit }} 对）{% endif %}。
+
+{% if pairs %}
+| 节点 A | 节点 B | 相似度 |
+|---|---|---|
+{% for first, second, score in pairs %}
+| {{ first.title }}（{{ first.id }}） | {{ second.title }}（{{ second.id }}） | {{ '%.2f' | format(score) }} |
+{% endfor %}
+
+## 进一步操作提示
+请确认每一对是否表示同一概念，确认后使用 `merge_nodes` 工具合并（target_id 为保留的节点）。
+{% else %}
+没有发现疑似重复的节点。
+{% endif %}
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    graph_name (str): 当前图谱的名称。
+    threshold (float): 最低相似度。
+    limit (int): 返回数量上限。
+    truncated (bool): 结果是否因数量上限被截断。
+    pairs (List[Tuple[Knowledge_Node, Knowledge_Node, float]]): 疑似重复的节点对与相似度。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
+
+PROMPT_SEARCH_EDGES_BY_KEYWORD = """
+{% if success %}
+## 按关键词搜索边成功
+
+在知识图谱 **{{ graph_name }}** 中，使用关键词 `{{ keyword }}` 搜索到 **{{ count }}** 条边{% if truncated %}（仅显示相关度最高的前 {{ limit }} 条）{% endif %}。
+
+{% if edges %}
+| 边 ID | 边标题 | 从 | 到 |
+|---|---|---|---|
+{% for edge in edges %}
+| {{ edge.id }} | {{ edge.title }} | {{ edge.start_node_id }} ({{ edge.start_node.title }}) | {{ edge.end_node_id }} ({{ edge.end_node.title }}) |
+{% endfor %}
+{% else %}
+没有找到匹配的边。
+{% endif %}
+
+## 进一步操作提示
+你可以使用 `get_edge_info` 查看具体边的详细信息。
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    graph_name (str): 当前图谱的名称。
+    keyword (str): 用于搜索的关键词。
+    count (int): 返回的边数量。
+    limit (int): 返回数量上限。
+    truncated (bool): 结果是否因数量上限被截断。
+    edges (List[Knowledge_Edge]): 匹配的边列表。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
+
+PROMPT_LIST_RELATION_TYPES = """
+{% if success %}
+## 关系类型统计
+
+知识图谱 **{{ graph_name }}** 中共有 **{{ total }}** 种关系类型（边标题去掉首尾空白、不区分大小写后视为同一类型）{% if truncated %}，以下仅列出边数最多的 {{ relations | length }} 种{% endif %}。
+
+{% if relations %}
+| 关系类型 | 边数量 |
+|---|---|
+{% for relation, count in relations %}
+| {{ relation }} | {{ count }} |
+{% endfor %}
+{% else %}
+当前图谱中没有边。
+{% endif %}
+
+## 进一步操作提示
+你可以使用 `get_neighbours_by_relation` 查看节点通过某种关系直接相连的节点，或使用 `get_relation_closure` 沿某种关系递归展开（例如一个知识点的全部前置知识）。
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    graph_name (str): 当前图谱的名称。
+    total (int): 关系类型总数。
+    relations (List[Tuple[str, int]]): 显示的 (关系类型, 边数量)。
+    truncated (bool): 结果是否因数量上限被截断。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
+
+PROMPT_GET_NEIGHBOURS_BY_RELATION = """
+{% if success %}
+## 按关系查询邻居成功
+在图谱 `{{ graph_name }}` 中，节点 `{{ node_id }}` ({{ node.title }}) 沿{{ direction_text }}通过关系「{{ relation }}」直接相连的节点共 **{{ total }}** 个{% if truncated %}，仅显示前 {{ items | length }} 个{% endif %}：
+
+{% if items %}
+| 边 ID | 方向 | 节点 ID | 节点标题 |
+|---|---|---|---|
+{% for item in items %}
+| {{ item.edge.id }} | {{ '出边' if item.outgoing else '入边' }} | {{ item.node.id }} | {{ item.node.title }} |
+{% endfor %}
+{% else %}
+该节点没有这种关系的{{ direction_text }}。可以使用 `list_relation_types` 查看图谱中已有的关系类型。
+{% endif %}
+
+## 进一步操作提示
+你可以使用 `get_relation_closure` 沿该关系继续递归展开，或使用 `get_node_info` 查看具体节点的详细信息。
+{% elif not_found %}
+## 查询结果
+在图谱 `{{ graph_name }}` 中未找到 ID 为 `{{ node_id }}` 的节点。
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    not_found (bool): 是否因为未找到节点而失败。
+    graph_name (str): 当前图谱的名称。
+    node_id (str): 查询的节点ID。
+    node (Knowledge_Node): 查询的节点对象。
+    relation (str): 关系类型。
+    direction_text (str): 遍历方向的文字描述。
+    items (List[Dict[str, Any]]): 显示的邻居，每个元素包含 'node'、'edge' 和 'outgoing'（是否为出边）。
+    total (int): 邻居总数（按边计）。
+    truncated (bool): 结果是否因数量上限被截断。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
+
+PROMPT_GET_RELATION_CLOSURE = """
+{% if success %}
+## 关系闭包查询成功
+在图谱 `{{ graph_name }}` 中，从节点 `{{ node_id }}` ({{ node.title }}) 出发，沿{{ direction_text }}反复经过关系「{{ relation }}」{% if max_depth is not none %}（至多 {{ max_depth }} 层）{% endif %}可以到达 **{{ total }}** 个节点{% if truncated %}，仅显示距离最近的 {{ items | length }} 个{% endif %}：
+
+{% if items %}
+| 层数 | 节点 ID | 节点标题 |
+|---|---|---|
+{% for item_node, depth in items %}
+| {{ depth }} | {{ item_node.id }} | {{ item_node.title }} |
+{% endfor %}
+{% else %}
+沿该关系无法到达其他节点。可以使用 `list_relation_types` 查看图谱中已有的关系类型。
+{% endif %}
+
+## 进一步操作提示
+你可以使用 `find_path` 查看两个节点之间的具体路径，或使用 `get_node_info` 查看具体节点的详细信息。
+{% elif not_found %}
+## 查询结果
+在图谱 `{{ graph_name }}` 中未找到 ID 为 `{{ node_id }}` 的节点。
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    not_found (bool): 是否因为未找到节点而失败。
+    graph_name (str): 当前图谱的名称。
+    node_id (str): 起始节点的ID。
+    node (Knowledge_Node): 起始节点对象。
+    relation (str): 关系类型。
+    direction_text (str): 遍历方向的文字描述。
+    max_depth (Optional[int]): 最大层数，None 表示不限制。
+    items (List[Tuple[Knowledge_Node, int]]): 显示的 (节点, 层数)，按层数从小到大排列。
+    total (int): 可到达的节点总数。
+    truncated (bool): 结果是否因数量上限被截断。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
+
+PROMPT_PLAN_LEARNING_PATH = """
+{% if success %}
+## 学习路径规划成功
+在图谱 `{{ graph_name }}` 中，按关系「{{ relation }}」规划学习 {% for target in targets %}`{{ target }}`{% if not loop.last %}、{% endif %}{% endfor %} 的顺序{% if known_count %}（已排除 {{ known_count }} 个已掌握的节点及只能经由它们到达的前置知识）{% endif %}，共 **{{ total }}** 个节点{% if truncated %}，仅显示最先学习的 {{ steps | length }} 个{% endif %}：
+
+{% if not relation_exists %}
+图谱中没有关系「{{ relation }}」的边，无法确定前置知识。可以使用 `list_relation_types` 查看图谱中已有的关系类型，再指定 relation 参数。
+{% elif steps %}
+| 序号 | 阶段 | 节点 ID | 节点标题 | 直接前置 |
+|---|---|---|---|---|
+{% for step in steps %}
+| {{ loop.index }} | {{ step.stage }}{% if step.cycle %}（循环组 {{ step.cycle }}）{% endif %} | {{ step.node.id }} | {{ step.node.title }} | {{ step.prerequisites | join(', ') or '-' }} |
+{% endfor %}
+{% endif %}
+
+{% if cycles %}
+**循环依赖**：以下节点组互为前置，无法确定先后，建议放在一起学习：
+{% for group in cycles %}
+- 循环组 {{ loop.index }}：{{ group | join(', ') }}
+{% endfor %}
+{% endif %}
+
+## 说明
+前置节点总是排在依赖它的节点之前；阶段相同的节点之间没有依赖，可以按任意顺序学习。你可以使用 `get_node_info` 查看具体节点的详细信息，或使用 `get_relation_closure` 查看某个节点沿关系展开的层数。
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    graph_name (str): 当前图谱的名称。
+    relation (str): 前置关系类型。
+    relation_exists (bool): 图谱中是否存在该关系类型的边。
+    targets (List[str]): 目标节点 ID。
+    known_count (int): 已掌握的节点数量。
+    steps (List[LearningStep]): 显示的学习步骤，按学习顺序排列。
+    cycles (List[List[str]]): 计划中的循环依赖组。
+    total (int): 计划中的节点总数。
+    truncated (bool): 结果是否因数量上限被截断。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
+
 PROMPT_ALL_NODES = """
 ## 所有节点信息
 
@@ -733,6 +1298,22 @@ Args:
     edges (List[Knowledge_Edge]): 所有边列表。
 """
 
+PROMPT_ALL_NODES_COMPACT = """在知识图谱 {{ graph_name }} 中共有 {{ count }} 个节点{{ '：' if nodes else '。' }}
+{% if nodes %}id\ttitle
+{% for node in nodes %}{{ node.id }}\t{{ node.title | tsv }}
+{% endfor %}{% endif %}"""
+
+PROMPT_ALL_EDGES_COMPACT = """在知识图谱 {{ graph_name }} 中共有 {{ count }} 条边{{ '：' if edges else '。' }}
+{% if edges %}id\ttitle\tstart_node_id\tend_node_id
+{% for edge in edges %}{{ edge.id }}\t{{ edge.title | tsv }}\t{{ edge.start_node_id }}\t{{ edge.end_node_id }}
+{% endfor %}{% endif %}"""
+"""
+PROMPT_ALL_NODES 与 PROMPT_ALL_EDGES 的紧凑版本，每个节点或边占一行 TSV。
+
+Args:
+    与 PROMPT_ALL_NODES、PROMPT_ALL_EDGES 相同，紧凑版本的边还需要 start_node_id 与 end_node_id。
+"""
+
 PROMPT_SAVE_GRAPH = """
 {% if success %}
 ## 图谱保存成功
@@ -785,4 +1366,106 @@ PROMPT_SAVE_ALL_GRAPHS = """
 Args:
     saved_graphs (List[str]): 成功保存的图谱名称列表。
     failed_graphs (List[Dict[str, str]]): 保存失败的图谱列表，每个元素包含 'name' 和 'error'。
-"""
\ No newline at end of file
+"""
+
+PROMPT_CREATE_SNAPSHOT = """
+## 快照创建成功
+已为知识图谱 **{{ graph_name }}** 创建快照 **{{ label }}**（版本 {{ version }}，{{ node_count }} 个节点，{{ edge_count }} 条边）。
+
+## 进一步操作提示
+之后可以使用 `diff_snapshot` 工具查看快照之后的变化，或使用 `rollback_to_snapshot` 工具将图谱恢复到该快照。
+每个图谱最多保留 {{ max_snapshots }} 个快照，超出时最早的快照会被丢弃。
+"""
+"""
+Args:
+    graph_name (str): 当前图谱的名称。
+    label (str): 快照名称。
+    version (int): 快照对应的图谱版本号。
+    node_count (int): 快照中的节点数量。
+    edge_count (int): 快照中的边数量。
+    max_snapshots (int): 每个图谱最多保留的快照数量。
+"""
+
+PROMPT_LIST_SNAPSHOTS = """
+## 快照列表
+{% if snapshots %}
+知识图谱 **{{ graph_name }}** 当前版本为 {{ version }}，共有 {{ snapshots | length }} 个快照（从早到晚）：
+
+| 快照名称 | 版本 | 创建时间 | 节点数 | 边数 |
+|---|---|---|---|---|
+{% for snapshot in snapshots %}
+| {{ snapshot.label }} | {{ snapshot.version }} | {{ snapshot.created_at }} | {{ snapshot.node_count }} | {{ snapshot.edge_count }} |
+{% endfor %}
+
+## 进一步操作提示
+你可以使用 `diff_snapshot` 工具查看某个快照之后的变化，或使用 `rollback_to_snapshot` 工具恢复到某个快照。
+{% else %}
+知识图谱 **{{ graph_name }}** 还没有任何快照。
+
+## 进一步操作提示
+你可以使用 `create_snapshot` 工具创建快照。`delete_items` 与 `batch_add_from_json` 在修改图谱前会自动创建快照。
+{% endif %}
+"""
+"""
+Args:
+    graph_name (str): 当前图谱的名称。
+    version (int): 图谱的当前版本号。
+    snapshots (List[Dict[str, Any]]): 快照列表，每个元素包含 'label'、'version'、'created_at'、'node_count' 和 'edge_count'。
+"""
+
+PROMPT_SNAPSHOT_NOT_FOUND = """
+## 操作失败
+错误: 知识图谱 **{{ graph_name }}** 中不存在名为 **{{ label }}** 的快照。
+{% if labels %}
+现有的快照: {{ labels | join(', ') }}
+{% endif %}
+
+## 进一步操作提示
+请使用 `list_snapshots` 工具查看现有的快照。
+"""
+"""
+Args:
+    graph_name (str): 当前图谱的名称。
+    label (str): 尝试使用的快照名称。
+    labels (List[str]): 现有的快照名称。
+"""
+
+PROMPT_SNAPSHOT_DIFF = """
+{% if success %}
+{% if rolled_back %}
+## 图谱已恢复
+知识图谱 **{{ graph_name }}** 已恢复到快照 **{{ label }}**，撤销了以下变化：
+{% else %}
+## 快照之后的变化
+知识图谱 **{{ graph_name }}** 自快照 **{{ label }}**（版本 {{ diff.from_version }}）以来的变化：
+{% endif %}
+{% if diff.is_empty %}
+- 没有任何变化
+{% else %}
+{% for title, ids in [('新增的节点', diff.added_nodes), ('删除的节点', diff.removed_nodes), ('修改的节点', diff.changed_nodes), ('新增的边', diff.added_edges), ('删除的边', diff.removed_edges), ('修改的边', diff.changed_edges)] %}
+{% if ids %}
+- **{{ title }}（{{ ids | length }}）:** {{ ids[:max_ids] | join(', ') }}{{ ' ……' if ids | length > max_ids else '' }}
+{% endif %}
+{% endfor %}
+{% endif %}
+
+## 进一步操作提示
+{% if rolled_back %}
+你可以使用 `get_all_node` 或 `get_all_edge` 工具来确认恢复结果。
+{% else %}
+你可以使用 `rollback_to_snapshot` 工具撤销这些变化。
+{% endif %}
+{% else %}
+{{ error_prompt }}
+{% endif %}
+"""
+"""
+Args:
+    success (bool): 操作是否成功。
+    rolled_back (bool): 是否已将图谱恢复到快照（否则只是列出变化）。
+    graph_name (str): 当前图谱的名称。
+    label (str): 快照名称。
+    diff (GraphDiff): 变化，恢复时为被撤销的变化。
+    max_ids (int): 每类变化最多列出的 ID 数量。
+    error_prompt (str): 如果失败，则传递由 PROMPT_OPERATION_ERROR 生成的错误提示。
+"""
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+import jinja2
+
+from src.graph_manager.knowledge_core import prompt
+
+
+def tsv_cell(value: Any) -> str:
+    """将值转换为可放入 TSV 单元格的文本：None 记为空，制表符与换行替换为空格。"""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        value = ",".join(str(item) for item in value)
+    return " ".join(str(value).replace("\t", " ").splitlines())
+
+
+# 与 jinja2.Template 使用相同的默认选项，渲染结果与逐次编译时完全一致
+PROMPT_ENV = jinja2.Environment()
+PROMPT_ENV.filters["tsv"] = tsv_cell
+
+# 模板源码 -> 编译好的模板；prompt.py 中的全部模板在导入时编译一次
+_COMPILED: Dict[str, jinja2.Template] = {
+    source: PROMPT_ENV.from_string(source)
+    for name, source in vars(prompt).items()
+    if name.startswith("PROMPT_") and isinstance(source, str)
+}
+
+
+def get_template(source: str) -> jinja2.Template:
+    """
+    返回模板源码对应的已编译模板。prompt.py 之外的模板在首次使用时编译并缓存。
+
+    Args:
+        source (str): 模板源码，通常是 prompt.py 中的 PROMPT_* 常量。
+
+    Returns:
+        jinja2.Template: 编译好的模板。
+    """
+    template = _COMPILED.get(source)
+    if template is None:
+        template = _COMPILED[source] = PROMPT_ENV.from_string(source)
+    return template
+
+
+def render_prompt(source: str, context: Optional[Dict[str, Any]] = None) -> str:
+    """
+    使用预编译的模板渲染提示词，等价于 `jinja2.Template(source).render(context)`。
+
+    Args:
+        source (str): 模板源码，通常是 prompt.py 中的 PROMPT_* 常量。
+        context (Optional[Dict[str, Any]]): 模板变量。
+
+    Returns:
+        str: 渲染结果。
+    """
+    return get_template(source).render(context or {})
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, List, Optional, Set, TypeVar
+
+from src.graph_manager.knowledge_core.adjacency import AdjacencyIndex
+
+T = TypeVar("T")
+
+
+def strongly_connected_components(nodes: Iterable[T], successors: Callable[[T], Iterable[T]]) -> List[List[T]]:
+    """
+    迭代的 Tarjan 算法求强连通分量，避免深图触发递归深度限制。
+
+    Args:
+        nodes (Iterable[T]): 全部节点。
+        successors (Callable[[T], Iterable[T]]): 节点的后继，后继必须也在 nodes 中。
+
+    Returns:
+        List[List[T]]: 强连通分量，按缩点 DAG 的逆拓扑序排列（一个分量的后继分量都排在它前面）。
+    """
+    order: Dict[T, int] = {}
+    lowlink: Dict[T, int] = {}
+    on_stack: Set[T] = set()
+    stack: List[T] = []
+    components: List[List[T]] = []
+    for root in nodes:
+        if root in order:
+            continue
+        order[root] = lowlink[root] = len(order)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors(root)))]
+        while work:
+            u, neighbours = work[-1]
+            for v in neighbours:
+                if v not in order:
+                    order[v] = lowlink[v] = len(order)
+                    stack.append(v)
+                    on_stack.add(v)
+                    work.append((v, iter(successors(v))))
+                    break
+                if v in on_stack and order[v] < lowlink[u]:
+                    lowlink[u] = order[v]
+            else:
+                work.pop()
+                if work and lowlink[u] < lowlink[work[-1][0]]:
+                    lowlink[work[-1][0]] = lowlink[u]
+                if lowlink[u] == order[u]:
+                    members = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        members.append(w)
+                        if w == u:
+                            break
+                    components.append(members)
+    return components
+
+
+class _UnionFind:
+    """内部辅助类：按节点下标组织的并查集（按大小合并 + 路径减半），同时记录连通分量的数量。"""
+
+    __slots__ = ("parent", "size", "count")
+
+    def __init__(self):
+        self.parent: List[int] = []
+        self.size: List[int] = []
+        self.count = 0
+
+    def add(self, idx: int):
+        """加入一个孤立节点，下标可以是回收复用的空槽。"""
+        if idx >= len(self.parent):
+            self.size.extend([1] * (idx + 1 - len(self.parent)))
+            self.parent.extend(range(len(self.parent), idx + 1))
+        self.parent[idx] = idx
+        self.size[idx] = 1
+        self.count += 1
+
+    def find(self, idx: int) -> int:
+        parent = self.parent
+        while parent[idx] != idx:
+            parent[idx] = parent[parent[idx]]
+            idx = parent[idx]
+        return idx
+
+    def union(self, u: int, v: int):
+        root_u, root_v = self.find(u), self.find(v)
+        if root_u == root_v:
+            return
+        if self.size[root_u] < self.size[root_v]:
+            root_u, root_v = root_v, root_u
+        self.parent[root_v] = root_u
+        self.size[root_u] += self.size[root_v]
+        self.count -= 1
+
+
+class _Condensation:
+    """
+    内部辅助类：强连通分量、缩点 DAG 及其可达性标签。
+
+    分量按迭代 Tarjan 算法的输出顺序编号，即缩点 DAG 的逆拓扑序：分量 a 能到达分量 b 时必有 a >= b。
+    每个分量另有两种区间标签：
+    - DAG 上一个 DFS 生成森林的 [pre, post] 区间：b 的区间包含在 a 的区间内时，a 一定能到达 b
+    - [low, post]，low 为全部后代中最小的 post（GRAIL 标签）：post(b) 不在 a 的区间内时，a 一定不能到达 b
+    """
+
+    __slots__ = ("comp", "succ", "pre", "post", "low", "count", "_clock")
+
+    def __init__(self, adjacency: AdjacencyIndex):
+        self.comp: List[int] = [-1] * adjacency.capacity # 节点下标 -> 分量编号，空槽为 -1
+        self.succ: List[List[int]] = [] # 分量编号 -> 缩点 DAG 中的后继分量（编号都更小）
+        self._tarjan(adjacency)
+        self.count = len(self.succ) # 非空分量的数量
+        self._label()
+
+    def _tarjan(self, adjacency: AdjacencyIndex):
+        """内部辅助方法：求强连通分量并建立缩点 DAG。"""
+        comp = self.comp
+        succ = self.succ
+        out_neighbours = adjacency.out_neighbours
+        for c, members in enumerate(strongly_connected_components(adjacency.node_indices(), out_neighbours)):
+            for w in members:
+                comp[w] = c
+            # 本分量能到达的节点都已属于先输出的分量
+            targets = {comp[v] for w in members for v in out_neighbours(w)}
+            targets.discard(c)
+            succ.append(sorted(targets))
+
+    def _label(self):
+        """内部辅助方法：计算生成森林区间与 GRAIL 区间。"""
+        succ = self.succ
+        size = len(succ)
+        pre = [0] * size
+        post = [0] * size
+        visited = bytearray(size)
+        clock = 0
+        # 从编号最大（拓扑序最靠前）的分量开始，使生成树尽量覆盖更多的可达关系
+        for root in range(size - 1, -1, -1):
+            if visited[root]:
+                continue
+            visited[root] = 1
+            pre[root] = clock
+            clock += 1
+            work = [(root, iter(succ[root]))]
+            while work:
+                c, children = work[-1]
+                for d in children:
+                    if not visited[d]:
+                        visited[d] = 1
+                        pre[d] = clock
+                        clock += 1
+                        work.append((d, iter(succ[d])))
+                        break
+                else:
+                    work.pop()
+                    post[c] = clock
+                    clock += 1
+        low = post[:]
+        for c in range(size): # 后继编号更小，已先计算
+            for d in succ[c]:
+                if low[d] < low[c]:
+                    low[c] = low[d]
+        self.pre, self.post, self.low = pre, post, low
+        self._clock = clock
+
+    def add_isolated(self, idx: int):
+        """为新加入的孤立节点分配一个新分量，标签取比现有标签都大的值，其余标签保持有效。"""
+        if idx >= len(self.comp):
+            self.comp.extend([-1] * (idx + 1 - len(self.comp)))
+        c = len(self.succ)
+        self.comp[idx] = c
+        self.succ.append([])
+        self.pre.append(self._clock)
+        self.post.append(self._clock + 1)
+        self.low.append(self._clock + 1)
+        self._clock += 2
+        self.count += 1
+
+    def decide(self, a: int, b: int) -> Optional[bool]:
+        """仅凭标签判断分量 a 能否到达分量 b，无法确定时返回 None。"""
+        if a == b:
+            return True
+        if a < b:
+            return False
+        post_b = self.post[b]
+        if post_b < self.low[a] or post_b > self.post[a]:
+            return False
+        if self.pre[a] <= self.pre[b] and post_b <= self.post[a]:
+            return True
+        return None
+
+    def reaches(self, a: int, b: int) -> bool:
+        """分量 a 能否到达分量 b。标签无法确定时在缩点 DAG 上做按标签剪枝的 DFS。"""
+        result = self.decide(a, b)
+        if result is not None:
+            return result
+        succ = self.succ
+        seen = {a}
+        stack = [a]
+        while stack:
+            for d in succ[stack.pop()]:
+                if d in seen:
+                    continue
+                seen.add(d)
+                result = self.decide(d, b)
+                if result:
+                    return True
+                if result is None:
+                    stack.append(d)
+        return False
+
+
+class ReachabilityIndex:
+    """
+    知识图谱的可达性与连通分量索引，按节点下标工作。
+
+    - 弱连通分量：并查集，添加节点或边时原地合并，近似 O(1)
+    - 强连通分量与缩点 DAG：首次查询时构建，之后大多数可达性查询只需比较分量的标签，O(1) 即可回答
+    - 添加边 u -> v 时，若 u 原本就能到达 v，可达关系不变，缩点保持有效；否则丢弃缩点，在下次查询时重建
+    - 删除边（且两端之间没有剩余的平行边）后不立即丢弃两种结构，而是标记为不精确：
+      删除只会减少可达关系，旧结构中不可达的节点对在当前图中同样不可达，仍可用于 `excludes` 快速排除；
+      需要精确结果的查询会先重建
+    - 删除非孤立节点后两种结构都在下次查询时重建；添加或删除孤立节点总是原地完成
+    """
+
+    __slots__ = ("_weak", "_strong", "_exact")
+
+    def __init__(self):
+        self._weak: Optional[_UnionFind] = None # None 表示需要重建
+        self._strong: Optional[_Condensation] = None
+        self._exact = True # 为 False 时，已有结构描述的是当前图的一个超图
+
+    def __deepcopy__(self, memo):
+        # 索引按节点下标组织，复制的图谱在首次查询时重建
+        return ReachabilityIndex()
+
+    def invalidate(self):
+        """丢弃两种结构，下次查询时重建。"""
+        self._weak = None
+        self._strong = None
+        self._exact = True
+
+    def add_node(self, idx: int):
+        """登记一个新加入的孤立节点。"""
+        if self._weak is not None:
+            self._weak.add(idx)
+        if self._strong is not None:
+            self._strong.add_isolated(idx)
+
+    def add_edge(self, u: int, v: int):
+        """登记一条新加入的边 u -> v。"""
+        if self._weak is not None:
+            self._weak.union(u, v)
+        strong = self._strong
+        if strong is not None and not strong.reaches(strong.comp[u], strong.comp[v]):
+            self._strong = None
+
+    def remove_edge(self, parallel_left: bool):
+        """登记一条边被删除，parallel_left 表示两端之间是否还有同方向的平行边。"""
+        if not parallel_left:
+            self._exact = False
+
+    def remove_node(self, idx: int, isolated: bool):
+        """登记一个节点被删除，isolated 表示该节点删除前是否没有任何边。"""
+        if not isolated or not self._exact:
+            self.invalidate()
+            return
+        if self._weak is not None:
+            self._weak.count -= 1
+        if self._strong is not None:
+            self._strong.comp[idx] = -1
+            self._strong.count -= 1
+
+    def excludes(self, u: int, v: int, directed: bool = True) -> bool:
+        """
+        仅凭已建立的结构判断节点 u 一定不能到达节点 v（directed 为 False 时忽略方向），从不重建，代价为 O(1)。
+        无法确定时返回 False，由调用方自行搜索。
+        """
+        if u == v:
+            return False
+        weak = self._weak
+        if weak is not None and weak.find(u) != weak.find(v):
+            return True
+        strong = self._strong
+        if directed and strong is not None:
+            return strong.decide(strong.comp[u], strong.comp[v]) is False
+        return False
+
+    def _weak_components(self, adjacency: AdjacencyIndex) -> _UnionFind:
+        """内部辅助方法：获取（必要时重建）并查集。"""
+        if not self._exact:
+            self.invalidate()
+        if self._weak is None:
+            weak = _UnionFind()
+            for idx in adjacency.node_indices():
+                weak.add(idx)
+            for u in adjacency.node_indices():
+                for v in adjacency.out_neighbours(u):
+                    weak.union(u, v)
+            self._weak = weak
+        return self._weak
+
+    def _condensation(self, adjacency: AdjacencyIndex) -> _Condensation:
+        """内部辅助方法：获取（必要时重建）缩点 DAG。"""
+        if not self._exact:
+            self.invalidate()
+        if self._strong is None:
+            self._strong = _Condensation(adjacency)
+        return self._strong
+
+    def reachable(self, adjacency: AdjacencyIndex, u: int, v: int) -> bool:
+        """沿边的方向，节点 u 能否到达节点 v。"""
+        if u == v:
+            return True
+        weak = self._weak_components(adjacency)
+        if weak.find(u) != weak.find(v):
+            return False
+        strong = self._condensation(adjacency)
+        return strong.reaches(strong.comp[u], strong.comp[v])
+
+    def connected(self, adjacency: AdjacencyIndex, u: int, v: int) -> bool:
+        """忽略边的方向，节点 u 与节点 v 是否在同一个弱连通分量中。"""
+        weak = self._weak_components(adjacency)
+        return weak.find(u) == weak.find(v)
+
+    def component_count(self, adjacency: AdjacencyIndex, strong: bool = False) -> int:
+        """弱（或强）连通分量的数量。"""
+        if strong:
+            return self._condensation(adjacency).count
+        return self._weak_components(adjacency).count
+
+    def components(self, adjacency: AdjacencyIndex, strong: bool = False) -> List[List[int]]:
+        """
+        列出弱（或强）连通分量，每个分量为节点下标列表。
+
+        Returns:
+            List[List[int]]: 按分量大小从大到小排列。
+        """
+        groups: Dict[int, List[int]] = {}
+        if strong:
+            comp = self._condensation(adjacency).comp
+            for idx in adjacency.node_indices():
+                groups.setdefault(comp[idx], []).append(idx)
+        else:
+            find = self._weak_components(adjacency).find
+            for idx in adjacency.node_indices():
+                groups.setdefault(find(idx), []).append(idx)
+        return sorted(groups.values(), key=len, reverse=True)
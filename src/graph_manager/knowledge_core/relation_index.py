@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+import unicodedata
+
+
+def normalize_relation(title: str) -> str:
+    """
+    规范化关系类型（边的标题）：全角转半角、去掉首尾空白并转为小写，
+    使“前置知识”“ 前置知识 ”等写法视为同一种关系。
+    """
+    return unicodedata.normalize("NFKC", title).strip().lower()
+
+
+class RelationIndex:
+    """
+    增量维护的关系类型索引：把边的标题视为关系类型。
+
+    - 关系类型 -> 边 ID，可以 O(1) 得到某种关系的全部边及其数量
+    - (节点 ID, 关系类型) -> 出边 / 入边 ID，按关系类型遍历时只需访问该类型的边，而不是节点的全部边
+    - 各类型保留首次出现时的原始标题，用于展示
+    """
+
+    __slots__ = ("_edges", "_out", "_in", "_edge_keys", "_labels")
+
+    def __init__(self):
+        self._edges: Dict[str, Dict[str, None]] = {} # 关系类型 -> 边 ID（按添加顺序）
+        self._out: Dict[Tuple[str, str], Dict[str, None]] = {} # (起始节点 ID, 关系类型) -> 出边 ID
+        self._in: Dict[Tuple[str, str], Dict[str, None]] = {} # (结束节点 ID, 关系类型) -> 入边 ID
+        self._edge_keys: Dict[str, Tuple[str, str, str]] = {} # 边 ID -> (关系类型, 起始节点 ID, 结束节点 ID)
+        self._labels: Dict[str, str] = {} # 关系类型 -> 展示用的原始标题
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    def __contains__(self, relation: str) -> bool:
+        return normalize_relation(relation) in self._edges
+
+    def add(self, edge_id: str, title: str, start_node_id: str, end_node_id: str):
+        """
+        索引一条边。若边已被索引则先移除旧内容（用于标题或端点变化后重新索引）。
+
+        Args:
+            edge_id (str): 边 ID。
+            title (str): 边的标题，即关系类型。
+            start_node_id (str): 起始节点 ID。
+            end_node_id (str): 结束节点 ID。
+        """
+        if edge_id in self._edge_keys:
+            self.remove(edge_id)
+        relation = normalize_relation(title)
+        self._edge_keys[edge_id] = (relation, start_node_id, end_node_id)
+        self._edges.setdefault(relation, {})[edge_id] = None
+        self._out.setdefault((start_node_id, relation), {})[edge_id] = None
+        self._in.setdefault((end_node_id, relation), {})[edge_id] = None
+        self._labels.setdefault(relation, title.strip())
+
+    def remove(self, edge_id: str):
+        """从索引中移除一条边，边不存在时静默忽略。"""
+        keys = self._edge_keys.pop(edge_id, None)
+        if keys is None:
+            return
+        relation, start_node_id, end_node_id = keys
+        for postings, key in ((self._edges, relation), (self._out, (start_node_id, relation)), (self._in, (end_node_id, relation))):
+            bucket = postings[key]
+            del bucket[edge_id]
+            if not bucket:
+                del postings[key]
+        if relation not in self._edges:
+            del self._labels[relation]
+
+    def label(self, relation: str) -> Optional[str]:
+        """关系类型展示用的标题，类型不存在时返回 None。"""
+        return self._labels.get(normalize_relation(relation))
+
+    def edge_ids(self, relation: str) -> List[str]:
+        """某种关系的全部边 ID，按添加顺序排列。"""
+        return list(self._edges.get(normalize_relation(relation), ()))
+
+    def count(self, relation: str) -> int:
+        """某种关系的边数量。"""
+        return len(self._edges.get(normalize_relation(relation), ()))
+
+    def out_edge_ids(self, node_id: str, relation: str) -> List[str]:
+        """节点某种关系的出边 ID。"""
+        return list(self._out.get((node_id, normalize_relation(relation)), ()))
+
+    def in_edge_ids(self, node_id: str, relation: str) -> List[str]:
+        """节点某种关系的入边 ID。"""
+        return list(self._in.get((node_id, normalize_relation(relation)), ()))
+
+    def relations(self) -> List[Tuple[str, int]]:
+        """所有关系类型的 (展示标题, 边数量)，按边数量从多到少排列，数量相同时按标题排列。"""
+        return sorted(((self._labels[relation], len(edges)) for relation, edges in self._edges.items()), key=lambda item: (-item[1], item[0]))
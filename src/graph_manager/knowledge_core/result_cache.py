@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+import functools
+import inspect
+import weakref
+
+if TYPE_CHECKING:
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+# 默认最多缓存的工具结果数量
+DEFAULT_RESULT_CACHE_SIZE = 256
+
+F = TypeVar("F", bound=Callable[..., str])
+
+
+class ResultCache:
+    """
+    工具读取结果的 LRU 缓存，键为 (图谱名称, 图谱版本, 方法名, 参数)。
+
+    - 图谱的任何修改都会使版本号递增，旧版本的结果不会再被命中；首次以新版本访问某个图谱时立即丢弃其旧结果
+    - 同名图谱被重新加载（图谱对象不同）时，同样丢弃旧结果
+    - maxsize 为 0 时不缓存，只统计未命中次数
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Tuple[str, int, str, Hashable], str] = OrderedDict()
+        self._graphs: Dict[str, Tuple[weakref.ref, int]] = {} # 图谱名称 -> (图谱对象的弱引用, 缓存结果对应的版本)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _sync(self, graph: Knowledge_Graph):
+        """内部辅助方法：图谱的版本或对象变化时丢弃该图谱的旧结果。"""
+        seen = self._graphs.get(graph.name)
+        if seen is not None and seen[0]() is graph and seen[1] == graph.version:
+            return
+        if seen is not None:
+            self.invalidate(graph.name)
+        self._graphs[graph.name] = (weakref.ref(graph), graph.version)
+
+    def get_or_compute(self, graph: Knowledge_Graph, method: str, args: Hashable, compute: Callable[[], str]) -> str:
+        """
+        获取缓存结果，未命中时调用 compute 计算并写入缓存。
+
+        Args:
+            graph (Knowledge_Graph): 结果所依据的图谱。
+            method (str): 方法名。
+            args (Hashable): 规范化后的参数。
+            compute (Callable[[], str]): 未命中时计算结果。
+
+        Returns:
+            str: 工具结果。
+        """
+        if self.maxsize <= 0:
+            self.misses += 1
+            return compute()
+        self._sync(graph)
+        key = (graph.name, graph.version, method, args)
+        entries = self._entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            return entries[key]
+        self.misses += 1
+        value = compute()
+        if graph.version == key[1]: # 计算过程中图谱被修改时，结果不对应任何一个版本，不写入
+            entries[key] = value
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        return value
+
+    def invalidate(self, graph_name: Optional[str] = None):
+        """丢弃某个图谱（为 None 时为全部图谱）的缓存结果。"""
+        if graph_name is None:
+            self._entries.clear()
+            self._graphs.clear()
+            return
+        self._graphs.pop(graph_name, None)
+        for key in [key for key in self._entries if key[0] == graph_name]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        缓存的命中统计。
+
+        Returns:
+            Dict[str, Any]: hits、misses、hit_rate（无请求时为 0.0）、size 与 maxsize。
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+def _freeze(value: Any) -> Hashable:
+    """内部辅助函数：把参数中的列表、集合与字典转换为可哈希的等价形式。"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+def cached_read(method: F) -> F:
+    """
+    装饰 KnowledgeGraphIntegration 中只读取当前图谱的方法，结果缓存在实例的 result_cache 中。
+
+    参数先按方法签名补全默认值，位置参数与关键字参数的等价写法命中同一条缓存。
+    没有当前图谱、当前图谱尚未加载而由存储后端直接回答（没有版本号），或参数无法哈希时直接调用原方法。
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs) -> str:
+        if self._storage_reader() is not None:
+            return method(self, *args, **kwargs)
+        graph = self.current_graph
+        if graph is None:
+            return method(self, *args, **kwargs)
+        try:
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = _freeze(tuple(bound.arguments.items())[1:])
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        return self.result_cache.get_or_compute(graph, method.__name__, key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
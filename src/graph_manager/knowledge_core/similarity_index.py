@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+import random
+import unicodedata
+
+# MinHash 签名长度与 LSH 分段：签名分为 _BANDS 段，每段 _ROWS 个值，任意一段完全相同即成为候选。
+# 候选阈值约为 (1/_BANDS)^(1/_ROWS) ≈ 0.25，之后再按精确的相似度过滤，因此阈值低于该值时可能漏掉少量结果。
+_BANDS = 16
+_ROWS = 2
+_NUM_PERM = _BANDS * _ROWS
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 61) - 1
+_rng = random.Random(20240611)
+_PERMUTATIONS: Tuple[Tuple[int, int], ...] = tuple((_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(_NUM_PERM))
+
+# 相似度中标题与标签的权重，任一节点没有标签时只比较标题
+TITLE_WEIGHT = 0.8
+# 默认的重复判定阈值
+DEFAULT_THRESHOLD = 0.6
+
+
+def normalize_title(text: str) -> str:
+    """
+    规范化标题：全角转半角、转小写，并去掉空白与标点，只保留文字和数字。
+
+    Args:
+        text (str): 原始标题。
+
+    Returns:
+        str: 规范化后的标题。
+    """
+    return "".join(ch for ch in unicodedata.normalize("NFKC", text).lower() if ch.isalnum())
+
+
+def title_shingles(title: str) -> FrozenSet[str]:
+    """标题规范化后的字符二元组集合，长度不足 2 时为整个标题。"""
+    text = normalize_title(title)
+    if len(text) < 2:
+        return frozenset((text,)) if text else frozenset()
+    return frozenset(text[i:i + 2] for i in range(len(text) - 1))
+
+
+def normalize_tags(tags: Iterable[str]) -> FrozenSet[str]:
+    """规范化后的标签集合。"""
+    return frozenset(tag for tag in (normalize_title(tag) for tag in tags) if tag)
+
+
+def jaccard(first: FrozenSet[str], second: FrozenSet[str]) -> float:
+    """两个集合的 Jaccard 相似度，都为空时为 0。"""
+    if not first and not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def similarity(first: Tuple[FrozenSet[str], FrozenSet[str]], second: Tuple[FrozenSet[str], FrozenSet[str]]) -> float:
+    """
+    两个节点的相似度：标题二元组的 Jaccard 相似度，两者都有标签时与标签的 Jaccard 相似度按 TITLE_WEIGHT 加权。
+
+    Args:
+        first (Tuple[FrozenSet[str], FrozenSet[str]]): (标题二元组, 规范化标签)。
+        second (Tuple[FrozenSet[str], FrozenSet[str]]): (标题二元组, 规范化标签)。
+
+    Returns:
+        float: 0 到 1 之间的相似度。
+    """
+    title_score = jaccard(first[0], second[0])
+    if not first[1] or not second[1]:
+        return title_score
+    return TITLE_WEIGHT * title_score + (1 - TITLE_WEIGHT) * jaccard(first[1], second[1])
+
+
+def _band_keys(shingles: FrozenSet[str]) -> List[Tuple[int, Tuple[int, ...]]]:
+    """内部辅助函数：计算 MinHash 签名并切分为 LSH 分段键。"""
+    hashes = [hash(shingle) & _MASK for shingle in shingles]
+    signature = [min((a * x + b) % _PRIME for x in hashes) for a, b in _PERMUTATIONS]
+    return [(band, tuple(signature[band * _ROWS:(band + 1) * _ROWS])) for band in range(_BANDS)]
+
+
+class MinHashIndex:
+    """
+    增量维护的节点近似重复索引（MinHash + LSH）。
+
+    - 以规范化标题的字符二元组计算 MinHash 签名，签名分段后放入 LSH 桶，查询只需检查同桶的节点，代价与图谱规模无关
+    - 候选节点再按 similarity 计算精确的相似度，结果只包含不低于阈值的节点
+    - 标签只参与相似度计算，不参与分桶（常见标签会使桶过大）
+    """
+
+    __slots__ = ("_buckets", "_doc_keys", "_doc_features")
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {} # LSH 分段键 -> 节点 ID 集合
+        self._doc_keys: Dict[str, List[Tuple[int, Tuple[int, ...]]]] = {} # 节点 ID -> 所在的分段键
+        self._doc_features: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]] = {} # 节点 ID -> (标题二元组, 规范化标签)
+
+    def __len__(self) -> int:
+        return len(self._doc_features)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_features
+
+    def add(self, doc_id: str, title: str, tags: Iterable[str] = ()):
+        """
+        索引一个节点。若节点已存在则先移除旧内容。
+
+        Args:
+            doc_id (str): 节点 ID。
+            title (str): 节点标题。
+            tags (Iterable[str]): 节点标签。
+        """
+        shingles = title_shingles(title)
+        features = (shingles, normalize_tags(tags))
+        if self._doc_features.get(doc_id, (None,))[0] == shingles:
+            self._doc_features[doc_id] = features # 标题未变化，只需更新标签
+            return
+        self.remove(doc_id)
+        self._doc_features[doc_id] = features
+        if not shingles:
+            self._doc_keys[doc_id] = []
+            return
+        keys = _band_keys(shingles)
+        buckets = self._buckets
+        for key in keys:
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = {doc_id}
+            else:
+                bucket.add(doc_id)
+        self._doc_keys[doc_id] = keys
+
+    def remove(self, doc_id: str):
+        """从索引中移除一个节点，节点不存在时静默忽略。"""
+        keys = self._doc_keys.pop(doc_id, None)
+        if keys is None:
+            return
+        del self._doc_features[doc_id]
+        buckets = self._buckets
+        for key in keys:
+            bucket = buckets[key]
+            bucket.discard(doc_id)
+            if not bucket:
+                del buckets[key]
+
+    def _candidates(self, keys: List[Tuple[int, Tuple[int, ...]]]) -> Set[str]:
+        """内部辅助方法：与给定分段键同桶的节点。"""
+        candidates: Set[str] = set()
+        for key in keys:
+            bucket = self._buckets.get(key)
+            if bucket:
+                candidates |= bucket
+        return candidates
+
+    def query(self, title: str, tags: Iterable[str] = (), threshold: float = DEFAULT_THRESHOLD, limit: Optional[int] = None, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        查找与给定标题（和标签）相似的节点。
+
+        Args:
+            title (str): 标题。
+            tags (Iterable[str]): 标签。
+            threshold (float): 最低相似度。默认为 DEFAULT_THRESHOLD。
+            limit (Optional[int]): 最多返回的结果数量，None 表示不限制。
+            exclude (Optional[str]): 不参与比较的节点 ID（通常是查询节点自身）。
+
+        Returns:
+            List[Tuple[str, float]]: (节点 ID, 相似度)，按相似度从高到低排列。
+        """
+        shingles = title_shingles(title)
+        if not shingles:
+            return []
+        features = (shingles, normalize_tags(tags))
+        results = []
+        for doc_id in self._candidates(_band_keys(shingles)):
+            if doc_id == exclude:
+                continue
+            score = similarity(features, self._doc_features[doc_id])
+            if score >= threshold:
+                results.append((doc_id, score))
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[:limit] if limit is not None else results
+
+    def similar_to(self, doc_id: str, threshold: float = DEFAULT_THRESHOLD, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """查找与已索引节点相似的其他节点，节点不存在时返回空列表。参数与 query 相同。"""
+        keys = self._doc_keys.get(doc_id)
+        if not keys:
+            return []
+        features = self._doc_features[doc_id]
+        results = []
+        for other in self._candidates(keys):
+            if other == doc_id:
+                continue
+            score = similarity(features, self._doc_features[other])
+            if score >= threshold:
+                results.append((other, score))
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[:limit] if limit is not None else results
+
+    def duplicate_pairs(self, threshold: float = DEFAULT_THRESHOLD, limit: Optional[int] = None) -> List[Tuple[str, str, float]]:
+        """
+        列出索引中所有相似度不低于阈值的节点对，只比较同桶的节点。
+
+        Args:
+            threshold (float): 最低相似度。默认为 DEFAULT_THRESHOLD。
+            limit (Optional[int]): 最多返回的节点对数量，None 表示不限制。
+
+        Returns:
+            List[Tuple[str, str, float]]: (节点 ID, 节点 ID, 相似度)，按相似度从高到低排列。
+        """
+        seen: Set[Tuple[str, str]] = set()
+        results = []
+        features = self._doc_features
+        for bucket in self._buckets.values():
+            if len(bucket) < 2:
+                continue
+            members = sorted(bucket)
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    if (first, second) in seen:
+                        continue
+                    seen.add((first, second))
+                    score = similarity(features[first], features[second])
+                    if score >= threshold:
+                        results.append((first, second, score))
+        results.sort(key=lambda item: (-item[2], item[0], item[1]))
+        return results[:limit] if limit is not None else results
@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+import time
+
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Node, Knowledge_Edge
+from src.graph_manager.knowledge_core.persistent_map import PersistentMap
+
+if TYPE_CHECKING:
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+
+def _node_content(node: Knowledge_Node) -> Tuple[Any, ...]:
+    """内部辅助函数：节点参与比较的内容。边列表由边的增删体现，不参与比较。"""
+    return (node.title, node.description, node.tags)
+
+
+def _edge_content(edge: Knowledge_Edge) -> Tuple[Any, ...]:
+    """内部辅助函数：边参与比较的内容。"""
+    return (edge.title, edge.description, edge.start_node_id, edge.end_node_id)
+
+
+def _node_record(node: Knowledge_Node) -> Knowledge_Node:
+    """内部辅助函数：复制节点作为快照中的记录。记录创建后不再修改，可以被多个快照共享。"""
+    return node.model_copy(update={"tags": list(node.tags), "in_edge": list(node.in_edge), "out_edge": list(node.out_edge)})
+
+
+def _edge_record(edge: Knowledge_Edge) -> Knowledge_Edge:
+    """内部辅助函数：复制边作为快照中的记录。记录不引用图谱中的节点对象。"""
+    record = edge.model_copy()
+    record._start_node = None
+    record._end_node = None
+    return record
+
+
+class GraphDiff(BaseModel):
+    """
+    两个图谱版本之间的差异，列出新增、删除与内容发生变化的节点和边的 ID。
+    """
+    from_version: int
+    to_version: int
+    added_nodes: List[str] = Field(default_factory=list)
+    removed_nodes: List[str] = Field(default_factory=list)
+    changed_nodes: List[str] = Field(default_factory=list)
+    added_edges: List[str] = Field(default_factory=list)
+    removed_edges: List[str] = Field(default_factory=list)
+    changed_edges: List[str] = Field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added_nodes or self.removed_nodes or self.changed_nodes
+                    or self.added_edges or self.removed_edges or self.changed_edges)
+
+    @property
+    def change_count(self) -> int:
+        return (len(self.added_nodes) + len(self.removed_nodes) + len(self.changed_nodes)
+                + len(self.added_edges) + len(self.removed_edges) + len(self.changed_edges))
+
+
+class GraphSnapshot:
+    """
+    知识图谱在某一版本的只读快照。
+
+    - 节点与边存放在持久化字典中，与图谱后续的版本共享未修改的部分，创建代价为 O(1)
+    - 快照创建后不再变化，读取时无需加锁，也不受图谱后续修改的影响
+    - 返回的节点与边对象为快照内部的记录，请勿修改
+    """
+    __slots__ = ("name", "version", "created_at", "_nodes", "_edges")
+
+    def __init__(self, name: str, version: int, nodes: PersistentMap[str, Knowledge_Node], edges: PersistentMap[str, Knowledge_Edge]):
+        self.name = name
+        self.version = version
+        self.created_at = time.time()
+        self._nodes = nodes
+        self._edges = edges
+
+    def __repr__(self) -> str:
+        return f"GraphSnapshot(name={self.name!r}, version={self.version}, nodes={len(self._nodes)}, edges={len(self._edges)})"
+
+    @property
+    def nodes(self) -> PersistentMap[str, Knowledge_Node]:
+        """以 ID 为键的节点字典（只读）。"""
+        return self._nodes
+
+    @property
+    def edges(self) -> PersistentMap[str, Knowledge_Edge]:
+        """以 ID 为键的边字典（只读）。"""
+        return self._edges
+
+    def get_node(self, node_id: str) -> Optional[Knowledge_Node]:
+        """根据ID获取节点。"""
+        return self._nodes.get(node_id)
+
+    def get_edge(self, edge_id: str) -> Optional[Knowledge_Edge]:
+        """根据ID获取边。"""
+        return self._edges.get(edge_id)
+
+    def get_all_node(self) -> List[Knowledge_Node]:
+        """获取快照中的所有节点。"""
+        return list(self._nodes.values())
+
+    def get_all_edge(self) -> List[Knowledge_Edge]:
+        """获取快照中的所有边。"""
+        return list(self._edges.values())
+
+    def get_out_edge(self, node_id: str) -> List[Knowledge_Edge]:
+        """获取指定节点的所有出边。"""
+        node = self._nodes.get(node_id)
+        return [] if node is None else [self._edges[edge_id] for edge_id in node.out_edge]
+
+    def get_in_edge(self, node_id: str) -> List[Knowledge_Edge]:
+        """获取指定节点的所有入边。"""
+        node = self._nodes.get(node_id)
+        return [] if node is None else [self._edges[edge_id] for edge_id in node.in_edge]
+
+    def to_graph(self, name: Optional[str] = None) -> Knowledge_Graph:
+        """
+        将快照还原为一个独立的知识图谱，代价为 O(n)。
+
+        Args:
+            name (Optional[str]): 新图谱的名称，默认为快照对应图谱的名称。
+
+        Returns:
+            Knowledge_Graph: 与快照内容相同、可以修改的新图谱。
+        """
+        from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+        return Knowledge_Graph(
+            name=name or self.name,
+            nodes={node_id: _node_record(node) for node_id, node in self._nodes.items()},
+            edges={edge_id: _edge_record(edge) for edge_id, edge in self._edges.items()},
+        )
+
+    def node_changes(self, other: GraphSnapshot) -> Iterator[Tuple[str, Optional[Knowledge_Node], Optional[Knowledge_Node]]]:
+        """逐个产出内容不同的节点：(ID, 本快照中的节点, other 中的节点)，只在一侧存在时另一侧为 None。"""
+        for node_id, old, new in self._nodes.diff(other._nodes):
+            if old is None or new is None or _node_content(old) != _node_content(new):
+                yield node_id, old, new
+
+    def edge_changes(self, other: GraphSnapshot) -> Iterator[Tuple[str, Optional[Knowledge_Edge], Optional[Knowledge_Edge]]]:
+        """逐个产出内容不同的边：(ID, 本快照中的边, other 中的边)，只在一侧存在时另一侧为 None。"""
+        for edge_id, old, new in self._edges.diff(other._edges):
+            if old is None or new is None or _edge_content(old) != _edge_content(new):
+                yield edge_id, old, new
+
+    def diff(self, other: GraphSnapshot) -> GraphDiff:
+        """
+        比较两个快照，列出从本快照到 other 的变化。
+        同一图谱的两个快照共享未修改的部分，代价与两者之间的修改量成正比。
+
+        Args:
+            other (GraphSnapshot): 较新（或要比较）的快照。
+
+        Returns:
+            GraphDiff: 从本快照到 other 的差异。
+        """
+        result = GraphDiff(from_version=self.version, to_version=other.version)
+        for changes, added, removed, changed in (
+            (self.node_changes(other), result.added_nodes, result.removed_nodes, result.changed_nodes),
+            (self.edge_changes(other), result.added_edges, result.removed_edges, result.changed_edges),
+        ):
+            for item_id, old, new in changes:
+                if old is None:
+                    added.append(item_id)
+                elif new is None:
+                    removed.append(item_id)
+                else:
+                    changed.append(item_id)
+        return result
+
+
+class SnapshotTracker:
+    """
+    快照跟踪器：作为 Knowledge_Graph 的修改监听器，随每次修改更新持久化字典中的节点与边记录。
+
+    - 每次修改只复制受影响的记录与持久化字典中的 O(log n) 个节点，获取快照为 O(1)
+    - 遇到无法识别的修改，或图谱在未通知监听器的情况下被修改（如 add_batch 回滚）时，
+      在下次获取快照时从图谱整体重建
+    """
+
+    def __init__(self, graph: Knowledge_Graph):
+        self._graph = graph
+        self._nodes: PersistentMap[str, Knowledge_Node] = PersistentMap()
+        self._edges: PersistentMap[str, Knowledge_Edge] = PersistentMap()
+        self._version = -1
+        self._resync()
+
+    def _resync(self):
+        """内部辅助方法：由图谱的当前状态重建全部记录，代价为 O(n)。"""
+        graph = self._graph
+        self._nodes = PersistentMap((node_id, _node_record(node)) for node_id, node in graph.nodes.items())
+        self._edges = PersistentMap((edge_id, _edge_record(edge)) for edge_id, edge in graph.edges.items())
+        self._version = graph.version
+
+    def snapshot(self) -> GraphSnapshot:
+        """返回图谱当前状态的快照。"""
+        if self._version != self._graph.version:
+            self._resync()
+        return GraphSnapshot(self._graph.name, self._version, self._nodes, self._edges)
+
+    def __call__(self, op: str, payload: Dict[str, Any]):
+        handler = self._HANDLERS.get(op)
+        # 每次修改使版本号恰好加一；版本号不连续说明中间有未通知监听器的修改
+        if handler is None or self._version == -1 or self._graph.version != self._version + 1:
+            self._version = -1 # 下次获取快照时整体重建
+            return
+        try:
+            handler(self, payload)
+        except (KeyError, ValueError):
+            self._version = -1
+            return
+        self._version = self._graph.version
+
+    # 修改处理
+
+    def _link(self, node_id: str, field: str, edge_id: str, add: bool):
+        """内部辅助方法：复制节点记录并在其 in_edge/out_edge 中加入或移除一条边。"""
+        node = self._nodes[node_id]
+        edge_ids = getattr(node, field)
+        edge_ids = edge_ids + [edge_id] if add else [item for item in edge_ids if item != edge_id]
+        self._nodes = self._nodes.set(node_id, node.model_copy(update={field: edge_ids}))
+
+    def _add_node(self, data: Dict[str, Any]):
+        node = Knowledge_Node(**data)
+        self._nodes = self._nodes.set(node.id, node)
+
+    def _add_edge(self, data: Dict[str, Any]):
+        edge = Knowledge_Edge(**data)
+        self._edges = self._edges.set(edge.id, edge)
+        self._link(edge.start_node_id, "out_edge", edge.id, True)
+        self._link(edge.end_node_id, "in_edge", edge.id, True)
+
+    def _remove_edge(self, edge_id: str):
+        edge = self._edges[edge_id]
+        self._edges = self._edges.delete(edge_id)
+        if edge.start_node_id in self._nodes:
+            self._link(edge.start_node_id, "out_edge", edge_id, False)
+        if edge.end_node_id in self._nodes:
+            self._link(edge.end_node_id, "in_edge", edge_id, False)
+
+    def _on_add_node(self, payload: Dict[str, Any]):
+        self._add_node(payload["node"])
+
+    def _on_add_edge(self, payload: Dict[str, Any]):
+        self._add_edge(payload["edge"])
+
+    def _on_add_batch(self, payload: Dict[str, Any]):
+        for node in payload["nodes"]:
+            self._add_node(node)
+        for edge in payload["edges"]:
+            self._add_edge(edge)
+
+    def _on_remove_node(self, payload: Dict[str, Any]):
+        node = self._nodes[payload["id"]]
+        self._nodes = self._nodes.delete(node.id)
+        for edge_id in dict.fromkeys(node.in_edge + node.out_edge):
+            self._remove_edge(edge_id)
+
+    def _on_remove_edge(self, payload: Dict[str, Any]):
+        self._remove_edge(payload["id"])
+
+    def _on_merge_nodes(self, payload: Dict[str, Any]):
+        target_id, source_id = payload["target_id"], payload["source_id"]
+        source = self._nodes[source_id]
+        for edge_id in dict.fromkeys(source.out_edge + source.in_edge):
+            edge = self._edges[edge_id]
+            if {edge.start_node_id, edge.end_node_id} == {source_id, target_id}:
+                self._remove_edge(edge_id)
+                continue
+            changes = {}
+            if edge.start_node_id == source_id:
+                changes["start_node_id"] = target_id
+                self._link(target_id, "out_edge", edge_id, True)
+            if edge.end_node_id == source_id:
+                changes["end_node_id"] = target_id
+                self._link(target_id, "in_edge", edge_id, True)
+            self._edges = self._edges.set(edge_id, edge.model_copy(update=changes))
+        self._nodes = self._nodes.delete(source_id)
+        self._on_update("_nodes", {"id": target_id, "title": payload["title"], "description": payload.get("description"), "tags": payload["tags"]})
+
+    def _on_update(self, records: str, payload: Dict[str, Any]):
+        items: PersistentMap = getattr(self, records)
+        changes = {key: value for key, value in payload.items() if key != "id"}
+        if "tags" in changes:
+            changes["tags"] = list(changes["tags"])
+        setattr(self, records, items.set(payload["id"], items[payload["id"]].model_copy(update=changes)))
+
+    _HANDLERS = {
+        "add_node": _on_add_node,
+        "add_edge": _on_add_edge,
+        "add_batch": _on_add_batch,
+        "remove_node": _on_remove_node,
+        "remove_edge": _on_remove_edge,
+        "update_node": lambda self, payload: self._on_update("_nodes", payload),
+        "update_edge": lambda self, payload: self._on_update("_edges", payload),
+        "merge_nodes": _on_merge_nodes,
+    }
+
+
+def rollback(graph: Knowledge_Graph, snapshot: GraphSnapshot) -> GraphDiff:
+    """
+    将图谱恢复到快照中的状态，只修改两者之间不同的节点和边，代价与修改量成正比。
+
+    所有修改都通过图谱的 add/remove/update 方法完成，修改日志与存储后端会同步记录。
+    需要清空描述的节点或边无法通过 update 表达，会被删除后按快照中的内容重新添加（节点的边随之重新添加）。
+
+    Args:
+        graph (Knowledge_Graph): 要恢复的图谱。
+        snapshot (GraphSnapshot): 目标快照，通常由同一图谱较早时调用 snapshot() 得到。
+
+    Returns:
+        GraphDiff: 恢复过程中撤销的变化（从图谱当前状态到快照）。
+    """
+    current = graph.snapshot()
+    result = current.diff(snapshot)
+    if result.is_empty:
+        return result
+
+    remove_edges: List[str] = []
+    remove_nodes: List[str] = []
+    add_nodes: Dict[str, Knowledge_Node] = {}
+    add_edges: Dict[str, Knowledge_Edge] = {}
+    update_nodes: List[Knowledge_Node] = []
+    update_edges: List[Knowledge_Edge] = []
+
+    for node_id, old, new in current.node_changes(snapshot):
+        if new is None:
+            remove_nodes.append(node_id)
+        elif old is None:
+            add_nodes[node_id] = new
+        elif new.description is None and old.description is not None:
+            # 删除后重新添加，节点在快照中的边也需要重新添加
+            remove_nodes.append(node_id)
+            add_nodes[node_id] = new
+            for edge_id in new.in_edge + new.out_edge:
+                add_edges[edge_id] = snapshot.edges[edge_id]
+        else:
+            update_nodes.append(new)
+
+    for edge_id, old, new in current.edge_changes(snapshot):
+        if new is None:
+            remove_edges.append(edge_id)
+        elif old is None:
+            add_edges[edge_id] = new
+        elif _edge_content(old)[2:] != _edge_content(new)[2:] or (new.description is None and old.description is not None):
+            remove_edges.append(edge_id)
+            add_edges[edge_id] = new
+        else:
+            update_edges.append(new)
+
+    for edge_id in remove_edges:
+        if edge_id in graph.edges:
+            graph.remove_edge(edge_id)
+    for node_id in remove_nodes:
+        graph.remove_node(node_id)
+    for node in update_nodes:
+        graph.update_node(node.id, node.title, node.description, list(node.tags))
+    for edge in update_edges:
+        if edge.id in graph.edges:
+            graph.update_edge(edge.id, edge.title, edge.description)
+        else: # 随端点被删除后重新添加
+            add_edges[edge.id] = edge
+    graph.add_batch(
+        [Knowledge_Node(id=node.id, title=node.title, description=node.description, tags=list(node.tags)) for node in add_nodes.values()],
+        [Knowledge_Edge(**edge.model_dump()) for edge_id, edge in add_edges.items() if edge_id not in graph.edges],
+    )
+    return result
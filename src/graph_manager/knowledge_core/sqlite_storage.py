@@ -0,0 +1,516 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import sqlite3
+import threading
+
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Node, Knowledge_Edge
+from src.graph_manager.knowledge_core.graph_io import SQLITE_SUFFIXES, strip_graph_suffix
+from src.graph_manager.knowledge_core.text_index import rank_matches
+from src.graph_manager.knowledge_core.subgraph_view import DIRECTIONS
+from src.graph_manager.knowledge_core.storage import GraphStorage, Step, register_storage_backend
+
+if TYPE_CHECKING:
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+# 数据库格式的标识与版本，写在 meta 表中
+FORMAT_NAME = "kg-sqlite"
+FORMAT_VERSION = 1
+# 其它连接持有写锁时的最长等待时间（毫秒）
+BUSY_TIMEOUT_MS = 5000
+# trigram 分词器只能匹配不少于 3 个字符的子串，更短的关键词改为在 SQL 中逐行过滤
+TRIGRAM_MIN_LENGTH = 3
+
+# 表结构。seq 记录插入顺序，同时作为全文索引的 rowid；节点的 tags 以 JSON 数组保存原始顺序
+_TABLES = (
+    "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    """CREATE TABLE nodes (
+        seq INTEGER PRIMARY KEY,
+        id TEXT NOT NULL UNIQUE,
+        title TEXT NOT NULL,
+        description TEXT,
+        tags TEXT NOT NULL,
+        tag_text TEXT NOT NULL
+    )""",
+    """CREATE TABLE edges (
+        seq INTEGER PRIMARY KEY,
+        id TEXT NOT NULL UNIQUE,
+        title TEXT NOT NULL,
+        start_node_id TEXT NOT NULL,
+        end_node_id TEXT NOT NULL,
+        description TEXT
+    )""",
+    "CREATE TABLE tags (node_id TEXT NOT NULL, tag TEXT NOT NULL, folded TEXT NOT NULL)",
+    # 覆盖索引：按起点/终点扩展时只需读取索引
+    "CREATE INDEX edges_by_start ON edges (start_node_id, end_node_id, id)",
+    "CREATE INDEX edges_by_end ON edges (end_node_id, start_node_id, id)",
+    "CREATE INDEX tags_by_node ON tags (node_id)",
+    "CREATE INDEX tags_by_tag ON tags (tag, node_id)",
+    "CREATE INDEX tags_by_folded ON tags (folded, node_id)",
+)
+
+# 全文索引：不保存内容的 FTS5 表，由触发器与节点表、边表保持同步
+_FTS_TABLES = (
+    "CREATE VIRTUAL TABLE nodes_fts USING fts5(title, description, tag_text, content='', tokenize='trigram')",
+    "CREATE VIRTUAL TABLE edges_fts USING fts5(title, description, content='', tokenize='trigram')",
+    """CREATE TRIGGER nodes_fts_insert AFTER INSERT ON nodes BEGIN
+        INSERT INTO nodes_fts (rowid, title, description, tag_text)
+        VALUES (new.seq, new.title, coalesce(new.description, ''), new.tag_text);
+    END""",
+    """CREATE TRIGGER nodes_fts_delete AFTER DELETE ON nodes BEGIN
+        INSERT INTO nodes_fts (nodes_fts, rowid, title, description, tag_text)
+        VALUES ('delete', old.seq, old.title, coalesce(old.description, ''), old.tag_text);
+    END""",
+    """CREATE TRIGGER nodes_fts_update AFTER UPDATE ON nodes BEGIN
+        INSERT INTO nodes_fts (nodes_fts, rowid, title, description, tag_text)
+        VALUES ('delete', old.seq, old.title, coalesce(old.description, ''), old.tag_text);
+        INSERT INTO nodes_fts (rowid, title, description, tag_text)
+        VALUES (new.seq, new.title, coalesce(new.description, ''), new.tag_text);
+    END""",
+    """CREATE TRIGGER edges_fts_insert AFTER INSERT ON edges BEGIN
+        INSERT INTO edges_fts (rowid, title, description)
+        VALUES (new.seq, new.title, coalesce(new.description, ''));
+    END""",
+    """CREATE TRIGGER edges_fts_delete AFTER DELETE ON edges BEGIN
+        INSERT INTO edges_fts (edges_fts, rowid, title, description)
+        VALUES ('delete', old.seq, old.title, coalesce(old.description, ''));
+    END""",
+    """CREATE TRIGGER edges_fts_update AFTER UPDATE ON edges BEGIN
+        INSERT INTO edges_fts (edges_fts, rowid, title, description)
+        VALUES ('delete', old.seq, old.title, coalesce(old.description, ''));
+        INSERT INTO edges_fts (rowid, title, description)
+        VALUES (new.seq, new.title, coalesce(new.description, ''));
+    END""",
+)
+
+# 重建表结构时需要删除的表，索引与触发器随表一并删除
+_SCHEMA_TABLES = ("meta", "tags", "nodes_fts", "edges_fts", "nodes", "edges")
+
+_NODE_COLUMNS = "id, title, description, tags"
+_EDGE_COLUMNS = "id, title, start_node_id, end_node_id, description"
+
+# 一批 ID 以 JSON 数组的形式作为单个参数传入，避免 SQL 参数个数的限制
+_EXPAND_QUERIES = {
+    "out": "SELECT start_node_id, id, end_node_id FROM edges WHERE start_node_id IN (SELECT value FROM json_each(?1)) ORDER BY seq",
+    "in": "SELECT end_node_id, id, start_node_id FROM edges WHERE end_node_id IN (SELECT value FROM json_each(?1)) ORDER BY seq",
+    "both": """SELECT u, id, v FROM (
+        SELECT seq, start_node_id AS u, id, end_node_id AS v FROM edges WHERE start_node_id IN (SELECT value FROM json_each(?1))
+        UNION ALL
+        SELECT seq, end_node_id AS u, id, start_node_id AS v FROM edges WHERE end_node_id IN (SELECT value FROM json_each(?1))
+    ) ORDER BY seq""",
+}
+
+
+def _fts5_trigram_available() -> bool:
+    """内部辅助函数：检测当前 SQLite 是否支持 FTS5 的 trigram 分词器（SQLite 3.34+）。"""
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("CREATE VIRTUAL TABLE probe USING fts5(text, tokenize='trigram')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+def _fts_phrase(keyword: str) -> str:
+    """内部辅助函数：将关键词转义为 FTS5 短语查询。"""
+    return '"' + keyword.replace('"', '""') + '"'
+
+
+def _node_from_row(row: Tuple) -> Knowledge_Node:
+    """内部辅助函数：由 (id, title, description, tags) 行构造节点。"""
+    return Knowledge_Node(id=row[0], title=row[1], description=row[2], tags=json.loads(row[3]))
+
+
+def _edge_from_row(row: Tuple) -> Knowledge_Edge:
+    """内部辅助函数：由 (id, title, start_node_id, end_node_id, description) 行构造边。"""
+    return Knowledge_Edge(id=row[0], title=row[1], start_node_id=row[2], end_node_id=row[3], description=row[4])
+
+
+def _node_params(node: Dict[str, Any]) -> Tuple:
+    """内部辅助函数：节点字典对应的 nodes 表插入参数。"""
+    tags = node.get("tags") or []
+    return (node["id"], node["title"], node.get("description"), json.dumps(tags, ensure_ascii=False), " ".join(tags))
+
+
+def _tag_params(node_id: str, tags: Iterable[str]) -> List[Tuple[str, str, str]]:
+    """内部辅助函数：节点标签对应的 tags 表插入参数。"""
+    return [(node_id, tag, tag.lower()) for tag in tags]
+
+
+class SQLiteStorage(GraphStorage):
+    """
+    基于标准库 sqlite3 的知识图谱存储后端。
+
+    - 节点、边、标签分别存放在 nodes / edges / tags 表中，边表在起点和终点上建有覆盖索引，标签表在原样与小写形式上建有索引
+    - 关键词搜索使用 FTS5 trigram 全文索引获得候选集，再按与内存图谱相同的规则校验并排序
+    - 遍历按层批量查询，每一跳只需一次索引查询，不需要把整个图谱加载到内存
+    - 数据库使用 WAL 日志模式，多个进程可以同时以只读方式打开同一图谱，并与一个写入者并发
+
+    同一实例可被多个线程共享，所有数据库访问都在锁内进行。
+    """
+
+    def __init__(self, path: str | Path, readonly: bool = False, name: Optional[str] = None):
+        """
+        打开（或创建）SQLite 图谱数据库。
+
+        Args:
+            path (str | Path): 数据库文件路径。
+            readonly (bool): 是否以只读方式打开，只读时文件必须已存在。
+            name (Optional[str]): 新建数据库时写入的图谱名称，默认为文件主名。
+        """
+        self.path = Path(path)
+        self.readonly = readonly
+        self._lock = threading.RLock()
+
+        if readonly:
+            if not self.path.exists():
+                raise ValueError(f"图谱文件 {self.path} 不存在")
+            self._conn = sqlite3.connect(self.path.resolve().as_uri() + "?mode=ro", uri=True, isolation_level=None, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        self._conn.create_function("kg_lower", 1, lambda text: text.lower() if text else "", deterministic=True)
+
+        if not self._has_schema():
+            if readonly:
+                raise ValueError(f"文件 {self.path} 不是有效的图谱数据库")
+            with self._transaction():
+                self._create_schema(name or strip_graph_suffix(self.path))
+        self._check_format()
+        self._fts = self._meta("fts") == "trigram"
+        self._data_version = self._data_version_now()
+
+    def __repr__(self) -> str:
+        return f"SQLiteStorage(path={str(self.path)!r}, readonly={self.readonly})"
+
+    # 表结构
+
+    def _has_schema(self) -> bool:
+        """内部辅助方法：数据库中是否已建立图谱表结构。"""
+        row = self._conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meta'").fetchone()
+        return row is not None
+
+    def _create_schema(self, name: str):
+        """内部辅助方法：在当前事务中建立全部表、索引与全文索引。"""
+        for statement in _TABLES:
+            self._conn.execute(statement)
+        fts = _fts5_trigram_available()
+        if fts:
+            for statement in _FTS_TABLES:
+                self._conn.execute(statement)
+        self._conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+            ("format", FORMAT_NAME),
+            ("version", str(FORMAT_VERSION)),
+            ("name", name),
+            ("fts", "trigram" if fts else ""),
+        ])
+
+    def _drop_schema(self):
+        """内部辅助方法：在当前事务中删除全部表（索引与触发器随表一并删除）。"""
+        for table in _SCHEMA_TABLES:
+            self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def _check_format(self):
+        """内部辅助方法：校验数据库格式与版本。"""
+        if self._meta("format") != FORMAT_NAME:
+            raise ValueError(f"文件 {self.path} 不是有效的图谱数据库")
+        version = int(self._meta("version") or 0)
+        if version > FORMAT_VERSION:
+            raise ValueError(f"文件 {self.path} 的格式版本 {version} 高于当前支持的版本 {FORMAT_VERSION}")
+
+    def _meta(self, key: str) -> Optional[str]:
+        """内部辅助方法：读取 meta 表中的一项。"""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @contextmanager
+    def _transaction(self):
+        """内部辅助方法：在锁内执行一个写事务，出错时回滚。"""
+        if self.readonly:
+            raise ValueError(f"图谱数据库 {self.path} 以只读方式打开，无法修改")
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        """内部辅助方法：在锁内执行查询并返回全部结果行。"""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # 基本信息
+
+    @property
+    def name(self) -> str:
+        """图谱名称。"""
+        with self._lock:
+            return self._meta("name") or strip_graph_suffix(self.path)
+
+    def node_count(self) -> int:
+        """节点数量。"""
+        return self._query("SELECT count(*) FROM nodes")[0][0]
+
+    def edge_count(self) -> int:
+        """边数量。"""
+        return self._query("SELECT count(*) FROM edges")[0][0]
+
+    # 读取
+
+    def _has_node(self, node_id: str) -> bool:
+        """内部辅助方法：节点是否存在。"""
+        return bool(self._query("SELECT 1 FROM nodes WHERE id = ?", (node_id,)))
+
+    def get_node(self, node_id: str) -> Optional[Knowledge_Node]:
+        """根据 ID 获取节点，节点的 in_edge/out_edge 列表按边的插入顺序填充。节点不存在时返回 None。"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_NODE_COLUMNS} FROM nodes WHERE id = ?", (node_id,)).fetchone()
+            if row is None:
+                return None
+            node = _node_from_row(row)
+            node.in_edge = [r[0] for r in self._conn.execute("SELECT id FROM edges WHERE end_node_id = ? ORDER BY seq", (node_id,))]
+            node.out_edge = [r[0] for r in self._conn.execute("SELECT id FROM edges WHERE start_node_id = ? ORDER BY seq", (node_id,))]
+            return node
+
+    def get_edge(self, edge_id: str) -> Optional[Knowledge_Edge]:
+        """根据 ID 获取边，边不存在时返回 None。"""
+        rows = self._query(f"SELECT {_EDGE_COLUMNS} FROM edges WHERE id = ?", (edge_id,))
+        return _edge_from_row(rows[0]) if rows else None
+
+    def iter_nodes(self) -> Iterator[Knowledge_Node]:
+        """按插入顺序逐个生成所有节点，in_edge/out_edge 列表为空。"""
+        for row in self._query(f"SELECT {_NODE_COLUMNS} FROM nodes ORDER BY seq"):
+            yield _node_from_row(row)
+
+    def iter_edges(self) -> Iterator[Knowledge_Edge]:
+        """按插入顺序逐个生成所有边。"""
+        for row in self._query(f"SELECT {_EDGE_COLUMNS} FROM edges ORDER BY seq"):
+            yield _edge_from_row(row)
+
+    def get_out_edge(self, node_id: str) -> List[Knowledge_Edge]:
+        """获取指定节点的所有出边。"""
+        if not self._has_node(node_id):
+            raise ValueError(f"节点 ID {node_id} 不存在")
+        rows = self._query(f"SELECT {_EDGE_COLUMNS} FROM edges WHERE start_node_id = ? ORDER BY seq", (node_id,))
+        return [_edge_from_row(row) for row in rows]
+
+    def get_in_edge(self, node_id: str) -> List[Knowledge_Edge]:
+        """获取指定节点的所有入边。"""
+        if not self._has_node(node_id):
+            raise ValueError(f"节点 ID {node_id} 不存在")
+        rows = self._query(f"SELECT {_EDGE_COLUMNS} FROM edges WHERE end_node_id = ? ORDER BY seq", (node_id,))
+        return [_edge_from_row(row) for row in rows]
+
+    def get_edges_between(self, start_node_id: str, end_node_id: str) -> List[Knowledge_Edge]:
+        """获取从起始节点直接指向结束节点的所有边。"""
+        rows = self._query(
+            f"SELECT {_EDGE_COLUMNS} FROM edges WHERE start_node_id = ? AND end_node_id = ? ORDER BY seq",
+            (start_node_id, end_node_id),
+        )
+        return [_edge_from_row(row) for row in rows]
+
+    def expand(self, node_ids: Iterable[str], direction: str = 'out') -> List[Step]:
+        """一次索引查询获取一批节点沿指定方向的所有相邻边，按边的插入顺序返回。"""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"不支持的扩散方向: {direction}，可选值为 {', '.join(DIRECTIONS)}")
+        return self._query(_EXPAND_QUERIES[direction], (json.dumps(list(node_ids), ensure_ascii=False),))
+
+    # 搜索
+
+    def _keyword_rows(self, table: str, columns: str, text_columns: Tuple[str, ...], keyword: str, case_sensitive: bool) -> List[Tuple]:
+        """
+        内部辅助方法：获取可能包含关键词的行（超集），由调用方校验。
+        关键词足够长时使用全文索引，否则在 SQL 中按子串过滤。
+        """
+        if self._fts and len(keyword) >= TRIGRAM_MIN_LENGTH:
+            return self._query(
+                f"SELECT {columns} FROM {table} WHERE seq IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)",
+                (_fts_phrase(keyword),),
+            )
+        if case_sensitive:
+            condition = " OR ".join(f"instr(coalesce({column}, ''), ?1)" for column in text_columns)
+            return self._query(f"SELECT {columns} FROM {table} WHERE {condition}", (keyword,))
+        condition = " OR ".join(f"instr(kg_lower({column}), ?1)" for column in text_columns)
+        return self._query(f"SELECT {columns} FROM {table} WHERE {condition}", (keyword.lower(),))
+
+    def search_nodes_by_keyword(self, keyword: str, case_sensitive: bool = False, limit: Optional[int] = None) -> List[Knowledge_Node]:
+        """根据关键词搜索节点，匹配 title、description 和 tags，排序规则与内存图谱一致。"""
+        rows = self._keyword_rows("nodes", _NODE_COLUMNS + ", tag_text", ("title", "description", "tag_text"), keyword, case_sensitive)
+        fold = (lambda text: text) if case_sensitive else str.lower
+        by_id = {row[0]: row for row in rows}
+        docs = ((row[0], (fold(row[1]), fold(row[2] or ""), fold(row[4]))) for row in rows)
+        node_ids = rank_matches(docs, keyword if case_sensitive else keyword.lower(), limit)
+        return [_node_from_row(by_id[node_id]) for node_id in node_ids]
+
+    def search_edges_by_keyword(self, keyword: str, case_sensitive: bool = False, limit: Optional[int] = None) -> List[Knowledge_Edge]:
+        """根据关键词搜索边，匹配 title 和 description，排序规则与内存图谱一致。"""
+        rows = self._keyword_rows("edges", _EDGE_COLUMNS, ("title", "description"), keyword, case_sensitive)
+        fold = (lambda text: text) if case_sensitive else str.lower
+        by_id = {row[0]: row for row in rows}
+        docs = ((row[0], (fold(row[1]), fold(row[4] or ""))) for row in rows)
+        edge_ids = rank_matches(docs, keyword if case_sensitive else keyword.lower(), limit)
+        return [_edge_from_row(by_id[edge_id]) for edge_id in edge_ids]
+
+    def search_nodes_by_tag(self, tags: List[str], mode: str = 'AND', case_sensitive: bool = False) -> List[Knowledge_Node]:
+        """根据一个或多个标签搜索节点，通过标签表的索引求交或求并，结果按节点插入顺序排列。"""
+        column = "tag" if case_sensitive else "folded"
+        search_tags = sorted(set(tags) if case_sensitive else {tag.lower() for tag in tags})
+        if not search_tags:
+            return []
+        params: Tuple = (json.dumps(search_tags, ensure_ascii=False),)
+        mode = mode.upper()
+        if mode == 'AND':
+            matched = f"SELECT node_id FROM tags WHERE {column} IN (SELECT value FROM json_each(?1)) GROUP BY node_id HAVING count(DISTINCT {column}) = ?2"
+            params += (len(search_tags),)
+        elif mode == 'OR':
+            matched = f"SELECT node_id FROM tags WHERE {column} IN (SELECT value FROM json_each(?1))"
+        else:
+            return []
+        rows = self._query(f"SELECT {_NODE_COLUMNS} FROM nodes WHERE id IN ({matched}) ORDER BY seq", params)
+        return [_node_from_row(row) for row in rows]
+
+    def get_top_k_tags(self, top_k: int = 10) -> List[Tuple[str, int]]:
+        """统计所有节点中最常出现的标签（区分大小写），次数相同时先出现的标签靠前。"""
+        rows = self._query("SELECT tag, count(*) AS n FROM tags GROUP BY tag ORDER BY n DESC, min(rowid) LIMIT ?", (top_k,))
+        return [(tag, count) for tag, count in rows]
+
+    # 写入
+
+    def _insert_node(self, conn: sqlite3.Connection, node: Dict[str, Any]):
+        """内部辅助方法：插入一个节点及其标签。"""
+        try:
+            conn.execute("INSERT INTO nodes (id, title, description, tags, tag_text) VALUES (?, ?, ?, ?, ?)", _node_params(node))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"节点 ID {node['id']} 已存在")
+        conn.executemany("INSERT INTO tags (node_id, tag, folded) VALUES (?, ?, ?)", _tag_params(node["id"], node.get("tags") or []))
+
+    def _insert_edge(self, conn: sqlite3.Connection, edge: Dict[str, Any]):
+        """内部辅助方法：校验端点后插入一条边。"""
+        for key, label in (("start_node_id", "起始"), ("end_node_id", "结束")):
+            if conn.execute("SELECT 1 FROM nodes WHERE id = ?", (edge[key],)).fetchone() is None:
+                raise ValueError(f"{label}节点 ID {edge[key]} 不存在")
+        try:
+            conn.execute(
+                "INSERT INTO edges (id, title, start_node_id, end_node_id, description) VALUES (?, ?, ?, ?, ?)",
+                (edge["id"], edge["title"], edge["start_node_id"], edge["end_node_id"], edge.get("description")),
+            )
+        except sqlite3.IntegrityError:
+            raise ValueError(f"边 ID {edge['id']} 已存在")
+
+    def _merge_nodes(self, conn: sqlite3.Connection, payload: Dict[str, Any]):
+        """内部辅助方法：将源节点的边改为连接目标节点，删除两者之间的边与源节点，并写入目标节点合并后的内容。"""
+        target_id, source_id = payload["target_id"], payload["source_id"]
+        for node_id in (target_id, source_id):
+            if conn.execute("SELECT 1 FROM nodes WHERE id = ?", (node_id,)).fetchone() is None:
+                raise ValueError(f"节点 ID {node_id} 不存在")
+        conn.execute(
+            "DELETE FROM edges WHERE (start_node_id = ?1 AND end_node_id = ?2) OR (start_node_id = ?2 AND end_node_id = ?1)",
+            (source_id, target_id),
+        )
+        conn.execute("UPDATE edges SET start_node_id = ? WHERE start_node_id = ?", (target_id, source_id))
+        conn.execute("UPDATE edges SET end_node_id = ? WHERE end_node_id = ?", (target_id, source_id))
+        conn.execute("DELETE FROM nodes WHERE id = ?", (source_id,))
+        conn.execute("DELETE FROM tags WHERE node_id IN (?, ?)", (source_id, target_id))
+        node = {"id": target_id, "title": payload["title"], "description": payload.get("description"), "tags": payload["tags"]}
+        conn.execute("UPDATE nodes SET title = ?, description = ?, tags = ?, tag_text = ? WHERE id = ?", _node_params(node)[1:] + (target_id,))
+        conn.executemany("INSERT INTO tags (node_id, tag, folded) VALUES (?, ?, ?)", _tag_params(target_id, node["tags"]))
+
+    def apply(self, op: str, payload: Dict[str, Any]):
+        """
+        在一个事务中应用一次修改，参数与 Knowledge_Graph 的修改事件一致。
+        挂载到内存图谱后，图谱的每次修改都会立即写入数据库。
+        """
+        with self._transaction() as conn:
+            if op == "add_node":
+                self._insert_node(conn, payload["node"])
+            elif op == "add_edge":
+                self._insert_edge(conn, payload["edge"])
+            elif op == "add_batch":
+                for node in payload["nodes"]:
+                    self._insert_node(conn, node)
+                for edge in payload["edges"]:
+                    self._insert_edge(conn, edge)
+            elif op == "remove_node":
+                node_id = payload["id"]
+                if conn.execute("DELETE FROM nodes WHERE id = ?", (node_id,)).rowcount == 0:
+                    raise ValueError(f"节点 ID {node_id} 不存在")
+                conn.execute("DELETE FROM edges WHERE start_node_id = ?1 OR end_node_id = ?1", (node_id,))
+                conn.execute("DELETE FROM tags WHERE node_id = ?", (node_id,))
+            elif op == "remove_edge":
+                if conn.execute("DELETE FROM edges WHERE id = ?", (payload["id"],)).rowcount == 0:
+                    raise ValueError(f"边 ID {payload['id']} 不存在")
+            elif op == "update_node":
+                node_id = payload["id"]
+                row = conn.execute("SELECT title, description, tags FROM nodes WHERE id = ?", (node_id,)).fetchone()
+                if row is None:
+                    raise ValueError(f"节点 ID {node_id} 不存在")
+                tags = payload["tags"] if payload.get("tags") is not None else json.loads(row[2])
+                node = {"id": node_id, "title": payload.get("title", row[0]), "description": payload.get("description", row[1]), "tags": tags}
+                conn.execute("UPDATE nodes SET title = ?, description = ?, tags = ?, tag_text = ? WHERE id = ?", _node_params(node)[1:] + (node_id,))
+                if payload.get("tags") is not None:
+                    conn.execute("DELETE FROM tags WHERE node_id = ?", (node_id,))
+                    conn.executemany("INSERT INTO tags (node_id, tag, folded) VALUES (?, ?, ?)", _tag_params(node_id, tags))
+            elif op == "update_edge":
+                edge_id = payload["id"]
+                row = conn.execute("SELECT title, description FROM edges WHERE id = ?", (edge_id,)).fetchone()
+                if row is None:
+                    raise ValueError(f"边 ID {edge_id} 不存在")
+                conn.execute(
+                    "UPDATE edges SET title = ?, description = ? WHERE id = ?",
+                    (payload.get("title", row[0]), payload.get("description", row[1]), edge_id),
+                )
+            elif op == "merge_nodes":
+                self._merge_nodes(conn, payload)
+            else:
+                raise ValueError(f"不支持的修改操作: {op}")
+
+    def write_graph(self, graph: Knowledge_Graph):
+        """
+        在一个事务中用内存图谱的全部内容替换数据库：重建表结构后批量插入，索引与全文索引一并重建。
+        其它进程的读取者在事务提交前始终看到旧数据。
+        """
+        with self._transaction() as conn:
+            self._drop_schema()
+            self._create_schema(graph.name)
+            nodes = graph.nodes.values()
+            conn.executemany(
+                "INSERT INTO nodes (id, title, description, tags, tag_text) VALUES (?, ?, ?, ?, ?)",
+                (_node_params({"id": n.id, "title": n.title, "description": n.description, "tags": n.tags}) for n in nodes),
+            )
+            conn.executemany(
+                "INSERT INTO tags (node_id, tag, folded) VALUES (?, ?, ?)",
+                (params for n in nodes for params in _tag_params(n.id, n.tags)),
+            )
+            conn.executemany(
+                "INSERT INTO edges (id, title, start_node_id, end_node_id, description) VALUES (?, ?, ?, ?, ?)",
+                ((e.id, e.title, e.start_node_id, e.end_node_id, e.description) for e in graph.edges.values()),
+            )
+        self._fts = self._meta("fts") == "trigram"
+
+    def _data_version_now(self) -> int:
+        """内部辅助方法：SQLite 的 data_version，其他连接每提交一次事务该值都会改变，本连接的提交不会。"""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def modified_externally(self) -> bool:
+        """数据库自打开以来是否被其他连接提交过修改。"""
+        return self._data_version_now() != self._data_version
+
+    def close(self):
+        """卸载监听器并关闭数据库连接。"""
+        self.detach()
+        with self._lock:
+            self._conn.close()
+
+
+register_storage_backend(SQLITE_SUFFIXES, lambda path, readonly: SQLiteStorage(path, readonly))
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Node, Knowledge_Edge
+from src.graph_manager.knowledge_core.subgraph_view import DIRECTIONS
+
+if TYPE_CHECKING:
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+# (起点 ID, 边 ID, 终点 ID)：沿扩散方向经过的一条边，起点为已访问一侧
+Step = Tuple[str, str, str]
+
+
+class GraphStorage(ABC):
+    """
+    知识图谱存储后端接口。
+
+    后端负责在外部存储中保存节点、边和标签，并通过各自的索引直接回答读取、搜索与遍历查询，
+    不需要把整个图谱加载为 pydantic 对象。
+
+    - 读取与搜索接口的语义与 Knowledge_Graph 的同名方法一致
+    - 遍历（k 跳邻域、最短路径）由本类基于 `expand` 逐层实现，后端只需一次查询返回整层的相邻边
+    - `apply` 的参数与 Knowledge_Graph 的修改事件一致，可作为修改监听器把内存图谱的修改直接写入后端
+    - 需要完整的内存图谱时调用 `load_graph`，整体写回时调用 `write_graph`
+
+    后端返回的边对象没有链接节点对象（访问 start_node/end_node 会抛出异常），请使用节点 ID。
+    """
+
+    def __enter__(self) -> GraphStorage:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # 基本信息
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """图谱名称。"""
+
+    @abstractmethod
+    def node_count(self) -> int:
+        """节点数量。"""
+
+    @abstractmethod
+    def edge_count(self) -> int:
+        """边数量。"""
+
+    # 读取
+
+    @abstractmethod
+    def get_node(self, node_id: str) -> Optional[Knowledge_Node]:
+        """根据 ID 获取节点，节点的 in_edge/out_edge 列表已填充。节点不存在时返回 None。"""
+
+    @abstractmethod
+    def get_edge(self, edge_id: str) -> Optional[Knowledge_Edge]:
+        """根据 ID 获取边，边不存在时返回 None。"""
+
+    @abstractmethod
+    def iter_nodes(self) -> Iterator[Knowledge_Node]:
+        """按插入顺序逐个生成所有节点，in_edge/out_edge 列表为空。"""
+
+    @abstractmethod
+    def iter_edges(self) -> Iterator[Knowledge_Edge]:
+        """按插入顺序逐个生成所有边。"""
+
+    @abstractmethod
+    def get_out_edge(self, node_id: str) -> List[Knowledge_Edge]:
+        """获取指定节点的所有出边。节点不存在时抛出 ValueError。"""
+
+    @abstractmethod
+    def get_in_edge(self, node_id: str) -> List[Knowledge_Edge]:
+        """获取指定节点的所有入边。节点不存在时抛出 ValueError。"""
+
+    @abstractmethod
+    def get_edges_between(self, start_node_id: str, end_node_id: str) -> List[Knowledge_Edge]:
+        """获取从起始节点直接指向结束节点的所有边。"""
+
+    @abstractmethod
+    def expand(self, node_ids: Iterable[str], direction: str = 'out') -> List[Step]:
+        """
+        获取一批节点沿指定方向的所有相邻边，是遍历查询的基本操作。
+
+        Args:
+            node_ids (Iterable[str]): 要扩展的节点 ID。
+            direction (str): 'out' 沿出边，'in' 沿入边，'both' 同时沿两个方向。
+
+        Returns:
+            List[Step]: (已访问一侧的节点 ID, 边 ID, 另一侧的节点 ID) 列表。
+        """
+
+    # 搜索
+
+    @abstractmethod
+    def search_nodes_by_keyword(self, keyword: str, case_sensitive: bool = False, limit: Optional[int] = None) -> List[Knowledge_Node]:
+        """根据关键词搜索节点，匹配 title、description 和 tags，标题匹配优先。"""
+
+    @abstractmethod
+    def search_edges_by_keyword(self, keyword: str, case_sensitive: bool = False, limit: Optional[int] = None) -> List[Knowledge_Edge]:
+        """根据关键词搜索边，匹配 title 和 description，标题匹配优先。"""
+
+    @abstractmethod
+    def search_nodes_by_tag(self, tags: List[str], mode: str = 'AND', case_sensitive: bool = False) -> List[Knowledge_Node]:
+        """根据一个或多个标签搜索节点，mode 为 'AND' 或 'OR'。"""
+
+    @abstractmethod
+    def get_top_k_tags(self, top_k: int = 10) -> List[Tuple[str, int]]:
+        """统计所有节点中最常出现的标签。"""
+
+    # 写入
+
+    @abstractmethod
+    def apply(self, op: str, payload: Dict[str, Any]):
+        """
+        应用一次修改。参数与 Knowledge_Graph 的修改事件一致（如 ('add_node', {"node": {...}})）。
+        修改与图谱当前状态冲突时抛出 ValueError。
+        """
+
+    @abstractmethod
+    def write_graph(self, graph: Knowledge_Graph):
+        """用内存图谱的全部内容整体替换后端中的数据。"""
+
+    @abstractmethod
+    def close(self):
+        """卸载监听器并关闭后端持有的资源。"""
+
+    # 基于上述接口的通用实现
+
+    _attached: Optional[Knowledge_Graph] = None
+
+    def attach(self, graph: Knowledge_Graph):
+        """将后端作为修改监听器挂载到内存图谱上，之后图谱的每次修改都直接写入后端。"""
+        self.detach()
+        self._attached = graph
+        graph.add_listener(self.apply)
+
+    def detach(self):
+        """从内存图谱上卸载后端。"""
+        if self._attached is not None:
+            self._attached.remove_listener(self.apply)
+            self._attached = None
+
+    def modified_externally(self) -> bool:
+        """
+        后端数据自打开以来是否被其他连接或进程修改过，用于判断内存中已加载的图谱是否需要重新加载。
+        默认返回 False，能够检测外部修改的后端应重写此方法。
+        """
+        return False
+
+    def load_graph(self, graph_cls: Optional[type] = None) -> Knowledge_Graph:
+        """
+        将后端中的全部数据加载为内存图谱，所有节点和边读取完毕后一次性建立索引。
+
+        Args:
+            graph_cls (Optional[type]): 要构造的图谱类，默认为 Knowledge_Graph。
+
+        Returns:
+            Knowledge_Graph: 加载得到的图谱。
+        """
+        if graph_cls is None:
+            from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+            graph_cls = Knowledge_Graph
+        nodes = {node.id: node for node in self.iter_nodes()}
+        edges = {edge.id: edge for edge in self.iter_edges()}
+        return graph_cls(name=self.name, nodes=nodes, edges=edges)
+
+    def get_neighbours(self, node_id: str, direction: str = 'both') -> List[Knowledge_Node]:
+        """获取指定节点沿某个方向的邻居节点（不包括自身）。"""
+        if self.get_node(node_id) is None:
+            raise ValueError(f"节点 ID {node_id} 不存在")
+        neighbour_ids = dict.fromkeys(v for _, _, v in self.expand([node_id], direction) if v != node_id)
+        return [self.get_node(neighbour_id) for neighbour_id in neighbour_ids]
+
+    def k_hop_scope(self, start_node_id: str, k: int, direction: str = 'out') -> Tuple[Dict[str, int], Dict[str, Tuple[str, str]]]:
+        """
+        从一个起始节点开始做至多 k 次扩散，只返回邻域的范围，不读取节点与边的内容。
+        每一跳只需一次 `expand` 查询，范围与 Knowledge_Graph.get_k_hop_neighborhood 一致。
+
+        Args:
+            start_node_id (str): 起始节点的ID。
+            k (int): 扩散的跳数（hops）。
+            direction (str): 扩散方向，'out'、'in' 或 'both'。
+
+        Returns:
+            Tuple[Dict[str, int], Dict[str, Tuple[str, str]]]: 节点 ID -> 跳数（按发现顺序排列），
+                以及经过的边 ID -> 该边两端的节点 ID。
+        """
+        if self.get_node(start_node_id) is None:
+            raise ValueError(f"起始节点 ID {start_node_id} 不存在")
+        if direction not in DIRECTIONS:
+            raise ValueError(f"不支持的扩散方向: {direction}，可选值为 {', '.join(DIRECTIONS)}")
+
+        hops: Dict[str, int] = {start_node_id: 0}
+        edge_ends: Dict[str, Tuple[str, str]] = {}
+        frontier = [start_node_id]
+        for depth in range(1, k + 1):
+            next_frontier = []
+            # 与内存图谱的 BFS 一样按上一跳节点的发现顺序扩展，截断时保留的节点与内存图谱一致
+            position = {node_id: i for i, node_id in enumerate(frontier)}
+            for u, edge_id, v in sorted(self.expand(frontier, direction), key=lambda step: position[step[0]]):
+                edge_ends[edge_id] = (u, v)
+                if v not in hops:
+                    hops[v] = depth
+                    next_frontier.append(v)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return hops, edge_ends
+
+    def get_k_hop_neighborhood(self, start_node_id: str, k: int, direction: str = 'out', name: Optional[str] = None) -> Knowledge_Graph:
+        """
+        从一个起始节点开始做至多 k 次扩散，只把得到的子图加载为独立的内存图谱，范围见 `k_hop_scope`。
+
+        Args:
+            start_node_id (str): 起始节点的ID。
+            k (int): 扩散的跳数（hops）。
+            direction (str): 扩散方向，'out'、'in' 或 'both'。
+            name (Optional[str]): 子图名称，默认为 "<图谱名称>_subgraph"。
+
+        Returns:
+            Knowledge_Graph: 包含子图所有节点和边的新图谱。
+        """
+        hops, edge_ends = self.k_hop_scope(start_node_id, k, direction)
+
+        from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+        # 节点原有的 in_edge/out_edge 列表会在建立子图索引时按子图中的边重新填充
+        nodes = {node_id: self.get_node(node_id) for node_id in hops}
+        edges = {edge_id: self.get_edge(edge_id) for edge_id in edge_ends}
+        return Knowledge_Graph(name=name or f"{self.name}_subgraph", nodes=nodes, edges=edges)
+
+    def find_path(self, start_node_id: str, goal_node_id: str, directed: bool = True, max_depth: Optional[int] = None) -> List[str]:
+        """
+        双向广度优先搜索最短路径，每轮从较小的一侧用一次 `expand` 查询扩展一整层。
+
+        Args:
+            start_node_id (str): 起始节点 ID。
+            goal_node_id (str): 目标节点 ID。
+            directed (bool): 是否沿边的方向查找。
+            max_depth (Optional[int]): 路径最多包含的边数，None 表示不限制。
+
+        Returns:
+            List[str]: 路径上的节点 ID 列表，如果不存在路径则返回空列表。
+        """
+        if self.get_node(start_node_id) is None or self.get_node(goal_node_id) is None:
+            raise ValueError("起始或终止节点不存在")
+        if max_depth is not None and max_depth < 0:
+            raise ValueError("max_depth 不能为负数")
+        if start_node_id == goal_node_id:
+            return [start_node_id]
+
+        forward_direction, backward_direction = ('out', 'in') if directed else ('both', 'both')
+        pred: Dict[str, Optional[str]] = {start_node_id: None}
+        succ: Dict[str, Optional[str]] = {goal_node_id: None}
+        forward_frontier = [start_node_id]
+        backward_frontier = [goal_node_id]
+        depth = 0
+        while forward_frontier and backward_frontier:
+            if max_depth is not None and depth >= max_depth:
+                return []
+            depth += 1
+            meet = None
+            if len(forward_frontier) <= len(backward_frontier):
+                visited, other, frontier, direction = pred, succ, forward_frontier, forward_direction
+            else:
+                visited, other, frontier, direction = succ, pred, backward_frontier, backward_direction
+            next_frontier = []
+            for u, _, v in self.expand(frontier, direction):
+                if v in visited:
+                    continue
+                visited[v] = u
+                if v in other:
+                    meet = v
+                    break
+                next_frontier.append(v)
+            if meet is not None:
+                path = []
+                node = meet
+                while node is not None:
+                    path.append(node)
+                    node = pred[node]
+                path.reverse()
+                node = succ[meet]
+                while node is not None:
+                    path.append(node)
+                    node = succ[node]
+                return path
+            if visited is pred:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+        return []
+
+
+# 文件后缀 -> 存储后端工厂，工厂接收 (文件路径, 是否只读)
+_BACKENDS: Dict[str, Callable[[Path, bool], GraphStorage]] = {}
+
+
+def register_storage_backend(suffixes: Iterable[str], factory: Callable[[Path, bool], GraphStorage]):
+    """
+    注册一种存储后端，之后后缀匹配的图谱文件都会通过该后端读写。
+
+    Args:
+        suffixes (Iterable[str]): 后端负责的文件后缀，如 ('.sqlite', '.db')。
+        factory (Callable[[Path, bool], GraphStorage]): 接收 (文件路径, 是否只读) 并返回后端实例。
+    """
+    for suffix in suffixes:
+        _BACKENDS[suffix] = factory
+
+
+def storage_suffixes() -> Tuple[str, ...]:
+    """获取所有已注册存储后端负责的文件后缀。"""
+    return tuple(_BACKENDS)
+
+
+def is_storage_path(filepath: str | Path) -> bool:
+    """判断文件是否由某个已注册的存储后端负责读写。"""
+    return str(filepath).endswith(tuple(_BACKENDS))
+
+
+def open_storage(filepath: str | Path, readonly: bool = False) -> GraphStorage:
+    """
+    根据文件后缀打开对应的存储后端。
+
+    Args:
+        filepath (str | Path): 图谱文件路径。
+        readonly (bool): 是否以只读方式打开，只读方式下多个进程可以同时读取同一图谱。
+
+    Returns:
+        GraphStorage: 打开的存储后端。
+    """
+    for suffix, factory in _BACKENDS.items():
+        if str(filepath).endswith(suffix):
+            return factory(Path(filepath), readonly)
+    raise ValueError(f"没有可处理文件 {filepath} 的存储后端，已支持的后缀为 {', '.join(_BACKENDS) or '无'}")
+
+
+# 注册内置后端（模块末尾导入，避免循环依赖）
+import src.graph_manager.knowledge_core.sqlite_storage  # noqa: E402,F401
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Collection, Dict, Iterator, List, Optional, TypeVar
+
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Node, Knowledge_Edge
+
+if TYPE_CHECKING:
+    from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+
+V = TypeVar("V")
+
+# k 跳邻域支持的扩散方向
+DIRECTIONS = ("out", "in", "both")
+
+
+class _RestrictedMapping(Mapping):
+    """
+    内部辅助类：父图 nodes/edges 字典在给定键集合上的只读视图，不复制任何对象。
+    """
+
+    __slots__ = ("_source", "_keys")
+
+    def __init__(self, source: Dict[str, V], keys: Collection[str]):
+        self._source = source
+        self._keys = keys
+
+    def __getitem__(self, key: str) -> V:
+        if key not in self._keys:
+            raise KeyError(key)
+        return self._source[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+
+class SubgraphView:
+    """
+    知识图谱的只读子图视图，只保存节点 ID 与边 ID 集合，节点和边对象直接引用父图。
+
+    - 创建视图不复制任何 pydantic 对象，代价只与子图规模成正比
+    - `nodes` / `edges` 提供与 Knowledge_Graph 相同形式的只读映射
+    - 需要独立的图谱对象时调用 `materialize()` 深拷贝生成新的 Knowledge_Graph
+
+    父图被修改后视图即过期（`is_stale` 为 True），此时其内容可能引用已删除的节点或边。
+    """
+
+    __slots__ = ("_graph", "_version", "_node_hops", "_edge_ids", "center_id", "k", "direction")
+
+    def __init__(self, graph: Knowledge_Graph, node_hops: Dict[str, int], edge_ids: Dict[str, None], center_id: str, k: int, direction: str):
+        self._graph = graph
+        self._version = graph.version
+        self._node_hops = node_hops  # 节点 ID -> 距中心节点的跳数（按发现顺序）
+        self._edge_ids = edge_ids  # 边 ID（按发现顺序）
+        self.center_id = center_id
+        self.k = k
+        self.direction = direction
+
+    def __len__(self) -> int:
+        return len(self._node_hops)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._node_hops
+
+    def __repr__(self) -> str:
+        return (f"SubgraphView(center_id={self.center_id!r}, k={self.k}, direction={self.direction!r}, "
+                f"nodes={len(self._node_hops)}, edges={len(self._edge_ids)})")
+
+    @property
+    def graph(self) -> Knowledge_Graph:
+        """视图所属的父图。"""
+        return self._graph
+
+    @property
+    def is_stale(self) -> bool:
+        """父图在视图创建之后是否被修改过。"""
+        return self._graph.version != self._version
+
+    @property
+    def nodes(self) -> Mapping[str, Knowledge_Node]:
+        """子图中节点 ID 到父图节点对象的只读映射。"""
+        return _RestrictedMapping(self._graph.nodes, self._node_hops)
+
+    @property
+    def edges(self) -> Mapping[str, Knowledge_Edge]:
+        """子图中边 ID 到父图边对象的只读映射。"""
+        return _RestrictedMapping(self._graph.edges, self._edge_ids)
+
+    def hop_of(self, node_id: str) -> int:
+        """获取节点距中心节点的跳数，节点不在子图中时抛出 KeyError。"""
+        return self._node_hops[node_id]
+
+    def nodes_at_hop(self, hop: int) -> List[Knowledge_Node]:
+        """获取恰好位于第 hop 跳的节点对象。"""
+        nodes = self._graph.nodes
+        return [nodes[node_id] for node_id, h in self._node_hops.items() if h == hop]
+
+    def materialize(self, name: Optional[str] = None) -> Knowledge_Graph:
+        """
+        将视图深拷贝为一个独立的 Knowledge_Graph，之后对其的修改不会影响父图。
+
+        Args:
+            name (Optional[str]): 新图谱的名称，默认为 "<父图名称>_subgraph"。
+
+        Returns:
+            Knowledge_Graph: 包含子图所有节点和边副本的新图谱。
+        """
+        if self.is_stale:
+            raise ValueError("子图视图已过期：父图在视图创建后被修改，请重新获取视图")
+        graph = self._graph
+        subgraph = type(graph)(name=name or f"{graph.name}_subgraph")
+        for node_id in self._node_hops:
+            subgraph.add_node(graph.nodes[node_id].model_copy(deep=True))
+        for edge_id in self._edge_ids:
+            subgraph.add_edge(graph.edges[edge_id].model_copy(deep=True))
+        return subgraph
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Tuple
+
+from src.graph_manager.knowledge_core.counters import RankedCounter
+
+
+def _posting_add(postings: Dict[str, Dict[str, int]], tag: str, node_id: str):
+    """内部辅助函数：向倒排表中添加一次 (标签, 节点) 出现。"""
+    bucket = postings.get(tag)
+    if bucket is None:
+        postings[tag] = {node_id: 1}
+    else:
+        bucket[node_id] = bucket.get(node_id, 0) + 1
+
+
+def _posting_remove(postings: Dict[str, Dict[str, int]], tag: str, node_id: str):
+    """内部辅助函数：从倒排表中移除一次 (标签, 节点) 出现。"""
+    bucket = postings[tag]
+    remaining = bucket[node_id] - 1
+    if remaining:
+        bucket[node_id] = remaining
+    else:
+        del bucket[node_id]
+        if not bucket:
+            del postings[tag]
+
+
+class TagIndex:
+    """
+    标签到节点 ID 的倒排索引，以及实时维护的标签频次表。
+
+    - 同时维护原样（区分大小写）与小写（不区分大小写）两套倒排表
+    - 倒排表中记录的是出现次数，以正确处理同一节点上重复或仅大小写不同的标签
+    - 标签频次统计的是所有节点上标签的出现总次数，与逐一计数的结果一致
+    """
+
+    __slots__ = ("_node_tags", "_exact", "_folded", "_counts")
+
+    def __init__(self):
+        self._node_tags: Dict[str, Tuple[str, ...]] = {}  # 节点 ID -> 索引时的标签
+        self._exact: Dict[str, Dict[str, int]] = {}  # 标签 -> {节点 ID: 出现次数}
+        self._folded: Dict[str, Dict[str, int]] = {}  # 小写标签 -> {节点 ID: 出现次数}
+        self._counts: RankedCounter[str] = RankedCounter(floor=1)
+
+    def add(self, node_id: str, tags: Iterable[str]):
+        """索引一个节点的所有标签。若节点已被索引则先移除旧标签。"""
+        if node_id in self._node_tags:
+            self.remove(node_id)
+        tags = tuple(tags)
+        self._node_tags[node_id] = tags
+        for tag in tags:
+            _posting_add(self._exact, tag, node_id)
+            _posting_add(self._folded, tag.lower(), node_id)
+            self._counts.increment(tag)
+
+    def remove(self, node_id: str):
+        """移除一个节点的所有标签，节点不存在时静默忽略。"""
+        for tag in self._node_tags.pop(node_id, ()):
+            _posting_remove(self._exact, tag, node_id)
+            _posting_remove(self._folded, tag.lower(), node_id)
+            self._counts.decrement(tag)
+
+    def query(self, tags: List[str], mode: str = 'AND', case_sensitive: bool = False) -> List[str]:
+        """
+        根据标签查询节点 ID。
+
+        Args:
+            tags (List[str]): 要搜索的标签列表。
+            mode (str): 'AND' 表示节点必须包含所有标签，'OR' 表示包含任一标签即可。
+            case_sensitive (bool): 是否区分大小写。
+
+        Returns:
+            List[str]: 匹配的节点 ID 列表；模式无效时返回空列表。
+        """
+        postings = self._exact if case_sensitive else self._folded
+        search_tags = set(tags) if case_sensitive else {tag.lower() for tag in tags}
+        if not search_tags:
+            return []
+
+        mode = mode.upper()
+        if mode == 'AND':
+            buckets = []
+            for tag in search_tags:
+                bucket = postings.get(tag)
+                if not bucket:
+                    return []
+                buckets.append(bucket)
+            buckets.sort(key=len) # 从最小的倒排表开始求交
+            smallest, others = buckets[0], buckets[1:]
+            return [node_id for node_id in smallest if all(node_id in other for other in others)]
+        if mode == 'OR':
+            result: Dict[str, None] = {}
+            for tag in search_tags:
+                result.update(dict.fromkeys(postings.get(tag, ())))
+            return list(result)
+        return []
+
+    def tag_count(self, tag: str) -> int:
+        """获取一个标签（区分大小写）在所有节点上的出现次数。"""
+        return self._counts.get(tag)
+
+    def node_count(self, tag: str, case_sensitive: bool = False) -> int:
+        """获取带有某个标签的节点数量，可用于估计查询的选择性。"""
+        postings = self._exact if case_sensitive else self._folded
+        return len(postings.get(tag if case_sensitive else tag.lower(), ()))
+
+    def top_k(self, top_k: int = 10) -> List[Tuple[str, int]]:
+        """获取出现次数最多的前 top_k 个标签，代价为 O(top_k)。"""
+        return self._counts.most_common(top_k)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class NGramIndex:
+    """
+    增量维护的字符 n-gram 倒排索引，用于子串搜索。
+
+    - 每个文档由若干文本字段组成（如标题、描述、标签），统一以小写形式切分
+    - 同时维护单字与二元组（bigram）倒排表，二元组对中文标题效果较好
+    - 查询时先对倒排表求交得到候选集，再对候选文档做一次子串校验，保证结果与全量扫描一致
+
+    字段顺序有意义：第 0 个字段视为标题，在排序时权重最高。
+    """
+
+    __slots__ = ("_postings", "_doc_grams", "_doc_fields", "_doc_folded")
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = {}  # gram -> 文档 ID 集合
+        self._doc_grams: Dict[str, Set[str]] = {}  # 文档 ID -> 文档包含的 gram
+        self._doc_fields: Dict[str, Tuple[str, ...]] = {}  # 文档 ID -> 原始字段
+        self._doc_folded: Dict[str, Tuple[str, ...]] = {}  # 文档 ID -> 小写字段
+
+    def __len__(self) -> int:
+        return len(self._doc_fields)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_fields
+
+    @staticmethod
+    def _grams(text: str) -> Set[str]:
+        """切分单字与二元组。"""
+        grams = set(text)
+        grams.update(text[i:i + 2] for i in range(len(text) - 1))
+        return grams
+
+    def add(self, doc_id: str, fields: Iterable[str]):
+        """
+        索引一个文档。若文档已存在则先移除旧内容。
+
+        Args:
+            doc_id (str): 文档 ID（节点或边的 ID）。
+            fields (Iterable[str]): 文档的文本字段，空字段请传入空字符串。
+        """
+        if doc_id in self._doc_fields:
+            self.remove(doc_id)
+
+        fields = tuple(fields)
+        folded = tuple(field.lower() for field in fields)
+        grams: Set[str] = set()
+        for field in folded:
+            grams |= self._grams(field)
+
+        postings = self._postings
+        for gram in grams:
+            bucket = postings.get(gram)
+            if bucket is None:
+                postings[gram] = {doc_id}
+            else:
+                bucket.add(doc_id)
+
+        self._doc_grams[doc_id] = grams
+        self._doc_fields[doc_id] = fields
+        self._doc_folded[doc_id] = folded
+
+    def remove(self, doc_id: str):
+        """从索引中移除一个文档，文档不存在时静默忽略。"""
+        grams = self._doc_grams.pop(doc_id, None)
+        if grams is None:
+            return
+        postings = self._postings
+        for gram in grams:
+            bucket = postings[gram]
+            bucket.discard(doc_id)
+            if not bucket:
+                del postings[gram]
+        del self._doc_fields[doc_id]
+        del self._doc_folded[doc_id]
+
+    def _candidates(self, folded_term: str) -> Optional[Set[str]]:
+        """
+        内部辅助方法：通过倒排表求交得到候选文档集合。
+        返回 None 表示空查询，即所有文档都是候选。
+        """
+        if not folded_term:
+            return None
+        if len(folded_term) == 1:
+            return set(self._postings.get(folded_term, ()))
+
+        grams = {folded_term[i:i + 2] for i in range(len(folded_term) - 1)}
+        buckets = []
+        for gram in grams:
+            bucket = self._postings.get(gram)
+            if not bucket:
+                return set()
+            buckets.append(bucket)
+        buckets.sort(key=len) # 从最小的倒排表开始求交
+        return buckets[0].intersection(*buckets[1:])
+
+    def search(self, term: str, case_sensitive: bool = False, limit: Optional[int] = None) -> List[str]:
+        """
+        搜索字段中包含 term 子串的文档，并按相关度排序。
+
+        排序规则：标题完全匹配 > 标题前缀匹配 > 标题包含 > 其它字段包含，同级时标题越短越靠前。
+
+        Args:
+            term (str): 查询子串。
+            case_sensitive (bool): 是否区分大小写。默认为False。
+            limit (Optional[int]): 最多返回的结果数量，None 表示不限制。
+
+        Returns:
+            List[str]: 匹配的文档 ID 列表。
+        """
+        folded_term = term.lower()
+        candidates = self._candidates(folded_term)
+        if candidates is None:
+            candidates = self._doc_fields.keys()
+
+        fields_of = self._doc_fields if case_sensitive else self._doc_folded
+        needle = term if case_sensitive else folded_term
+
+        return rank_matches(((doc_id, fields_of[doc_id]) for doc_id in candidates), needle, limit)
+
+
+def match_rank(fields: Tuple[str, ...], needle: str) -> Optional[int]:
+    """
+    计算文档与查询子串的匹配等级，数值越小越相关；不包含该子串时返回 None。
+    等级：标题完全匹配 0 > 标题前缀匹配 1 > 标题包含 2 > 其它字段包含 3。
+    """
+    title = fields[0] if fields else ""
+    if needle in title:
+        if title == needle:
+            return 0
+        if title.startswith(needle):
+            return 1
+        return 2
+    if any(needle in field for field in fields[1:]):
+        return 3
+    return None
+
+
+def rank_matches(docs: Iterable[Tuple[str, Tuple[str, ...]]], needle: str, limit: Optional[int] = None) -> List[str]:
+    """
+    校验候选文档并按相关度排序，同级时标题越短越靠前。
+
+    Args:
+        docs (Iterable[Tuple[str, Tuple[str, ...]]]): (文档 ID, 文本字段) 候选集，可以是超集。
+        needle (str): 查询子串，需与字段使用相同的大小写形式。
+        limit (Optional[int]): 最多返回的结果数量，None 表示不限制。
+
+    Returns:
+        List[str]: 匹配的文档 ID 列表。
+    """
+    ranked: List[Tuple[int, int, str]] = []
+    for doc_id, fields in docs:
+        rank = match_rank(fields, needle)
+        if rank is None:
+            continue # 候选集是超集，需要校验
+        ranked.append((rank, len(fields[0]) if fields else 0, doc_id))
+
+    ranked.sort()
+    if limit is not None:
+        ranked = ranked[:limit]
+    return [doc_id for _, _, doc_id in ranked]
@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import os
+import unicodedata
+import zlib
+
+import numpy as np
+
+from src.graph_manager.knowledge_core.graph_io import strip_graph_suffix
+
+# 向量索引文件的后缀与格式版本，文件与图谱文件放在同一目录（如 'math.json' -> 'math.vectors.npz'）
+VECTOR_INDEX_SUFFIX = ".vectors.npz"
+FORMAT_VERSION = 1
+
+# 特征哈希的维度；矩阵每行占用 DEFAULT_DIM * 6 字节（float16 词频 + float32 权重向量）
+DEFAULT_DIM = 1024
+# 提取的字符 n-gram 长度
+NGRAM_SIZES = (1, 2, 3)
+# 标题中的 n-gram 计数权重，使标题相近的节点排在只有描述相近的节点之前
+TITLE_BOOST = 2.0
+# 节点数量相对上次计算 IDF 时变化超过该比例时，重新计算 IDF 并重新加权所有向量
+IDF_REFRESH_RATIO = 0.2
+
+# 倒排分区（IVF）：节点数量达到 IVF_MIN_SIZE 时自动启用，分区数约为 sqrt(节点数)；规模较小时直接计算全部节点更快
+IVF_MIN_SIZE = 100000
+# 查询时检查的分区数下限，实际为 max(MIN_PROBES, 分区数 // 10)
+MIN_PROBES = 8
+# 训练分区中心时每个分区的采样数与 k-means 迭代次数
+SAMPLES_PER_PARTITION = 32
+KMEANS_ITERATIONS = 5
+# 整体重新加权或分配分区时每批处理的行数，限制临时矩阵的大小
+CHUNK_ROWS = 1024
+
+
+def vector_index_path_for(graph_path: str | Path) -> Path:
+    """根据图谱文件路径得到对应的向量索引文件路径（如 'math.ndjson.gz' -> 'math.vectors.npz'）。"""
+    graph_path = Path(graph_path)
+    return graph_path.with_name(strip_graph_suffix(graph_path) + VECTOR_INDEX_SUFFIX)
+
+
+def _segments(text: str) -> List[str]:
+    """内部辅助函数：规范化文本（全角转半角、转小写），并按空白与标点切分为连续的文字片段。"""
+    segments = []
+    current = []
+    for ch in unicodedata.normalize("NFKC", text).lower():
+        if ch.isalnum():
+            current.append(ch)
+        elif current:
+            segments.append("".join(current))
+            current = []
+    if current:
+        segments.append("".join(current))
+    return segments
+
+
+def _buckets(text: str, dim: int) -> List[int]:
+    """内部辅助函数：文本中所有字符 n-gram 的哈希桶。使用 crc32 而非 hash()，保证写入文件的向量在不同进程中一致。"""
+    buckets = []
+    for segment in _segments(text):
+        length = len(segment)
+        for n in NGRAM_SIZES:
+            for i in range(length - n + 1):
+                buckets.append(zlib.crc32(segment[i:i + n].encode("utf-8")) % dim)
+    return buckets
+
+
+def term_frequencies(fields: Sequence[str], dim: int = DEFAULT_DIM) -> np.ndarray:
+    """
+    计算文本的哈希词频向量：各 n-gram 计数（标题按 TITLE_BOOST 加权）取 log(1 + 计数)。
+
+    Args:
+        fields (Sequence[str]): 文本字段，第一个字段视为标题。
+        dim (int): 向量维度。
+
+    Returns:
+        np.ndarray: 长度为 dim 的 float32 向量。
+    """
+    counts = np.zeros(dim, dtype=np.float64)
+    for position, text in enumerate(fields):
+        if text:
+            buckets = _buckets(text, dim)
+            if buckets:
+                counts += np.bincount(buckets, minlength=dim) * (TITLE_BOOST if position == 0 else 1.0)
+    return np.log1p(counts).astype(np.float32)
+
+
+def fields_checksum(fields: Sequence[str]) -> int:
+    """文本字段的校验值，用于判断索引文件中的向量是否仍与节点内容一致。"""
+    return zlib.crc32("\x1f".join(fields).encode("utf-8"))
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """内部辅助函数：将矩阵的每一行原地归一化为单位向量，全零行保持不变。"""
+    norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix))[:, None]
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def _top_k(ids: Sequence[str], rows: np.ndarray, scores: np.ndarray, limit: int, min_score: float) -> List[Tuple[str, float]]:
+    """内部辅助函数：从一组行的得分中取出得分最高且为正、不低于 min_score 的 limit 个结果。"""
+    if len(scores) > limit:
+        chosen = np.argpartition(-scores, limit - 1)[:limit]
+        rows, scores = rows[chosen], scores[chosen]
+    order = np.argsort(-scores, kind="stable")
+    return [(ids[rows[i]], float(scores[i])) for i in order if scores[i] > 0 and scores[i] >= min_score]
+
+
+class VectorIndex:
+    """
+    增量维护的节点文本向量索引，用于按语义相近程度查找节点（无需外部模型）。
+
+    - 节点的标题、描述和标签按字符 n-gram 哈希为定长向量，以 TF-IDF 加权并归一化后存放在 NumPy 矩阵中
+    - 查询以矩阵乘法批量计算余弦相似度，再用 argpartition 取前 k 个结果
+    - 增删改节点时只更新对应的行；IDF 在节点数量变化超过 IDF_REFRESH_RATIO 后的下一次查询时整体重新计算
+    - 节点数量较多时可按倒排分区（IVF）划分，查询只检查与查询向量最接近的若干分区
+    - 词频矩阵可以保存到文件，重新加载时只需为内容已变化的节点重新计算向量
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM, partitions: Optional[int] = None):
+        """
+        Args:
+            dim (int): 向量维度。默认为 DEFAULT_DIM。
+            partitions (Optional[int]): 倒排分区数。None 表示节点数量达到 IVF_MIN_SIZE 时自动启用，0 表示不分区。
+        """
+        self.dim = dim
+        self.partitions = partitions
+        self._ids: List[str] = [] # 行号 -> 节点 ID
+        self._rows: Dict[str, int] = {} # 节点 ID -> 行号
+        self._checksums: List[int] = [] # 行号 -> 节点文本的校验值
+        self._tf = np.zeros((0, dim), dtype=np.float16) # 词频矩阵，按容量预分配
+        self._df = np.zeros(dim, dtype=np.int64) # 各维度的文档频率
+        self._idf: Optional[np.ndarray] = None # 当前使用的 IDF，None 表示需要（重新）计算
+        self._idf_size = 0 # 计算 IDF 时的节点数量
+        self._matrix = np.zeros((0, dim), dtype=np.float32) # TF-IDF 加权并归一化后的向量，仅在 _idf 有效时可用
+        self._centroids: Optional[np.ndarray] = None # 分区中心
+        self._assign = np.zeros(0, dtype=np.int32) # 行号 -> 所属分区
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    def _reserve(self, size: int):
+        """内部辅助方法：保证矩阵容量不小于 size，容量不足时翻倍扩展。"""
+        capacity = self._tf.shape[0]
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 64)
+        for name in ("_tf", "_matrix"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, self.dim), dtype=old.dtype)
+            new[:len(self._ids)] = old[:len(self._ids)]
+            setattr(self, name, new)
+        assign = np.zeros(capacity, dtype=np.int32)
+        assign[:len(self._ids)] = self._assign[:len(self._ids)]
+        self._assign = assign
+
+    def _weigh(self, tf: np.ndarray) -> np.ndarray:
+        """内部辅助方法：按当前 IDF 加权并归一化一行或多行词频。"""
+        weighted = np.atleast_2d(tf).astype(np.float32) * self._idf
+        return _normalize_rows(weighted)
+
+    def _set_row(self, row: int, tf: np.ndarray):
+        """内部辅助方法：写入一行词频，并在 IDF 与分区有效时同步更新加权向量与所属分区。"""
+        self._tf[row] = tf
+        if self._idf is not None:
+            vector = self._weigh(tf)
+            self._matrix[row] = vector[0]
+            if self._centroids is not None:
+                self._assign[row] = int(np.argmax(vector @ self._centroids.T))
+
+    def add(self, doc_id: str, fields: Sequence[str]):
+        """
+        索引一个节点。若节点已存在则更新其向量。
+
+        Args:
+            doc_id (str): 节点 ID。
+            fields (Sequence[str]): 节点的文本字段，第一个字段视为标题。
+        """
+        self._add(doc_id, term_frequencies(fields, self.dim), fields_checksum(fields))
+
+    def _add(self, doc_id: str, tf: np.ndarray, checksum: int):
+        """内部辅助方法：以已计算的词频索引一个节点。"""
+        row = self._rows.get(doc_id)
+        if row is None:
+            row = len(self._ids)
+            self._reserve(row + 1)
+            self._ids.append(doc_id)
+            self._checksums.append(checksum)
+            self._rows[doc_id] = row
+        else:
+            self._df -= self._tf[row] > 0
+            self._checksums[row] = checksum
+        self._df += tf > 0
+        self._set_row(row, tf)
+
+    def remove(self, doc_id: str):
+        """从索引中移除一个节点，节点不存在时静默忽略。最后一行会被移动到空出的行，矩阵始终保持紧凑。"""
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return
+        self._df -= self._tf[row] > 0
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._ids[row] = moved
+            self._checksums[row] = self._checksums[last]
+            self._rows[moved] = row
+            self._tf[row] = self._tf[last]
+            self._matrix[row] = self._matrix[last]
+            self._assign[row] = self._assign[last]
+        self._ids.pop()
+        self._checksums.pop()
+        self._tf[last] = 0
+        self._matrix[last] = 0
+
+    def _partition_count(self) -> int:
+        """内部辅助方法：当前应使用的分区数，0 表示不分区。"""
+        size = len(self._ids)
+        if self.partitions is None:
+            return int(math.sqrt(size)) if size >= IVF_MIN_SIZE else 0
+        return min(self.partitions, size)
+
+    def _prepare(self):
+        """
+        内部辅助方法：查询前按需重新计算 IDF 与加权向量，并按需训练分区。
+        重新计算 IDF 会使所有向量变化，因此分区中心随之失效并在之后重新训练；两次之间新增的节点直接分配到最近的分区。
+        """
+        size = len(self._ids)
+        if self._idf is None or abs(size - self._idf_size) > IDF_REFRESH_RATIO * max(self._idf_size, 1):
+            self._idf = (np.log((1 + size) / (1 + self._df)) + 1).astype(np.float32)
+            self._idf_size = size
+            for start in range(0, size, CHUNK_ROWS):
+                block = self._matrix[start:min(start + CHUNK_ROWS, size)]
+                np.multiply(self._tf[start:start + len(block)], self._idf, out=block)
+                _normalize_rows(block)
+            self._centroids = None
+        partitions = self._partition_count()
+        if partitions < 2:
+            self._centroids = None
+        elif self._centroids is None:
+            self._train(partitions)
+
+    def _train(self, partitions: int):
+        """内部辅助方法：在抽样的向量上以球面 k-means 训练分区中心，再为所有节点分配分区。"""
+        size = len(self._ids)
+        rng = np.random.default_rng(0)
+        sample = self._matrix[rng.choice(size, min(size, partitions * SAMPLES_PER_PARTITION), replace=False)]
+        centroids = sample[rng.choice(len(sample), partitions, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(labels, kind="stable")
+            present, starts = np.unique(labels[order], return_index=True)
+            # 没有分到样本的分区保留原来的中心
+            centroids[present] = np.add.reduceat(sample[order], starts, axis=0)
+            _normalize_rows(centroids)
+        self._centroids = centroids
+        for start in range(0, size, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, size)
+            self._assign[start:stop] = np.argmax(self._matrix[start:stop] @ centroids.T, axis=1)
+
+    def search(self, queries: Sequence[str], limit: int = 10, min_score: float = 0.0) -> List[List[Tuple[str, float]]]:
+        """
+        批量查找与各查询文本最相近的节点。
+
+        Args:
+            queries (Sequence[str]): 查询文本。
+            limit (int): 每个查询最多返回的结果数量。
+            min_score (float): 最低余弦相似度（0 到 1）。得分为 0（没有任何共同的 n-gram）的节点不会返回。
+
+        Returns:
+            List[List[Tuple[str, float]]]: 与 queries 一一对应的 (节点 ID, 相似度) 列表，按相似度从高到低排列。
+        """
+        size = len(self._ids)
+        if not queries:
+            return []
+        if not size or limit <= 0:
+            return [[] for _ in queries]
+        self._prepare()
+        vectors = self._weigh(np.stack([term_frequencies((query,), self.dim) for query in queries]))
+        matrix = self._matrix[:size]
+        if self._centroids is None:
+            scores = vectors @ matrix.T
+            all_rows = np.arange(size)
+            return [_top_k(self._ids, all_rows, row_scores, limit, min_score) for row_scores in scores]
+
+        probes = max(MIN_PROBES, len(self._centroids) // 10)
+        nearest = np.argsort(-(vectors @ self._centroids.T), axis=1)[:, :probes]
+        assign = self._assign[:size]
+        results = []
+        for vector, chosen in zip(vectors, nearest):
+            rows = np.flatnonzero(np.isin(assign, chosen))
+            results.append(_top_k(self._ids, rows, matrix[rows] @ vector, limit, min_score))
+        return results
+
+    def save(self, filepath: str | Path):
+        """
+        将词频矩阵保存到文件（先写临时文件再原子替换）。加权向量与分区在加载后按需重新计算。
+
+        Args:
+            filepath (str | Path): 目标文件路径，通常由 vector_index_path_for 给出。
+        """
+        filepath = Path(filepath)
+        tmp_path = filepath.with_name(filepath.name + ".tmp")
+        size = len(self._ids)
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    format_version=np.array(FORMAT_VERSION),
+                    dim=np.array(self.dim),
+                    ids=np.array(self._ids, dtype=np.str_),
+                    checksums=np.array(self._checksums, dtype=np.uint32),
+                    tf=self._tf[:size],
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    @classmethod
+    def load(cls, filepath: str | Path, docs: Iterable[Tuple[str, Sequence[str]]], partitions: Optional[int] = None) -> Tuple[VectorIndex, int]:
+        """
+        从文件加载索引，并与当前的节点内容对齐：内容未变化的节点直接复用文件中的词频，
+        其余节点重新计算，文件中已不存在的节点被丢弃。
+
+        Args:
+            filepath (str | Path): 索引文件路径。
+            docs (Iterable[Tuple[str, Sequence[str]]]): 当前所有节点的 (节点 ID, 文本字段)。
+            partitions (Optional[int]): 倒排分区数，含义与构造参数相同。
+
+        Returns:
+            Tuple[VectorIndex, int]: 加载的索引，以及从文件中复用的节点数量。
+
+        Raises:
+            ValueError: 文件格式版本不受支持。
+        """
+        with np.load(filepath, allow_pickle=False) as data:
+            if int(data["format_version"]) != FORMAT_VERSION:
+                raise ValueError(f"不支持的向量索引格式版本: {int(data['format_version'])}")
+            index = cls(int(data["dim"]), partitions)
+            saved = {doc_id: row for row, doc_id in enumerate(data["ids"].tolist())}
+            checksums = data["checksums"].tolist()
+            tf = data["tf"]
+        # 先整体复用内容未变化的行，再逐个计算其余节点
+        reused_ids, reused_rows, reused_checksums, changed = [], [], [], []
+        for doc_id, fields in docs:
+            checksum = fields_checksum(fields)
+            row = saved.get(doc_id)
+            if row is not None and checksums[row] == checksum:
+                reused_ids.append(doc_id)
+                reused_rows.append(row)
+                reused_checksums.append(checksum)
+            else:
+                changed.append((doc_id, fields))
+        reused = len(reused_ids)
+        index._reserve(reused + len(changed))
+        index._tf[:reused] = tf[reused_rows]
+        index._df += np.count_nonzero(index._tf[:reused], axis=0)
+        index._ids = reused_ids
+        index._checksums = reused_checksums
+        index._rows = {doc_id: row for row, doc_id in enumerate(reused_ids)}
+        for doc_id, fields in changed:
+            index.add(doc_id, fields)
+        return index, reused
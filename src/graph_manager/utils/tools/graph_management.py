@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, Field
+from typing import Optional
 from langchain_core.tools import tool
 
 from src.graph_manager.utils.kgi_init import kgi
@@ -46,10 +47,54 @@ def save_current_graph() -> str:
     return kgi.save_current_graph()
 
 
+class CreateSnapshotSchema(BaseModel):
+    """为当前图谱创建快照，之后可以查看快照之后的变化或将图谱恢复到快照。"""
+    label: Optional[str] = Field(default=None, description="快照名称，默认为 'v<版本号>'。同名快照会被覆盖。")
+
+@tool("create_snapshot", args_schema=CreateSnapshotSchema)
+def create_snapshot(label: Optional[str] = None) -> str:
+    """为当前图谱创建快照，之后可以查看快照之后的变化或将图谱恢复到快照。"""
+    return kgi.create_snapshot(label)
+
+
+class ListSnapshotsSchema(BaseModel):
+    """列出当前图谱的所有快照。"""
+    pass
+
+@tool("list_snapshots", args_schema=ListSnapshotsSchema)
+def list_snapshots() -> str:
+    """列出当前图谱的所有快照，包括 delete_items 与 batch_add_from_json 自动创建的快照。"""
+    return kgi.list_snapshots()
+
+
+class DiffSnapshotSchema(BaseModel):
+    """列出当前图谱自指定快照以来的变化。"""
+    label: str = Field(description="快照名称。")
+
+@tool("diff_snapshot", args_schema=DiffSnapshotSchema)
+def diff_snapshot(label: str) -> str:
+    """列出当前图谱自指定快照以来新增、删除与修改的节点和边。"""
+    return kgi.diff_snapshot(label)
+
+
+class RollbackToSnapshotSchema(BaseModel):
+    """将当前图谱恢复到指定快照。"""
+    label: str = Field(description="快照名称。")
+
+@tool("rollback_to_snapshot", args_schema=RollbackToSnapshotSchema)
+def rollback_to_snapshot(label: str) -> str:
+    """将当前图谱恢复到指定快照，撤销快照之后的所有修改。"""
+    return kgi.rollback_to_snapshot(label)
+
+
 # 将所有管理工具函数收集到一个列表中
 management_tool_list = [
     add_new_graph,
     set_current_graph,
     summarize_graph_content,
     save_current_graph,
+    create_snapshot,
+    list_snapshots,
+    diff_snapshot,
+    rollback_to_snapshot,
 ]
\ No newline at end of file
@@ -8,22 +8,22 @@ from src.graph_manager.utils.kgi_init import kgi
 
 class GetAllNodeSchema(BaseModel):
     """获取当前图谱中所有节点的简要信息（ID和标题）。"""
-    pass
+    compact: bool = Field(default=False, description="是否以紧凑的 TSV 行输出结果，结果较多时可节省篇幅。")
 
 @tool("get_all_node", args_schema=GetAllNodeSchema)
-def get_all_node() -> str:
+def get_all_node(compact: bool = False) -> str:
     """获取当前图谱中所有节点的简要信息（ID和标题）。"""
-    return kgi.get_all_node()
+    return kgi.get_all_node(compact)
 
 
 class GetAllEdgeSchema(BaseModel):
     """获取当前图谱中所有边的简要信息（ID和标题）。"""
-    pass
+    compact: bool = Field(default=False, description="是否以紧凑的 TSV 行输出结果，结果较多时可节省篇幅。")
 
 @tool("get_all_edge", args_schema=GetAllEdgeSchema)
-def get_all_edge() -> str:
+def get_all_edge(compact: bool = False) -> str:
     """获取当前图谱中所有边的简要信息（ID和标题）。"""
-    return kgi.get_all_edge()
+    return kgi.get_all_edge(compact)
 
 
 class GetNodeInfoSchema(BaseModel):
@@ -37,16 +37,38 @@ def get_node_info(node_id: str) -> str:
 
 
 class FindPathSchema(BaseModel):
-    """查找两个节点之间的最短路径。"""
+    """查找两个节点之间的最短路径，可选择忽略方向、返回多条路径或限制路径长度。"""
     start_node_id: str = Field(description="起始节点的ID。")
     end_node_id: str = Field(description="结束节点的ID。")
     with_description: bool = Field(default=False, description="是否在结果中包含路径上节点的描述。")
     with_edge_description: bool = Field(default=False, description="是否在结果中包含路径上边的描述。")
+    directed: bool = Field(default=True, description="是否沿边的方向查找。设为 False 可以找到方向“相反”的关联概念。")
+    k: int = Field(default=1, description="返回的路径数量上限，大于 1 时按长度从短到长返回多条不同的路径。")
+    all_shortest: bool = Field(default=False, description="是否返回所有等长的最短路径（最多 max(k, 10) 条）。")
+    max_depth: Optional[int] = Field(default=None, description="路径最多包含的边数，不填表示不限制。")
+    compact: bool = Field(default=False, description="是否以紧凑的 TSV 行输出结果，结果较多时可节省篇幅。")
+    with_centrality: bool = Field(default=False, description="是否标注路径上节点的介数中心性。需要全图计算，大图谱上较慢。")
 
 @tool("find_path", args_schema=FindPathSchema)
-def find_path(start_node_id: str, end_node_id: str, with_description: bool = False, with_edge_description: bool = False) -> str:
-    """查找两个节点之间的最短路径。"""
-    return kgi.find_path(start_node_id, end_node_id, with_description, with_edge_description)
+def find_path(start_node_id: str, end_node_id: str, with_description: bool = False, with_edge_description: bool = False,
+              directed: bool = True, k: int = 1, all_shortest: bool = False, max_depth: Optional[int] = None, compact: bool = False,
+              with_centrality: bool = False) -> str:
+    """查找两个节点之间的最短路径，可选择忽略方向、返回多条路径或限制路径长度。"""
+    return kgi.find_path(start_node_id, end_node_id, with_description, with_edge_description, directed, k, all_shortest, max_depth, compact, with_centrality)
+
+
+class GetKHopNeighborhoodSchema(BaseModel):
+    """获取以指定节点为中心、扩散 k 跳得到的邻域子图，包括子图中的节点（及其跳数）与边。"""
+    node_id: str = Field(description="中心节点的ID。")
+    k: int = Field(default=1, description="扩散的跳数，k=1 表示直接邻居，k=2 表示二跳邻居。")
+    direction: str = Field(default='both', description="扩散方向，'out' 沿出边，'in' 沿入边，'both' 同时沿两个方向。")
+    with_description: bool = Field(default=False, description="是否在结果中包含节点的描述。")
+    max_nodes: int = Field(default=50, description="最多显示的节点数量，按跳数从近到远保留。")
+
+@tool("get_k_hop_neighborhood", args_schema=GetKHopNeighborhoodSchema)
+def get_k_hop_neighborhood(node_id: str, k: int = 1, direction: str = 'both', with_description: bool = False, max_nodes: int = 50) -> str:
+    """获取以指定节点为中心、扩散 k 跳得到的邻域子图，包括子图中的节点（及其跳数）与边。"""
+    return kgi.get_k_hop_neighborhood(node_id, k, direction, with_description, max_nodes)
 
 
 class SearchNodesByTagSchema(BaseModel):
@@ -54,11 +76,177 @@ class SearchNodesByTagSchema(BaseModel):
     tags: List[str] = Field(description="要搜索的标签列表。")
     mode: str = Field(default='AND', description="搜索模式，'AND' 表示节点必须包含所有标签，'OR' 表示节点包含任一标签即可。")
     case_sensitive: bool = Field(default=False, description="是否区分大小写。")
+    compact: bool = Field(default=False, description="是否以紧凑的 TSV 行输出结果，结果较多时可节省篇幅。")
 
 @tool("search_nodes_by_tag", args_schema=SearchNodesByTagSchema)
-def search_nodes_by_tag(tags: List[str], mode: str = 'AND', case_sensitive: bool = False) -> str:
+def search_nodes_by_tag(tags: List[str], mode: str = 'AND', case_sensitive: bool = False, compact: bool = False) -> str:
     """根据一个或多个标签搜索节点。"""
-    return kgi.search_nodes_by_tag(tags, mode, case_sensitive)
+    return kgi.search_nodes_by_tag(tags, mode, case_sensitive, compact)
+
+
+class SearchNodesByKeywordSchema(BaseModel):
+    """根据关键词搜索节点，关键词会匹配节点的标题、描述和标签。"""
+    keyword: str = Field(description="要搜索的关键词，支持任意子串（如中文概念名的一部分）。")
+    case_sensitive: bool = Field(default=False, description="是否区分大小写。")
+    limit: int = Field(default=20, description="最多返回的节点数量，结果按相关度排序。")
+
+@tool("search_nodes_by_keyword", args_schema=SearchNodesByKeywordSchema)
+def search_nodes_by_keyword(keyword: str, case_sensitive: bool = False, limit: int = 20) -> str:
+    """根据关键词搜索节点，关键词会匹配节点的标题、描述和标签。"""
+    return kgi.search_nodes_by_keyword(keyword, case_sensitive, limit)
+
+
+class SearchEdgesByKeywordSchema(BaseModel):
+    """根据关键词搜索边，关键词会匹配边的标题和描述。"""
+    keyword: str = Field(description="要搜索的关键词。")
+    case_sensitive: bool = Field(default=False, description="是否区分大小写。")
+    limit: int = Field(default=20, description="最多返回的边数量，结果按相关度排序。")
+
+@tool("search_edges_by_keyword", args_schema=SearchEdgesByKeywordSchema)
+def search_edges_by_keyword(keyword: str, case_sensitive: bool = False, limit: int = 20) -> str:
+    """根据关键词搜索边，关键词会匹配边的标题和描述。"""
+    return kgi.search_edges_by_keyword(keyword, case_sensitive, limit)
+
+
+class ListRelationTypesSchema(BaseModel):
+    """列出当前图谱中的关系类型（边的标题）及各自的边数量。"""
+    top_k: int = Field(default=30, description="最多列出的关系类型数量，按边数量从多到少保留。")
+
+@tool("list_relation_types", args_schema=ListRelationTypesSchema)
+def list_relation_types(top_k: int = 30) -> str:
+    """列出当前图谱中的关系类型（边的标题，如“前置知识”“应用于”）及各自的边数量。"""
+    return kgi.list_relation_types(top_k)
+
+
+class GetNeighboursByRelationSchema(BaseModel):
+    """获取节点通过某种关系直接相连的节点。"""
+    node_id: str = Field(description="要查询的节点ID。")
+    relation: str = Field(description="关系类型，即边的标题，如“前置知识”。不区分大小写，忽略首尾空白。")
+    direction: str = Field(default='out', description="遍历方向，'out' 沿出边，'in' 沿入边，'both' 同时沿两个方向。")
+    limit: int = Field(default=50, description="最多显示的邻居数量。")
+
+@tool("get_neighbours_by_relation", args_schema=GetNeighboursByRelationSchema)
+def get_neighbours_by_relation(node_id: str, relation: str, direction: str = 'out', limit: int = 50) -> str:
+    """获取节点通过某种关系直接相连的节点，例如“梯度下降”的出边中所有“前置知识”关系指向的节点。"""
+    return kgi.get_neighbours_by_relation(node_id, relation, direction, limit)
+
+
+class GetRelationClosureSchema(BaseModel):
+    """从节点出发沿某种关系递归展开，列出可以到达的全部节点。"""
+    node_id: str = Field(description="起始节点的ID。")
+    relation: str = Field(description="关系类型，即边的标题，如“前置知识”。不区分大小写，忽略首尾空白。")
+    direction: str = Field(default='out', description="遍历方向，'out' 沿出边，'in' 沿入边，'both' 同时沿两个方向。")
+    max_depth: Optional[int] = Field(default=None, description="最大展开层数，不填表示不限制。")
+    limit: int = Field(default=50, description="最多显示的节点数量，按层数从近到远保留。")
+
+@tool("get_relation_closure", args_schema=GetRelationClosureSchema)
+def get_relation_closure(node_id: str, relation: str, direction: str = 'out', max_depth: Optional[int] = None, limit: int = 50) -> str:
+    """
+    从节点出发沿某种关系递归展开，列出可以到达的全部节点及其层数，
+    例如一个知识点的全部（直接与间接）前置知识，或依赖某个知识点的全部后续知识。
+    """
+    return kgi.get_relation_closure(node_id, relation, direction, max_depth, limit)
+
+
+class PlanLearningPathSchema(BaseModel):
+    """规划学习目标知识点的顺序。"""
+    target_ids: List[str] = Field(description="要学习的目标节点ID列表。")
+    relation: str = Field(default="前置知识", description="前置关系类型，边 A -> B 表示学习 B 之前需要先学习 A。不区分大小写，忽略首尾空白。")
+    known_ids: Optional[List[str]] = Field(default=None, description="已经掌握的节点ID列表，这些节点及只能经由它们到达的前置知识不会出现在计划中。")
+    max_nodes: int = Field(default=50, description="最多显示的节点数量，按学习顺序保留最先学习的节点。")
+
+@tool("plan_learning_path", args_schema=PlanLearningPathSchema)
+def plan_learning_path(target_ids: List[str], relation: str = "前置知识", known_ids: Optional[List[str]] = None, max_nodes: int = 50) -> str:
+    """
+    规划学习目标知识点的顺序：列出目标的全部（未掌握的）前置知识，前置节点总是排在依赖它的节点之前，
+    并给出可以并行学习的阶段与循环依赖组。适合回答“学 X 之前要先学什么、按什么顺序学”。
+    """
+    return kgi.plan_learning_path(target_ids, relation, known_ids, max_nodes)
+
+
+class ListComponentsSchema(BaseModel):
+    """列出当前图谱的连通分量。"""
+    strong: bool = Field(default=False, description="为 true 时列出强连通分量（沿边的方向互相可达），否则列出弱连通分量（忽略方向后相互连通）。")
+    top_k: int = Field(default=10, description="最多列出的分量数量，按分量大小从大到小保留。")
+    max_nodes: int = Field(default=10, description="每个分量最多列出的节点数量。")
+
+@tool("list_components", args_schema=ListComponentsSchema)
+def list_components(strong: bool = False, top_k: int = 10, max_nodes: int = 10) -> str:
+    """列出当前图谱的连通分量，可用于发现与主体图谱脱节的孤立节点群；不同分量之间不存在任何路径。"""
+    return kgi.list_components(strong, top_k, max_nodes)
+
+
+class QueryGraphSchema(BaseModel):
+    """在当前图谱上执行图模式查询。"""
+    query: str = Field(description="JSON 格式的图模式查询。格式参见工具文档。")
+
+@tool("query_graph", args_schema=QueryGraphSchema)
+def query_graph(query: str) -> str:
+    """
+    在当前图谱上执行图模式查询：一次调用即可完成节点过滤、按边类型扩展与多跳路径匹配，
+    代替依次调用 search_nodes_by_tag、get_node_info、find_path 等多个工具。
+
+    JSON格式要求:
+    - "nodes": 对象，键为变量名，值为该变量的过滤条件（条件同时满足，空对象表示任意节点）:
+        - "id": str / "ids": List[str] (节点 ID)
+        - "title": str (标题完全相同，不区分大小写)
+        - "keyword": str (标题、描述或标签包含该关键词)
+        - "tags": List[str] 与 "tag_mode": "AND" | "OR" (默认 "AND")
+    - "edges": 列表（可选），每一项是两个变量之间的连接条件:
+        - "from": str, "to": str (必需，变量名)
+        - "title": str (可选，边的类型，路径上的每条边都必须是该类型；不区分大小写，忽略首尾空白)
+        - "min_hops": int, "max_hops": int (可选，默认都为 1，最大为 6)
+        - "directed": bool (可选，默认 true；为 false 时忽略边的方向)
+    - "return": List[str] (可选，结果中列出的变量，默认为全部)
+    - "limit": int (可选，默认 20，最大 200)
+
+    JSON示例（“梯度下降”的三跳以内前置知识中带有“错题”标签的节点）:
+    ```json
+    {
+        "nodes": {"x": {"title": "梯度下降"}, "p": {"tags": ["错题"]}},
+        "edges": [{"from": "p", "to": "x", "title": "前置知识", "max_hops": 3}],
+        "return": ["p"]
+    }
+    ```
+    """
+    return kgi.query_graph(query)
+
+
+class SemanticSearchNodesSchema(BaseModel):
+    """按文本相近程度批量查找节点。"""
+    queries: List[str] = Field(description="查询文本列表，可以是概念名称或描述，一次可查找多个概念。")
+    limit: int = Field(default=5, description="每个查询最多返回的节点数量。")
+    min_score: float = Field(default=0.1, ge=0.0, le=1.0, description="最低相似度（0 到 1）。")
+
+@tool("semantic_search_nodes", args_schema=SemanticSearchNodesSchema)
+def semantic_search_nodes(queries: List[str], limit: int = 5, min_score: float = 0.1) -> str:
+    """按文本相近程度批量查找节点。用语与节点标题不完全一致时也能找到相关节点，适合一次为多个概念定位节点 ID。"""
+    return kgi.semantic_search_nodes(queries, limit, min_score)
+
+
+class FindSimilarNodesSchema(BaseModel):
+    """查找与给定标题或已有节点近似重复的节点。"""
+    title: Optional[str] = Field(default=None, description="要比较的标题。与 node_id 二选一。")
+    node_id: Optional[str] = Field(default=None, description="要比较的已有节点ID。与 title 二选一。")
+    tags: Optional[List[str]] = Field(default=None, description="要比较的标签，仅在提供 title 时使用。")
+    threshold: float = Field(default=0.6, ge=0.0, le=1.0, description="最低相似度（0 到 1）。")
+    limit: int = Field(default=10, description="最多返回的节点数量。")
+
+@tool("find_similar_nodes", args_schema=FindSimilarNodesSchema)
+def find_similar_nodes(title: Optional[str] = None, node_id: Optional[str] = None, tags: Optional[List[str]] = None, threshold: float = 0.6, limit: int = 10) -> str:
+    """查找与给定标题或已有节点近似重复的节点。添加新概念前可用它检查图谱中是否已有同一概念。"""
+    return kgi.find_similar_nodes(title, node_id, tags, threshold, limit)
+
+
+class FindDuplicateNodesSchema(BaseModel):
+    """列出当前图谱中疑似重复的节点对。"""
+    threshold: float = Field(default=0.6, ge=0.0, le=1.0, description="最低相似度（0 到 1）。")
+    limit: int = Field(default=20, description="最多返回的节点对数量。")
+
+@tool("find_duplicate_nodes", args_schema=FindDuplicateNodesSchema)
+def find_duplicate_nodes(threshold: float = 0.6, limit: int = 20) -> str:
+    """列出当前图谱中疑似重复的节点对，可作为 merge_nodes 的候选。"""
+    return kgi.find_duplicate_nodes(threshold, limit)
 
 
 # 将所有读取工具函数收集到一个列表中
@@ -67,5 +255,17 @@ reading_tool_list = [
     get_all_edge,
     get_node_info,
     find_path,
+    query_graph,
+    list_relation_types,
+    get_neighbours_by_relation,
+    get_relation_closure,
+    plan_learning_path,
+    list_components,
+    get_k_hop_neighborhood,
     search_nodes_by_tag,
+    search_nodes_by_keyword,
+    search_edges_by_keyword,
+    semantic_search_nodes,
+    find_similar_nodes,
+    find_duplicate_nodes,
 ]
\ No newline at end of file
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Literal, Optional, List
 from langchain_core.tools import tool
 import json
 
@@ -73,11 +73,12 @@ def update_edge_in_current_graph(edge_id: str, title: Optional[str] = None, desc
 class BatchAddFromJSONSchema(BaseModel):
     """通过JSON数据批量添加节点和边。"""
     json_data: str = Field(description='包含节点和边列表的JSON字符串。格式参见工具文档。')
+    dedup: Literal["off", "flag", "merge"] = Field(default="flag", description="与已有节点标题近似重复的新节点如何处理：'off' 不检查，'flag' 照常添加并列出，'merge' 不创建该节点，引用它的边改为连接已有节点。")
 
 @tool("batch_add_from_json", args_schema=BatchAddFromJSONSchema)
-def batch_add_from_json(json_data: str) -> str:
+def batch_add_from_json(json_data: str, dedup: str = "flag") -> str:
     """
-    通过JSON数据批量添加节点和边。
+    通过JSON数据批量添加节点和边。整个批次要么全部写入，要么（有任何错误时）完全不写入。
 
     JSON格式要求:
     - 顶层是一个对象，包含 "nodes" 和/或 "edges" 键。
@@ -120,7 +121,18 @@ def batch_add_from_json(json_data: str) -> str:
     }
     ```
     """
-    return kgi.batch_add_from_json(json_data)
+    return kgi.batch_add_from_json(json_data, dedup)
+
+
+class MergeNodesSchema(BaseModel):
+    """将表示同一概念的两个节点合并为一个。"""
+    target_id: str = Field(description="保留的节点ID。")
+    source_id: str = Field(description="被合并并删除的节点ID，它的边会改为连接保留的节点。")
+
+@tool("merge_nodes", args_schema=MergeNodesSchema)
+def merge_nodes(target_id: str, source_id: str) -> str:
+    """将源节点合并到目标节点：源节点的边改为连接目标节点，标签并入目标节点，然后删除源节点。"""
+    return kgi.merge_nodes(target_id, source_id)
 
 
 # 将所有写入工具函数收集到一个列表中
@@ -131,4 +143,5 @@ writing_tool_list = [
     update_node_in_current_graph,
     update_edge_in_current_graph,
     batch_add_from_json,
+    merge_nodes,
 ]
\ No newline at end of file
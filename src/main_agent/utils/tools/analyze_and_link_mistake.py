@@ -56,7 +56,7 @@ async def analyze_and_link_mistake(mistake_description: str) -> str:
     task_book_lines.append(f"2. 使用 add_node 工具创建一个新节点，title 为 '{mistake_node_title}'，description 为 '{mistake_description}'，tags 为 ['错题']。")
 
     for i, keyword in enumerate(keywords):
-        task_book_lines.append(f"{i+3}. 使用 search_nodes_by_keyword 工具搜索关键词 '{keyword}' 相关节点，并进行相应处理。")
+        task_book_lines.append(f"{i+3}. 使用 find_similar_nodes 工具查找标题与 '{keyword}' 相似的已有节点（没有结果时再用 search_nodes_by_keyword 搜索），并进行相应处理；不要重复创建已有的概念节点。")
 
     task_book = "\n".join(task_book_lines)
 
@@ -51,15 +51,15 @@ async def answer_with_graph_path(question: str, graph_name: str) -> str:
     if len(entities) >= 2:
         # 查找路径
         start_node, end_node = entities[0], entities[1]
-        task_book_lines.append(f"2. 使用 search_nodes_by_keyword 找到 '{start_node}' 的节点 ID。")
-        task_book_lines.append(f"3. 使用 search_nodes_by_keyword 找到 '{end_node}' 的节点 ID。")
-        task_book_lines.append(f"4. 使用 find_path 查找这两个节点之间的路径，并返回路径上所有节点和边的详细信息。")
+        task_book_lines.append(f"2. 使用 semantic_search_nodes（queries 为 ['{start_node}', '{end_node}']）一次找到两个概念的节点 ID；若某个概念没有合适的结果，再用 search_nodes_by_keyword 查找。")
+        task_book_lines.append(f"3. 使用 find_path 查找这两个节点之间的路径，并返回路径上所有节点和边的详细信息。")
         # 备用逻辑：如果找不到路径，则获取邻居
-        task_book_lines.append(f"5. (如果上一步未找到路径) 使用 get_k_hop_neighborhood (k=1) 分别获取 '{start_node}' 和 '{end_node}' 的邻居节点信息。")
+        task_book_lines.append(f"4. (如果上一步未找到路径) 使用 get_k_hop_neighborhood (k=1) 分别获取 '{start_node}' 和 '{end_node}' 的邻居节点信息；若 find_path 指出两个节点位于不同的连通分量中，直接说明图谱中二者没有关联，不必继续查找路径。")
     else:
         # 开放性问题，获取子图
         core_concept = entities[0]
-        task_book_lines.append(f"2. 使用 get_k_hop_neighborhood (k=2) 获取 '{core_concept}' 节点的二跳邻居子图信息。")
+        task_book_lines.append(f"2. 使用 semantic_search_nodes 找到 '{core_concept}' 的节点 ID。")
+        task_book_lines.append(f"3. 使用 get_k_hop_neighborhood (k=2) 获取该节点的二跳邻居子图信息。")
 
     task_book = "\n".join(task_book_lines)
 
@@ -73,7 +73,7 @@ async def process_document_to_graph(file_path: str) -> str:
     task_book_lines.append(f"2. 切换到名为 '{target_graph_name}' 的图谱。")
     
     batch_data = {"nodes": nodes, "edges": edges}
-    task_book_lines.append(f"3. 使用 batch_add_from_json 工具批量添加以下节点和边: {json.dumps(batch_data, ensure_ascii=False)}")
+    task_book_lines.append(f"3. 使用 batch_add_from_json 工具（dedup 设为 'merge'，与已有节点重复的概念会自动合并）批量添加以下节点和边: {json.dumps(batch_data, ensure_ascii=False)}")
 
     task_book = "\n".join(task_book_lines)
 
@@ -0,0 +1,135 @@
+import random
+
+import pytest
+
+from src.graph_manager.knowledge_core.adjacency import AdjacencyIndex
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+
+
+def make_graph(node_count: int) -> Knowledge_Graph:
+    graph = Knowledge_Graph(name="adjacency")
+    for i in range(node_count):
+        graph.add_node(Knowledge_Node(id=f"n{i}", title=f"概念{i}"))
+    return graph
+
+
+def assert_lists_match_edges(graph: Knowledge_Graph):
+    """节点上的 in_edge / out_edge 与 edges 字典描述的是同一组边，且保持边的添加顺序。"""
+    expected_out = {node_id: [] for node_id in graph.nodes}
+    expected_in = {node_id: [] for node_id in graph.nodes}
+    for edge in graph.edges.values():
+        expected_out[edge.start_node_id].append(edge.id)
+        expected_in[edge.end_node_id].append(edge.id)
+    adjacency = graph._adjacency
+    for node_id, node in graph.nodes.items():
+        assert node.out_edge == expected_out[node_id]
+        assert node.in_edge == expected_in[node_id]
+        idx = adjacency.index_of(node_id)
+        # 邻居下标数组与边 ID 列表逐位对应
+        assert [adjacency.id_of(v) for v in adjacency.out_neighbours(idx)] == [graph.edges[e].end_node_id for e in node.out_edge]
+        assert [adjacency.id_of(u) for u in adjacency.in_neighbours(idx)] == [graph.edges[e].start_node_id for e in node.in_edge]
+
+
+def test_remove_keeps_edge_order_and_neighbour_arrays_in_step():
+    graph = make_graph(4)
+    for i, (u, v) in enumerate([(0, 1), (0, 2), (0, 3), (0, 1), (2, 0)]):
+        graph.add_edge(Knowledge_Edge(id=f"e{i}", start_node_id=f"n{u}", end_node_id=f"n{v}", title="相关"))
+
+    graph.remove_edge("e0") # 删除 n0 出边列表中的第一条，其余边保持原有顺序
+    assert graph.nodes["n0"].out_edge == ["e1", "e2", "e3"]
+    assert_lists_match_edges(graph)
+    assert graph.get_edges_between("n0", "n1") == [graph.edges["e3"]]
+
+    graph.remove_edge("e2") # 删除中间的一条后，后续边的位置映射随之前移
+    assert graph.nodes["n0"].out_edge == ["e1", "e3"]
+    assert {n.id for n in graph.get_out_neighbours("n0")} == {"n1", "n2"}
+
+    graph.remove_edge("e3")
+    assert_lists_match_edges(graph)
+    assert graph.get_edges_between("n0", "n1") == []
+    assert [n.id for n in graph.get_out_neighbours("n0")] == ["n2"]
+
+
+def test_removing_a_hub_only_detaches_its_edges():
+    graph = make_graph(5)
+    for i in range(1, 5):
+        graph.add_edge(Knowledge_Edge(id=f"out{i}", start_node_id="n0", end_node_id=f"n{i}", title="相关"))
+        graph.add_edge(Knowledge_Edge(id=f"in{i}", start_node_id=f"n{i}", end_node_id="n0", title="相关"))
+    graph.add_edge(Knowledge_Edge(id="loop", start_node_id="n0", end_node_id="n0", title="自环"))
+    graph.add_edge(Knowledge_Edge(id="keep", start_node_id="n1", end_node_id="n2", title="相关"))
+
+    graph.add_edge(Knowledge_Edge(id="after", start_node_id="n1", end_node_id="n3", title="相关"))
+
+    graph.remove_node("n0")
+
+    assert set(graph.edges) == {"keep", "after"}
+    assert_lists_match_edges(graph)
+    assert graph.nodes["n1"].out_edge == ["keep", "after"] # in1 位于两者之前，删除后不打乱顺序
+    assert graph.nodes["n2"].in_edge == ["keep"]
+
+
+def test_freed_slot_is_reused_without_stale_edges():
+    graph = make_graph(3)
+    graph.add_edge(Knowledge_Edge(id="e", start_node_id="n1", end_node_id="n2", title="相关"))
+    old_index = graph._adjacency.index_of("n1")
+    graph.remove_node("n1")
+
+    graph.add_node(Knowledge_Node(id="fresh", title="新概念"))
+    assert graph._adjacency.index_of("fresh") == old_index
+    assert graph._adjacency.capacity == 3
+    assert graph.get_out_edge("fresh") == [] and graph.get_in_edge("n2") == []
+    assert graph.find_path("fresh", "n2") == []
+
+
+def test_add_node_takes_ownership_of_the_node_edge_lists():
+    """add_node 会清空传入节点上的 in_edge / out_edge，之后由索引维护它们。"""
+    index = AdjacencyIndex()
+    in_edge, out_edge = ["stale-in"], ["stale-out"]
+    index.add_node("a", in_edge, out_edge)
+    index.add_node("b", [], [])
+    assert in_edge == [] and out_edge == []
+
+    index.add_edge("e", "a", "b")
+    assert out_edge == ["e"]
+    with pytest.raises(ValueError):
+        index.add_node("a", [], [])
+
+
+def test_graph_add_node_clears_stale_edge_lists():
+    graph = make_graph(1)
+    node = Knowledge_Node(id="stale", title="旧节点", in_edge=["x"], out_edge=["y", "z"])
+    graph.add_node(node)
+    assert node.in_edge == [] and node.out_edge == []
+    graph.add_edge(Knowledge_Edge(id="e", start_node_id="stale", end_node_id="n0", title="相关"))
+    assert graph.nodes["stale"].out_edge == ["e"]
+
+
+def test_reloaded_graph_does_not_duplicate_edge_ids(tmp_path):
+    graph = make_graph(3)
+    graph.add_edge(Knowledge_Edge(id="e1", start_node_id="n0", end_node_id="n1", title="相关"))
+    graph.add_edge(Knowledge_Edge(id="e2", start_node_id="n1", end_node_id="n2", title="相关"))
+    path = tmp_path / "graph.json"
+    graph.save_to_file(str(path))
+
+    loaded = Knowledge_Graph.load_from_file(str(path))
+    assert loaded.nodes["n1"].in_edge == ["e1"]
+    assert loaded.nodes["n1"].out_edge == ["e2"]
+    assert_lists_match_edges(loaded)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_edge_churn_stays_consistent(seed):
+    rng = random.Random(seed)
+    graph = make_graph(12)
+    nodes = list(graph.nodes)
+    for step in range(400):
+        if graph.edges and rng.random() < 0.4:
+            graph.remove_edge(rng.choice(list(graph.edges)))
+        else:
+            graph.add_edge(Knowledge_Edge(id=f"e{step}", start_node_id=rng.choice(nodes), end_node_id=rng.choice(nodes), title="相关"))
+    assert_lists_match_edges(graph)
+    for u in nodes:
+        for v in nodes:
+            expected = [e.id for e in graph.edges.values() if (e.start_node_id, e.end_node_id) == (u, v)]
+            assert sorted(graph._adjacency.edges_between(u, v)) == sorted(expected)
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from src.graph_manager.knowledge_core.bulk_ingest import BatchError, ingest, run_benchmark
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.knowledge_graph_integration import KnowledgeGraphIntegration
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+
+
+def base_graph() -> Knowledge_Graph:
+    graph = Knowledge_Graph(name="bulk")
+    graph.add_node(Knowledge_Node(id="n1", title="微积分"))
+    graph.add_node(Knowledge_Node(id="n2", title="线性代数"))
+    graph.add_edge(Knowledge_Edge(id="e0", start_node_id="n1", end_node_id="n2", title="相关"))
+    return graph
+
+
+def payload():
+    return {
+        "nodes": [{"id": "x", "title": "梯度下降", "tags": ["AI"]}, {"id": "y", "title": "导数"}],
+        "edges": [{"id": "e1", "start_node_id": "y", "end_node_id": "x", "title": "前置知识"},
+                  {"id": "e2", "start_node_id": "x", "end_node_id": "n1", "title": "相关"}],
+    }
+
+
+def state(graph: Knowledge_Graph):
+    return graph.model_dump(), [(n.id, d) for n, d in graph.get_high_in_degree_nodes(100)], graph.get_top_k_tags(100)
+
+
+def test_ingest_matches_adding_items_one_by_one():
+    bulk, single = base_graph(), base_graph()
+    events = []
+    bulk.add_listener(lambda op, payload: events.append(op))
+    version = bulk.version
+
+    summary = ingest(bulk, payload())
+    for node in payload()["nodes"]:
+        single.add_node(Knowledge_Node(**node))
+    for edge in payload()["edges"]:
+        single.add_edge(Knowledge_Edge(**edge))
+
+    assert summary.success and (summary.added_nodes, summary.added_edges) == (2, 2)
+    assert events == ["add_batch"] and bulk.version == version + 1
+    assert state(bulk) == state(single)
+    assert [node.id for node in bulk.search_nodes_by_keyword("梯度")] == ["x"]
+    assert bulk.find_path("y", "n2") == ["y", "x", "n1", "n2"]
+
+
+def test_every_error_is_reported_and_nothing_is_written():
+    graph = base_graph()
+    before, version = state(graph), graph.version
+    data = payload()
+    data["nodes"] += [{"id": "n1", "title": "与图谱重复"}, {"id": "x", "title": "与批次重复"}, {"title": 123}, "不是对象"]
+    data["edges"] += [{"id": "e0", "start_node_id": "x", "end_node_id": "y", "title": "与图谱重复"},
+                      {"id": "e3", "start_node_id": "x", "end_node_id": "不存在", "title": "相关"}]
+
+    summary = ingest(graph, data)
+    assert not summary.success
+    assert sorted((error.kind, error.index) for error in summary.errors) == [("edge", 2), ("edge", 3), ("node", 2), ("node", 3), ("node", 4), ("node", 5)]
+    assert state(graph) == before and graph.version == version
+
+
+def test_generated_ids_never_collide():
+    graph = base_graph()
+    summary = ingest(graph, {"nodes": [{"title": "无 ID 节点"} for _ in range(20)], "edges": [{"start_node_id": "n1", "end_node_id": "n2", "title": "平行边"}]})
+    assert summary.success and len(graph.nodes) == 22
+    assert len(graph.get_edges_between("n1", "n2")) == 2
+    assert not ingest(graph, ["not", "a", "dict"]).success
+    assert not ingest(graph, {"nodes": "not a list"}).success
+
+
+def test_failing_listener_rolls_the_batch_back():
+    graph = base_graph()
+    before = state(graph)
+
+    def fail(op, payload):
+        raise RuntimeError("listener failed")
+
+    graph.add_listener(fail)
+    with pytest.raises(RuntimeError):
+        ingest(graph, payload())
+    graph.remove_listener(fail)
+    assert state(graph) == before
+    assert graph.search_nodes_by_keyword("梯度") == []
+    assert ingest(graph, payload()).success
+
+
+def test_add_batch_validates_by_default():
+    graph = Knowledge_Graph(name="g")
+    with pytest.raises(BatchError) as excinfo:
+        graph.add_batch([], [Knowledge_Edge(id="e", start_node_id="a", end_node_id="b")])
+    assert len(excinfo.value.errors) == 2
+
+
+def test_batch_add_from_json_is_all_or_nothing(tmp_path):
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    kgi.add_graph("bulk", base_graph())
+    bad = payload()
+    bad["edges"].append({"id": "e3", "start_node_id": "x", "end_node_id": "不存在", "title": "相关"})
+    response = kgi.batch_add_from_json(json.dumps(bad, ensure_ascii=False))
+    assert "不存在" in response and "x" not in kgi.current_graph.nodes
+    kgi.batch_add_from_json(json.dumps(payload(), ensure_ascii=False))
+    assert {"x", "y"} <= set(kgi.current_graph.nodes)
+
+
+def test_benchmark_processes_the_same_items_with_both_methods():
+    results = run_benchmark(batch_size=50, batches=2)
+    assert [result["method"] for result in results] == ["legacy", "bulk"]
+    assert results[0]["items"] == results[1]["items"] > 0
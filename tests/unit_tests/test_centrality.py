@@ -0,0 +1,146 @@
+import threading
+
+import networkx as nx
+import pytest
+
+from src.graph_manager.knowledge_core.centrality import CentralityEngine, sampled_closeness_centrality
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+
+
+class Projection:
+    """记录 projection 被调用次数的 networkx 投影。"""
+
+    def __init__(self, G: nx.DiGraph):
+        self.G = G
+        self.calls = 0
+
+    def __call__(self) -> nx.DiGraph:
+        self.calls += 1
+        return self.G
+
+
+def test_result_is_cached_per_version():
+    engine = CentralityEngine()
+    projection = Projection(nx.path_graph(5, create_using=nx.DiGraph))
+    first = engine.get("betweenness", 1, projection, approximate=False)
+    assert engine.get("betweenness", 1, projection, approximate=False) is first
+    assert projection.calls == 1
+    assert first.scores == pytest.approx(nx.betweenness_centrality(projection.G))
+    assert first.ranking[0] == (2, first.scores[2])
+
+    second = engine.get("betweenness", 2, projection, approximate=False)
+    assert second is not first and second.version == 2
+    with pytest.raises(ValueError):
+        engine.get("pagerank", 1, projection, approximate=False)
+
+
+def test_large_graphs_switch_to_seeded_sampling():
+    engine = CentralityEngine(exact_limit=10, max_samples=5)
+    G = nx.gnp_random_graph(30, 0.15, seed=1, directed=True)
+    result = engine.get("betweenness", 1, lambda: G)
+    assert result.approximate
+    again = CentralityEngine(exact_limit=10, max_samples=5).get("betweenness", 1, lambda: G)
+    assert again.scores == result.scores # 固定种子，排名可复现
+
+
+def test_sampled_closeness_with_every_source_is_exact():
+    G = nx.gnp_random_graph(25, 0.1, seed=3, directed=True)
+    assert sampled_closeness_centrality(G, k=len(G)) == pytest.approx(nx.closeness_centrality(G))
+
+
+def test_background_returns_stale_result_and_refreshes():
+    engine = CentralityEngine()
+    G1 = nx.path_graph(4, create_using=nx.DiGraph)
+    G2 = nx.complete_graph(4, create_using=nx.DiGraph)
+    old = engine.get("closeness", 1, lambda: G1, approximate=False)
+
+    stale = engine.get("closeness", 2, lambda: G2, approximate=False, background=True)
+    assert stale is old
+    fresh = engine.get("closeness", 2, lambda: G2, approximate=False) # 等待后台计算完成
+    assert fresh.version == 2
+    assert fresh.scores == pytest.approx(nx.closeness_centrality(G2))
+    assert engine.get("closeness", 2, lambda: G2, approximate=False, background=True) is fresh
+
+
+def test_first_background_call_does_not_compute_in_the_caller():
+    engine = CentralityEngine()
+    G = nx.path_graph(5, create_using=nx.DiGraph)
+    release = threading.Event()
+    callers = []
+
+    def detach():
+        callers.append(threading.current_thread())
+        def build():
+            callers.append(threading.current_thread())
+            release.wait(5)
+            return G
+        return build
+
+    marker = engine.get("betweenness", 1, Projection(G), approximate=False, background=True, detach=detach)
+    assert marker.computing and marker.scores == {} and marker.ranking == []
+    assert callers == [threading.current_thread()] # 投影只在后台线程中构建
+    # 同一版本再次调用不会重复提交
+    assert engine.get("betweenness", 1, Projection(G), approximate=False, background=True, detach=detach).computing
+    release.set()
+    result = engine.get("betweenness", 1, Projection(G), approximate=False)
+    assert not result.computing and result.scores == pytest.approx(nx.betweenness_centrality(G))
+    assert len(callers) == 2 and callers[1] is not threading.current_thread()
+
+
+def test_failed_background_computation_is_dropped():
+    engine = CentralityEngine()
+    G = nx.path_graph(4, create_using=nx.DiGraph)
+    release = threading.Event()
+
+    def failing_build():
+        release.wait(5)
+        raise RuntimeError("构建失败")
+
+    engine.get("closeness", 1, Projection(G), approximate=False, background=True, detach=lambda: failing_build)
+    _, future = engine._pending[("closeness", False)]
+    release.set()
+    with pytest.raises(RuntimeError):
+        future.result()
+    assert engine._pending == {}
+    result = engine.get("closeness", 1, Projection(G), approximate=False) # 重新计算而不是重抛旧的异常
+    assert result.scores == pytest.approx(nx.closeness_centrality(G))
+
+
+def test_sampling_does_not_depend_on_projection_order():
+    G = nx.gnp_random_graph(40, 0.1, seed=2, directed=True)
+    H = nx.DiGraph()
+    H.add_nodes_from(reversed(list(G)))
+    H.add_edges_from(reversed(list(G.edges)))
+    for metric in ("betweenness", "closeness"):
+        first = CentralityEngine(exact_limit=10, max_samples=8).get(metric, 1, lambda: G)
+        second = CentralityEngine(exact_limit=10, max_samples=8).get(metric, 1, lambda: H)
+        assert first.approximate and first.scores == second.scores
+
+
+def test_graph_background_centrality_reads_a_snapshot():
+    graph = Knowledge_Graph(name="chain")
+    for i in range(4):
+        graph.add_node(Knowledge_Node(id=f"n{i}", title=f"概念{i}"))
+    for i in range(3):
+        graph.add_edge(Knowledge_Edge(id=f"e{i}", start_node_id=f"n{i}", end_node_id=f"n{i + 1}", title="相关"))
+    expected = nx.betweenness_centrality(graph._to_networkx())
+    submitted = graph.version
+    assert graph.get_high_betweenness_centrality_nodes(background=True) == []
+    graph.add_node(Knowledge_Node(id="late", title="后加入")) # 后台任务使用提交时的快照
+    result = graph._centrality.get("betweenness", submitted, graph._to_networkx, False)
+    assert "late" not in result.scores and result.scores == pytest.approx(expected)
+    assert graph.get_betweenness_centrality(background=True) is result.scores # 旧结果立即返回
+
+
+def test_graph_ranking_uses_engine_cache():
+    graph = Knowledge_Graph(name="star")
+    graph.add_node(Knowledge_Node(id="hub", title="中心"))
+    for i in range(4):
+        graph.add_node(Knowledge_Node(id=f"in{i}", title="前"))
+        graph.add_node(Knowledge_Node(id=f"out{i}", title="后"))
+        graph.add_edge(Knowledge_Edge(id=f"a{i}", start_node_id=f"in{i}", end_node_id="hub", title="相关"))
+        graph.add_edge(Knowledge_Edge(id=f"b{i}", start_node_id="hub", end_node_id=f"out{i}", title="相关"))
+    top = graph.get_high_betweenness_centrality_nodes(top_k=1)
+    assert top[0][0].id == "hub"
+    assert graph.get_betweenness_centrality() is graph.get_betweenness_centrality()
@@ -0,0 +1,66 @@
+import random
+from collections import Counter
+
+import pytest
+
+from src.graph_manager.knowledge_core.counters import RankedCounter
+
+
+def assert_matches(counter: RankedCounter, expected: Counter):
+    ranked = list(counter.iter_ranked())
+    assert dict(ranked) == dict(expected)
+    assert [count for _, count in ranked] == sorted(expected.values(), reverse=True)
+    for top_k in (0, 1, 3, len(expected) + 1):
+        top = counter.most_common(top_k)
+        assert top == ranked[:max(top_k, 0)]
+
+
+@pytest.mark.parametrize("floor", [0, 1])
+@pytest.mark.parametrize("seed", range(4))
+def test_random_updates_match_counter(floor, seed):
+    rng = random.Random(seed)
+    counter, expected = RankedCounter(floor=floor), Counter()
+    keys = [f"k{i}" for i in range(15)]
+    for _ in range(600):
+        key = rng.choice(keys)
+        r = rng.random()
+        if r < 0.5:
+            counter.increment(key)
+            expected[key] += 1
+        elif r < 0.85 and key in expected:
+            counter.decrement(key)
+            expected[key] -= 1
+            if expected[key] < floor:
+                del expected[key]
+        elif r < 0.9:
+            counter.discard(key)
+            expected.pop(key, None)
+        elif floor == 0:
+            counter.add_key(key)
+            expected.setdefault(key, 0)
+        assert len(counter) == len(expected)
+    assert_matches(counter, expected)
+
+
+def test_ties_are_ranked_by_arrival_in_the_bucket():
+    counter = RankedCounter(floor=0)
+    for key in "abc":
+        counter.add_key(key)
+    counter.increment("c")
+    counter.increment("a")
+    assert counter.most_common(3) == [("c", 1), ("a", 1), ("b", 0)]
+
+    counter.decrement("c")
+    assert counter.most_common(3) == [("a", 1), ("b", 0), ("c", 0)]
+
+
+def test_floor_one_drops_keys_that_reach_zero():
+    counter = RankedCounter(floor=1)
+    counter.increment("x")
+    counter.increment("x")
+    counter.decrement("x")
+    assert counter.get("x") == 1
+    counter.decrement("x")
+    assert "x" not in counter and counter.most_common(5) == []
+    with pytest.raises(ValueError):
+        RankedCounter(floor=2)
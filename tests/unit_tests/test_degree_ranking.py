@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+
+
+def degrees(graph: Knowledge_Graph):
+    in_degree = {node_id: 0 for node_id in graph.nodes}
+    out_degree = {node_id: 0 for node_id in graph.nodes}
+    for edge in graph.edges.values():
+        out_degree[edge.start_node_id] += 1
+        in_degree[edge.end_node_id] += 1
+    return in_degree, out_degree
+
+
+def assert_top_k_valid(ranking, expected, top_k):
+    """排名中的度数正确、按降序排列，且没有遗漏度数更高的节点。"""
+    assert len(ranking) == min(top_k, len(expected))
+    counts = [count for _, count in ranking]
+    assert counts == sorted(expected.values(), reverse=True)[:top_k]
+    for node, count in ranking:
+        assert expected[node.id] == count
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_rankings_follow_every_mutation(seed):
+    rng = random.Random(seed)
+    graph = Knowledge_Graph(name="degree")
+    for i in range(15):
+        graph.add_node(Knowledge_Node(id=f"n{i}", title=f"概念{i}"))
+    for step in range(300):
+        nodes = list(graph.nodes)
+        r = rng.random()
+        if r < 0.55:
+            graph.add_edge(Knowledge_Edge(id=f"e{step}", start_node_id=rng.choice(nodes), end_node_id=rng.choice(nodes), title="相关"))
+        elif r < 0.8 and graph.edges:
+            graph.remove_edge(rng.choice(list(graph.edges)))
+        elif r < 0.9 and len(nodes) > 5:
+            graph.remove_node(rng.choice(nodes))
+        else:
+            graph.add_node(Knowledge_Node(id=f"m{step}", title="新概念"))
+        if step % 25 == 0:
+            in_degree, out_degree = degrees(graph)
+            for top_k in (1, 5, 100):
+                assert_top_k_valid(graph.get_high_in_degree_nodes(top_k), in_degree, top_k)
+                assert_top_k_valid(graph.get_high_out_degree_nodes(top_k), out_degree, top_k)
+
+
+def test_self_loop_counts_on_both_sides_and_isolated_nodes_rank():
+    graph = Knowledge_Graph(name="loop")
+    graph.add_node(Knowledge_Node(id="a", title="A"))
+    graph.add_node(Knowledge_Node(id="b", title="B"))
+    graph.add_edge(Knowledge_Edge(id="loop", start_node_id="a", end_node_id="a", title="自环"))
+    assert [(n.id, d) for n, d in graph.get_high_in_degree_nodes(2)] == [("a", 1), ("b", 0)]
+    assert [(n.id, d) for n, d in graph.get_high_out_degree_nodes(2)] == [("a", 1), ("b", 0)]
+
+    graph.remove_node("a")
+    assert [(n.id, d) for n, d in graph.get_high_in_degree_nodes(5)] == [("b", 0)]
+    assert graph.get_high_out_degree_nodes(0) == []
@@ -0,0 +1,65 @@
+import gzip
+import json
+
+import pytest
+
+from src.graph_manager.knowledge_core.graph_io import convert_json_to_ndjson, is_ndjson_path, read_header, strip_graph_suffix
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+
+
+@pytest.fixture
+def graph() -> Knowledge_Graph:
+    graph = Knowledge_Graph(name="数学 graph")
+    graph.add_node(Knowledge_Node(id="a", title="集合论", description="朴素集合论\n第二行", tags=["数学", "基础"]))
+    graph.add_node(Knowledge_Node(id="b", title="Logic \"quoted\"", tags=[]))
+    graph.add_node(Knowledge_Node(id="c", title="空描述"))
+    graph.add_edge(Knowledge_Edge(id="ab", start_node_id="a", end_node_id="b", title="前置知识", description="说明"))
+    graph.add_edge(Knowledge_Edge(id="ab2", start_node_id="a", end_node_id="b", title="相关"))
+    graph.add_edge(Knowledge_Edge(id="cc", start_node_id="c", end_node_id="c", title="自环"))
+    graph.add_edge(Knowledge_Edge(id="ba", start_node_id="b", end_node_id="a", title="相关"))
+    return graph
+
+
+@pytest.mark.parametrize("suffix", [".ndjson", ".ndjson.gz"])
+def test_round_trip_preserves_the_graph(tmp_path, graph, suffix):
+    path = tmp_path / f"math{suffix}"
+    graph.save_to_file(str(path))
+    assert not (tmp_path / f"math{suffix}.tmp").exists()
+
+    loaded = Knowledge_Graph.load_from_file(str(path))
+    assert loaded.name == graph.name
+    assert loaded.model_dump() == graph.model_dump() # 包括由边重建的 in_edge/out_edge 及其顺序
+    assert [e.id for e in loaded.get_edges_between("a", "b")] == ["ab", "ab2"]
+    assert [n.id for n in loaded.search_nodes_by_keyword("集合")] == ["a"]
+
+    header = read_header(path)
+    assert (header["name"], header["node_count"], header["edge_count"]) == (graph.name, 3, 4)
+
+
+def test_node_records_do_not_store_edge_lists(tmp_path, graph):
+    path = tmp_path / "math.ndjson"
+    graph.save_to_file(str(path))
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1 + 3 + 4
+    assert "ab2" not in "".join(lines[1:4])
+
+
+def test_convert_json_to_ndjson(tmp_path, graph):
+    src = tmp_path / "old.json"
+    graph.save_to_file(str(src))
+    dst = convert_json_to_ndjson(src)
+    assert dst.name == "old.ndjson.gz" and is_ndjson_path(dst)
+    with gzip.open(dst, "rt", encoding="utf-8") as f:
+        assert json.loads(f.readline())["node_count"] == 3
+    assert Knowledge_Graph.load_from_file(str(dst)).model_dump() == graph.model_dump()
+    assert strip_graph_suffix(dst) == "old"
+
+
+def test_rejects_files_that_are_not_graph_ndjson(tmp_path):
+    path = tmp_path / "bad.ndjson"
+    path.write_text('{"format": "something-else"}\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        Knowledge_Graph.load_from_file(str(path))
+    with pytest.raises(ValueError):
+        read_header(path)
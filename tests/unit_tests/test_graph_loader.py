@@ -0,0 +1,72 @@
+import pytest
+
+from src.graph_manager.knowledge_core.graph_loader import load_graph_files, map_files
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.knowledge_graph_integration import KnowledgeGraphIntegration
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+
+
+def write_graph(path, name: str, node_count: int) -> Knowledge_Graph:
+    graph = Knowledge_Graph(name=name)
+    for i in range(node_count):
+        graph.add_node(Knowledge_Node(id=f"{name}{i}", title=f"{name}概念{i}", tags=["标签"]))
+    for i in range(node_count - 1):
+        graph.add_edge(Knowledge_Edge(id=f"{name}e{i}", start_node_id=f"{name}{i}", end_node_id=f"{name}{i + 1}", title="相关"))
+    graph.save_to_file(str(path))
+    return graph
+
+
+def file_size(path) -> int:
+    return path.stat().st_size
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_parallel_load_matches_serial_load(tmp_path, workers):
+    paths = [tmp_path / "a.json", tmp_path / "b.ndjson", tmp_path / "c.ndjson.gz"]
+    expected = {path: write_graph(path, path.name.split(".")[0], 4 + i) for i, path in enumerate(paths)}
+    broken = tmp_path / "broken.json"
+    broken.write_text("{", encoding="utf-8")
+
+    loaded = load_graph_files(paths + [broken], workers=workers)
+    assert list(loaded) == paths + [broken]
+    for path, graph in expected.items():
+        assert loaded[path].model_dump() == graph.model_dump()
+        assert [n.id for n in loaded[path].search_nodes_by_tag(["标签"])] == list(graph.nodes)
+    assert isinstance(loaded[broken], Exception)
+
+
+def test_map_files_returns_results_in_input_order(tmp_path):
+    paths = [tmp_path / f"{i}.json" for i in range(4)]
+    for i, path in enumerate(paths):
+        path.write_text("x" * i, encoding="utf-8")
+    assert list(map_files(file_size, paths, workers=2).values()) == [0, 1, 2, 3]
+
+
+def test_reload_is_incremental(tmp_path):
+    write_graph(tmp_path / "a.json", "a", 3)
+    write_graph(tmp_path / "b.json", "b", 3)
+    write_graph(tmp_path / "c.json", "c", 3)
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    kgi.reload_graphs(preload=True, workers=2)
+    loaded = {g.name: g for g in kgi.graph_list}
+    assert set(loaded) == {"a", "b", "c"}
+    kgi.set_current_graph("a")
+
+    write_graph(tmp_path / "b.json", "b", 5) # 在本进程之外修改
+    (tmp_path / "c.json").unlink()
+    kgi.reload_graphs()
+
+    graphs = {g.name: g for g in kgi.graph_list}
+    assert graphs["a"] is loaded["a"] and kgi.current_graph is loaded["a"]
+    assert "c" not in graphs and kgi.get_graph("c") is None
+    b = kgi.get_graph("b")
+    assert b is not loaded["b"] and len(b.nodes) == 5
+
+
+def test_external_change_to_the_current_graph_is_reloaded(tmp_path):
+    write_graph(tmp_path / "a.json", "a", 2)
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    kgi.set_current_graph("a")
+    write_graph(tmp_path / "a.json", "a", 4)
+    kgi.reload_graphs()
+    assert kgi.current_graph is not None and len(kgi.current_graph.nodes) == 4
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from src.graph_manager.knowledge_core import graph_manifest
+from src.graph_manager.knowledge_core.graph_manifest import MANIFEST_FILENAME, GraphManifest
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.knowledge_graph_integration import KnowledgeGraphIntegration
+from src.graph_manager.knowledge_core.mutation_log import open_graph_log
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+
+
+def write_graph(path, name: str, node_count: int):
+    graph = Knowledge_Graph(name=name)
+    for i in range(node_count):
+        graph.add_node(Knowledge_Node(id=f"{name}{i}", title=f"{name}概念{i}"))
+    for i in range(node_count - 1):
+        graph.add_edge(Knowledge_Edge(id=f"{name}e{i}", start_node_id=f"{name}{i}", end_node_id=f"{name}{i + 1}", title="相关"))
+    graph.save_to_file(str(path))
+    return graph
+
+
+@pytest.fixture
+def described(monkeypatch):
+    """记录被重新读取的图谱文件名。"""
+    calls = []
+    describe = graph_manifest.describe_graph_file
+
+    def spy(filepath):
+        calls.append(filepath.name)
+        return describe(filepath)
+
+    monkeypatch.setattr(graph_manifest, "describe_graph_file", spy)
+    return calls
+
+
+def counts(manifest: GraphManifest):
+    return {entry.file: (entry.name, entry.node_count, entry.edge_count) for entry in manifest}
+
+
+def test_refresh_only_rereads_changed_files(tmp_path, described):
+    write_graph(tmp_path / "a.json", "a", 3)
+    write_graph(tmp_path / "b.ndjson", "b", 2)
+    manifest = GraphManifest.load(tmp_path)
+    assert manifest.refresh() == []
+    manifest.save()
+    assert sorted(described) == ["a.json", "b.ndjson"]
+    assert counts(manifest) == {"a.json": ("a", 3, 2), "b.ndjson": ("b", 2, 1)}
+
+    described.clear()
+    reloaded = GraphManifest.load(tmp_path)
+    reloaded.refresh()
+    assert described == []
+    assert counts(reloaded) == counts(manifest)
+
+    write_graph(tmp_path / "a.json", "a", 5)
+    (tmp_path / "b.ndjson").unlink()
+    reloaded.refresh()
+    assert described == ["a.json"]
+    assert counts(reloaded) == {"a.json": ("a", 5, 4)}
+
+
+def test_pending_log_counts_are_exact(tmp_path, described):
+    path = tmp_path / "a.json"
+    graph = write_graph(path, "a", 2)
+    log, _ = open_graph_log(graph, path, compact_threshold=None)
+    graph.add_node(Knowledge_Node(id="extra", title="日志中的节点"))
+    graph.remove_edge("ae0")
+    log.close()
+
+    manifest = GraphManifest.load(tmp_path)
+    manifest.refresh()
+    assert counts(manifest) == {"a.json": ("a", 3, 0)}
+
+
+def test_corrupt_manifest_is_rebuilt(tmp_path):
+    write_graph(tmp_path / "a.json", "a", 1)
+    (tmp_path / MANIFEST_FILENAME).write_text("{not json", encoding="utf-8")
+    manifest = GraphManifest.load(tmp_path)
+    assert len(manifest) == 0
+    manifest.refresh()
+    manifest.save()
+    data = json.loads((tmp_path / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    assert [item["file"] for item in data["graphs"]] == ["a.json"]
+
+
+def test_integration_loads_graphs_on_demand(tmp_path, described):
+    write_graph(tmp_path / "a.json", "a", 3)
+    write_graph(tmp_path / "b.json", "b", 2)
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path, max_loaded_graphs=1)
+    assert kgi.graph_list == []
+    listing = kgi.list_current_graph()
+    assert "a" in listing and "b" in listing
+
+    kgi.set_current_graph("a")
+    assert [g.name for g in kgi.graph_list] == ["a"]
+    kgi.add_node_to_current_graph(title="新节点", id="a-new")
+
+    kgi.set_current_graph("b") # 超过 max_loaded_graphs，a 被卸载
+    assert [g.name for g in kgi.graph_list] == ["b"]
+    kgi.set_current_graph("a")
+    assert "a-new" in kgi.current_graph.nodes # 卸载前的修改已写入日志
+    kgi.set_current_graph("missing")
+    assert kgi.current_graph.name == "a"
+
+
+def test_unreadable_graph_file_is_logged_and_reported(tmp_path, caplog, capsys):
+    write_graph(tmp_path / "a.json", "a", 2)
+    (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+    capsys.readouterr()
+    with caplog.at_level("WARNING", logger=graph_manifest.__name__):
+        assert GraphManifest.load(tmp_path).refresh() == [str(tmp_path / "broken.json")]
+    assert "broken.json" in caplog.text and capsys.readouterr().out == ""
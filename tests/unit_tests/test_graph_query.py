@@ -0,0 +1,158 @@
+import itertools
+import json
+import random
+
+import pytest
+
+from src.graph_manager.knowledge_core.graph_query import parse_query
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.knowledge_graph_integration import KnowledgeGraphIntegration
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+
+
+def random_graph(rng: random.Random, node_count: int = 8, edge_count: int = 14) -> Knowledge_Graph:
+    graph = Knowledge_Graph(name="query")
+    for i in range(node_count):
+        graph.add_node(Knowledge_Node(id=f"n{i}", title=f"节点{i}", tags=rng.sample(["x", "y", "z"], rng.randint(0, 2))))
+    for i in range(edge_count):
+        u, v = rng.randrange(node_count), rng.randrange(node_count)
+        graph.add_edge(Knowledge_Edge(id=f"e{i}", start_node_id=f"n{u}", end_node_id=f"n{v}", title=rng.choice(["前置知识", "相关"])))
+    return graph
+
+
+def node_matches(node: Knowledge_Node, pattern: dict) -> bool:
+    if "ids" in pattern and node.id not in pattern["ids"]:
+        return False
+    if "tags" in pattern:
+        hits = [tag in node.tags for tag in pattern["tags"]]
+        if not (any(hits) if pattern.get("tag_mode") == "OR" else all(hits)):
+            return False
+    return True
+
+
+def walk_levels(graph: Knowledge_Graph, start: str, edge: dict):
+    """参考实现：levels[L] 为恰好经过 L 条符合条件的边能到达的节点集合。"""
+    title, directed = edge.get("title"), edge.get("directed", True)
+    levels, current = {}, {start}
+    for hops in range(1, edge.get("max_hops", 1) + 1):
+        following = set()
+        for item in graph.edges.values():
+            if title is not None and item.title != title:
+                continue
+            if item.start_node_id in current:
+                following.add(item.end_node_id)
+            if not directed and item.end_node_id in current:
+                following.add(item.start_node_id)
+        levels[hops] = current = following
+    return levels
+
+
+def brute_force(graph: Knowledge_Graph, query: dict):
+    variables = list(query["nodes"])
+    returns = query.get("return", variables)
+    results = set()
+    for combo in itertools.product(graph.nodes, repeat=len(variables)):
+        binding = dict(zip(variables, combo))
+        if not all(node_matches(graph.nodes[binding[var]], pattern) for var, pattern in query["nodes"].items()):
+            continue
+        if all(any(binding[edge["to"]] in nodes for hops, nodes in walk_levels(graph, binding[edge["from"]], edge).items() if hops >= edge.get("min_hops", 1))
+               for edge in query["edges"]):
+            results.add(tuple(binding[var] for var in returns))
+    return results
+
+
+def random_query(rng: random.Random) -> dict:
+    variables = ["a", "b", "c"][:rng.randint(2, 3)]
+    nodes = {}
+    for var in variables:
+        pattern = {}
+        if rng.random() < 0.4:
+            pattern["tags"] = rng.sample(["x", "y", "z"], rng.randint(1, 2))
+            pattern["tag_mode"] = rng.choice(["AND", "OR"])
+        if rng.random() < 0.3:
+            pattern["ids"] = [f"n{i}" for i in rng.sample(range(8), 3)]
+        nodes[var] = pattern
+    edges = []
+    for start, end in zip(variables, variables[1:]):
+        if rng.random() < 0.5:
+            start, end = end, start
+        min_hops = rng.randint(1, 2)
+        edge = {"from": start, "to": end, "min_hops": min_hops, "max_hops": min_hops + rng.randint(0, 2), "directed": rng.random() < 0.7}
+        if rng.random() < 0.5:
+            edge["title"] = rng.choice(["前置知识", "相关"])
+        edges.append(edge)
+    if len(variables) == 3 and rng.random() < 0.5: # 两端都已绑定的校验步骤
+        edges.append({"from": "a", "to": "c", "max_hops": 3, "directed": False})
+    query = {"nodes": nodes, "edges": edges, "limit": 200}
+    if rng.random() < 0.5:
+        query["return"] = rng.sample(variables, rng.randint(1, len(variables)))
+    return query
+
+
+def test_random_queries_match_a_brute_force_search():
+    rng = random.Random(11)
+    for _ in range(120):
+        graph = random_graph(rng)
+        query = random_query(rng)
+        result = graph.query(query)
+        returns = query.get("return", list(query["nodes"]))
+        found = [tuple(match.nodes[var].id for var in returns) for match in result.matches]
+        assert len(found) == len(set(found)) and not result.truncated
+        assert set(found) == brute_force(graph, query), query
+        for match in result.matches:
+            for edge, path in zip(query["edges"], match.paths):
+                # 每条路径都是满足跳数范围的一条最短路径，边的类型一致且首尾相连
+                assert edge.get("min_hops", 1) <= len(path) <= edge["max_hops"]
+                assert all(item.title == edge.get("title", item.title) for item in path)
+                ends = [(item.start_node_id, item.end_node_id) for item in path]
+                if edge.get("directed", True):
+                    assert all(a[1] == b[0] for a, b in zip(ends, ends[1:]))
+
+
+def chain_graph() -> Knowledge_Graph:
+    graph = Knowledge_Graph(name="chain")
+    for node_id, title, tags in [("a", "导数", ["基础"]), ("b", "梯度", []), ("c", "梯度下降", ["错题"]), ("d", "反向传播", ["错题"])]:
+        graph.add_node(Knowledge_Node(id=node_id, title=title, tags=tags))
+    for edge_id, u, v in [("ab", "a", "b"), ("bc", "b", "c"), ("cd", "c", "d")]:
+        graph.add_edge(Knowledge_Edge(id=edge_id, start_node_id=u, end_node_id=v, title="前置知识"))
+    return graph
+
+
+def test_title_filter_paths_and_plan():
+    graph = chain_graph()
+    result = graph.query({
+        "nodes": {"x": {"title": "反向传播"}, "p": {"tags": ["基础"]}},
+        "edges": [{"from": "p", "to": "x", "title": "前置知识", "max_hops": 3}],
+    })
+    [match] = result.matches
+    assert {var: node.id for var, node in match.nodes.items()} == {"x": "d", "p": "a"}
+    assert [edge.id for edge in match.paths[0]] == ["ab", "bc", "cd"]
+    assert result.plan[0].startswith("枚举 ") and "1 个" in result.plan[0]
+    assert graph.query({"nodes": {"x": {"title": "梯度"}}}).matches[0].nodes["x"].id == "b" # 标题需完全相同
+
+
+def test_limit_marks_truncation():
+    result = chain_graph().query({"nodes": {"a": {}, "b": {}}, "edges": [{"from": "a", "to": "b", "max_hops": 3}], "limit": 2})
+    assert len(result.matches) == 2 and result.truncated
+
+
+@pytest.mark.parametrize("query", [
+    {"nodes": {}},
+    {"nodes": {"a": {}}, "edges": [{"from": "a", "to": "missing"}]},
+    {"nodes": {"a": {}}, "return": ["b"]},
+    {"nodes": {"a": {}, "b": {}}, "edges": [{"from": "a", "to": "b", "min_hops": 3, "max_hops": 2}]},
+    {"nodes": {"a": {"unknown": 1}}},
+    {"nodes": {"a": {}}, "limit": 0},
+])
+def test_invalid_queries_are_rejected(query):
+    with pytest.raises(ValueError, match="查询格式错误"):
+        parse_query(query)
+
+
+def test_query_graph_tool_reports_errors_and_matches(tmp_path):
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    kgi.add_graph("chain", chain_graph())
+    response = kgi.query_graph(json.dumps({"nodes": {"p": {"tags": ["错题"]}, "x": {"id": "a"}}, "edges": [{"from": "x", "to": "p", "max_hops": 2}]}))
+    assert "梯度下降" in response and "反向传播" not in response
+    assert "查询格式错误" in kgi.query_graph(json.dumps({"nodes": {}}))
+    assert "Expecting property name" in kgi.query_graph("{")
@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import pytest
+
+from src.graph_manager.knowledge_core.graph_registry import GraphRegistry
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.knowledge_graph_integration import KnowledgeGraphIntegration
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Node
+
+
+def test_register_keeps_names_and_files_one_to_one():
+    registry = GraphRegistry()
+    registry.register("a", "dir/a.json")
+    registry.register("a", Path("dir/a.json")) # 重复注册同一对应关系
+    with pytest.raises(ValueError):
+        registry.register("a", "dir/other.json")
+    with pytest.raises(ValueError):
+        registry.register("b", "dir/a.json")
+    assert registry.file_path("a") == Path("dir/a.json")
+    assert registry.name_of("dir/a.json") == "a"
+    with pytest.raises(ValueError):
+        registry.set_loaded("unknown", Knowledge_Graph(name="unknown"))
+
+
+def test_sync_follows_renamed_and_deleted_files():
+    registry = GraphRegistry()
+    registry.sync([("a", Path("a.json")), ("b", Path("b.json")), ("c", Path("c.json"))])
+    graph_b = Knowledge_Graph(name="b")
+    registry.set_loaded("b", graph_b)
+
+    # a.json 改名为 a2.json，b.json 中的图谱改名为 b2，c.json 被删除
+    assert registry.sync([("a", Path("a2.json")), ("b2", Path("b.json"))]) == []
+    assert registry.file_path("a") == Path("a2.json") and registry.name_of("a.json") is None
+    assert registry.name_of("b.json") == "b2" and "b" not in registry
+    assert "c" not in registry and registry.file_path("c") is None
+    assert registry.loaded == [graph_b] # 已加载的对象由调用方决定是否卸载
+    assert registry.unregister("b") is graph_b and registry.loaded == []
+
+
+def test_duplicate_names_keep_the_registered_file():
+    registry = GraphRegistry()
+    registry.sync([("a", Path("2.json"))])
+    duplicates = registry.sync([("a", Path("1.json")), ("a", Path("2.json")), ("b", Path("3.json")), ("b", Path("4.json"))])
+    assert registry.file_path("a") == Path("2.json")
+    assert registry.file_path("b") == Path("3.json")
+    assert duplicates == [Path("1.json"), Path("4.json")]
+
+
+def test_loaded_graphs_are_ordered_by_use():
+    registry = GraphRegistry()
+    graphs = {}
+    for name in "abc":
+        registry.register(name, f"{name}.json")
+        graphs[name] = Knowledge_Graph(name=name)
+        registry.set_loaded(name, graphs[name])
+    assert registry.get("a") is graphs["a"]
+    assert registry.loaded_names == ["b", "c", "a"]
+    assert registry.unload("c") is graphs["c"] and "c" in registry
+    assert registry.get("c") is None and not registry.is_loaded("c")
+
+
+def test_integration_handles_renamed_and_deleted_graph_files(tmp_path):
+    for name in ("a", "b"):
+        graph = Knowledge_Graph(name=name)
+        graph.add_node(Knowledge_Node(id=f"{name}1", title=name))
+        graph.save_to_file(str(tmp_path / f"{name}.json"))
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    kgi.set_current_graph("a")
+    kgi.set_current_graph("b")
+
+    assert "已存在" in kgi.add_graph("a")
+    (tmp_path / "a.json").rename(tmp_path / "renamed.json")
+    (tmp_path / "b.json").unlink()
+    kgi.reload_graphs()
+
+    assert kgi.get_graph("b") is None
+    assert kgi.get_graph("a") is not None and "a1" in kgi.get_graph("a").nodes
+    assert "已存在" not in kgi.add_graph("b")
+    assert (tmp_path / "b.json").exists()
+
+
+def test_integration_logs_files_with_duplicate_names(tmp_path, caplog):
+    for file_name in ("1.json", "2.json"):
+        Knowledge_Graph(name="a").save_to_file(str(tmp_path / file_name))
+    with caplog.at_level("WARNING"):
+        kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    assert kgi.get_graph("a") is not None
+    assert "与其他文件重复" in caplog.text
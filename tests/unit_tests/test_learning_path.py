@@ -0,0 +1,235 @@
+import random
+
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.knowledge_graph_integration import KnowledgeGraphIntegration
+from src.graph_manager.knowledge_core.learning_path import LearningPlan, LearningPlanner
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+from src.graph_manager.knowledge_core.reachability import strongly_connected_components
+
+
+def prerequisite(edge_id: str, before: str, after: str, title: str = "前置知识") -> Knowledge_Edge:
+    return Knowledge_Edge(id=edge_id, start_node_id=before, end_node_id=after, title=title)
+
+
+def chain_graph() -> Knowledge_Graph:
+    """极限 -> 导数 <-> 链式法则 -> 偏导数 -> 梯度下降，另有一条无关的“相关”边。"""
+    graph = Knowledge_Graph(name="chain")
+    graph.add_batch(
+        [Knowledge_Node(id=node_id, title=node_id) for node_id in ["极限", "导数", "链式法则", "偏导数", "梯度下降", "线性代数"]],
+        [
+            prerequisite("e1", "极限", "导数"),
+            prerequisite("e2", "导数", "链式法则"),
+            prerequisite("e3", "链式法则", "导数"),
+            prerequisite("e4", "导数", "偏导数"),
+            prerequisite("e5", "偏导数", "梯度下降"),
+            prerequisite("e6", "线性代数", "梯度下降", title="相关"),
+        ],
+    )
+    return graph
+
+
+def planner_of(graph: Knowledge_Graph) -> LearningPlanner:
+    return next(listener for listener in graph._listeners if isinstance(listener, LearningPlanner))
+
+
+def assert_valid_order(planner: LearningPlanner):
+    """维护的拓扑序必须使每条跨分量的前置边都从位置小的分量指向位置大的分量。"""
+    for before, after in planner._edges.values():
+        source, target = planner._comp[before], planner._comp[after]
+        if source != target:
+            assert planner._position[source] < planner._position[target], (before, after)
+
+
+def summary(plan: LearningPlan):
+    """与拓扑序的具体选择无关的计划内容：节点、阶段、直接前置与循环依赖组。"""
+    return (
+        {step.node.id: (step.stage, sorted(step.prerequisites)) for step in plan.steps},
+        sorted(sorted(group) for group in plan.cycles),
+    )
+
+
+def assert_plan_consistent(plan: LearningPlan):
+    """前置节点排在依赖它的节点之前（循环依赖组内除外），同一循环依赖组在计划中连续出现。"""
+    position = {step.node.id: i for i, step in enumerate(plan.steps)}
+    cycle = {step.node.id: step.cycle for step in plan.steps}
+    for step in plan.steps:
+        for before in step.prerequisites:
+            if step.cycle is None or cycle[before] != step.cycle:
+                assert position[before] < position[step.node.id]
+    for group in plan.cycles:
+        positions = sorted(position[node_id] for node_id in group)
+        assert positions[-1] - positions[0] == len(group) - 1
+
+
+def test_plan_orders_prerequisites_and_groups_cycles():
+    plan = chain_graph().plan_learning_path(["梯度下降"])
+    assert [step.node.id for step in plan.steps][0] == "极限"
+    assert [step.node.id for step in plan.steps][-2:] == ["偏导数", "梯度下降"]
+    assert sorted(plan.cycles[0]) == ["导数", "链式法则"]
+    assert {step.node.id: step.stage for step in plan.steps} == {"极限": 1, "导数": 2, "链式法则": 2, "偏导数": 3, "梯度下降": 4}
+    assert "线性代数" not in {step.node.id for step in plan.steps}
+
+
+def test_new_edges_merge_and_split_cycles():
+    graph = chain_graph()
+    graph.plan_learning_path(["梯度下降"])
+    graph.add_edge(prerequisite("back", "偏导数", "极限")) # 形成包含四个节点的环
+    plan = graph.plan_learning_path(["梯度下降"])
+    assert len(plan.cycles) == 1
+    assert sorted(plan.cycles[0]) == ["偏导数", "导数", "极限", "链式法则"]
+    assert {step.node.id: step.stage for step in plan.steps}["梯度下降"] == 2
+    assert_valid_order(planner_of(graph))
+
+    graph.remove_edge("back") # 分量分裂，下次规划时重建
+    assert summary(graph.plan_learning_path(["梯度下降"])) == summary(chain_graph().plan_learning_path(["梯度下降"]))
+    graph.update_edge("e3", title="相关") # 不再是前置关系，环消失
+    plan = graph.plan_learning_path(["梯度下降"])
+    assert plan.cycles == [] and [step.node.id for step in plan.steps] == ["极限", "导数", "偏导数", "梯度下降"]
+
+
+def test_self_loops_do_not_form_cycle_groups():
+    graph = chain_graph()
+    graph.add_edge(prerequisite("loop", "极限", "极限"))
+    plan = graph.plan_learning_path(["导数"])
+    assert [step.node.id for step in plan.steps][0] == "极限"
+    assert sorted(map(sorted, plan.cycles)) == [["导数", "链式法则"]]
+
+
+def test_known_nodes_prune_the_closure():
+    plan = chain_graph().plan_learning_path(["梯度下降"], known_ids=["偏导数"])
+    assert [step.node.id for step in plan.steps] == ["梯度下降"]
+    plan = chain_graph().plan_learning_path(["梯度下降"], known_ids=["链式法则"]) # 环中的一个节点已掌握
+    assert {step.node.id for step in plan.steps} == {"极限", "导数", "偏导数", "梯度下降"}
+
+
+def test_reverse_relation():
+    plan = chain_graph().plan_learning_path(["极限"], reverse=True)
+    assert [step.node.id for step in plan.steps][-1] == "极限"
+    assert {step.node.id for step in plan.steps} == {"极限", "导数", "链式法则", "偏导数", "梯度下降"}
+
+
+def test_unknown_target_raises_value_error():
+    with pytest.raises(ValueError):
+        chain_graph().plan_learning_path(["不存在"])
+
+
+def test_strongly_connected_components_order_and_depth():
+    successors = {1: [2], 2: [3], 3: [1, 4], 4: [5], 5: [4], 6: []}
+    components = strongly_connected_components(successors, successors.__getitem__)
+    assert sorted(sorted(c) for c in components) == [[1, 2, 3], [4, 5], [6]]
+    position = {node: i for i, component in enumerate(components) for node in component}
+    assert all(position[u] >= position[v] for u, targets in successors.items() for v in targets) # 逆拓扑序
+    n = 20000
+    assert len(strongly_connected_components(range(n), lambda i: [i + 1] if i + 1 < n else [])) == n
+
+
+def test_closing_a_cycle_keeps_unaffected_components_in_order():
+    graph = Knowledge_Graph(name="cycle")
+    for i in range(5):
+        graph.add_node(Knowledge_Node(id=str(i), title=str(i)))
+    graph.plan_learning_path(["0"])
+    planner = planner_of(graph)
+    for i, (before, after) in enumerate([("1", "3"), ("4", "2"), ("0", "1"), ("1", "2"), ("3", "0")]):
+        graph.add_edge(prerequisite(f"e{i}", before, after))
+        assert_valid_order(planner)
+    plan = graph.plan_learning_path(["2"])
+    assert [sorted(group) for group in plan.cycles] == [["0", "1", "3"]]
+    assert plan.steps[-1].node.id == "2"
+
+
+class Mutator:
+    """对图谱施加可复现的随机修改，只使用“前置知识”和“相关”两种关系。"""
+
+    def __init__(self, seed: int, node_count: int):
+        self.rng = random.Random(seed)
+        self.graph = Knowledge_Graph(name=f"random-{seed}")
+        self.graph.add_batch([Knowledge_Node(id=f"n{i}", title=f"概念{i}") for i in range(node_count)], [])
+        self._next_id = node_count
+
+    def _id(self, prefix: str) -> str:
+        self._next_id += 1
+        return f"{prefix}{self._next_id}"
+
+    def add_edge(self, title: str = "前置知识"):
+        nodes = list(self.graph.nodes)
+        self.graph.add_edge(prerequisite(self._id("e"), self.rng.choice(nodes), self.rng.choice(nodes), title))
+
+    def remove_edge(self):
+        if self.graph.edges:
+            self.graph.remove_edge(self.rng.choice(list(self.graph.edges)))
+
+    def step(self):
+        graph, rng = self.graph, self.rng
+        nodes = list(graph.nodes)
+        r = rng.random()
+        if r < 0.45:
+            self.add_edge(rng.choice(["前置知识", "前置知识", "相关"]))
+        elif r < 0.6:
+            self.remove_edge()
+        elif r < 0.67:
+            graph.add_node(Knowledge_Node(id=self._id("n"), title="新概念"))
+        elif r < 0.72 and len(nodes) > 10:
+            graph.remove_node(rng.choice(nodes))
+        elif r < 0.8 and graph.edges:
+            graph.update_edge(rng.choice(list(graph.edges)), title=rng.choice(["前置知识", "相关"]))
+        elif r < 0.85 and len(nodes) > 10:
+            target, source = rng.sample(nodes, 2)
+            graph.merge_nodes(target, source)
+        else:
+            node_id = self._id("n")
+            graph.add_batch([Knowledge_Node(id=node_id, title="批量")], [
+                prerequisite(self._id("e"), node_id, rng.choice(nodes)),
+                prerequisite(self._id("e"), rng.choice(nodes), node_id),
+            ])
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_order_matches_rebuild_under_random_edge_changes(seed):
+    mutator = Mutator(seed, node_count=60)
+    graph = mutator.graph
+    graph.plan_learning_path([next(iter(graph.nodes))])
+    planner = planner_of(graph)
+    for step in range(400):
+        mutator.add_edge() if mutator.rng.random() < 0.7 else mutator.remove_edge()
+        if planner._version != -1:
+            assert_valid_order(planner)
+        if step % 10 == 0:
+            targets = mutator.rng.sample(list(graph.nodes), 3)
+            plan = graph.plan_learning_path(targets)
+            assert_valid_order(planner)
+            assert_plan_consistent(plan)
+            assert summary(plan) == summary(LearningPlanner(graph).plan(targets))
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_plan_matches_rebuild_under_random_mutations(seed):
+    mutator = Mutator(seed, node_count=40)
+    graph = mutator.graph
+    for step in range(400):
+        mutator.step()
+        if step % 8 == 0:
+            targets = mutator.rng.sample(list(graph.nodes), 2)
+            known = mutator.rng.sample(list(graph.nodes), 3)
+            plan = graph.plan_learning_path(targets, known_ids=known)
+            assert_plan_consistent(plan)
+            assert summary(plan) == summary(LearningPlanner(graph).plan(targets, known))
+
+
+def test_plan_recovers_from_an_invalid_maintained_order():
+    graph = chain_graph()
+    graph.plan_learning_path(["梯度下降"])
+    planner = planner_of(graph)
+    planner._position[planner._comp["极限"]] = len(planner._position) + 10
+    plan = graph.plan_learning_path(["梯度下降"])
+    assert_plan_consistent(plan)
+    assert_valid_order(planner)
+    assert summary(plan) == summary(LearningPlanner(graph).plan(["梯度下降"]))
+
+
+def test_tool_reports_errors_as_text(tmp_path):
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    kgi.add_graph("chain", chain_graph())
+    assert "梯度下降" in kgi.plan_learning_path(["梯度下降"])
+    assert "不存在" in kgi.plan_learning_path(["不存在"])
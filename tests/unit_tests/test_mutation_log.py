@@ -0,0 +1,158 @@
+import json
+import os
+
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.mutation_log import MutationLog, open_graph_log, replay, wal_path_for
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+
+
+def state(graph: Knowledge_Graph):
+    nodes = {n.id: (n.title, n.description, tuple(n.tags), sorted(n.in_edge), sorted(n.out_edge)) for n in graph.nodes.values()}
+    edges = {e.id: (e.start_node_id, e.end_node_id, e.title, e.description) for e in graph.edges.values()}
+    return nodes, edges
+
+
+def rotated_path(snapshot_path):
+    wal_path = wal_path_for(snapshot_path)
+    return wal_path.with_name(wal_path.stem + ".wal.old")
+
+
+def reopen(path):
+    """模拟重新启动：从快照加载图谱并重放残留日志。"""
+    graph = Knowledge_Graph.load_from_file(str(path))
+    log, applied = open_graph_log(graph, path, compact_threshold=None)
+    log.close()
+    return graph, applied
+
+
+@pytest.fixture
+def saved(tmp_path):
+    graph = Knowledge_Graph(name="wal")
+    graph.add_node(Knowledge_Node(id="a", title="A"))
+    graph.add_node(Knowledge_Node(id="b", title="B"))
+    graph.add_edge(Knowledge_Edge(id="ab", start_node_id="a", end_node_id="b", title="相关"))
+    path = tmp_path / "wal.json"
+    graph.save_to_file(str(path))
+    return graph, path
+
+
+def mutate_a(graph):
+    graph.add_node(Knowledge_Node(id="c", title="C", tags=["新"]))
+    graph.add_edge(Knowledge_Edge(id="bc", start_node_id="b", end_node_id="c", title="前置知识"))
+    graph.update_node("a", title="A2", description="改过")
+    graph.update_edge("ab", title="依赖")
+    graph.remove_edge("ab")
+
+
+def mutate_b(graph):
+    graph.add_node(Knowledge_Node(id="d", title="D"))
+    graph.add_edge(Knowledge_Edge(id="da", start_node_id="d", end_node_id="a", title="相关"))
+    graph.remove_node("b")
+
+
+def test_every_op_replays_to_the_same_graph(saved):
+    graph, path = saved
+    log, _ = open_graph_log(graph, path, compact_threshold=None)
+    mutate_a(graph)
+    mutate_b(graph)
+    log.close()
+    ops = [json.loads(line)["op"] for line in wal_path_for(path).read_text(encoding="utf-8").splitlines()]
+    assert ops == ["add_node", "add_edge", "update_node", "update_edge", "remove_edge", "add_node", "add_edge", "remove_node"]
+
+    restored, applied = reopen(path)
+    assert applied == len(ops)
+    assert state(restored) == state(graph)
+
+
+def test_torn_tail_is_dropped_and_truncated_before_new_appends(saved):
+    graph, path = saved
+    log, _ = open_graph_log(graph, path, compact_threshold=None)
+    mutate_a(graph)
+    log.close()
+    expected = state(graph)
+    wal_path = wal_path_for(path)
+    with open(wal_path, "a", encoding="utf-8") as f:
+        f.write('{"op":"add_node","node":{"id":"半')
+
+    restored = Knowledge_Graph.load_from_file(str(path))
+    log, applied = open_graph_log(restored, path, compact_threshold=None)
+    assert applied == 5 and state(restored) == expected
+    assert wal_path.read_bytes().endswith(b"\n") # 残缺末行已被截掉
+
+    mutate_b(restored)
+    log.close()
+    again, applied = reopen(path)
+    assert applied == 8
+    assert state(again) == state(restored)
+
+
+def test_replay_stops_at_an_unparseable_line(saved, tmp_path):
+    graph, _ = saved
+    wal_path = tmp_path / "broken.wal"
+    good = json.dumps({"op": "add_node", "node": {"id": "x", "title": "X"}}, ensure_ascii=False)
+    after = json.dumps({"op": "add_node", "node": {"id": "y", "title": "Y"}}, ensure_ascii=False)
+    wal_path.write_text(good + "\n" + "not json\n" + after + "\n", encoding="utf-8")
+    assert replay(graph, wal_path) == (1, 0)
+    assert "x" in graph.nodes and "y" not in graph.nodes
+    assert replay(graph, tmp_path / "missing.wal") == (0, 0)
+
+
+def test_rotated_log_left_by_an_interrupted_compaction_is_recovered(saved):
+    graph, path = saved
+    log, _ = open_graph_log(graph, path, compact_threshold=None)
+    mutate_a(graph)
+    log.close()
+    # 压缩在轮换日志之后、写入快照之前中断：旧记录留在 .wal.old，新记录写入新的 .wal
+    wal_path = wal_path_for(path)
+    os.replace(wal_path, rotated_path(path))
+    log = MutationLog(wal_path, path, compact_threshold=None)
+    log.attach(graph)
+    mutate_b(graph)
+    log.close()
+
+    restored, applied = reopen(path)
+    assert applied == 8
+    assert state(restored) == state(graph)
+    # 打开时立即重新压缩：旧日志被删除，快照本身已包含全部修改
+    assert not rotated_path(path).exists()
+    assert state(Knowledge_Graph.load_from_file(str(path))) == state(graph)
+
+
+def test_rotated_log_already_in_the_snapshot_is_skipped(saved):
+    graph, path = saved
+    log, _ = open_graph_log(graph, path, compact_threshold=None)
+    mutate_a(graph)
+    log.close()
+    # 压缩在替换快照之后、删除 .wal.old 之前中断
+    os.replace(wal_path_for(path), rotated_path(path))
+    graph.save_to_file(str(path))
+
+    restored, _ = reopen(path)
+    assert state(restored) == state(graph)
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_compaction_moves_records_into_the_snapshot(saved, background):
+    graph, path = saved
+    log, _ = open_graph_log(graph, path, compact_threshold=None)
+    mutate_a(graph)
+    assert log.compact(background=background)
+    mutate_b(graph) # 压缩进行中的修改写入新的日志
+    log.close()
+    assert not rotated_path(path).exists()
+    assert log.records == 3
+    restored, applied = reopen(path)
+    assert applied == 3
+    assert state(restored) == state(graph)
+
+
+def test_threshold_triggers_compaction(saved):
+    graph, path = saved
+    log, _ = open_graph_log(graph, path, compact_threshold=4)
+    mutate_a(graph)
+    log.wait_for_compaction()
+    assert log.records == 1
+    log.close()
+    assert state(reopen(path)[0]) == state(graph)
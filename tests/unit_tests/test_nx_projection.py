@@ -0,0 +1,86 @@
+import random
+
+import networkx as nx
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.knowledge_graph_integration import KnowledgeGraphIntegration
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+
+
+def fresh_projection(graph: Knowledge_Graph) -> nx.DiGraph:
+    G = nx.DiGraph()
+    G.add_nodes_from(graph.nodes)
+    G.add_edges_from((edge.start_node_id, edge.end_node_id) for edge in graph.edges.values())
+    return G
+
+
+def chain(n: int) -> Knowledge_Graph:
+    graph = Knowledge_Graph(name="chain")
+    for i in range(n):
+        graph.add_node(Knowledge_Node(id=f"n{i}", title=f"概念{i}"))
+    for i in range(n - 1):
+        graph.add_edge(Knowledge_Edge(id=f"e{i}", start_node_id=f"n{i}", end_node_id=f"n{i + 1}", title="相关"))
+    return graph
+
+
+def test_parallel_edges_leave_the_projection_only_with_the_last_one():
+    graph = chain(3)
+    graph._to_networkx()
+    graph.add_edge(Knowledge_Edge(id="dup", start_node_id="n0", end_node_id="n1", title="重复"))
+
+    graph.remove_edge("e0")
+    assert graph._to_networkx().has_edge("n0", "n1")
+    graph.remove_edge("dup")
+    assert not graph._to_networkx().has_edge("n0", "n1")
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_patched_projection_matches_fresh_build(seed):
+    rng = random.Random(seed)
+    graph = chain(10)
+    projection = graph._to_networkx()
+    for step in range(200):
+        nodes = list(graph.nodes)
+        r = rng.random()
+        if r < 0.5:
+            graph.add_edge(Knowledge_Edge(id=f"x{step}", start_node_id=rng.choice(nodes), end_node_id=rng.choice(nodes), title="相关"))
+        elif r < 0.8 and graph.edges:
+            graph.remove_edge(rng.choice(list(graph.edges)))
+        elif r < 0.9 and len(nodes) > 3:
+            graph.remove_node(rng.choice(nodes))
+        else:
+            graph.add_node(Knowledge_Node(id=f"m{step}", title="新概念"))
+    assert graph._to_networkx() is projection # 原地修补，没有重建
+    expected = fresh_projection(graph)
+    assert set(projection.nodes) == set(expected.nodes)
+    assert set(projection.edges) == set(expected.edges)
+
+
+def test_centrality_is_reused_until_the_graph_changes():
+    graph = chain(5)
+    version = graph.version
+    first = graph.get_betweenness_centrality()
+    assert graph.get_betweenness_centrality() is first
+    assert first == pytest.approx(nx.betweenness_centrality(fresh_projection(graph)))
+
+    graph.update_node("n0", title="改名")
+    assert graph.version > version
+
+    graph.add_edge(Knowledge_Edge(id="short", start_node_id="n0", end_node_id="n4", title="捷径"))
+    updated = graph.get_betweenness_centrality()
+    assert updated is not first
+    assert updated == pytest.approx(nx.betweenness_centrality(fresh_projection(graph)))
+    assert graph.get_closeness_centrality() == pytest.approx(nx.closeness_centrality(fresh_projection(graph)))
+
+
+def test_find_path_tool_only_computes_centrality_on_request(tmp_path):
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path, result_cache_size=0)
+    kgi.add_graph("chain", chain(4))
+    graph = kgi.current_graph
+    plain = kgi.find_path("n0", "n3")
+    assert "中心度" not in plain and "**入度:** 1" in plain
+    assert graph._centrality._results == {} and graph._centrality._pending == {}
+    annotated = kgi.find_path("n0", "n3", with_centrality=True)
+    assert "中心度" in annotated and graph._centrality._pending == {}
+    assert kgi.find_path("n0", "n3") == plain # 中心性已缓存也不影响默认输出
@@ -0,0 +1,48 @@
+import networkx as nx
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+from src.graph_manager.knowledge_core.parallel_centrality import parallel_betweenness_centrality, parallel_closeness_centrality
+
+
+def random_digraph(n: int, p: float, seed: int) -> nx.DiGraph:
+    G = nx.gnp_random_graph(n, p, seed=seed, directed=True)
+    return nx.relabel_nodes(G, {i: f"n{i}" for i in G})
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_parallel_brandes_matches_networkx(seed):
+    G = random_digraph(40, 0.08, seed)
+    G.add_node("isolated")
+    expected = nx.betweenness_centrality(G, normalized=True)
+    assert parallel_betweenness_centrality(G, workers=2) == pytest.approx(expected)
+
+
+def test_parallel_sampled_betweenness_matches_networkx():
+    G = random_digraph(30, 0.1, seed=7)
+    expected = nx.betweenness_centrality(G, k=10, normalized=True, seed=42)
+    assert parallel_betweenness_centrality(G, workers=2, k=10, seed=42) == pytest.approx(expected)
+
+
+def test_parallel_closeness_matches_networkx():
+    G = random_digraph(40, 0.06, seed=11)
+    assert parallel_closeness_centrality(G, workers=3) == pytest.approx(nx.closeness_centrality(G))
+
+
+def test_small_and_empty_graphs():
+    assert parallel_betweenness_centrality(nx.DiGraph(), workers=2) == {}
+    assert parallel_closeness_centrality(nx.DiGraph(), workers=2) == {}
+    G = nx.DiGraph([("a", "b")])
+    assert parallel_betweenness_centrality(G, workers=4) == pytest.approx(nx.betweenness_centrality(G))
+
+
+def test_graph_shares_the_cache_between_worker_counts():
+    graph = Knowledge_Graph(name="cycle")
+    for i in range(6):
+        graph.add_node(Knowledge_Node(id=f"n{i}", title=f"概念{i}"))
+    for i in range(6):
+        graph.add_edge(Knowledge_Edge(id=f"e{i}", start_node_id=f"n{i}", end_node_id=f"n{(i + 1) % 6}", title="相关"))
+    parallel = graph.get_betweenness_centrality(workers=2)
+    assert graph.get_betweenness_centrality() is parallel
+    assert parallel == pytest.approx(nx.betweenness_centrality(graph._to_networkx()))
@@ -0,0 +1,105 @@
+import itertools
+import random
+
+import networkx as nx
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+
+
+def random_graph(seed: int, n: int = 14, m: int = 24) -> Knowledge_Graph:
+    rng = random.Random(seed)
+    graph = Knowledge_Graph(name="paths")
+    for i in range(n):
+        graph.add_node(Knowledge_Node(id=f"n{i}", title=f"概念{i}"))
+    for i in range(m):
+        graph.add_edge(Knowledge_Edge(id=f"e{i}", start_node_id=f"n{rng.randrange(n)}", end_node_id=f"n{rng.randrange(n)}", title="相关"))
+    return graph
+
+
+def projection(graph: Knowledge_Graph, directed: bool = True):
+    G = nx.DiGraph() if directed else nx.Graph()
+    G.add_nodes_from(graph.nodes)
+    G.add_edges_from((edge.start_node_id, edge.end_node_id) for edge in graph.edges.values())
+    return G
+
+
+def assert_is_path(G, path, source, target):
+    assert path[0] == source and path[-1] == target
+    assert all(G.has_edge(u, v) for u, v in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("directed", [True, False])
+@pytest.mark.parametrize("seed", range(3))
+def test_paths_match_networkx(seed, directed):
+    graph = random_graph(seed)
+    G = projection(graph, directed)
+    for source, target in itertools.permutations(list(graph.nodes)[:8], 2):
+        path = graph.find_path(source, target, directed=directed)
+        if not nx.has_path(G, source, target):
+            assert path == []
+            assert graph.find_all_shortest_paths(source, target, directed=directed) == []
+            assert graph.find_k_shortest_paths(source, target, k=3, directed=directed) == []
+            continue
+        length = nx.shortest_path_length(G, source, target)
+        assert_is_path(G, path, source, target)
+        assert len(path) == length + 1
+
+        all_paths = graph.find_all_shortest_paths(source, target, directed=directed)
+        assert sorted(all_paths) == sorted(nx.all_shortest_paths(G, source, target))
+
+        k_paths = graph.find_k_shortest_paths(source, target, k=4, directed=directed)
+        expected = list(itertools.islice(nx.shortest_simple_paths(G, source, target), 4))
+        assert [len(p) for p in k_paths] == [len(p) for p in expected]
+        assert len({tuple(p) for p in k_paths}) == len(k_paths)
+        for p in k_paths:
+            assert_is_path(G, p, source, target)
+            assert len(set(p)) == len(p)
+
+
+def test_max_depth_and_direction():
+    graph = random_graph(0, n=0, m=0)
+    for i in range(4):
+        graph.add_node(Knowledge_Node(id=f"c{i}", title=f"链{i}"))
+    for i in range(3):
+        graph.add_edge(Knowledge_Edge(id=f"c{i}", start_node_id=f"c{i}", end_node_id=f"c{i + 1}", title="相关"))
+
+    assert graph.find_path("c0", "c3") == ["c0", "c1", "c2", "c3"]
+    assert graph.find_path("c0", "c3", max_depth=2) == []
+    assert graph.find_path("c3", "c0") == []
+    assert graph.find_path("c3", "c0", directed=False) == ["c3", "c2", "c1", "c0"]
+    assert graph.find_path("c1", "c1") == ["c1"]
+    with pytest.raises(ValueError):
+        graph.find_path("c0", "missing")
+    with pytest.raises(ValueError):
+        graph.find_path("c0", "c3", max_depth=-1)
+
+
+def test_results_are_cached_until_the_graph_changes():
+    graph = random_graph(1)
+    cache = graph._path_cache
+    first = graph.find_path("n0", "n5", directed=False)
+    hits = cache.hits
+    assert graph.find_path("n0", "n5", directed=False) == first
+    assert cache.hits == hits + 1
+
+    first.append("tampered") # 返回的列表是副本，不影响缓存
+    graph.add_edge(Knowledge_Edge(id="shortcut", start_node_id="n0", end_node_id="n5", title="捷径"))
+    assert graph.find_path("n0", "n5", directed=False) == ["n0", "n5"]
+
+
+def test_unreachable_results_go_through_the_cache_without_building_the_index():
+    graph = Knowledge_Graph(name="islands")
+    for node_id in "abxy":
+        graph.add_node(Knowledge_Node(id=node_id, title=node_id))
+    graph.add_edge(Knowledge_Edge(id="ab", start_node_id="a", end_node_id="b", title="相关"))
+    graph.add_edge(Knowledge_Edge(id="xy", start_node_id="x", end_node_id="y", title="相关"))
+    cache = graph._path_cache
+    assert graph.find_path("a", "y") == [] and graph._reachability._weak is None # 路径查询不触发索引重建
+    assert graph.find_path("a", "y") == [] and cache.hits == 1
+
+    assert not graph.is_reachable("a", "y") # 索引建立后，未命中缓存的不可达查询直接返回
+    misses = cache.misses
+    assert graph.find_all_shortest_paths("a", "y") == [] and cache.misses == misses + 1
+    assert graph.find_all_shortest_paths("a", "y") == [] and cache.hits == 2
@@ -0,0 +1,80 @@
+import jinja2
+import pytest
+
+from src.graph_manager.knowledge_core import prompt
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.knowledge_graph_integration import KnowledgeGraphIntegration
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+from src.graph_manager.knowledge_core.prompt_templates import get_template, render_prompt, tsv_cell
+
+TEMPLATES = sorted(name for name, value in vars(prompt).items() if name.startswith("PROMPT_") and isinstance(value, str))
+
+
+def render_uncompiled(source, context):
+    try:
+        return jinja2.Template(source).render(context)
+    except jinja2.UndefinedError as e:
+        return type(e)
+
+
+def render_compiled(source, context):
+    try:
+        return render_prompt(source, context)
+    except jinja2.UndefinedError as e:
+        return type(e)
+
+
+@pytest.mark.parametrize("name", [name for name in TEMPLATES if "COMPACT" not in name])
+def test_precompiled_output_is_identical(name):
+    source = getattr(prompt, name)
+    context = {"graph_name": "图谱", "name": "图谱", "count": 0, "nodes": [], "edges": [], "error_message": "出错"}
+    assert render_compiled(source, context) == render_uncompiled(source, context)
+    assert get_template(source) is get_template(source)
+
+
+def test_templates_outside_prompt_module_are_cached():
+    source = "{{ value | tsv }}!"
+    assert render_prompt(source, {"value": ["a", "b"]}) == "a,b!"
+    assert get_template(source) is get_template(source)
+    assert render_prompt("无变量") == "无变量"
+
+
+def test_tsv_cell_flattens_separators():
+    assert tsv_cell(None) == ""
+    assert tsv_cell("a\tb\nc") == "a b c"
+    assert tsv_cell(["x", 1]) == "x,1"
+
+
+@pytest.fixture
+def kgi(tmp_path):
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    graph = Knowledge_Graph(name="tsv")
+    graph.add_node(Knowledge_Node(id="a", title="多行\n标题\t带制表符", tags=["数学", "基础"]))
+    graph.add_node(Knowledge_Node(id="b", title="B", tags=["数学"]))
+    graph.add_edge(Knowledge_Edge(id="ab", start_node_id="a", end_node_id="b", title="前置知识"))
+    kgi.add_graph("tsv", graph)
+    return kgi
+
+
+def tsv_rows(text: str):
+    return [line.split("\t") for line in text.splitlines()[1:] if line]
+
+
+def test_compact_list_output_is_one_row_per_item(kgi):
+    assert tsv_rows(kgi.get_all_node(compact=True)) == [["id", "title"], ["a", "多行 标题 带制表符"], ["b", "B"]]
+    assert tsv_rows(kgi.get_all_edge(compact=True)) == [["id", "title", "start_node_id", "end_node_id"], ["ab", "前置知识", "a", "b"]]
+    assert tsv_rows(kgi.search_nodes_by_tag(["数学"], compact=True))[1:] == [["a", "多行 标题 带制表符", "数学,基础"], ["b", "B", "数学"]]
+
+
+def test_compact_find_path_lists_nodes_and_edges(kgi):
+    rows = [line.split("\t") for line in kgi.find_path("a", "b", compact=True).splitlines() if line.startswith(("N\t", "E\t"))]
+    assert [row[1] for row in rows if row[0] == "N"] == ["id", "a", "b"]
+    assert [row[1] for row in rows if row[0] == "E"] == ["id", "ab"]
+    assert "centrality" not in rows[0]
+    rows = [line.split("\t") for line in kgi.find_path("a", "b", compact=True, with_centrality=True).splitlines() if line.startswith("N\t")]
+    assert rows[0][5] == "centrality" and all(len(row) == len(rows[0]) for row in rows)
+
+
+def test_summary_renders_for_graphs_with_edges(kgi):
+    summary = kgi.summarize_graph_content()
+    assert "前置知识" in summary
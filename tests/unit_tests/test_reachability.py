@@ -0,0 +1,156 @@
+import random
+
+import networkx as nx
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.knowledge_graph_integration import KnowledgeGraphIntegration
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+
+
+def to_networkx(graph: Knowledge_Graph) -> nx.DiGraph:
+    G = nx.DiGraph()
+    G.add_nodes_from(graph.nodes)
+    G.add_edges_from((edge.start_node_id, edge.end_node_id) for edge in graph.edges.values())
+    return G
+
+
+def assert_matches_networkx(graph: Knowledge_Graph, rng: random.Random):
+    G = to_networkx(graph)
+    U = G.to_undirected()
+    nodes = list(graph.nodes)
+    index_of = graph._adjacency.index_of
+    for _ in range(40): # 在重建之前检查：不精确的结构给出的“不可达”也必须成立
+        start, goal = rng.choice(nodes), rng.choice(nodes)
+        if graph._reachability.excludes(index_of(start), index_of(goal)):
+            assert not nx.has_path(G, start, goal)
+        if graph._reachability.excludes(index_of(start), index_of(goal), directed=False):
+            assert not nx.has_path(U, start, goal)
+    for _ in range(40):
+        start, goal = rng.choice(nodes), rng.choice(nodes)
+        assert graph.is_reachable(start, goal) == nx.has_path(G, start, goal)
+        assert graph.is_reachable(start, goal, directed=False) == nx.has_path(U, start, goal)
+    assert graph.count_components() == nx.number_weakly_connected_components(G)
+    assert graph.count_components(strong=True) == nx.number_strongly_connected_components(G)
+    assert sorted(map(sorted, graph.get_components(strong=True))) == sorted(map(sorted, nx.strongly_connected_components(G)))
+    sizes = [len(component) for component in graph.get_components()]
+    assert sizes == sorted(sizes, reverse=True)
+
+
+def mutate(graph: Knowledge_Graph, rng: random.Random, step: int):
+    """随机执行一次修改，覆盖会更新、保留或丢弃可达性索引的各种操作。"""
+    nodes = list(graph.nodes)
+    r = rng.random()
+    if r < 0.45:
+        graph.add_edge(Knowledge_Edge(id=f"e{step}", start_node_id=rng.choice(nodes), end_node_id=rng.choice(nodes), title="相关"))
+    elif r < 0.6 and graph.edges:
+        graph.remove_edge(rng.choice(list(graph.edges)))
+    elif r < 0.7:
+        graph.add_node(Knowledge_Node(id=f"n{step}", title="新概念"))
+    elif r < 0.78 and len(nodes) > 10:
+        graph.remove_node(rng.choice(nodes))
+    elif r < 0.84 and len(nodes) > 10:
+        target, source = rng.sample(nodes, 2)
+        graph.merge_nodes(target, source)
+    else:
+        node_id = f"n{step}"
+        graph.add_batch([Knowledge_Node(id=node_id, title="批量")], [
+            Knowledge_Edge(id=f"b{step}", start_node_id=node_id, end_node_id=rng.choice(nodes), title="相关"),
+        ])
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_queries_match_networkx_under_random_mutations(seed):
+    rng = random.Random(seed)
+    graph = Knowledge_Graph(name="reach")
+    for i in range(30):
+        graph.add_node(Knowledge_Node(id=f"init{i}", title=f"概念{i}"))
+    for step in range(300):
+        mutate(graph, rng, step)
+        if step % 10 == 0:
+            assert_matches_networkx(graph, rng)
+    assert_matches_networkx(graph, rng)
+
+
+def two_islands() -> Knowledge_Graph:
+    graph = Knowledge_Graph(name="islands")
+    for node_id in "abcxyz":
+        graph.add_node(Knowledge_Node(id=node_id, title=node_id))
+    for u, v in ["ab", "bc", "ca", "xy", "yz"]:
+        graph.add_edge(Knowledge_Edge(id=u + v, start_node_id=u, end_node_id=v, title="相关"))
+    return graph
+
+
+def test_unreachable_across_components():
+    graph = two_islands()
+    assert not graph.is_reachable("a", "x") and not graph.is_reachable("a", "x", directed=False)
+    assert graph.find_path("a", "z") == [] and graph.find_path("a", "z", directed=False) == []
+    assert not graph.is_reachable("z", "x") and graph.is_reachable("z", "x", directed=False) # 同一弱连通分量内的反向
+    assert graph.find_path("z", "x", directed=False) == ["z", "y", "x"]
+
+    graph.add_edge(Knowledge_Edge(id="cx", start_node_id="c", end_node_id="x", title="相关"))
+    assert graph.is_reachable("a", "z") and not graph.is_reachable("z", "a")
+    assert graph.find_path("a", "z") == ["a", "b", "c", "x", "y", "z"]
+    graph.remove_edge("cx")
+    assert graph.find_path("a", "z") == [] and graph.count_components() == 2
+
+
+def test_removals_split_strong_components():
+    graph = two_islands()
+    assert graph.count_components(strong=True) == 4
+    graph.remove_edge("ca")
+    assert not graph.is_reachable("c", "a") and graph.is_reachable("a", "c")
+    assert graph.count_components(strong=True) == 6
+    graph.remove_node("b")
+    assert not graph.is_reachable("a", "c", directed=False) and graph.count_components() == 3
+    graph.merge_nodes("a", "c") # 合并后 a 继承 c 的边
+    graph.add_edge(Knowledge_Edge(id="za", start_node_id="z", end_node_id="a", title="相关"))
+    graph.add_edge(Knowledge_Edge(id="ax", start_node_id="a", end_node_id="x", title="相关"))
+    assert graph.is_reachable("y", "a") and graph.count_components(strong=True) == 1
+
+
+def test_edge_changes_keep_structures_that_are_still_usable():
+    graph = two_islands()
+    assert not graph.is_reachable("a", "x")
+    index = graph._reachability
+    strong = index._strong
+    graph.add_edge(Knowledge_Edge(id="xz", start_node_id="x", end_node_id="z", title="相关")) # x 原本就能到达 z
+    assert index._strong is strong
+    graph.add_edge(Knowledge_Edge(id="zx", start_node_id="z", end_node_id="x", title="相关")) # 形成新的环
+    assert index._strong is None
+    assert graph.count_components(strong=True) == 2
+
+    graph.remove_edge("ca") # 删除后结构保留为超图近似，仍能排除不可达的节点对
+    a, x = graph._adjacency.index_of("a"), graph._adjacency.index_of("x")
+    assert index._weak is not None and index._strong is not None and not index._exact
+    assert index.excludes(a, x) and index.excludes(a, x, directed=False)
+    assert not graph.is_reachable("c", "a") and index._exact # 精确查询前先重建
+    assert graph.count_components(strong=True) == 4
+
+
+def test_parallel_edges_keep_reachability_until_the_last_one_goes():
+    graph = two_islands()
+    graph.add_edge(Knowledge_Edge(id="xy2", start_node_id="x", end_node_id="y", title="平行"))
+    graph.remove_edge("xy")
+    assert graph.is_reachable("x", "z")
+    graph.remove_edge("xy2")
+    assert not graph.is_reachable("x", "z")
+
+
+def test_isolated_nodes_and_unknown_ids():
+    graph = two_islands()
+    graph.add_node(Knowledge_Node(id="solo", title="孤立"))
+    assert graph.count_components() == 3 and graph.is_reachable("solo", "solo")
+    assert graph.get_components(top_k=1) == [graph.get_components()[0]]
+    graph.remove_node("solo")
+    assert graph.count_components() == 2
+    with pytest.raises(ValueError):
+        graph.is_reachable("a", "不存在")
+
+
+def test_find_path_tool_reports_disconnected_nodes(tmp_path):
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    kgi.add_graph("islands", two_islands())
+    assert "不同的连通分量" in kgi.find_path("a", "x")
+    assert "不同的连通分量" not in kgi.find_path("z", "x")
+    assert "共有 **2** 个弱连通分量" in kgi.list_components()
@@ -0,0 +1,131 @@
+import random
+from collections import Counter
+
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+from src.graph_manager.knowledge_core.relation_index import normalize_relation
+
+TITLES = ["前置知识", " 前置知识 ", "应用于", "Related", "RELATED", "ｒｅｌａｔｅｄ"]
+
+
+def scan_steps(graph: Knowledge_Graph, node_id: str, relation: str, direction: str):
+    """参考实现：扫描全部边，找出节点沿某种关系经过的 (边 ID, 对端节点 ID)。"""
+    relation = normalize_relation(relation)
+    steps = []
+    for edge in graph.edges.values():
+        if normalize_relation(edge.title) != relation:
+            continue
+        if direction in ("out", "both") and edge.start_node_id == node_id:
+            steps.append((edge.id, edge.end_node_id))
+        if direction in ("in", "both") and edge.end_node_id == node_id:
+            steps.append((edge.id, edge.start_node_id))
+    return steps
+
+
+def scan_closure(graph: Knowledge_Graph, node_id: str, relation: str, direction: str, max_depth=None):
+    depths, frontier, depth = {node_id: 0}, [node_id], 0
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        frontier = [other for current in frontier for _, other in scan_steps(graph, current, relation, direction)]
+        frontier = [other for other in dict.fromkeys(frontier) if other not in depths]
+        depths.update((other, depth) for other in frontier)
+    del depths[node_id]
+    return depths
+
+
+def assert_index_matches_scan(graph: Knowledge_Graph):
+    counts = Counter(normalize_relation(edge.title) for edge in graph.edges.values())
+    assert {normalize_relation(label): count for label, count in graph.get_relation_types()} == dict(counts)
+    for relation in counts:
+        assert sorted(edge.id for edge in graph.get_edges_by_relation(relation)) == sorted(
+            edge.id for edge in graph.edges.values() if normalize_relation(edge.title) == relation)
+        for node_id in graph.nodes:
+            for direction in ("out", "in", "both"):
+                found = [(edge.id, node.id) for node, edge in graph.get_neighbours_by_relation(node_id, relation, direction)]
+                assert sorted(found) == sorted(scan_steps(graph, node_id, relation, direction))
+
+
+def test_index_follows_every_edge_mutation():
+    rng = random.Random(4)
+    graph = Knowledge_Graph(name="rel")
+    next_id = 0
+    for step in range(300):
+        if len(graph.nodes) < 3:
+            graph.add_node(Knowledge_Node(id=f"n{next_id}", title=f"节点{next_id}"))
+            next_id += 1
+            continue
+        node_ids = list(graph.nodes)
+        action = rng.random()
+        if action < 0.35:
+            graph.add_edge(Knowledge_Edge(start_node_id=rng.choice(node_ids), end_node_id=rng.choice(node_ids), title=rng.choice(TITLES)))
+        elif action < 0.5 and graph.edges:
+            graph.update_edge(rng.choice(list(graph.edges)), title=rng.choice(TITLES))
+        elif action < 0.6 and graph.edges:
+            graph.remove_edge(rng.choice(list(graph.edges)))
+        elif action < 0.7:
+            graph.remove_node(rng.choice(node_ids))
+        elif action < 0.8:
+            source, target = rng.sample(node_ids, 2)
+            graph.merge_nodes(target, source)
+        elif action < 0.9:
+            new_id = f"n{next_id}"
+            next_id += 1
+            graph.add_batch([Knowledge_Node(id=new_id, title=new_id)],
+                            [Knowledge_Edge(start_node_id=new_id, end_node_id=rng.choice(node_ids), title=rng.choice(TITLES))])
+        else:
+            graph.add_node(Knowledge_Node(id=f"n{next_id}", title=f"节点{next_id}"))
+            next_id += 1
+        if step % 25 == 0:
+            assert_index_matches_scan(graph)
+    assert_index_matches_scan(graph)
+    reloaded = Knowledge_Graph.model_validate(graph.model_dump())
+    assert sorted(reloaded.get_relation_types()) == sorted(graph.get_relation_types())
+
+
+def test_titles_are_normalized_and_keep_the_first_label():
+    graph = Knowledge_Graph(name="rel")
+    for node_id in "abc":
+        graph.add_node(Knowledge_Node(id=node_id, title=node_id))
+    graph.add_edge(Knowledge_Edge(id="ab", start_node_id="a", end_node_id="b", title="Related"))
+    graph.add_edge(Knowledge_Edge(id="bc", start_node_id="b", end_node_id="c", title=" ｒｅｌａｔｅｄ "))
+    graph.add_edge(Knowledge_Edge(id="ac", start_node_id="a", end_node_id="c", title="应用于"))
+    assert graph.get_relation_types() == [("Related", 2), ("应用于", 1)]
+    assert graph.get_relation_types(top_k=1) == [("Related", 2)]
+    assert [edge.id for edge in graph.get_edges_by_relation("RELATED", limit=1)] == ["ab"]
+    assert "related" in graph.relation_index and "依赖" not in graph.relation_index
+
+    graph.update_edge("ab", title="依赖")
+    graph.remove_edge("ac")
+    assert graph.get_relation_types() == [("Related", 1), ("依赖", 1)] # 类型仍有边时保留首次出现的标题
+    assert graph.get_edges_by_relation("应用于") == []
+
+
+def chain() -> Knowledge_Graph:
+    graph = Knowledge_Graph(name="chain")
+    for node_id in "abcde":
+        graph.add_node(Knowledge_Node(id=node_id, title=node_id))
+    for u, v in ["ab", "bc", "cd", "ca"]:
+        graph.add_edge(Knowledge_Edge(id=u + v, start_node_id=u, end_node_id=v, title="前置知识"))
+    graph.add_edge(Knowledge_Edge(id="de", start_node_id="d", end_node_id="e", title="应用于"))
+    return graph
+
+
+@pytest.mark.parametrize("direction", ["out", "in", "both"])
+@pytest.mark.parametrize("max_depth", [None, 1, 2])
+def test_closure_matches_a_breadth_first_scan(direction, max_depth):
+    graph = chain()
+    for node_id in graph.nodes:
+        closure = graph.get_relation_closure(node_id, "前置知识", direction, max_depth)
+        assert {node.id: depth for node, depth in closure} == scan_closure(graph, node_id, "前置知识", direction, max_depth)
+        assert [depth for _, depth in closure] == sorted(depth for _, depth in closure)
+
+
+def test_closure_stops_at_other_relations_and_validates_arguments():
+    graph = chain()
+    assert [(node.id, depth) for node, depth in graph.get_relation_closure("a", "前置知识")] == [("b", 1), ("c", 2), ("d", 3)]
+    with pytest.raises(ValueError):
+        graph.get_relation_closure("missing", "前置知识")
+    with pytest.raises(ValueError):
+        graph.get_neighbours_by_relation("a", "前置知识", direction="sideways")
@@ -0,0 +1,129 @@
+import random
+
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.knowledge_graph_integration import KnowledgeGraphIntegration
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+from src.graph_manager.knowledge_core.result_cache import ResultCache
+
+
+def random_graph(name: str, seed: int, node_count: int = 30) -> Knowledge_Graph:
+    rng = random.Random(seed)
+    graph = Knowledge_Graph(name=name)
+    for i in range(node_count):
+        graph.add_node(Knowledge_Node(id=f"n{i}", title=f"概念{i}", tags=rng.sample(["a", "b", "c"], rng.randint(0, 2))))
+    for i in range(node_count * 2):
+        graph.add_edge(Knowledge_Edge(id=f"e{i}", start_node_id=f"n{rng.randrange(node_count)}", end_node_id=f"n{rng.randrange(node_count)}", title=rng.choice(["前置知识", "相关"])))
+    return graph
+
+
+def reads(kgi: KnowledgeGraphIntegration, a: str, b: str):
+    return [
+        kgi.get_node_info(a),
+        kgi.get_node_neighbours(b),
+        kgi.search_nodes_by_tag(["a"]),
+        kgi.search_nodes_by_keyword("概念"),
+        kgi.get_k_hop_neighborhood(a, 2),
+        kgi.find_path(a, b),
+        kgi.get_relation_closure(a, "前置知识"),
+        kgi.list_components(),
+    ]
+
+
+@pytest.fixture
+def kgi(tmp_path):
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path, result_cache_size=16)
+    kgi.add_graph("random", random_graph("random", 0))
+    return kgi
+
+
+def test_cached_results_match_uncached_under_random_mutations(kgi, tmp_path):
+    graph = kgi.current_graph
+    uncached = KnowledgeGraphIntegration(graph_dir=tmp_path / "uncached", result_cache_size=0)
+    uncached.current_graph = graph
+    rng = random.Random(1)
+    for step in range(60):
+        a, b = rng.sample(list(graph.nodes), 2)
+        assert reads(kgi, a, b) == reads(uncached, a, b)
+        assert reads(kgi, a, b) == reads(uncached, a, b)
+        r = rng.random()
+        if r < 0.4:
+            graph.add_edge(Knowledge_Edge(id=f"new{step}", start_node_id=a, end_node_id=b, title="前置知识"))
+        elif r < 0.6 and graph.edges:
+            graph.remove_edge(rng.choice(list(graph.edges)))
+        elif r < 0.8:
+            graph.update_node(a, title=f"改名{step}", tags=["a"])
+        else:
+            graph.remove_node(b)
+    stats = kgi.result_cache.stats()
+    assert stats["hits"] > 0 and stats["size"] <= stats["maxsize"] == 16
+
+
+def test_equivalent_calls_share_an_entry_and_mutations_invalidate(kgi):
+    first = kgi.get_k_hop_neighborhood("n0", 2)
+    assert kgi.get_k_hop_neighborhood(node_id="n0", k=2, direction="both") == first # 位置参数、关键字参数与默认值
+    assert kgi.search_nodes_by_tag(["a", "b"]) == kgi.search_nodes_by_tag(("a", "b"))
+    assert kgi.result_cache.stats()["hits"] == 2
+    kgi.update_node_in_current_graph("n0", title="新的标题")
+    assert "新的标题" in kgi.get_node_info("n0")
+    assert len(kgi.result_cache) == 1 # 旧版本的结果已被丢弃
+
+
+def test_different_calls_never_share_an_entry(kgi):
+    results = {
+        "k1": kgi.get_k_hop_neighborhood("n0", 1),
+        "k2": kgi.get_k_hop_neighborhood("n0", 2),
+        "in": kgi.get_k_hop_neighborhood("n0", 1, direction="in"),
+        "n1": kgi.get_k_hop_neighborhood("n1", 1),
+        "neighbours": kgi.get_node_neighbours("n0"), # 不同方法的相同参数
+        "info": kgi.get_node_info("n0"),
+        "and": kgi.search_nodes_by_tag(["a", "b"]),
+        "or": kgi.search_nodes_by_tag(["a", "b"], mode="OR"),
+    }
+    assert kgi.result_cache.stats()["hits"] == 0 and len(kgi.result_cache) == len(results)
+    assert len(set(results.values())) == len(results)
+
+
+def test_graphs_with_the_same_version_do_not_collide(kgi):
+    kgi.add_graph("other", random_graph("other", 5))
+    assert kgi.current_graph.name == "other"
+    other = kgi.get_node_info("n0")
+    kgi.set_current_graph("random")
+    assert kgi.get_graph("random").version == kgi.get_graph("other").version
+    assert kgi.get_node_info("n0") != other
+    kgi.set_current_graph("other")
+    assert kgi.get_node_info("n0") == other and kgi.result_cache.stats()["hits"] == 1
+
+
+def test_same_name_reloaded_graph_is_not_served_stale_results():
+    cache = ResultCache(8)
+    old = Knowledge_Graph(name="g")
+    assert cache.get_or_compute(old, "m", (), lambda: "old") == "old"
+    new = Knowledge_Graph(name="g")
+    assert new.version == old.version
+    assert cache.get_or_compute(new, "m", (), lambda: "new") == "new"
+
+
+def test_lru_bound_and_disabled_cache():
+    graph = Knowledge_Graph(name="g")
+    cache = ResultCache(2)
+    for key in range(3):
+        cache.get_or_compute(graph, "m", key, lambda: str(key))
+    assert len(cache) == 2
+    assert cache.get_or_compute(graph, "m", 0, lambda: "recomputed") == "recomputed"
+    disabled = ResultCache(0)
+    disabled.get_or_compute(graph, "m", 0, lambda: "x")
+    assert len(disabled) == 0 and disabled.stats()["misses"] == 1
+
+
+def test_result_computed_across_a_mutation_is_not_stored():
+    graph = random_graph("g", 0, node_count=3)
+    cache = ResultCache(8)
+
+    def compute():
+        graph.update_node("n0", title="改动")
+        return "stale"
+
+    cache.get_or_compute(graph, "m", (), compute)
+    assert len(cache) == 0
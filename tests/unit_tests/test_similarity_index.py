@@ -0,0 +1,154 @@
+import random
+
+import pytest
+
+from src.graph_manager.knowledge_core.bulk_ingest import ingest
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.mutation_log import open_graph_log
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+from src.graph_manager.knowledge_core.similarity_index import MinHashIndex, normalize_tags, similarity, title_shingles
+
+
+def state(graph: Knowledge_Graph):
+    nodes = {n.id: (n.title, n.description, tuple(n.tags), sorted(n.in_edge), sorted(n.out_edge)) for n in graph.nodes.values()}
+    edges = {e.id: (e.start_node_id, e.end_node_id, e.title, e.description) for e in graph.edges.values()}
+    return nodes, edges
+
+
+def random_titles(rng: random.Random, count: int):
+    """生成成簇的标题：每个基础标题派生出若干只改动少量字符的变体。"""
+    alphabet = "线性代数微积分概率统计图论拓扑几何数论矩阵向量空间"
+    titles = []
+    while len(titles) < count:
+        base = "".join(rng.choice(alphabet) for _ in range(rng.randint(6, 12)))
+        titles.append(base)
+        for _ in range(rng.randint(0, 3)):
+            chars = list(base)
+            chars[rng.randrange(len(chars))] = rng.choice(alphabet)
+            titles.append("".join(chars) + rng.choice(["", " ", "（一）"]))
+    return titles[:count]
+
+
+def test_lsh_query_matches_a_linear_scan():
+    rng = random.Random(7)
+    titles = random_titles(rng, 300)
+    index = MinHashIndex()
+    for i, title in enumerate(titles):
+        index.add(str(i), title)
+
+    expected_total = found_total = 0
+    for i in range(0, len(titles), 3):
+        query = (title_shingles(titles[i]), normalize_tags(()))
+        expected = {str(j): similarity(query, (title_shingles(t), normalize_tags(()))) for j, t in enumerate(titles) if j != i}
+        expected = {doc_id: score for doc_id, score in expected.items() if score >= 0.6}
+        result = index.query(titles[i], threshold=0.6, exclude=str(i))
+        assert [score for _, score in result] == sorted((score for _, score in result), reverse=True)
+        for doc_id, score in result: # 结果中不会出现误报，分数是精确值
+            assert score == pytest.approx(expected[doc_id])
+        expected_total += len(expected)
+        found_total += len(result)
+    assert expected_total > 50
+    assert found_total / expected_total >= 0.95
+
+
+def test_index_follows_removals_and_tags():
+    index = MinHashIndex()
+    index.add("a", "线性代数基础", ["数学"])
+    index.add("b", "线性代数 基础！", ["数学"])
+    index.add("c", "线性代数基础", ["历史"])
+    assert [doc_id for doc_id, _ in index.similar_to("a")] == ["b", "c"] # 标签相同的得分更高
+    index.remove("b")
+    index.add("c", "完全不同的标题") # 重新添加会替换旧的签名
+    assert "b" not in index and len(index) == 2
+    assert index.similar_to("a") == []
+    assert index.query("") == []
+
+
+def test_graph_duplicates_follow_updates():
+    graph = Knowledge_Graph(name="dup")
+    graph.add_node(Knowledge_Node(id="a", title="梯度下降法"))
+    graph.add_node(Knowledge_Node(id="b", title="随机森林"))
+    assert graph.find_duplicate_nodes() == []
+    graph.update_node("b", title="梯度下降 法")
+    assert [(x.id, y.id) for x, y, _ in graph.find_duplicate_nodes()] == [("a", "b")]
+    graph.remove_node("a")
+    assert graph.find_similar_nodes("梯度下降法") and graph.find_similar_nodes("梯度下降法", exclude_id="b") == []
+
+
+def merge_fixture() -> Knowledge_Graph:
+    graph = Knowledge_Graph(name="merge")
+    graph.add_node(Knowledge_Node(id="t", title="梯度下降", tags=["优化"]))
+    graph.add_node(Knowledge_Node(id="s", title="梯度下降法", description="沿负梯度方向更新", tags=["优化", "AI"]))
+    for node_id in "xyz":
+        graph.add_node(Knowledge_Node(id=node_id, title=node_id.upper()))
+    edges = {"st": ("s", "t"), "ts": ("t", "s"), "xs": ("x", "s"), "sy": ("s", "y"), "tz": ("t", "z"), "ss": ("s", "s")}
+    for edge_id, (u, v) in edges.items():
+        graph.add_edge(Knowledge_Edge(id=edge_id, start_node_id=u, end_node_id=v, title="相关"))
+    return graph
+
+
+def test_merge_redirects_edges_and_drops_the_source():
+    graph = merge_fixture()
+    events = []
+    graph.add_listener(lambda op, payload: events.append(op))
+    graph.merge_nodes("t", "s")
+
+    expected = Knowledge_Graph(name="merge")
+    expected.add_node(Knowledge_Node(id="t", title="梯度下降", description="沿负梯度方向更新", tags=["优化", "AI"]))
+    for node_id in "xyz":
+        expected.add_node(Knowledge_Node(id=node_id, title=node_id.upper()))
+    for edge_id, (u, v) in {"xs": ("x", "t"), "sy": ("t", "y"), "tz": ("t", "z"), "ss": ("t", "t")}.items():
+        expected.add_edge(Knowledge_Edge(id=edge_id, start_node_id=u, end_node_id=v, title="相关"))
+
+    assert events == ["merge_nodes"]
+    assert state(graph) == state(expected)
+    assert graph.get_high_out_degree_nodes(1)[0][0].id == "t"
+    assert graph.find_path("x", "y") == ["x", "t", "y"]
+    assert [node.id for node in graph.search_nodes_by_keyword("负梯度")] == ["t"]
+    assert graph.find_similar_nodes("梯度下降法", exclude_id="t") == []
+    with pytest.raises(ValueError):
+        graph.merge_nodes("t", "s")
+    with pytest.raises(ValueError):
+        graph.merge_nodes("t", "t")
+
+
+def test_merge_replays_and_snapshots(tmp_path):
+    graph = merge_fixture()
+    path = tmp_path / "merge.json"
+    graph.save_to_file(str(path))
+    before = graph.snapshot()
+    log, _ = open_graph_log(graph, path, compact_threshold=None)
+    graph.merge_nodes("t", "s", title="梯度下降算法", tags=["优化"])
+    log.close()
+
+    reopened = Knowledge_Graph.load_from_file(str(path))
+    log, applied = open_graph_log(reopened, path, compact_threshold=None)
+    log.close()
+    assert applied == 1 and state(reopened) == state(graph)
+    assert state(graph.snapshot()) == state(graph)
+
+    graph.rollback(before)
+    assert state(graph) == state(merge_fixture())
+
+
+def test_ingest_merge_redirects_batch_edges():
+    graph = Knowledge_Graph(name="ingest")
+    graph.add_node(Knowledge_Node(id="gd", title="梯度下降"))
+    data = {
+        "nodes": [{"id": "new-gd", "title": "梯度 下降！"}, {"id": "lr", "title": "学习率"}],
+        "edges": [{"id": "e1", "start_node_id": "lr", "end_node_id": "new-gd", "title": "影响"},
+                  {"id": "e2", "start_node_id": "new-gd", "end_node_id": "new-gd", "title": "自环"}],
+    }
+
+    flagged = ingest(graph.snapshot().to_graph(), data, dedup="flag")
+    assert [(d.id, d.match_id, d.merged) for d in flagged.duplicates] == [("new-gd", "gd", False)]
+    assert flagged.added_nodes == 2
+
+    summary = ingest(graph, data, dedup="merge")
+    assert summary.success and summary.added_nodes == 1 and summary.added_edges == 2
+    assert [(d.id, d.match_id, d.merged) for d in summary.duplicates] == [("new-gd", "gd", True)]
+    assert "new-gd" not in graph.nodes
+    assert (graph.edges["e1"].start_node_id, graph.edges["e1"].end_node_id) == ("lr", "gd")
+    assert (graph.edges["e2"].start_node_id, graph.edges["e2"].end_node_id) == ("gd", "gd")
+    with pytest.raises(ValueError):
+        ingest(graph, data, dedup="unknown")
@@ -0,0 +1,152 @@
+import json
+import random
+
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.knowledge_graph_integration import MAX_SNAPSHOTS_PER_GRAPH, KnowledgeGraphIntegration
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+from src.graph_manager.knowledge_core.persistent_map import PersistentMap
+
+
+def build_graph() -> Knowledge_Graph:
+    graph = Knowledge_Graph(name="snap")
+    for node_id in "abcd":
+        graph.add_node(Knowledge_Node(id=node_id, title=node_id.upper(), tags=["原始"]))
+    for edge_id, (u, v) in {"ab": "ab", "bc": "bc", "cd": "cd", "da": "da"}.items():
+        graph.add_edge(Knowledge_Edge(id=edge_id, start_node_id=u, end_node_id=v, title="相关"))
+    return graph
+
+
+def contents(source):
+    nodes = {n.id: (n.title, n.description, tuple(n.tags), sorted(n.in_edge), sorted(n.out_edge)) for n in source.get_all_node()}
+    edges = {e.id: (e.start_node_id, e.end_node_id, e.title, e.description) for e in source.get_all_edge()}
+    return nodes, edges
+
+
+def test_snapshot_stays_frozen_and_diff_names_each_change():
+    graph = build_graph()
+    snapshot = graph.snapshot()
+    frozen = contents(snapshot)
+    assert frozen == contents(graph)
+
+    graph.add_node(Knowledge_Node(id="e", title="E"))
+    graph.add_edge(Knowledge_Edge(id="ae", start_node_id="a", end_node_id="e", title="新边"))
+    graph.update_node("b", tags=["改过"])
+    graph.update_edge("cd", title="依赖")
+    graph.remove_node("d") # 同时删除 cd、da
+
+    assert contents(snapshot) == frozen
+    assert [e.id for e in snapshot.get_out_edge("a")] == ["ab"]
+    diff = graph.diff(snapshot)
+    assert sorted(diff.added_nodes) == ["e"] and sorted(diff.added_edges) == ["ae"]
+    assert sorted(diff.removed_nodes) == ["d"] and sorted(diff.removed_edges) == ["cd", "da"]
+    assert sorted(diff.changed_nodes) == ["b"] and diff.changed_edges == []
+
+
+def test_rollback_restores_removed_hubs_and_updates():
+    graph = build_graph()
+    snapshot = graph.snapshot()
+    expected = contents(graph)
+    events = []
+    graph.add_listener(lambda op, payload: events.append(op))
+
+    graph.remove_node("a")
+    graph.update_node("c", title="改名", description="描述")
+    graph.add_edge(Knowledge_Edge(id="cb", start_node_id="c", end_node_id="b", title="反向"))
+    events.clear()
+
+    graph.rollback(snapshot)
+    assert contents(graph) == expected
+    assert graph.diff(snapshot).is_empty
+    assert {"remove_edge", "add_batch"} <= set(events) # 恢复通过普通修改完成，日志可以记录
+    assert graph.find_path("d", "b") == ["d", "a", "b"]
+
+
+def test_tracker_resyncs_after_a_rolled_back_batch():
+    graph = build_graph()
+    graph.snapshot()
+
+    def fail(op, payload):
+        raise RuntimeError("listener failed")
+
+    graph.add_listener(fail)
+    with pytest.raises(RuntimeError):
+        graph.add_batch([Knowledge_Node(id="x", title="X")], [])
+    graph.remove_listener(fail)
+    graph.update_node("a", title="A2")
+    assert contents(graph.snapshot()) == contents(graph)
+
+
+def test_snapshot_graph_is_independent():
+    graph = build_graph()
+    copy = graph.snapshot().to_graph()
+    copy.update_node("a", title="副本")
+    graph.remove_node("b")
+    assert graph.nodes["a"].title == "A" and "b" in copy.nodes
+
+
+def test_persistent_map_versions_share_nothing_mutable():
+    rng = random.Random(0)
+    versions, reference = [PersistentMap()], [{}]
+    for step in range(500):
+        key = rng.randrange(100)
+        current, expected = versions[-1], dict(reference[-1])
+        if key in expected and rng.random() < 0.4:
+            current = current.delete(key)
+            del expected[key]
+        else:
+            current = current.set(key, step)
+            expected[key] = step
+        versions.append(current)
+        reference.append(expected)
+    for version, expected in zip(versions[::50], reference[::50]):
+        assert dict(version.items()) == expected and len(version) == len(expected)
+    old, new = versions[100], versions[-1]
+    changes = {key: (before, after) for key, before, after in old.diff(new)}
+    keys = reference[100].keys() | reference[-1].keys()
+    assert changes == {key: (reference[100].get(key), reference[-1].get(key)) for key in keys if reference[100].get(key) != reference[-1].get(key)}
+
+
+@pytest.fixture
+def kgi(tmp_path):
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    kgi.add_graph("snap", build_graph())
+    return kgi
+
+
+def test_labels_and_undo_snapshots(kgi):
+    graph = kgi.current_graph
+    assert "start" in kgi.create_snapshot("start")
+    version = graph.version
+
+    response = kgi.delete_items(node_ids=["a"], edge_ids=["missing"])
+    undo_label = f"before-delete-v{version}"
+    assert undo_label in response
+    assert "before-delete" not in kgi.delete_items(node_ids=["missing"]) # 没有修改时不保存撤销快照
+
+    batch = {"nodes": [{"id": "x", "title": "X"}], "edges": []}
+    version = graph.version
+    assert f"before-batch-v{version}" in kgi.batch_add_from_json(json.dumps(batch))
+
+    listing = kgi.list_snapshots()
+    assert listing.index("start") < listing.index(undo_label) < listing.index("before-batch")
+
+    kgi.rollback_to_snapshot(undo_label)
+    assert "a" in graph.nodes and "x" not in graph.nodes
+    kgi.rollback_to_snapshot("start")
+    assert contents(graph) == contents(build_graph())
+    response = kgi.rollback_to_snapshot("nope")
+    assert "nope" in response and "start" in response # 提示现有的快照名称
+
+
+def test_snapshot_labels_are_capped_and_overwritten(kgi):
+    for i in range(MAX_SNAPSHOTS_PER_GRAPH + 2):
+        kgi.current_graph.update_node("a", title=f"A{i}")
+        kgi.create_snapshot(f"s{i}")
+    kgi.current_graph.update_node("a", title="最新")
+    kgi.create_snapshot("s5") # 同名覆盖
+    labels = [line.split("|")[1].strip() for line in kgi.list_snapshots().splitlines() if line.startswith("| s")]
+    assert labels == [f"s{i}" for i in range(2, MAX_SNAPSHOTS_PER_GRAPH + 2) if i != 5] + ["s5"]
+    kgi.rollback_to_snapshot("s5")
+    assert kgi.current_graph.nodes["a"].title == "最新"
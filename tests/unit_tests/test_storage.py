@@ -0,0 +1,145 @@
+import random
+
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.knowledge_graph_integration import KnowledgeGraphIntegration
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+from src.graph_manager.knowledge_core.storage import is_storage_path, open_storage
+
+TITLES = ["线性代数", "线性回归", "概率论", "Graph Theory", "graph search", "回归分析"]
+TAGS = ["数学", "Math", "统计", "AI"]
+
+
+def random_graph(seed: int) -> Knowledge_Graph:
+    rng = random.Random(seed)
+    graph = Knowledge_Graph(name="stored")
+    for i in range(25):
+        graph.add_node(Knowledge_Node(id=f"n{i}", title=f"{rng.choice(TITLES)}{i}", description=rng.choice(["", "矩阵与回归", "search tree"]), tags=rng.sample(TAGS, rng.randint(0, 2))))
+    for i in range(45):
+        graph.add_edge(Knowledge_Edge(id=f"e{i}", start_node_id=f"n{rng.randrange(25)}", end_node_id=f"n{rng.randrange(25)}", title=rng.choice(["前置知识", "相关"])))
+    return graph
+
+
+def state(graph: Knowledge_Graph):
+    nodes = {n.id: (n.title, n.description, tuple(n.tags), sorted(n.in_edge), sorted(n.out_edge)) for n in graph.nodes.values()}
+    edges = {e.id: (e.start_node_id, e.end_node_id, e.title, e.description) for e in graph.edges.values()}
+    return nodes, edges
+
+
+@pytest.fixture
+def stored(tmp_path):
+    graph = random_graph(0)
+    path = tmp_path / "stored.sqlite"
+    graph.save_to_file(str(path))
+    storage = open_storage(path)
+    yield graph, storage
+    storage.close()
+
+
+def test_round_trip_and_point_reads(stored, tmp_path):
+    graph, storage = stored
+    assert is_storage_path(tmp_path / "stored.sqlite") and not is_storage_path(tmp_path / "stored.json")
+    assert (storage.name, storage.node_count(), storage.edge_count()) == ("stored", 25, 45)
+    assert state(storage.load_graph()) == state(graph)
+    assert state(Knowledge_Graph.load_from_file(str(tmp_path / "stored.sqlite"))) == state(graph)
+    for node_id in ("n0", "n7", "n24"):
+        assert storage.get_node(node_id) == graph.nodes[node_id]
+        assert {e.id for e in storage.get_out_edge(node_id)} == set(graph.nodes[node_id].out_edge)
+        assert {e.id for e in storage.get_in_edge(node_id)} == set(graph.nodes[node_id].in_edge)
+    assert storage.get_node("missing") is None and storage.get_edge("missing") is None
+
+
+@pytest.mark.parametrize("keyword", ["线性", "回归", "graph", "Graph", "矩", "search tree", "不存在"])
+def test_keyword_search_ranks_like_the_memory_index(stored, keyword):
+    graph, storage = stored
+    for case_sensitive in (False, True):
+        expected = [n.id for n in graph.search_nodes_by_keyword(keyword, case_sensitive)]
+        assert [n.id for n in storage.search_nodes_by_keyword(keyword, case_sensitive)] == expected
+    assert [e.id for e in storage.search_edges_by_keyword("前置")] == [e.id for e in graph.search_edges_by_keyword("前置")]
+
+
+def test_tag_queries_match(stored):
+    graph, storage = stored
+    for tags in (["数学"], ["math"], ["数学", "AI"]):
+        for mode in ("AND", "OR"):
+            for case_sensitive in (False, True):
+                expected = {n.id for n in graph.search_nodes_by_tag(tags, mode, case_sensitive)}
+                assert {n.id for n in storage.search_nodes_by_tag(tags, mode, case_sensitive)} == expected
+    assert dict(storage.get_top_k_tags(10)) == dict(graph.get_top_k_tags(10))
+
+
+def test_traversals_match_the_memory_graph(stored):
+    graph, storage = stored
+    for start in ("n0", "n3", "n11"):
+        for direction in ("out", "in", "both"):
+            expected = graph.get_k_hop_neighborhood(start, 2, direction=direction)
+            subgraph = storage.get_k_hop_neighborhood(start, 2, direction=direction)
+            assert set(subgraph.nodes) == set(expected.nodes)
+            assert set(subgraph.edges) == set(expected.edges)
+        for goal in ("n5", "n20"):
+            for directed in (True, False):
+                assert len(storage.find_path(start, goal, directed)) == len(graph.find_path(start, goal, directed))
+
+
+def test_attached_storage_follows_graph_mutations(stored, tmp_path):
+    graph, storage = stored
+    storage.attach(graph)
+    graph.add_node(Knowledge_Node(id="new", title="新概念", tags=["AI"]))
+    graph.add_edge(Knowledge_Edge(id="x", start_node_id="new", end_node_id="n0", title="相关"))
+    graph.update_node("n1", title="改名后的标题", tags=["统计"])
+    graph.update_edge("e0", description="补充说明")
+    graph.remove_node("n2")
+    graph.remove_edge(next(iter(graph.edges)))
+    storage.detach()
+    graph.add_node(Knowledge_Node(id="after-detach", title="不写入"))
+
+    with open_storage(tmp_path / "stored.sqlite", readonly=True) as reader:
+        loaded = reader.load_graph()
+    graph.remove_node("after-detach")
+    assert state(loaded) == state(graph)
+    assert [n.id for n in storage.search_nodes_by_keyword("改名后")] == ["n1"]
+
+
+def integration_reads(kgi: KnowledgeGraphIntegration):
+    return [
+        kgi.get_node_info("n3"),
+        kgi.get_node_info("missing"),
+        kgi.search_nodes_by_keyword("回归", limit=3),
+        sorted(kgi.get_k_hop_neighborhood("n0", 2, max_nodes=5).splitlines()), # 同一跳内边的排列顺序可能不同
+        sorted(kgi.get_k_hop_neighborhood("n3", 1, direction="in").splitlines()),
+        kgi.find_path("n0", "n20", directed=False),
+        kgi.find_path("n5", "n6", compact=True),
+        kgi.find_path("n0", "missing"),
+    ]
+
+
+def test_integration_reads_a_storage_backed_graph_without_loading_it(tmp_path):
+    random_graph(0).save_to_file(str(tmp_path / "stored.sqlite"))
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    assert "stored" in kgi.set_current_graph("stored")
+    from_storage = integration_reads(kgi)
+    assert kgi.graph_list == [] and kgi._current_graph is None # 读取全部由存储后端回答
+    assert "stored" in kgi.list_current_graph() and kgi.graph_list == []
+    kgi.find_path("n0", "n20", k=2) # 多条路径需要完整的内存图谱
+    assert [graph.name for graph in kgi.graph_list] == ["stored"] and kgi._current_storage is None
+    assert integration_reads(kgi) == from_storage
+
+
+def test_writes_load_the_storage_backed_graph_and_persist(tmp_path):
+    random_graph(0).save_to_file(str(tmp_path / "stored.sqlite"))
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    kgi.set_current_graph("stored")
+    kgi.add_node_to_current_graph("新概念", id="new")
+    assert kgi._current_storage is None and kgi.current_graph.get_node("new") is not None
+    with open_storage(tmp_path / "stored.sqlite", readonly=True) as reader:
+        assert reader.get_node("new").title == "新概念"
+
+    kgi.add_graph("other")
+    kgi.unload_graph("stored")
+    kgi.set_current_graph("stored") # 再次选中时又只打开存储后端
+    assert "新概念" in kgi.get_node_info("new") and kgi._current_graph is None
+    kgi.reload_graphs()
+    assert kgi._current_storage is not None and "新概念" in kgi.get_node_info("new")
+    kgi.set_current_graph("other")
+    assert kgi._current_storage is None and kgi.current_graph.name == "other"
@@ -0,0 +1,79 @@
+import random
+
+import networkx as nx
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Edge, Knowledge_Node
+
+
+def random_graph(seed: int, n: int = 20, m: int = 35) -> Knowledge_Graph:
+    rng = random.Random(seed)
+    graph = Knowledge_Graph(name="hops")
+    for i in range(n):
+        graph.add_node(Knowledge_Node(id=f"n{i}", title=f"概念{i}"))
+    for i in range(m):
+        graph.add_edge(Knowledge_Edge(id=f"e{i}", start_node_id=f"n{rng.randrange(n)}", end_node_id=f"n{rng.randrange(n)}", title="相关"))
+    return graph
+
+
+def expected_neighbourhood(graph: Knowledge_Graph, center: str, k: int, direction: str):
+    """networkx 给出跳数；边为从距离小于 k 的节点沿扩散方向经过的边。"""
+    G = nx.MultiDiGraph()
+    G.add_nodes_from(graph.nodes)
+    G.add_edges_from((e.start_node_id, e.end_node_id) for e in graph.edges.values())
+    if direction == "in":
+        G = G.reverse()
+    elif direction == "both":
+        G = G.to_undirected()
+    hops = nx.single_source_shortest_path_length(G, center, cutoff=k)
+    edges = set()
+    for edge in graph.edges.values():
+        if direction in ("out", "both") and hops.get(edge.start_node_id, k) < k:
+            edges.add(edge.id)
+        if direction in ("in", "both") and hops.get(edge.end_node_id, k) < k:
+            edges.add(edge.id)
+    return hops, edges
+
+
+@pytest.mark.parametrize("direction", ["out", "in", "both"])
+@pytest.mark.parametrize("seed", range(3))
+def test_view_matches_bfs_reference(seed, direction):
+    graph = random_graph(seed)
+    for center in ("n0", "n7"):
+        for k in (0, 1, 2, 4):
+            view = graph.get_k_hop_neighborhood(center, k, direction=direction)
+            hops, edges = expected_neighbourhood(graph, center, k, direction)
+            assert {node_id: view.hop_of(node_id) for node_id in view.nodes} == hops
+            assert set(view.edges) == edges
+            assert len(view) == len(hops)
+
+
+def test_view_is_zero_copy_and_read_only():
+    graph = random_graph(1)
+    view = graph.get_k_hop_neighborhood("n0", 2, direction="both")
+    for node_id, node in view.nodes.items():
+        assert node is graph.nodes[node_id]
+    assert [n.id for n in view.nodes_at_hop(0)] == ["n0"]
+    with pytest.raises(TypeError):
+        view.nodes["n0"] = graph.nodes["n0"]
+    with pytest.raises(KeyError):
+        view.nodes["not-in-view"]
+
+
+def test_materialize_copies_and_refuses_stale_views():
+    graph = random_graph(2)
+    view = graph.get_k_hop_neighborhood("n3", 2, direction="both")
+    subgraph = view.materialize(name="sub")
+    assert subgraph.name == "sub"
+    assert set(subgraph.nodes) == set(view.nodes) and set(subgraph.edges) == set(view.edges)
+    subgraph.update_node("n3", title="副本里改名")
+    assert graph.nodes["n3"].title != "副本里改名"
+
+    assert not view.is_stale
+    graph.update_node("n3", title="父图改名")
+    assert view.is_stale
+    with pytest.raises(ValueError):
+        view.materialize()
+    with pytest.raises(ValueError):
+        graph.get_k_hop_neighborhood("n3", 1, direction="sideways")
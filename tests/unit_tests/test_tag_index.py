@@ -0,0 +1,75 @@
+import random
+from collections import Counter
+
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Node
+from src.graph_manager.knowledge_core.tag_index import TagIndex
+
+TAGS = ["数学", "Math", "math", "AI", "ai", "物理"]
+
+
+def linear_query(node_tags, tags, mode, case_sensitive):
+    fold = (lambda tag: tag) if case_sensitive else str.lower
+    wanted = {fold(tag) for tag in tags}
+    result = set()
+    for node_id, node in node_tags.items():
+        have = {fold(tag) for tag in node}
+        if wanted and (wanted <= have if mode == "AND" else wanted & have):
+            result.add(node_id)
+    return result
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_query_and_counts_match_linear_scan(seed):
+    rng = random.Random(seed)
+    index, node_tags = TagIndex(), {}
+    for _ in range(200):
+        node_id = f"n{rng.randrange(30)}"
+        if node_id in node_tags and rng.random() < 0.3:
+            index.remove(node_id)
+            del node_tags[node_id]
+        else:
+            tags = [rng.choice(TAGS) for _ in range(rng.randint(0, 3))] # 可能重复或仅大小写不同
+            index.add(node_id, tags)
+            node_tags[node_id] = tags
+
+    for _ in range(50):
+        tags = rng.sample(TAGS, rng.randint(1, 2))
+        for mode in ("AND", "OR"):
+            for case_sensitive in (False, True):
+                assert set(index.query(tags, mode, case_sensitive)) == linear_query(node_tags, tags, mode, case_sensitive)
+
+    expected = Counter(tag for tags in node_tags.values() for tag in tags)
+    assert dict(index.top_k(len(TAGS))) == dict(expected)
+    assert [count for _, count in index.top_k(3)] == sorted(expected.values(), reverse=True)[:3]
+    for tag in TAGS:
+        assert index.tag_count(tag) == expected[tag]
+
+
+def test_query_edge_cases():
+    index = TagIndex()
+    index.add("a", ["AI", "ai"])
+    assert index.query(["AI"]) == ["a"]
+    assert index.query([]) == []
+    assert index.query(["AI"], mode="XOR") == []
+    assert index.node_count("ai") == 1 and index.node_count("ai", case_sensitive=True) == 1
+    index.remove("a")
+    index.remove("missing")
+    assert index.query(["ai"]) == [] and index.top_k() == []
+
+
+def test_graph_top_k_tags_follow_updates():
+    graph = Knowledge_Graph(name="tags")
+    graph.add_node(Knowledge_Node(id="n1", title="A", tags=["数学", "基础"]))
+    graph.add_node(Knowledge_Node(id="n2", title="B", tags=["数学"]))
+    assert graph.get_top_k_tags(1) == [("数学", 2)]
+
+    graph.update_node("n2", tags=["物理"])
+    graph.update_node("n1", tags=["物理"])
+    assert graph.get_top_k_tags(1) == [("物理", 2)]
+    assert [n.id for n in graph.search_nodes_by_tag(["数学"])] == []
+
+    graph.remove_node("n1")
+    assert graph.get_top_k_tags() == [("物理", 1)]
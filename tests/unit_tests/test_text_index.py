@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Node
+from src.graph_manager.knowledge_core.text_index import NGramIndex
+
+ALPHABET = "abAB学习图谱 "
+
+
+def linear_search(docs, term, case_sensitive=False):
+    """按 search 文档中的排序规则逐一扫描全部文档。"""
+    needle = term if case_sensitive else term.lower()
+    ranked = []
+    for doc_id, fields in docs.items():
+        fields = fields if case_sensitive else tuple(field.lower() for field in fields)
+        title = fields[0]
+        if needle in title:
+            rank = 0 if title == needle else 1 if title.startswith(needle) else 2
+        elif any(needle in field for field in fields[1:]):
+            rank = 3
+        else:
+            continue
+        ranked.append((rank, len(title), doc_id))
+    return [doc_id for _, _, doc_id in sorted(ranked)]
+
+
+def random_text(rng, max_len=6):
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, max_len)))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_search_matches_linear_scan(seed):
+    rng = random.Random(seed)
+    index, docs = NGramIndex(), {}
+    for step in range(300):
+        doc_id = f"d{rng.randrange(60)}"
+        if doc_id in docs and rng.random() < 0.3:
+            index.remove(doc_id)
+            del docs[doc_id]
+        else:
+            fields = (random_text(rng), random_text(rng, 10), random_text(rng, 4))
+            index.add(doc_id, fields)
+            docs[doc_id] = fields
+    assert len(index) == len(docs)
+    for _ in range(100):
+        term = random_text(rng, 3)
+        for case_sensitive in (False, True):
+            assert index.search(term, case_sensitive) == linear_search(docs, term, case_sensitive)
+
+
+def test_ranking_and_limit():
+    index = NGramIndex()
+    index.add("desc", ("其它", "介绍图谱的内容"))
+    index.add("contains", ("知识图谱", ""))
+    index.add("prefix_long", ("图谱算法进阶", ""))
+    index.add("prefix", ("图谱算法", ""))
+    index.add("exact", ("图谱", ""))
+    assert index.search("图谱") == ["exact", "prefix", "prefix_long", "contains", "desc"]
+    assert index.search("图谱", limit=2) == ["exact", "prefix"]
+
+
+def test_single_character_and_empty_terms():
+    index = NGramIndex()
+    index.add("a", ("Graph", ""))
+    index.add("b", ("tree", "a graph"))
+    assert index.search("h") == ["a", "b"]
+    assert set(index.search("")) == {"a", "b"}
+    assert index.search("zz") == []
+    assert index.search("G", case_sensitive=True) == ["a"]
+
+
+def test_graph_search_follows_updates_and_removals():
+    graph = Knowledge_Graph(name="search")
+    graph.add_node(Knowledge_Node(id="n1", title="线性代数", description="矩阵与向量"))
+    graph.add_node(Knowledge_Node(id="n2", title="概率论", tags=["数学基础"]))
+
+    assert [n.id for n in graph.search_nodes_by_keyword("矩阵")] == ["n1"]
+    assert [n.id for n in graph.search_nodes_by_keyword("数学")] == ["n2"]
+
+    graph.update_node("n1", description="行列式")
+    assert graph.search_nodes_by_keyword("矩阵") == []
+    assert [n.id for n in graph.search_nodes_by_keyword("行列")] == ["n1"]
+
+    graph.remove_node("n2")
+    assert graph.search_nodes_by_keyword("数学") == []
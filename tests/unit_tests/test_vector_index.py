@@ -0,0 +1,130 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.graph_manager.knowledge_core.knowledge_graph import Knowledge_Graph
+from src.graph_manager.knowledge_core.knowledge_graph_integration import KnowledgeGraphIntegration
+from src.graph_manager.knowledge_core.node_edge import Knowledge_Node
+from src.graph_manager.knowledge_core.vector_index import VectorIndex, term_frequencies, vector_index_path_for
+
+WORDS = ["线性代数", "矩阵", "特征值", "梯度下降", "学习率", "概率", "贝叶斯", "图论", "最短路径", "拓扑排序", "卷积", "神经网络"]
+
+
+def random_doc(rng: random.Random):
+    title = "".join(rng.sample(WORDS, rng.randint(1, 2)))
+    description = " ".join(rng.sample(WORDS, rng.randint(0, 4)))
+    return (title, description)
+
+
+def reference_search(docs, query, limit):
+    """线性扫描的参考实现：在 docs 上从头计算 TF-IDF 与余弦相似度。"""
+    ids = list(docs)
+    tf = np.stack([term_frequencies(docs[doc_id]) for doc_id in ids]).astype(np.float64)
+    idf = np.log((1 + len(ids)) / (1 + np.count_nonzero(tf, axis=0))) + 1
+    matrix = tf * idf
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    vector = term_frequencies((query,)).astype(np.float64) * idf
+    scores = matrix @ (vector / np.linalg.norm(vector))
+    ranked = sorted(((doc_id, score) for doc_id, score in zip(ids, scores) if score > 0), key=lambda item: -item[1])
+    return ranked[:limit]
+
+
+def test_search_after_churn_matches_a_linear_scan():
+    rng = random.Random(3)
+    index, docs = VectorIndex(), {}
+    for step in range(400):
+        if docs and rng.random() < 0.3:
+            doc_id = rng.choice(list(docs))
+            index.remove(doc_id) # 删除时最后一行被移动到空出的位置
+            del docs[doc_id]
+        else:
+            doc_id = f"n{rng.randrange(200)}"
+            docs[doc_id] = random_doc(rng)
+            index.add(doc_id, docs[doc_id])
+    assert len(index) == len(docs)
+
+    queries = ["梯度下降的学习率", "矩阵特征值", "贝叶斯概率", "完全无关的词"]
+    for query, result in zip(queries, index.search(queries, limit=8)):
+        expected = reference_search(docs, query, 8)
+        # 词频以 float16 保存，分数存在少量舍入误差
+        assert [score for _, score in result] == pytest.approx([score for _, score in expected], abs=5e-4)
+        top = {doc_id for doc_id, score in expected if score > expected[-1][1] + 1e-3} if expected else set()
+        assert top <= {doc_id for doc_id, _ in result}
+
+
+def test_title_matches_rank_first_and_min_score_filters():
+    index = VectorIndex()
+    index.add("title", ("梯度下降", "优化方法"))
+    index.add("description", ("优化方法", "梯度下降"))
+    index.add("other", ("图论", "最短路径"))
+    [result] = index.search(["梯度下降"], limit=10)
+    assert [doc_id for doc_id, _ in result] == ["title", "description"]
+    assert index.search(["梯度下降"], min_score=result[0][1] + 1e-6) == [[]]
+    assert index.search([]) == [] and index.search(["x"], limit=0) == [[]]
+
+
+def test_partitioned_search_probing_every_partition_equals_flat_search():
+    rng = random.Random(5)
+    flat, partitioned = VectorIndex(), VectorIndex(partitions=4)
+    for i in range(200):
+        doc = random_doc(rng)
+        flat.add(str(i), doc)
+        partitioned.add(str(i), doc)
+    queries = ["线性代数矩阵", "神经网络卷积"]
+    for expected, result in zip(flat.search(queries, limit=5), partitioned.search(queries, limit=5)):
+        assert [score for _, score in result] == pytest.approx([score for _, score in expected])
+    partitioned.add("new", ("数值积分", "")) # 训练分区之后新增的节点直接分配到最近的分区
+    assert partitioned.search(["数值积分"], limit=1) == [[("new", pytest.approx(1.0))]]
+
+
+def test_saved_vectors_are_reused_only_for_unchanged_nodes(tmp_path):
+    docs = {f"n{i}": (WORDS[i], WORDS[-i - 1]) for i in range(10)}
+    index = VectorIndex()
+    for doc_id, fields in docs.items():
+        index.add(doc_id, fields)
+    path = tmp_path / "g.vectors.npz"
+    index.save(path)
+
+    docs["n0"] = ("卷积神经网络", "")
+    del docs["n1"]
+    docs["new"] = ("最短路径", "")
+    loaded, reused = VectorIndex.load(path, docs.items())
+    assert reused == 8 and len(loaded) == 10 and "n1" not in loaded
+    fresh = VectorIndex()
+    for doc_id, fields in docs.items():
+        fresh.add(doc_id, fields)
+    queries = ["卷积", "最短路径", "矩阵"]
+    assert loaded.search(queries) == fresh.search(queries)
+
+
+def test_graph_search_follows_updates_and_is_saved_with_the_graph(tmp_path):
+    graph = Knowledge_Graph(name="vec")
+    graph.add_node(Knowledge_Node(id="a", title="梯度下降", description="优化算法"))
+    graph.add_node(Knowledge_Node(id="b", title="贝叶斯定理"))
+    [[(node, _)]] = graph.semantic_search(["梯度下降法"], limit=1)
+    assert node.id == "a"
+    graph.update_node("b", title="随机梯度下降")
+    graph.remove_node("a")
+    assert [node.id for node, _ in graph.semantic_search(["梯度下降"])[0]] == ["b"]
+
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    kgi.add_graph("vec", graph)
+    kgi.save_current_graph()
+    assert vector_index_path_for(tmp_path / "vec.json") == tmp_path / "vec.vectors.npz"
+    assert (tmp_path / "vec.vectors.npz").exists()
+    reloaded = Knowledge_Graph.load_from_file(str(tmp_path / "vec.json"))
+    assert reloaded.load_vector_index(str(tmp_path / "vec.vectors.npz")) == 1
+    assert "随机梯度下降" in kgi.semantic_search_nodes(["梯度下降", " "])
+
+
+def test_unreadable_index_file_is_logged_and_rebuilt(tmp_path, caplog):
+    graph = Knowledge_Graph(name="vec")
+    graph.add_node(Knowledge_Node(id="a", title="梯度下降"))
+    graph.save_to_file(str(tmp_path / "vec.json"))
+    (tmp_path / "vec.vectors.npz").write_bytes(b"not an index")
+    kgi = KnowledgeGraphIntegration(graph_dir=tmp_path)
+    kgi.set_current_graph("vec")
+    with caplog.at_level("WARNING"):
+        assert "梯度下降" in kgi.semantic_search_nodes(["梯度下降"])
+    assert "vec.vectors.npz" in caplog.text